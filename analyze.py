@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Offline batch analysis of recorded captures.
+
+Runs the live framer, decoders and detectors of one device from the daemon
+configuration over capture files (or raw serial byte dumps) on a process
+pool, splitting files by time chunk, and merges everything into one report
+and one event list:
+
+    python analyze.py --config daemon.json --report report.json \\
+        --events events.jsonl captures/*.mrblk
+"""
+
+import argparse
+import json
+import os
+import sys
+from utils.analysis.batch import run_batch
+from utils.daemon.config import load_config
+
+
+def main():
+    """
+    Parse arguments, analyse the captures and write the report.
+    """
+    parser = argparse.ArgumentParser(description="MR offline batch analysis")
+    parser.add_argument("captures", nargs="+", help="Capture files or raw dumps")
+    parser.add_argument(
+        "--config", required=True, help="Daemon JSON file describing the packets"
+    )
+    parser.add_argument("--device", help="Device of the config (default: first)")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="Worker processes"
+    )
+    parser.add_argument(
+        "--chunk-seconds", type=float, default=600.0, help="Seconds per work unit"
+    )
+    parser.add_argument(
+        "--overlap",
+        type=float,
+        default=5.0,
+        help="Seconds read past each chunk edge; above the longest event",
+    )
+    parser.add_argument(
+        "--raw-rate",
+        type=float,
+        help="Bytes per second of raw dumps (default: baudrate / 11)",
+    )
+    parser.add_argument("--report", help="Write the summary report as JSON")
+    parser.add_argument("--events", help="Write all events as JSON lines")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    devices = {device.name: device for device in config.devices}
+    if args.device and args.device not in devices:
+        parser.error(f"Unknown device '{args.device}'")
+    device = devices[args.device] if args.device else config.devices[0]
+    raw_rate = args.raw_rate or device.baudrate / 11.0
+
+    def progress(done, total, result):
+        print(
+            f"[BATCH] {done}/{total} {os.path.basename(result.path)} "
+            f"{sum(result.packets.values())} packets, {len(result.events)} events"
+        )
+
+    report = run_batch(
+        args.captures,
+        device,
+        workers=args.workers,
+        chunk_seconds=args.chunk_seconds,
+        overlap=args.overlap,
+        raw_rate=raw_rate,
+        progress=progress,
+    )
+
+    summary = report.to_dict()
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    if args.events:
+        with open(args.events, "w", encoding="utf-8") as f:
+            for event in report.events:
+                f.write(json.dumps(event) + "\n")
+
+    packets = sum(report.packets.values())
+    print(
+        f"[BATCH] {len(report.files)} files, {report.units} units, "
+        f"{packets} packets, {len(report.events)} events in "
+        f"{report.elapsed:.1f} s ({packets / max(report.elapsed, 1e-9):.0f} "
+        f"packets/s on {report.workers} workers)"
+    )
+    for name, count in sorted(report.events_by_detector.items()):
+        print(f"[BATCH]   {name}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,42 +11,196 @@ from PySide6.QtWidgets import (
     QSpinBox,
     QDoubleSpinBox,
     QCheckBox,
+    QStackedWidget,
 )
 from PySide6.QtCore import QObject, QTimer
 from PySide6.QtGui import QFont
 import random
+import time
 import numpy as np
 from views.main_window_view import MainWindowView
 from views.plotter_widget_view import PlotterWidgetView
+from views.multi_channel_view import MultiChannelView
+from views.render_scheduler import RenderScheduler
+from utils.diagnostics.event_loop_probe import EventLoopLagProbe
+from utils.dsp.channel_stats import ChannelStatistics
+from utils.events.signature_index import SignatureIndex
 
 
 class MainWindowController(QObject):
     """
     Controller class for the main window that manages the interaction between
     the view and the detection widgets.
+
+    Detection views are long-lived: each one is built once, kept in a
+    QStackedWidget and switched instantly, so plotted data survives switching.
+    Views that stay hidden longer than ``view_eviction_timeout`` seconds are
+    destroyed to bound memory and rebuilt on demand.
+
+    With a ``signature_directory`` (the signature index the acquisition
+    daemon fills from detected events), the arc view lists the most similar
+    past operations for each of its events.
     """
 
-    def __init__(self):
+    # Seconds a hidden view is kept alive before it is evicted
+    VIEW_EVICTION_TIMEOUT = 300.0
+    # Interval of the eviction sweep in milliseconds
+    VIEW_EVICTION_INTERVAL_MS = 30000
+    # Sample rate of the arc signal shown in the arc view's spectrogram (Hz)
+    ARC_SAMPLE_RATE = 10000.0
+
+    def __init__(self, view_eviction_timeout=None, signature_directory=None):
         super().__init__()
         # Create and show the main window
         self.view = MainWindowView()
         self.current_widget = None
 
+        # Cached detection views, keyed by view name
+        self.view_eviction_timeout = (
+            self.VIEW_EVICTION_TIMEOUT
+            if view_eviction_timeout is None
+            else view_eviction_timeout
+        )
+        self._views = {}
+        self._last_visible = {}
+        self._view_builders = {
+            "arc": self._build_arc_detection_view,
+            "short_circuit": self._build_short_circuit_detection_view,
+            "multi_channel": self._build_multi_channel_view,
+        }
+
+        # Redraws of all detection views are paced by one render scheduler
+        self.render_scheduler = RenderScheduler(parent=self)
+        self.render_scheduler.stats_updated.connect(self.view.show_render_stats)
+
+        # GUI event-loop lag, shown in the diagnostics panel
+        self.event_loop_probe = EventLoopLagProbe(parent=self)
+
+        # Signatures of past operations, read when the arc view is built
+        self.signature_directory = signature_directory
+
+        # Running statistics of the channels shown by each detection view
+        self.channel_statistics = {}
+
+        # All detection views live in one stacked container
+        self.view_stack = QStackedWidget(self.view.ui.mainWidget)
+        self.view.ui.mainWidgetLayout.addWidget(self.view_stack)
+
+        # Periodically evict views that have been hidden for too long
+        self.eviction_timer = QTimer(self)
+        self.eviction_timer.timeout.connect(self.evict_stale_views)
+        self.eviction_timer.start(self.VIEW_EVICTION_INTERVAL_MS)
+
         # Connect to view signals
         self.view.arc_detection_requested.connect(self.show_arc_detection_ui)
         self.view.short_circuit_detection_requested.connect(
             self.show_short_circuit_detection_ui
         )
+        self.view.multi_channel_requested.connect(self.show_multi_channel_ui)
 
     def show_arc_detection_ui(self):
         """
         Show the Arc Detection UI in the main widget area.
         """
-        self.clear_current_widget()
+        self.show_view("arc")
+        print("Arc Detection UI with plotter displayed")
+
+    def show_short_circuit_detection_ui(self):
+        """
+        Show the Short Circuit Detection UI in the main widget area.
+        """
+        self.show_view("short_circuit")
+        print("Short Circuit Detection UI with plotter displayed")
+
+    def show_multi_channel_ui(self):
+        """
+        Show the combined phase current, arc and tap position view.
+        """
+        self.show_view("multi_channel")
+        print("Multi-channel overview displayed")
+
+    def show_view(self, name):
+        """
+        Switch the main widget area to the named view, building it on first use.
+
+        Args:
+            name (str): Key of the view ("arc", "short_circuit" or "multi_channel")
+
+        Returns:
+            QWidget: The view now being displayed
+        """
+        now = time.monotonic()
+        # The view being hidden stays cached; remember when it was last seen
+        if self.current_widget is not None:
+            for key, widget in self._views.items():
+                if widget is self.current_widget:
+                    self._last_visible[key] = now
+
+        widget = self._views.get(name)
+        if widget is None:
+            widget = self._view_builders[name]()
+            self.render_scheduler.register_view(widget)
+            self._views[name] = widget
+            self.view_stack.addWidget(widget)
+
+        self.view_stack.setCurrentWidget(widget)
+        self.current_widget = widget
+        self._last_visible[name] = now
+
+        # Update the main widget style
+        self.view.ui.mainWidget.setStyleSheet(
+            "QWidget { background-color: transparent; }"
+        )
+        return widget
+
+    def evict_stale_views(self):
+        """
+        Destroy cached views that have not been visible for longer than the
+        eviction timeout. The currently displayed view is never evicted.
+
+        Returns:
+            list: Names of the evicted views
+        """
+        now = time.monotonic()
+        evicted = []
+        for name, widget in list(self._views.items()):
+            if widget is self.current_widget:
+                continue
+            if now - self._last_visible.get(name, now) < self.view_eviction_timeout:
+                continue
+            self._destroy_view(name)
+            evicted.append(name)
+        return evicted
+
+    def _destroy_view(self, name):
+        """
+        Remove a cached view from the stack and schedule it for deletion.
+
+        Args:
+            name (str): Key of the view to destroy
+        """
+        widget = self._views.pop(name, None)
+        self._last_visible.pop(name, None)
+        self.channel_statistics.pop(name, None)
+        if widget is None:
+            return
+        if widget is self.current_widget:
+            self.current_widget = None
+        self.render_scheduler.unregister_view(widget)
+        self.view_stack.removeWidget(widget)
+        widget.setParent(None)
+        widget.deleteLater()
+        print(f"[VIEW] Evicted cached view '{name}'")
 
-        # Create plotter widget for arc detection
-        self.current_widget = PlotterWidgetView()
-        self.current_widget.set_plot_labels(
+    def _build_arc_detection_view(self):
+        """
+        Build the plotter widget for arc detection.
+
+        Returns:
+            PlotterWidgetView: The configured arc detection view
+        """
+        widget = PlotterWidgetView()
+        widget.set_plot_labels(
             x_label="Time (s)", y_label="Arc Signal (V)", title="Arc Detection Analysis"
         )
 
@@ -61,30 +215,70 @@ class MainWindowController(QObject):
         # Add noise
         arc_data += np.random.normal(0, 0.02, len(arc_data))
 
-        self.current_widget.plot_static_data(time_data, arc_data, "Arc Detection")
+        widget.plot_static_data(time_data, arc_data, "Arc Detection")
 
         # Add markers for detected arcs
-        self.current_widget.add_marker(2.0, "Arc Event 1", "r")
-        self.current_widget.add_marker(4.5, "Arc Event 2", "r")
-        self.current_widget.add_marker(7.5, "Arc Event 3", "r")
+        widget.add_marker(2.0, "Arc Event 1", "r")
+        widget.add_marker(4.5, "Arc Event 2", "r")
+        widget.add_marker(7.5, "Arc Event 3", "r")
 
-        self.view.ui.mainWidgetLayout.addWidget(self.current_widget)
-        # Update the main widget style
-        self.view.ui.mainWidget.setStyleSheet(
-            "QWidget { background-color: transparent; }"
+        self._attach_channel_statistics("arc", widget, {"Arc": arc_data})
+
+        # Compare each arc with the recorded past operations, if any
+        index = self._load_signature_index()
+        if index is not None:
+            for number, i in enumerate((200, 450, 750), start=1):
+                matches = index.query(arc_data[i : i + 20], k=10)
+                widget.show_similar_operations(
+                    f"Arc Event {number} (t={time_data[i]:.2f} s)", matches
+                )
+
+        # Arcs show up as broadband high-frequency energy; the spectrogram
+        # stays empty until live samples arrive through show_arc_samples()
+        widget.enable_spectrogram(
+            self.ARC_SAMPLE_RATE, fft_size=256, history_seconds=10.0
         )
+        return widget
 
-        print("Arc Detection UI with plotter displayed")
+    def show_arc_samples(self, samples):
+        """
+        Feed live arc-signal samples to the spectrogram of the arc view.
 
-    def show_short_circuit_detection_ui(self):
+        Meant to be connected to the decoded arc stream of a live source;
+        samples arriving while the arc view is not built are dropped.
+
+        Args:
+            samples: 1-D array of new samples at ARC_SAMPLE_RATE
         """
-        Show the Short Circuit Detection UI in the main widget area.
+        widget = self._views.get("arc")
+        if widget is not None:
+            widget.update_spectrogram(samples)
+
+    def _load_signature_index(self):
+        """
+        Read the signature index of past operations from its directory.
+
+        Returns:
+            SignatureIndex: The index, or None without a directory or history
+        """
+        if not self.signature_directory:
+            return None
+        try:
+            index = SignatureIndex(self.signature_directory)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] Could not read signatures: {e}")
+            return None
+        return index if index.count else None
+
+    def _build_short_circuit_detection_view(self):
         """
-        self.clear_current_widget()
+        Build the plotter widget for short circuit detection.
 
-        # Create plotter widget for short circuit detection
-        self.current_widget = PlotterWidgetView()
-        self.current_widget.set_plot_labels(
+        Returns:
+            PlotterWidgetView: The configured short circuit detection view
+        """
+        widget = PlotterWidgetView()
+        widget.set_plot_labels(
             x_label="Time (s)",
             y_label="Current (A)",
             title="Short Circuit Detection Analysis",
@@ -103,37 +297,83 @@ class MainWindowController(QObject):
         # Add noise
         current_data += np.random.normal(0, 0.5, len(current_data))
 
-        self.current_widget.plot_static_data(time_data, current_data, "Short Circuit")
+        widget.plot_static_data(time_data, current_data, "Short Circuit")
 
         # Add markers for detected short circuits
-        self.current_widget.add_marker(1.5, "Short Circuit 1", "b")
-        self.current_widget.add_marker(3.5, "Short Circuit 2", "b")
+        widget.add_marker(1.5, "Short Circuit 1", "b")
+        widget.add_marker(3.5, "Short Circuit 2", "b")
 
-        # Add the widget to the main widget area
-        self.view.ui.mainWidgetLayout.addWidget(self.current_widget)
+        self._attach_channel_statistics(
+            "short_circuit", widget, {"Current": current_data}
+        )
+        return widget
 
-        # Update the main widget style
-        self.view.ui.mainWidget.setStyleSheet(
-            "QWidget { background-color: transparent; }"
+    def _attach_channel_statistics(self, name, widget, fields):
+        """
+        Keep running statistics of a view's channels and show them in it.
+
+        Args:
+            name (str): Key of the view
+            widget (PlotterWidgetView): The view showing the statistics
+            fields (dict): Initial samples per channel name
+        """
+        statistics = ChannelStatistics(name)
+        statistics.update(fields)
+        self.channel_statistics[name] = statistics
+        table = widget.show_channel_statistics(
+            statistics.snapshot(), statistics.started
         )
 
-        print("Short Circuit Detection UI with plotter displayed")
+        def reset():
+            statistics.reset()
+            widget.show_channel_statistics(statistics.snapshot(), statistics.started)
+
+        table.reset_requested.connect(reset)
+
+    def _build_multi_channel_view(self):
+        """
+        Build the stacked view of phase currents, arc signal and tap position.
+
+        Returns:
+            MultiChannelView: The configured multi-channel view
+        """
+        widget = MultiChannelView()
+        sample_rate = 5000.0
+        duration = 10.0
+        widget.add_time_base(
+            "fast",
+            ["phase_a", "phase_b", "phase_c", "arc"],
+            capacity=int(duration * sample_rate),
+        )
+        widget.add_time_base("slow", ["tap_position"], capacity=int(duration * 10))
+
+        widget.add_channel("phase_a", "fast", "Phase A", "A", "r")
+        widget.add_channel("phase_b", "fast", "Phase B", "A", "g")
+        widget.add_channel("phase_c", "fast", "Phase C", "A", "b")
+        widget.add_channel("arc", "fast", "Arc", "V", "m")
+        widget.add_channel("tap_position", "slow", "Tap", None, "k")
+
+        # Generate sample data: three-phase currents, an arc burst during
+        # the tap change and the tap position stepping up
+        fast_time = np.arange(int(duration * sample_rate)) / sample_rate
+        phases = [
+            10 * np.sin(2 * np.pi * 50 * fast_time - shift)
+            for shift in (0, 2 * np.pi / 3, 4 * np.pi / 3)
+        ]
+        arc = np.random.normal(0, 0.02, len(fast_time))
+        change = slice(int(5.0 * sample_rate), int(5.05 * sample_rate))
+        arc[change] += np.random.uniform(0.5, 1.0, change.stop - change.start)
+        widget.append("fast", fast_time, np.vstack(phases + [arc]))
+
+        slow_time = np.arange(int(duration * 10)) / 10.0
+        tap = np.where(slow_time < 5.0, 8.0, 9.0)
+        widget.append("slow", slow_time, tap[np.newaxis, :])
+        return widget
 
     def clear_current_widget(self):
         """
-        Clear the current widget from the main widget area.
+        Destroy every cached view and clear the main widget area.
         """
-        # Clear current widget reference first
-        if self.current_widget:
-            self.current_widget.setParent(None)
-            self.current_widget.deleteLater()
-            self.current_widget = None
-            
-        # Clear the layout contents safely
-        layout = self.view.ui.mainWidgetLayout
-        if layout:
-            while layout.count():
-                child = layout.takeAt(0)
-                if child.widget():
-                    child.widget().setParent(None)
-                    child.widget().deleteLater()
+        for name in list(self._views):
+            self._destroy_view(name)
+        self.current_widget = None
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Measure compression ratio and speed of the block capture format on
+synthetic arc and phase-current payloads shaped like the device packets.
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import tempfile
+import time
+import numpy as np
+from utils.capture.block_store import BlockCaptureReader, BlockCaptureWriter
+
+
+def make_records(seconds=10.0, rate=2000):
+    """Interleaved arc (0xA0) and short-circuit current (0xB0) packets"""
+    rng = np.random.default_rng(1)
+    count = int(seconds * rate)
+    t = np.arange(count) / rate + 1.7e9
+    jitter = rng.normal(0, 20e-6, count)
+
+    # Arc signal in mV: low baseline with noise and occasional bursts
+    arc = 200 + 50 * np.sin(2 * np.pi * 0.5 * t) + rng.normal(0, 20, count)
+    for start in rng.integers(0, count - 40, 20):
+        arc[start : start + 40] += rng.uniform(500, 1000, 40)
+    # Phase current in 10 mA: 50 Hz sine with noise
+    current = 1000 + 200 * np.sin(2 * np.pi * 50 * t) + rng.normal(0, 5, count)
+
+    records = []
+    for i in range(count):
+        records.append(
+            (
+                t[i] + jitter[i],
+                0xA0,
+                bytes([0xA0]) + struct.pack("<I", max(0, int(arc[i]))),
+            )
+        )
+        records.append(
+            (
+                t[i] + jitter[i] + 100e-6,
+                0xB0,
+                bytes([0xB0, 1]) + struct.pack("<I", int(current[i])),
+            )
+        )
+    return records
+
+
+def run(records, codec, level, directory):
+    """Write and fully read back one file, returning the measurements"""
+    path = os.path.join(directory, f"bench-{codec}-{level}.mrblk")
+    started = time.perf_counter()
+    with BlockCaptureWriter(path, codec=codec, level=level) as writer:
+        writer.write_many(records)
+    write_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with BlockCaptureReader(path) as reader:
+        count = sum(1 for _ in reader.read())
+    read_seconds = time.perf_counter() - started
+    assert count == len(records)
+
+    raw_mb = writer.stats["raw_bytes"] / 1e6
+    return {
+        "ratio": writer.compression_ratio,
+        "write_mb_s": raw_mb / write_seconds,
+        "read_mb_s": raw_mb / read_seconds,
+        "file_kb": os.path.getsize(path) / 1e3,
+    }
+
+
+if __name__ == "__main__":
+    records = make_records()
+    raw_kb = sum(11 + len(p) for _, _, p in records) / 1e3
+    print(f"{len(records)} records, {raw_kb:.0f} kB in raw capture layout")
+    print(
+        f"{'codec':>6} {'level':>5} {'ratio':>7} {'write MB/s':>11} {'read MB/s':>10}"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for codec, level in [
+            ("none", 0),
+            ("zlib", 1),
+            ("zlib", 6),
+            ("zlib", 9),
+            ("lzma", 0),
+            ("lzma", 6),
+        ]:
+            result = run(records, codec, level, directory)
+            print(
+                f"{codec:>6} {level:>5} {result['ratio']:>6.1f}x "
+                f"{result['write_mb_s']:>11.1f} {result['read_mb_s']:>10.1f}"
+            )
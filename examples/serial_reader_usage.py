@@ -10,6 +10,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.serial.serial_reader import SerialReader, PacketConfig
+from utils.serial.decoding import FieldSpec, PacketDecoder
+from utils.dsp.calibration import LinearCalibration
 from PySide6.QtCore import QObject, Signal, QCoreApplication
 from queue import Queue
 import time
@@ -23,12 +25,23 @@ class ArcDetectionProcessor(QObject):
     def __init__(self):
         super().__init__()
         self.arc_queue = Queue()
+        # Arc intensity in bytes 1-4 (little endian counts of 1 mV)
+        self.decoder = PacketDecoder(
+            5,
+            [
+                FieldSpec(
+                    "intensity",
+                    1,
+                    "<u4",
+                    calibration=LinearCalibration(0.001, units="V"),
+                )
+            ],
+        )
 
     def process_arc_packet(self, packet: bytes):
         """Process arc detection packet"""
         if len(packet) >= 5:
-            # Example: extract arc intensity from bytes 1-4 (little endian float)
-            intensity = int.from_bytes(packet[1:5], byteorder="little") / 1000.0
+            intensity = float(self.decoder.decode([packet])["intensity"][0])
             print(f"Arc Detection: Intensity = {intensity:.3f}")
             self.arc_detected.emit(intensity)
 
@@ -41,13 +54,23 @@ class ShortCircuitProcessor(QObject):
     def __init__(self):
         super().__init__()
         self.sc_queue = Queue()
+        # Location in byte 1, current in bytes 2-5 (counts of 10 mA)
+        self.decoder = PacketDecoder(
+            6,
+            [
+                FieldSpec("location", 1, "u1"),
+                FieldSpec(
+                    "current", 2, "<u4", calibration=LinearCalibration(0.01, units="A")
+                ),
+            ],
+        )
 
     def process_sc_packet(self, packet: bytes):
         """Process short circuit detection packet"""
         if len(packet) >= 6:
-            # Example: extract location (byte 1) and current (bytes 2-5)
-            location = packet[1]
-            current = int.from_bytes(packet[2:6], byteorder="little") / 100.0
+            fields = self.decoder.decode([packet])
+            location = int(fields["location"][0])
+            current = float(fields["current"][0])
             print(f"Short Circuit: Location = {location}, Current = {current:.2f}A")
             self.short_circuit_detected.emit(location, current)
 
@@ -60,13 +83,26 @@ class TemperatureProcessor(QObject):
     def __init__(self):
         super().__init__()
         self.temp_queue = Queue()
+        # Sensor ID in byte 1, temperature in bytes 2-3 (counts of 0.1 °C)
+        self.decoder = PacketDecoder(
+            4,
+            [
+                FieldSpec("sensor", 1, "u1"),
+                FieldSpec(
+                    "temperature",
+                    2,
+                    "<u2",
+                    calibration=LinearCalibration(0.1, units="°C"),
+                ),
+            ],
+        )
 
     def process_temp_packet(self, packet: bytes):
         """Process temperature monitoring packet"""
         if len(packet) >= 4:
-            # Example: extract sensor ID (byte 1) and temperature (bytes 2-3)
-            sensor_id = packet[1]
-            temp = int.from_bytes(packet[2:4], byteorder="little") / 10.0
+            fields = self.decoder.decode([packet])
+            sensor_id = int(fields["sensor"][0])
+            temp = float(fields["temperature"][0])
             print(f"Temperature: Sensor {sensor_id} = {temp:.1f}°C")
             self.temperature_updated.emit(sensor_id, temp)
 
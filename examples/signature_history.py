@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Fill a signature index with synthetic past operations, e.g. to try the
+similar-operations list of the GUI without recorded history:
+
+    python examples/signature_history.py /tmp/signatures
+    MR_SIGNATURES=/tmp/signatures python main.py
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import numpy as np
+from utils.events.signature_index import SignatureIndex
+
+
+def synthetic_history(index, operations=5000, seed=0):
+    """Add arc bursts whose decay slows as the contacts wear"""
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    t = np.linspace(0.0, 1.0, 40)
+    for operation_id in range(1, operations + 1):
+        decay = rng.uniform(3.0, 12.0)
+        waveform = np.exp(-decay * t) + rng.normal(0, 0.05, len(t))
+        index.add(
+            operation_id,
+            waveform,
+            tap_position=int(rng.integers(1, 20)),
+            time=now - (operations + 1 - operation_id) * 3600.0,
+        )
+    return index
+
+
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else "signatures"
+    index = synthetic_history(SignatureIndex(directory))
+    index.save()
+    print(f"Saved {index.count} synthetic operations to {directory}")
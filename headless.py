@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Headless entry point for the MR Detection System acquisition daemon.
+
+Runs serial acquisition, detection and recording under a QCoreApplication
+without loading any widgets, suitable for running as a systemd service:
+
+    python headless.py --config /etc/mr-stufenschalter/daemon.json
+"""
+
+import argparse
+import signal
+import sys
+from PySide6.QtCore import QCoreApplication, QTimer
+from utils.daemon.acquisition_daemon import AcquisitionDaemon
+from utils.daemon.config import load_config
+
+
+def main():
+    """
+    Parse arguments, start the acquisition daemon and run until signalled.
+    """
+    parser = argparse.ArgumentParser(description="MR headless acquisition daemon")
+    parser.add_argument(
+        "--config", required=True, help="JSON file describing ports and packets"
+    )
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+
+    # Create the Qt core application (no GUI)
+    app = QCoreApplication(sys.argv[:1])
+
+    daemon = AcquisitionDaemon(config)
+    app.aboutToQuit.connect(daemon.stop)
+
+    # Quit cleanly on SIGTERM (systemd stop) and SIGINT (Ctrl+C)
+    signal.signal(signal.SIGTERM, lambda *_: app.quit())
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+
+    # Python only runs signal handlers between bytecodes; wake it up regularly
+    wakeup_timer = QTimer()
+    wakeup_timer.timeout.connect(lambda: None)
+    wakeup_timer.start(200)
+
+    daemon.start()
+
+    # Run the event loop
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
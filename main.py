@@ -3,6 +3,7 @@
 Main entry point for the MR Detection System application.
 """
 
+import os
 import sys
 from PySide6.QtWidgets import QApplication
 from controllers.main_window_controller import MainWindowController
@@ -15,8 +16,11 @@ def main():
     # Create the Qt application
     app = QApplication(sys.argv)
 
-    # Create the controller and connect it to the view
-    controller = MainWindowController()
+    # Create the controller and connect it to the view; MR_SIGNATURES points
+    # at the signature index written by the acquisition daemon
+    controller = MainWindowController(
+        signature_directory=os.environ.get("MR_SIGNATURES")
+    )
     controller.view.show()
 
     # Run the application event loop
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Long-running soak test of the acquisition path.
+
+Drives a SerialReader from a synthetic high-rate source through an
+in-memory transport, with the plot view rendering offscreen (or headless),
+samples RSS, object counts, queue depths and dispatch latency percentiles
+at intervals, and exits non-zero when growth or latency thresholds are
+exceeded:
+
+    python soak.py --duration 4h --rate 2000 --interval 60 --report soak.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from queue import Empty, Queue
+
+
+def parse_duration(text: str) -> float:
+    """Seconds from "90", "90s", "15m" or "4h" """
+    units = {"s": 1, "m": 60, "h": 3600}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+class ArcConsumer:
+    """Drains the arc packet queue like the GUI: decode, detect, plot"""
+
+    def __init__(self, queue: Queue, rate: float, view=None, window: int = 20000):
+        import numpy as np
+        from utils.detection.detectors import ThresholdDetector
+        from utils.dsp.ring_buffer import TimeBaseRingBuffer
+        from utils.serial.decoding import FieldSpec, PacketDecoder
+
+        self.np = np
+        self.queue = queue
+        self.rate = rate
+        self.view = view
+        self.decoder = PacketDecoder(5, [FieldSpec("arc", 1, "<u4")])
+        self.detector = ThresholdDetector("arc", 0xA0, "arc", 900, hold_off=0.1)
+        self.history = TimeBaseRingBuffer(window, 1)
+        self.samples = 0
+        self.events = 0
+
+    def drain(self):
+        packets = []
+        try:
+            while True:
+                packets.append(self.queue.get_nowait())
+        except Empty:
+            pass
+        if not packets:
+            return
+        times = (self.samples + self.np.arange(len(packets))) / self.rate
+        self.samples += len(packets)
+        fields = self.decoder.decode(packets)
+        self.events += len(self.detector.process(times, fields))
+        self.history.append(times, fields["arc"][None, :])
+        if self.view is not None:
+            x, y = self.history.latest()
+            self.view.update_data(x, y[0], "Arc")
+
+
+def main():
+    """
+    Parse arguments, run the soak and write the report.
+    """
+    parser = argparse.ArgumentParser(description="MR acquisition soak test")
+    parser.add_argument(
+        "--duration", default="1h", help="Run time, e.g. 600, 30m or 4h"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=2000.0, help="Packets per second and type"
+    )
+    parser.add_argument(
+        "--interval", default="60", help="Time between samples, e.g. 60 or 5m"
+    )
+    parser.add_argument(
+        "--headless", action="store_true", help="Run without the plot view"
+    )
+    parser.add_argument("--warmup", default="2m", help="Ignored for growth checks")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=50.0)
+    parser.add_argument("--max-object-growth", type=int, default=10000)
+    parser.add_argument("--max-queue-depth", type=int, default=1000)
+    parser.add_argument("--max-p99-ms", type=float, default=100.0)
+    parser.add_argument(
+        "--max-latency-regression",
+        type=float,
+        default=2.0,
+        help="Allowed ratio of the final to the baseline p99 latency",
+    )
+    parser.add_argument("--report", help="Write samples and verdict as JSON")
+    args = parser.parse_args()
+
+    if not args.headless:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtCore import QCoreApplication, QTimer
+    from utils.diagnostics.soak import SoakMonitor, SoakThresholds, SyntheticSource
+    from utils.serial.serial_reader import SerialReader
+    from utils.serial.transports import MemoryTransport
+
+    if args.headless:
+        app = QCoreApplication(sys.argv[:1])
+        view = scheduler = None
+    else:
+        from PySide6.QtWidgets import QApplication
+        from views.plotter_widget_view import PlotterWidgetView
+        from views.render_scheduler import RenderScheduler
+
+        app = QApplication(sys.argv[:1])
+        view = PlotterWidgetView()
+        view.resize(1200, 600)
+        view.show()
+        scheduler = RenderScheduler()
+        scheduler.register_view(view)
+
+    transport = MemoryTransport()
+    reader = SerialReader("soak://synthetic", log_packets=False, transport=transport)
+    arc_queue = Queue(maxsize=100000)
+    reader.add_packet_config(0xA0, 5, arc_queue, name="Arc")
+    reader.add_packet_config(0xB0, 6, None, name="ShortCircuit")
+    consumer = ArcConsumer(arc_queue, args.rate, view)
+
+    thresholds = SoakThresholds(
+        warmup=parse_duration(args.warmup),
+        max_rss_growth_mb=args.max_rss_growth_mb,
+        max_object_growth=args.max_object_growth,
+        max_queue_depth=args.max_queue_depth,
+        max_p99_latency=args.max_p99_ms / 1000.0,
+        max_latency_regression=args.max_latency_regression,
+    )
+    monitor = SoakMonitor(reader, thresholds)
+    source = SyntheticSource(transport, rate=args.rate)
+
+    duration = parse_duration(args.duration)
+    started = time.monotonic()
+
+    def take_sample():
+        sample = monitor.sample()
+        latency = sample.latency
+        print(
+            f"[SOAK] {sample.elapsed:7.0f} s rss={sample.rss_bytes / 1e6:.1f} MB "
+            f"packets={sample.packets} dropped={sample.dropped} "
+            f"queues={max(sample.queue_depths.values(), default=0)} "
+            f"p50={latency['p50'] * 1000:.2f} ms p99={latency['p99'] * 1000:.2f} ms "
+            f"events={consumer.events}"
+        )
+        if time.monotonic() - started >= duration:
+            app.quit()
+
+    drain_timer = QTimer()
+    drain_timer.timeout.connect(consumer.drain)
+    drain_timer.start(50)
+    sample_timer = QTimer()
+    sample_timer.timeout.connect(take_sample)
+    sample_timer.start(int(parse_duration(args.interval) * 1000))
+
+    reader.start()
+    source.start()
+    print(
+        f"[SOAK] {args.rate:.0f} packets/s per type for {duration:.0f} s, "
+        f"{'headless' if args.headless else 'offscreen GUI'}"
+    )
+    app.exec()
+
+    source.stop()
+    reader.stop()
+    if scheduler is not None:
+        scheduler.unregister_view(view)
+
+    report = monitor.report()
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    for failure in report["failures"]:
+        print(f"[SOAK] FAIL {failure}")
+    print(f"[SOAK] {'PASSED' if report['passed'] else 'FAILED'}")
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared framer and the offline batch analysis
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import tempfile
+import unittest
+import numpy as np
+from utils.analysis.batch import KIND_BLOCKS, KIND_RAW, file_kind, run_batch
+from utils.capture.block_store import BlockCaptureWriter
+from utils.daemon.config import parse_config
+from utils.serial.framing import frame_buffer
+from utils.serial.types import PacketConfig
+
+CONFIG = {
+    "devices": [
+        {
+            "name": "diverter",
+            "port": "/dev/null",
+            "packets": [
+                {
+                    "header": "0xA0",
+                    "size": 5,
+                    "fields": [{"name": "arc", "offset": 1, "dtype": "<u4"}],
+                },
+                {"header": "0xB0", "size": 3},
+            ],
+            "detectors": [
+                {
+                    "name": "arc",
+                    "header": "0xA0",
+                    "field": "arc",
+                    "threshold": 50,
+                    "hold_off": 0.05,
+                }
+            ],
+        }
+    ]
+}
+
+
+def arc_levels(count, seed=0):
+    """Quiet signal with short bursts above the detector threshold"""
+    rng = np.random.default_rng(seed)
+    levels = rng.integers(0, 20, count)
+    for start in rng.choice(count - 20, size=count // 500, replace=False):
+        levels[start : start + rng.integers(1, 10)] = 100
+    return levels
+
+
+class TestFrameBuffer(unittest.TestCase):
+
+    def test_frames_skips_garbage_and_keeps_tail(self):
+        """Test packets, skipped bytes and the incomplete tail"""
+        configs = {0xA0: PacketConfig(0xA0, 3, None), 0xB0: PacketConfig(0xB0, 2, None)}
+        buffer = bytearray(b"\xa0\x01\x02\xff\xb0\x03\xa0\x04")
+
+        packets, desync = frame_buffer(buffer, configs)
+
+        self.assertEqual(
+            [(position, packet) for position, packet, _ in packets],
+            [(0, b"\xa0\x01\x02"), (4, b"\xb0\x03")],
+        )
+        self.assertEqual(desync, [(3, 0xFF)])
+        self.assertEqual(buffer, bytearray(b"\xa0\x04"))
+
+
+class TestBatchAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.device = parse_config(CONFIG).devices[0]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chunked_blocks_match_single_pass(self):
+        """Test that time chunks on a process pool find the same events"""
+        path = os.path.join(self.tmp.name, "diverter.mrblk")
+        levels = arc_levels(60000)
+        with BlockCaptureWriter(path, block_records=1000) as writer:
+            for i, level in enumerate(levels):
+                t = 1000.0 + i * 0.01
+                writer.write(t, 0xA0, struct.pack("<BI", 0xA0, int(level)))
+                if i % 10 == 0:
+                    writer.write(t, 0xB0, b"\xb0\x00\x00")
+        self.assertEqual(file_kind(path), KIND_BLOCKS)
+
+        single = run_batch([path], self.device, workers=1, chunk_seconds=1e9)
+        chunked = run_batch(
+            [path], self.device, workers=2, chunk_seconds=60.0, overlap=1.0
+        )
+
+        self.assertEqual(single.units, 1)
+        self.assertEqual(chunked.units, 10)
+        self.assertGreater(len(single.events), 50)
+        self.assertEqual(chunked.events, single.events)
+        self.assertEqual(chunked.packets, {0xA0: 60000, 0xB0: 6000})
+        self.assertEqual(chunked.packets, single.packets)
+
+    def test_out_of_order_capture_split_in_two(self):
+        """Test that records written out of time order are counted once"""
+        path = os.path.join(self.tmp.name, "diverter.mrblk")
+        levels = arc_levels(12000, seed=2)
+        order = np.arange(len(levels))
+        rng = np.random.default_rng(2)
+        for start in range(100, len(order), 200):  # Late writes within 2 s
+            rng.shuffle(order[start : start + 200])
+        with BlockCaptureWriter(path, block_records=1000) as writer:
+            for i in order:
+                writer.write(
+                    1000.0 + i * 0.01, 0xA0, struct.pack("<BI", 0xA0, int(levels[i]))
+                )
+
+        single = run_batch([path], self.device, workers=1, chunk_seconds=1e9)
+        chunked = run_batch(
+            [path], self.device, workers=1, chunk_seconds=60.0, overlap=1.0
+        )
+
+        self.assertEqual(chunked.units, 2)
+        self.assertEqual(single.packets, {0xA0: 12000})
+        self.assertEqual(chunked.packets, single.packets)
+        self.assertGreater(len(single.events), 10)
+        self.assertEqual(chunked.events, single.events)
+
+    def test_chunked_raw_dump_matches_single_pass(self):
+        """Test that byte-offset chunks of a raw dump are framed consistently"""
+        path = os.path.join(self.tmp.name, "diverter.bin")
+        stream = bytearray()
+        for i, level in enumerate(arc_levels(20000, seed=1)):
+            stream += struct.pack("<BI", 0xA0, int(level))
+            if i % 100 == 0:
+                stream += b"\x17"  # Line noise
+        with open(path, "wb") as f:
+            f.write(stream)
+        self.assertEqual(file_kind(path), KIND_RAW)
+
+        single = run_batch([path], self.device, workers=1, chunk_seconds=1e9)
+        chunked = run_batch(
+            [path], self.device, workers=1, chunk_seconds=1.0, overlap=0.2
+        )
+
+        self.assertGreater(chunked.units, 5)
+        self.assertEqual(single.packets, {0xA0: 20000})
+        self.assertEqual(single.desync_bytes, 200)
+        self.assertEqual(chunked.packets, single.packets)
+        self.assertEqual(chunked.desync_bytes, single.desync_bytes)
+        self.assertEqual(chunked.events, single.events)
+
+
+if __name__ == "__main__":
+    unittest.main()
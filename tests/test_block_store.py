@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the block-compressed capture format
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import tempfile
+import unittest
+from utils.capture.block_store import (
+    BlockCaptureReader,
+    BlockCaptureWriter,
+    decode_block,
+    encode_block,
+)
+from utils.capture.recorder import CaptureRecorder, read_capture
+
+
+def make_records(count, start=1000.0):
+    """Interleaved fixed-size packets of two headers"""
+    records = []
+    for i in range(count):
+        records.append((start + i * 0.001, 0xA0, bytes([0xA0]) + struct.pack("<I", i)))
+        if i % 3 == 0:
+            records.append(
+                (start + i * 0.001 + 0.0001, 0xB0, bytes([0xB0, i % 7, 255]))
+            )
+    return records
+
+
+class TestBlockEncoding(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Test that encoding and decoding restores records exactly"""
+        records = make_records(500)
+        decoded = decode_block(encode_block(records))
+
+        self.assertEqual(
+            [(h, p) for _, h, p in decoded], [(h, p) for _, h, p in records]
+        )
+        for (t1, _, _), (t2, _, _) in zip(decoded, records):
+            self.assertAlmostEqual(t1, t2, places=6)
+
+    def test_variable_length_group(self):
+        """Test a header whose packets have different lengths"""
+        records = [(1.0, 0xC0, b"\xc0\x01"), (2.0, 0xC0, b"\xc0\x01\x02\x03")]
+
+        decoded = decode_block(encode_block(records))
+
+        self.assertEqual([p for _, _, p in decoded], [b"\xc0\x01", b"\xc0\x01\x02\x03"])
+
+
+class TestBlockCaptureFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "test.mrblk")
+
+    def test_range_query_reads_only_touched_blocks(self):
+        """Test random access through the block index"""
+        records = make_records(10000)
+        with BlockCaptureWriter(self.path, codec="zlib", block_records=1000) as writer:
+            writer.write_many(records)
+        self.assertGreater(writer.compression_ratio, 1.0)
+
+        with BlockCaptureReader(self.path) as reader:
+            self.assertGreater(len(reader.index), 10)
+            selected = list(reader.read(start=1005.0, end=1005.5, headers=[0xA0]))
+            blocks_read = reader.stats["blocks_read"]
+
+        self.assertEqual(len(selected), 501)
+        self.assertTrue(all(1005.0 <= t <= 1005.5 for t, _, _ in selected))
+        self.assertLessEqual(blocks_read, 2)
+
+    def test_out_of_order_records(self):
+        """Test range queries over records written out of time order"""
+        records = [
+            (1000.0, 0xA0, b"\xa0\x00"),
+            (1000.2, 0xA0, b"\xa0\x01"),
+            (1000.1, 0xA0, b"\xa0\x02"),
+            (1000.15, 0xA0, b"\xa0\x03"),
+            (1000.05, 0xA0, b"\xa0\x04"),
+        ]
+        with BlockCaptureWriter(self.path, codec="none", block_records=2) as writer:
+            writer.write_many(records)
+
+        with BlockCaptureReader(self.path) as reader:
+            self.assertEqual(reader.time_range(), (1000.0, 1000.2))
+            selected = [p[1] for _, _, p in reader.read(None, 1000.16)]
+            later = [p[1] for _, _, p in reader.read(1000.06, None)]
+
+        self.assertEqual(selected, [0, 2, 3, 4])
+        self.assertEqual(later, [1, 2, 3])
+
+    def test_recover_index_without_footer(self):
+        """Test that an unterminated file is readable by scanning blocks"""
+        records = make_records(3000)
+        writer = BlockCaptureWriter(self.path, codec="lzma", level=0, block_records=500)
+        writer.write_many(records)
+        writer.flush_block()
+        writer._file.close()  # Simulate a crash before close()
+
+        with BlockCaptureReader(self.path) as reader:
+            self.assertEqual(sum(1 for _ in reader.read()), len(records))
+
+    def test_recorder_block_format(self):
+        """Test that the recorder writes block files readable by read_capture"""
+        recorder = CaptureRecorder(self.directory, prefix="dev", file_format="block")
+        recorder.start()
+        for timestamp, header, packet in make_records(100):
+            recorder.write(header, packet, timestamp)
+        recorder.stop()
+
+        self.assertTrue(recorder.current_path.endswith(".mrblk"))
+        records = list(read_capture(recorder.current_path))
+        self.assertEqual(len(records), len(make_records(100)))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
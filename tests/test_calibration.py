@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for the calibration stage of the packet decoder
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import threading
+import unittest
+import numpy as np
+from utils.dsp.calibration import (
+    LinearCalibration,
+    LookupTableCalibration,
+    PiecewiseLinearCalibration,
+    TemperatureCompensation,
+    calibration_from_dict,
+)
+from utils.serial.decoding import FieldSpec, PacketDecoder
+
+
+def packets(values, temperatures=None):
+    """Packets of a 0xA0 header, a <u2 count and a <i2 temperature in 0.1 °C"""
+    temperatures = [250] * len(values) if temperatures is None else temperatures
+    return [
+        struct.pack("<BHh", 0xA0, int(v), int(t)) for v, t in zip(values, temperatures)
+    ]
+
+
+class TestCalibration(unittest.TestCase):
+
+    def test_piecewise_table_matches_interpolation(self):
+        """Test that the precomputed table gives the interpolated curve"""
+        points = [(0, -1.0), (1000, 0.0), (40000, 5.0), (65535, 5.5)]
+        calibration = PiecewiseLinearCalibration(points, units="V")
+        raw = np.random.default_rng(0).integers(0, 65536, 10000).astype("<u2")
+        expected = np.interp(raw, [p[0] for p in points], [p[1] for p in points])
+
+        calibration.prepare("<u2")
+        self.assertIsNotNone(calibration._table)
+        np.testing.assert_allclose(calibration.apply(raw), expected)
+
+        calibration.prepare("<u4")  # Too wide for a table
+        self.assertIsNone(calibration._table)
+        np.testing.assert_allclose(calibration.apply(raw.astype("<u4")), expected)
+
+    def test_lookup_table_and_signed_counts(self):
+        """Test table lookups, clamping and signed raw types"""
+        calibration = LookupTableCalibration([10.0, 20.0, 30.0], raw_min=-1)
+        raw = np.array([-5, -1, 0, 1, 9], dtype="<i2")
+        expected = [10.0, 10.0, 20.0, 30.0, 30.0]
+        np.testing.assert_array_equal(calibration.apply(raw), expected)
+        calibration.prepare("<i2")
+        np.testing.assert_array_equal(calibration.apply(raw), expected)
+
+    def test_decoder_with_temperature_field(self):
+        """Test calibration with compensation from a field of the same packet"""
+        decoder = PacketDecoder(
+            5,
+            [
+                FieldSpec(
+                    "current",
+                    1,
+                    "<u2",
+                    calibration=LinearCalibration(
+                        0.01,
+                        units="A",
+                        compensation=TemperatureCompensation(
+                            25.0, gain_coefficient=0.01, field="temperature"
+                        ),
+                    ),
+                ),
+                FieldSpec("temperature", 3, "<i2", scale=0.1),
+            ],
+        )
+
+        fields = decoder.decode(packets([1000, 1000], [250, 350]))
+
+        np.testing.assert_allclose(fields["temperature"], [25.0, 35.0])
+        np.testing.assert_allclose(fields["current"], [10.0, 11.0])
+        self.assertEqual(decoder.units, {"current": "A"})
+
+    def test_from_dict(self):
+        """Test building calibrations from their JSON description"""
+        calibration = calibration_from_dict(
+            {
+                "type": "piecewise",
+                "points": [[0, 0.0], [10, 1.0]],
+                "units": "V",
+                "temperature": {
+                    "header": "0xC0",
+                    "field": "t",
+                    "offset_coefficient": 1,
+                },
+            }
+        )
+        self.assertIsInstance(calibration, PiecewiseLinearCalibration)
+        self.assertEqual(calibration.compensation.header, 0xC0)
+        calibration.compensation.temperature = 27.0
+        np.testing.assert_allclose(calibration.apply(np.array([5])), [2.5])
+        self.assertIsNone(calibration_from_dict(None))
+        with self.assertRaises(ValueError):
+            calibration_from_dict({"type": "cubic"})
+
+    def test_swap_while_decoding(self):
+        """Test that swapping calibrations never mixes them within a batch"""
+        decoder = PacketDecoder(
+            5, [FieldSpec("value", 1, "<u2", calibration=LinearCalibration(1.0))]
+        )
+        batch = packets(range(1000))
+        stop = threading.Event()
+        mixed = []
+
+        def decode_loop():
+            while not stop.is_set():
+                values = decoder.decode(batch)["value"]
+                ratio = values[1:] / np.arange(1, 1000)
+                if not np.all(ratio == ratio[0]):
+                    mixed.append(ratio)
+
+        thread = threading.Thread(target=decode_loop)
+        thread.start()
+        for gain in range(2, 300):
+            decoder.set_calibration("value", LinearCalibration(float(gain)))
+        stop.set()
+        thread.join()
+
+        self.assertEqual(mixed, [])
+        self.assertEqual(decoder.decode(batch)["value"][1], 299.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming channel statistics and quantile sketch
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import unittest
+import numpy as np
+from PySide6.QtWidgets import QApplication
+from utils.daemon.acquisition_daemon import AcquisitionDaemon
+from utils.daemon.config import parse_config
+from utils.dsp.channel_stats import (
+    ChannelStatistics,
+    QuantileSketch,
+    RunningStats,
+    statistics_from_dict,
+)
+
+
+def samples(count=100000, seed=0):
+    """Skewed values of both signs with some exact zeros"""
+    rng = np.random.default_rng(seed)
+    values = np.concatenate(
+        [
+            rng.lognormal(0.0, 2.0, count),
+            -rng.exponential(5.0, count // 4),
+            np.zeros(50),
+        ]
+    )
+    rng.shuffle(values)
+    return values
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def test_relative_error(self):
+        """Test that quantiles stay within the relative accuracy"""
+        values = samples()
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for batch in np.array_split(values, 97):
+            sketch.update(batch)
+        qs = (0.01, 0.25, 0.5, 0.9, 0.99, 0.999)
+        for q, estimate in sketch.quantiles(qs).items():
+            exact = np.quantile(values, q, method="lower")
+            self.assertLessEqual(abs(estimate - exact), 0.0101 * abs(exact), q)
+        self.assertTrue(np.isnan(QuantileSketch().quantile(0.5)))
+
+    def test_merge_equals_single_sketch(self):
+        """Test that merged partial sketches answer like one sketch"""
+        values = samples(seed=1)
+        whole, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        whole.update(values)
+        first.update(values[:30000])
+        second.update(values[30000:])
+        first.merge(second)
+        self.assertEqual(first.count, len(values))
+        self.assertEqual(first.quantiles(), whole.quantiles())
+        with self.assertRaises(ValueError):
+            first.merge(QuantileSketch(relative_accuracy=0.05))
+
+    def test_memory_is_bounded(self):
+        """Test that a huge dynamic range folds the smallest magnitudes"""
+        sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=256)
+        for exponent in range(-8, 9):
+            sketch.update(np.full(10, 10.0**exponent))
+        self.assertLessEqual(sketch.buckets, 256)
+        self.assertAlmostEqual(sketch.quantile(1.0), 1e8, delta=1e6)
+        self.assertAlmostEqual(sketch.quantile(0.9), 1e7, delta=1e5)
+        # 256 buckets span a factor of about 170; smaller values are folded
+        self.assertGreater(sketch.quantile(0.5), 1e5)
+        self.assertEqual(sketch.count, 170)
+
+    def test_folded_values_read_as_lowest_bucket(self):
+        """Test that folded magnitudes read back at the edge of the range"""
+        sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=256)
+        self.assertAlmostEqual(sketch.dynamic_range, 167.4, delta=0.1)
+        sketch.update(np.full(100, 2.3))
+        sketch.update(np.full(1, 1000.0))
+        lowest = 1000.0 * sketch.gamma / sketch.dynamic_range  # 255 buckets down
+        # The median value 2.3 is folded into the lowest of the 256 buckets
+        self.assertAlmostEqual(sketch.quantile(0.5), lowest, delta=0.02 * lowest)
+        self.assertAlmostEqual(sketch.quantile(1.0), 1000.0, delta=10.0)
+
+    def test_rejects_narrow_stores(self):
+        """Test that too few buckets for a useful range are refused"""
+        with self.assertRaises(ValueError):
+            QuantileSketch(relative_accuracy=0.01, max_buckets=64)
+        with self.assertRaises(ValueError):
+            statistics_from_dict({"channels": ["current"], "max_buckets": 64})
+        # Coarser accuracy needs fewer buckets for the same range
+        self.assertGreater(QuantileSketch(0.1, max_buckets=24).dynamic_range, 100)
+
+
+class TestRunningStats(unittest.TestCase):
+
+    def test_batches_match_numpy(self):
+        """Test Welford batch updates against a single numpy pass"""
+        values = 1e6 + samples(seed=2)  # Large offset stresses cancellation
+        stats = RunningStats()
+        for batch in np.array_split(values, 123):
+            stats.update(batch)
+        stats.update(np.array([np.nan, np.inf]))
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["count"], len(values))
+        self.assertAlmostEqual(snapshot["mean"], values.mean(), places=6)
+        self.assertAlmostEqual(snapshot["std"], values.std(), places=6)
+        self.assertEqual(snapshot["min"], values.min())
+        self.assertEqual(snapshot["max"], values.max())
+        self.assertLessEqual(snapshot["p99"], values.max())
+
+        first, second = RunningStats(), RunningStats()
+        first.update(values[:1000])
+        second.update(values[1000:])
+        first.merge(second)
+        self.assertAlmostEqual(first.std, values.std(), places=6)
+
+
+class TestChannelStatistics(unittest.TestCase):
+
+    def test_windows(self):
+        """Test explicit and automatic window resets"""
+        statistics = ChannelStatistics(channels=["arc"], window=3600.0)
+        statistics.started = 0.0
+        statistics.update({"arc": np.arange(10.0), "other": np.ones(5)}, now=10.0)
+        self.assertEqual(list(statistics.snapshot()), ["arc"])
+        self.assertEqual(statistics.snapshot()["arc"]["mean"], 4.5)
+
+        statistics.update({"arc": np.array([100.0])}, now=3700.0)
+        self.assertEqual(statistics.previous["channels"]["arc"]["count"], 10)
+        self.assertEqual(statistics.previous["end"], 3700.0)
+        self.assertEqual(statistics.snapshot()["arc"]["max"], 100.0)
+
+        closed = statistics.reset(now=4000.0)
+        self.assertEqual(closed["start"], 3700.0)
+        self.assertEqual(statistics.snapshot()["arc"]["count"], 0)
+        self.assertTrue(np.isnan(statistics.snapshot()["arc"]["mean"]))
+
+    def test_from_dict(self):
+        """Test building from the JSON description"""
+        statistics = statistics_from_dict(
+            {"channels": ["current"], "window": 86400, "quantiles": [0.5, 0.999]}
+        )
+        statistics.update({"current": np.arange(1.0, 1001.0)})
+        self.assertIn("p99_9", statistics.snapshot()["current"])
+        self.assertIsNone(statistics_from_dict(None))
+        with self.assertRaises(ValueError):
+            statistics_from_dict({"quantiles": [99]})
+
+
+class TestDaemonStatistics(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_decoded_and_filtered_channels(self):
+        """Test statistics of a decoded field and a filter output"""
+        config = parse_config(
+            {
+                "devices": [
+                    {
+                        "name": "diverter",
+                        "port": "/dev/null",
+                        "packets": [
+                            {
+                                "header": "0xA0",
+                                "size": 5,
+                                "fields": [
+                                    {"name": "arc", "offset": 1, "dtype": "<u4"}
+                                ],
+                                "filters": [
+                                    {
+                                        "field": "arc",
+                                        "output": "arc_mean",
+                                        "stages": [{"type": "fir", "taps": [0.5] * 2}],
+                                    }
+                                ],
+                                "statistics": ["arc", "arc_mean"],
+                            }
+                        ],
+                    }
+                ]
+            }
+        )
+        daemon = AcquisitionDaemon(config)
+        queue = daemon.pending[("diverter", 0xA0)]
+        for i, level in enumerate(range(1, 101)):
+            queue.append((100.0 + i * 0.01, struct.pack("<BI", 0xA0, level)))
+        daemon.process_pending()
+
+        snapshot = daemon.statistics[("diverter", 0xA0)].snapshot()
+        self.assertEqual(snapshot["arc"]["count"], 100)
+        self.assertEqual(snapshot["arc"]["mean"], 50.5)
+        self.assertAlmostEqual(snapshot["arc"]["p50"], 50.0, delta=0.5)
+        self.assertEqual(snapshot["arc_mean"]["count"], 100)
+        text = daemon.metrics.render()
+        self.assertIn('channel="arc",stat="p99"', text)
+
+        config.devices[0].packets[0].statistics = {"channels": ["missing"]}
+        with self.assertRaises(ValueError):
+            AcquisitionDaemon(config)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for packet decoding and threshold detection
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import unittest
+import numpy as np
+from utils.serial.decoding import FieldSpec, PacketDecoder
+from utils.detection.detectors import ThresholdDetector
+
+
+class TestPacketDecoder(unittest.TestCase):
+
+    def test_decode_batch(self):
+        """Test decoding several packets with scaled fields"""
+        decoder = PacketDecoder(
+            6,
+            [
+                FieldSpec("location", 1, "u1"),
+                FieldSpec("current", 2, "<u4", scale=0.01),
+            ],
+        )
+        packets = [bytes([0xB0, i]) + struct.pack("<I", i * 100) for i in range(4)]
+
+        fields = decoder.decode(packets)
+
+        np.testing.assert_array_equal(fields["location"], [0, 1, 2, 3])
+        np.testing.assert_allclose(fields["current"], [0.0, 1.0, 2.0, 3.0])
+
+    def test_field_outside_packet(self):
+        """Test that a field not fitting in the packet is rejected"""
+        with self.assertRaises(ValueError):
+            PacketDecoder(4, [FieldSpec("value", 2, "<u4")])
+
+
+class TestThresholdDetector(unittest.TestCase):
+
+    def test_event_spanning_batches(self):
+        """Test that an event crossing a batch boundary is reported once"""
+        events = []
+        detector = ThresholdDetector(
+            "arc", 0xA0, "arc", threshold=1.0, callback=events.append
+        )
+        values = np.zeros(20)
+        values[8:14] = [2.0, 3.0, 5.0, 4.0, 2.0, 1.5]
+        timestamps = np.arange(20) * 0.001
+
+        detector.process(timestamps[:10], {"arc": values[:10]})
+        self.assertEqual(len(events), 0)
+        detector.process(timestamps[10:], {"arc": values[10:]})
+
+        self.assertEqual(len(events), 1)
+        self.assertAlmostEqual(events[0].timestamp, 0.008)
+        self.assertAlmostEqual(events[0].duration, 0.006)
+        self.assertEqual(events[0].peak, 5.0)
+        self.assertAlmostEqual(events[0].energy, 0.0175)
+
+    def test_waveform_kept_across_batches(self):
+        """Test that the samples of an event are attached when requested"""
+        detector = ThresholdDetector("arc", 0xA0, "arc", 1.0, keep_waveform=True)
+        values = np.zeros(20)
+        values[8:14] = [2.0, 3.0, 5.0, 4.0, 2.0, 1.5]
+        timestamps = np.arange(20) * 0.001
+
+        detector.process(timestamps[:10], {"arc": values[:10]})
+        (event,) = detector.process(timestamps[10:], {"arc": values[10:]})
+
+        np.testing.assert_array_equal(event.waveform, values[8:14])
+        plain = ThresholdDetector("arc", 0xA0, "arc", 1.0)
+        self.assertIsNone(plain.process(timestamps, {"arc": values})[0].waveform)
+
+    def test_hold_off_suppresses_retrigger(self):
+        """Test that a second excursion inside the hold-off is ignored"""
+        detector = ThresholdDetector("arc", 0xA0, "arc", threshold=1.0, hold_off=0.01)
+        values = np.zeros(30)
+        values[2:4] = 2.0
+        values[6:8] = 2.0  # Within hold-off
+        values[20:22] = 2.0  # After hold-off
+        timestamps = np.arange(30) * 0.001
+
+        events = detector.process(timestamps, {"arc": values})
+
+        self.assertEqual([round(e.timestamp, 3) for e in events], [0.002, 0.020])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
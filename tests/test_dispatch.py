@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the packet execution targets
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+import unittest
+from utils.diagnostics.timing import TIMINGS
+from utils.serial.dispatch import (
+    KeyedThreadPool,
+    PacketDispatcher,
+    SerialExecutor,
+)
+from utils.serial.types import PacketConfig
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class TestKeyedThreadPool(unittest.TestCase):
+
+    def test_order_preserved_per_key(self):
+        """Test that tasks of one key run in submission order, one at a time"""
+        pool = KeyedThreadPool(workers=4, batch=3)
+        results = {key: [] for key in range(5)}
+        active = {key: 0 for key in range(5)}
+        overlaps = []
+
+        def task(key, value):
+            active[key] += 1
+            if active[key] > 1:
+                overlaps.append(key)
+            results[key].append(value)
+            active[key] -= 1
+
+        for value in range(200):
+            for key in range(5):
+                pool.submit(key, task, key, value)
+        self.assertTrue(wait_for(lambda: pool.backlog == 0))
+        pool.shutdown()
+
+        for key in range(5):
+            self.assertEqual(results[key], list(range(200)))
+        self.assertEqual(overlaps, [])
+        self.assertEqual(pool.stats["processed"], 1000)
+
+    def test_backlog_limit(self):
+        """Test that submissions beyond the backlog limit are rejected"""
+        gate = threading.Event()
+        pool = KeyedThreadPool(workers=1, max_backlog=2)
+        pool.submit("a", gate.wait)
+        self.assertTrue(wait_for(lambda: pool.backlog == 0))
+
+        self.assertTrue(pool.submit("a", lambda: None))
+        self.assertTrue(pool.submit("a", lambda: None))
+        self.assertFalse(pool.submit("a", lambda: None))
+        self.assertEqual(pool.stats["dropped"], 1)
+        gate.set()
+        pool.shutdown()
+
+
+class TestPacketDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.handled = []
+        self.threads = set()
+        self.dropped = []
+
+        def handler(packet, config, framed_at):
+            self.threads.add(threading.current_thread().name)
+            self.handled.append((config.header, packet))
+
+        self.dispatcher = PacketDispatcher(handler, on_drop=self.dropped.append)
+
+    def tearDown(self):
+        self.dispatcher.shutdown()
+
+    def test_gui_configs_are_not_dispatched(self):
+        """Test that GUI configs are left to the caller"""
+        config = PacketConfig(0xA0, 5, None)
+        self.assertFalse(self.dispatcher.dispatch(b"\xa0" * 5, config, 0.0))
+        self.assertEqual(self.handled, [])
+
+    def test_inline_runs_on_calling_thread(self):
+        """Test that inline configs run synchronously"""
+        config = PacketConfig(0xA0, 5, None, executor="inline")
+        self.assertTrue(self.dispatcher.dispatch(b"\xa0" * 5, config, 0.0))
+        self.assertEqual(self.handled, [(0xA0, b"\xa0" * 5)])
+        self.assertEqual(self.threads, {threading.current_thread().name})
+
+    def test_worker_and_pool_preserve_order(self):
+        """Test that off-thread targets keep per-header order and report backlog"""
+        worker_config = PacketConfig(0xA0, 2, None, executor="worker")
+        pool_config = PacketConfig(0xB0, 2, None, executor="pool")
+        for i in range(100):
+            self.dispatcher.dispatch(bytes([0xA0, i]), worker_config, 0.0)
+            self.dispatcher.dispatch(bytes([0xB0, i]), pool_config, 0.0)
+        self.assertTrue(wait_for(lambda: len(self.handled) == 200))
+
+        for header in (0xA0, 0xB0):
+            values = [p[1] for h, p in self.handled if h == header]
+            self.assertEqual(values, list(range(100)))
+        self.assertNotIn(threading.current_thread().name, self.threads)
+
+        backlog = self.dispatcher.backlog()
+        self.assertEqual(backlog["worker:0xA0"]["processed"], 100)
+        self.assertEqual(backlog["pool"]["processed"], 100)
+        self.assertEqual(backlog["pool"]["backlog"], 0)
+
+    def test_full_backlog_reports_drop(self):
+        """Test that a full worker backlog drops and reports the packet"""
+        gate = threading.Event()
+        dispatcher = PacketDispatcher(
+            lambda *args: gate.wait(), on_drop=self.dropped.append, max_backlog=1
+        )
+        config = PacketConfig(0xA0, 1, None, executor="worker")
+        for _ in range(5):
+            dispatcher.dispatch(b"\xa0", config, 0.0)
+        self.assertGreaterEqual(len(self.dropped), 3)
+        gate.set()
+        dispatcher.shutdown()
+
+
+class TestSerialExecutor(unittest.TestCase):
+
+    def test_runs_in_order(self):
+        """Test that a dedicated executor runs tasks in order"""
+        executor = SerialExecutor("test-executor")
+        results = []
+        for i in range(50):
+            executor.submit(results.append, i)
+        executor.shutdown()
+        self.assertEqual(results, list(range(50)))
+
+
+class TestExecutorUtilization(unittest.TestCase):
+
+    def setUp(self):
+        TIMINGS.reset()
+        TIMINGS.enabled = True
+
+    def tearDown(self):
+        TIMINGS.enabled = False
+        TIMINGS.reset()
+
+    def test_busy_time_recorded(self):
+        """Test that executor and pool threads report their busy time"""
+        executor = SerialExecutor("busy-executor")
+        pool = KeyedThreadPool(workers=2, name="busy-pool")
+        for key in range(2):
+            executor.submit(time.sleep, 0.05)
+            pool.submit(key, time.sleep, 0.05)
+        executor.shutdown()
+        self.assertTrue(wait_for(lambda: pool.stats["processed"] == 2))
+        pool.shutdown()
+
+        utilization = TIMINGS.utilization()
+        self.assertGreaterEqual(utilization["busy-executor"], 0.009)
+        pool_busy = sum(
+            value for name, value in utilization.items() if name.startswith("busy-pool")
+        )
+        self.assertGreaterEqual(pool_busy, 0.009)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched event marker layer
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import numpy as np
+from PySide6.QtWidgets import QApplication
+from views.event_marker_layer import EventMarkerItem
+from views.plotter_widget_view import PlotterWidgetView
+
+
+class TestEventMarkerItem(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_appends_keep_positions_sorted(self):
+        """Test that in-order and out-of-order appends keep markers sorted"""
+        item = EventMarkerItem()
+        for i in range(1000):
+            item.add_marker(float(i), f"m{i}")
+        item.add_markers([500.5, -1.0], ["late", "early"])
+
+        self.assertEqual(item.count, 1002)
+        self.assertTrue(np.all(np.diff(item.positions) >= 0))
+        self.assertEqual(item.labels[0], "early")
+        self.assertEqual(item.labels[502], "late")
+        self.assertEqual(item.visible_range(10.0, 19.5), (11, 21))
+
+    def test_single_item_per_colour(self):
+        """Test that thousands of markers add one graphics item per colour"""
+        view = PlotterWidgetView()
+        items_before = len(view.plot_widget.getPlotItem().items)
+        for i in range(5000):
+            view.add_marker(i * 0.01, f"Arc {i}", "r")
+        view.add_markers(np.arange(100) * 0.5, color="b")
+
+        self.assertEqual(len(view.plot_widget.getPlotItem().items), items_before + 2)
+        self.assertEqual(view.marker_items["r"].count, 5000)
+        self.assertEqual(view.marker_items["b"].count, 100)
+
+        view.clear_markers()
+        self.assertEqual(len(view.plot_widget.getPlotItem().items), items_before)
+
+    def test_paints_visible_markers(self):
+        """Test that markers inside the visible range are drawn"""
+        view = PlotterWidgetView()
+        view.resize(600, 400)
+        view.add_markers(np.arange(0.0, 1000.0, 0.5), color=(255, 0, 0))
+        view.plot_widget.setXRange(100.0, 110.0, padding=0)
+        view.plot_widget.setYRange(0.0, 1.0, padding=0)
+
+        image = view.plot_widget.grab().toImage()
+        red = [
+            x
+            for x in range(image.width())
+            if image.pixelColor(x, image.height() // 2).red() > 200
+            and image.pixelColor(x, image.height() // 2).green() < 80
+        ]
+        self.assertGreaterEqual(len(red), 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
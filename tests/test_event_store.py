@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite event store and its use by the acquisition daemon
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import tempfile
+import time
+import unittest
+from PySide6.QtCore import QCoreApplication
+from utils.daemon.acquisition_daemon import AcquisitionDaemon
+from utils.daemon.config import parse_config
+from utils.events.event_store import EventRecord, EventStore, OperationRecord
+from utils.events.signature_index import SignatureIndex
+
+
+class TestEventStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "events.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_batched_writes_and_queries(self):
+        """Test that queued rows are written in batches and can be queried"""
+        store = EventStore(self.path, batch_size=100, flush_interval=0.05)
+        store.start()
+        operation_id = store.add_operation(
+            OperationRecord("diverter", 10.0, tap_from=6, tap_to=7)
+        )
+        for i in range(1000):
+            store.add_event(
+                EventRecord(
+                    "diverter",
+                    "arc" if i % 2 else "short_circuit",
+                    time=10.0 + i,
+                    tap_position=i % 10,
+                    peak=float(i),
+                    energy=0.5,
+                    operation_id=operation_id,
+                    capture_path="captures/diverter.mrblk",
+                    capture_time=10.0 + i,
+                    metadata={"header": 0xA0},
+                )
+            )
+        store.flush()
+        store.stop()
+
+        self.assertEqual(store.stats["events"], 1000)
+        self.assertGreaterEqual(store.stats["batches"], 10)
+        arcs = store.query_events(kind="arc", tap_position=7)
+        self.assertEqual(len(arcs), 100)
+        self.assertTrue(all(e.tap_position == 7 and e.kind == "arc" for e in arcs))
+        self.assertEqual([e.time for e in arcs], sorted(e.time for e in arcs))
+        self.assertEqual(arcs[0].metadata, {"header": 0xA0})
+        self.assertEqual(arcs[0].capture_path, "captures/diverter.mrblk")
+        self.assertEqual(len(store.query_events(start=100.0, end=200.0)), 100)
+        self.assertEqual(store.count_events_by_tap("arc")[7], 100)
+        (operation,) = store.query_operations(device="diverter")
+        self.assertEqual((operation.id, operation.tap_to), (operation_id, 7))
+
+        # Operation ids continue after reopening
+        reopened = EventStore(self.path)
+        self.assertEqual(
+            reopened.add_operation(OperationRecord("diverter", 20.0)),
+            operation_id + 1,
+        )
+
+    def test_indexed_query_speed(self):
+        """Test that a kind/tap/time query over many events takes milliseconds"""
+        store = EventStore(self.path, batch_size=5000, max_queue=200000)
+        store.start()
+        for i in range(200000):
+            store.add_event(
+                EventRecord(
+                    "diverter",
+                    ("arc", "short_circuit")[i % 2],
+                    time=i * 60.0,
+                    tap_position=i % 19,
+                )
+            )
+        store.flush(timeout=60.0)
+        store.stop()
+        self.assertEqual(store.stats["events"], 200000)
+
+        elapsed = []  # Best of a few, so one scheduler hiccup does not fail it
+        for _ in range(5):
+            started = time.perf_counter()
+            events = store.query_events(
+                kind="arc", tap_position=7, start=1.0e6, end=1.0e6 + 90 * 86400
+            )
+            elapsed.append(time.perf_counter() - started)
+        self.assertTrue(events)
+        self.assertLess(min(elapsed), 0.05)
+
+
+class TestDaemonEventStore(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def test_operations_and_events_recorded(self):
+        """Test that tap changes become operations and events link to them"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "events.sqlite")
+            signatures = os.path.join(tmp, "signatures")
+            config = parse_config(
+                {
+                    "devices": [
+                        {
+                            "name": "diverter",
+                            "port": "/dev/null",
+                            "packets": [
+                                {
+                                    "header": "0xA0",
+                                    "size": 5,
+                                    "fields": [
+                                        {"name": "arc", "offset": 1, "dtype": "<u4"}
+                                    ],
+                                },
+                                {
+                                    "header": "0xC0",
+                                    "size": 2,
+                                    "fields": [
+                                        {"name": "tap", "offset": 1, "dtype": "u1"}
+                                    ],
+                                },
+                            ],
+                            "detectors": [
+                                {
+                                    "name": "arc",
+                                    "header": "0xA0",
+                                    "field": "arc",
+                                    "threshold": 5,
+                                    "kind": "arc",
+                                }
+                            ],
+                            "tap_position": {"header": "0xC0", "field": "tap"},
+                        }
+                    ],
+                    "event_store": {"path": path, "flush_interval": 0.05},
+                    "signatures": {"directory": signatures, "length": 16},
+                }
+            )
+            daemon = AcquisitionDaemon(config)
+            daemon.event_store.start()
+
+            tap = daemon.pending[("diverter", 0xC0)]
+            arc = daemon.pending[("diverter", 0xA0)]
+            for t, position in ((0.0, 6), (1.0, 6), (2.0, 7)):
+                tap.append((100.0 + t, bytes([0xC0, position])))
+            for i, level in enumerate([0, 9, 12, 0, 0]):
+                arc.append((102.0 + i * 0.01, struct.pack("<BI", 0xA0, level)))
+            daemon.process_pending()
+            daemon.event_store.flush()
+            daemon.stop()  # Also saves the signatures
+
+            (operation,) = daemon.event_store.query_operations()
+            self.assertEqual((operation.tap_from, operation.tap_to), (6, 7))
+            self.assertAlmostEqual(operation.end_time, 102.03)
+            (event,) = daemon.event_store.query_events(kind="arc")
+            self.assertEqual(event.tap_position, 7)
+            self.assertEqual(event.operation_id, operation.id)
+            self.assertEqual(event.peak, 12.0)
+            self.assertAlmostEqual(event.energy, 0.21)
+
+            # The event waveform is indexed under its operation
+            index = SignatureIndex(signatures, length=16)
+            self.assertEqual(index.count, 1)
+            self.assertEqual(int(index.meta[0]["operation_id"]), operation.id)
+            self.assertEqual(int(index.meta[0]["tap_position"]), 7)
+
+    def test_signatures_need_event_store(self):
+        """Test that signatures without operations are rejected"""
+        with self.assertRaises(ValueError):
+            parse_config(
+                {
+                    "devices": [{"port": "/dev/null"}],
+                    "signatures": {"directory": "signatures"},
+                }
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
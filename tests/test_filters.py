@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming filters and the shared filter stage
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import unittest
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+from utils.daemon.acquisition_daemon import AcquisitionDaemon
+from utils.daemon.config import parse_config
+from utils.dsp.filters import (
+    Decimator,
+    FIRFilter,
+    FilterStage,
+    IIRFilter,
+    butterworth_sos,
+    filter_from_dict,
+    fir_lowpass,
+)
+
+SPLITS = [3, 70, 71, 500, 4000, 4064]
+
+
+def in_blocks(stream_filter, samples):
+    """Filter ``samples`` in blocks of uneven sizes"""
+    return np.concatenate(
+        [stream_filter.process(part) for part in np.split(samples, SPLITS)]
+    )
+
+
+def direct_form(sos, samples):
+    """Reference per-sample difference equation of a section cascade"""
+    for b0, b1, b2, _, a1, a2 in sos:
+        out = np.zeros(len(samples))
+        x1 = x2 = y1 = y2 = 0.0
+        for i, x in enumerate(samples):
+            y = b0 * x + b1 * x1 + b2 * x2 - a1 * y1 - a2 * y2
+            x2, x1, y2, y1 = x1, x, y1, y
+            out[i] = y
+        samples = out
+    return samples
+
+
+def gain(sos, frequency, sample_rate):
+    """Steady-state amplitude gain of a sine through the filter"""
+    t = np.arange(20000) / sample_rate
+    out = IIRFilter(sos).process(np.sin(2 * np.pi * frequency * t))
+    return np.sqrt(2 * np.mean(out[10000:] ** 2))
+
+
+class TestStreamFilters(unittest.TestCase):
+
+    def setUp(self):
+        self.samples = np.random.default_rng(0).normal(size=10007)
+
+    def test_iir_matches_difference_equation(self):
+        """Test the block state-space evaluation against the recursion"""
+        sos = butterworth_sos(5, 100.0, 1000.0)
+        expected = direct_form(sos, self.samples)
+        np.testing.assert_allclose(IIRFilter(sos).process(self.samples), expected)
+        np.testing.assert_allclose(in_blocks(IIRFilter(sos), self.samples), expected)
+
+    def test_butterworth_response(self):
+        """Test unit pass-band gain and -3 dB at the cutoff"""
+        low = butterworth_sos(4, 100.0, 1000.0)
+        self.assertAlmostEqual(gain(low, 1.0, 1000.0), 1.0, places=3)
+        self.assertAlmostEqual(gain(low, 100.0, 1000.0), 2**-0.5, places=3)
+        self.assertLess(gain(low, 300.0, 1000.0), 0.01)
+        high = butterworth_sos(3, 100.0, 1000.0, btype="highpass")
+        self.assertAlmostEqual(gain(high, 100.0, 1000.0), 2**-0.5, places=3)
+        self.assertAlmostEqual(gain(high, 400.0, 1000.0), 1.0, places=2)
+
+    def test_fir_blocks_match_single_pass(self):
+        """Test that the FIR history carries across blocks"""
+        taps = fir_lowpass(31, 50.0, 1000.0)
+        self.assertAlmostEqual(taps.sum(), 1.0)
+        expected = np.convolve(self.samples, taps)[: len(self.samples)]
+        np.testing.assert_allclose(FIRFilter(taps).process(self.samples), expected)
+        np.testing.assert_allclose(in_blocks(FIRFilter(taps), self.samples), expected)
+
+    def test_decimator_blocks_match_single_pass(self):
+        """Test that decimation phase and history carry across blocks"""
+        decimator = Decimator(4)
+        whole = decimator.process(self.samples)
+        self.assertEqual(list(decimator.last_indices[:3]), [0, 4, 8])
+        full_rate = np.convolve(self.samples, decimator.taps)[: len(self.samples)]
+        np.testing.assert_allclose(whole, full_rate[::4])
+
+        decimator.reset()
+        np.testing.assert_allclose(in_blocks(decimator, self.samples), whole)
+
+    def test_from_dict(self):
+        """Test building filters from their JSON description"""
+        self.assertIsInstance(
+            filter_from_dict({"type": "butterworth", "cutoff": 10, "sample_rate": 100}),
+            IIRFilter,
+        )
+        self.assertEqual(filter_from_dict({"type": "decimate", "factor": 8}).factor, 8)
+        with self.assertRaises(ValueError):
+            filter_from_dict({"type": "fir_lowpass", "cutoff": 80, "sample_rate": 100})
+        with self.assertRaises(ValueError):
+            filter_from_dict({"type": "median"})
+
+
+class TestFilterStage(unittest.TestCase):
+
+    def test_decimated_timestamps_and_cost(self):
+        """Test output timestamps follow decimation and cost is counted"""
+        stage = FilterStage("test")
+        output = stage.add_channel("arc", [FIRFilter([0.5, 0.5]), Decimator(3)])
+        self.assertEqual(output, "arc_filtered")
+        times = np.arange(10, dtype=np.float64)
+
+        first = stage.process(times[:5], {"arc": np.ones(5)})
+        second = stage.process(times[5:], {"arc": np.ones(5)})
+
+        self.assertEqual(list(first[output][0]), [0.0, 3.0])
+        self.assertEqual(list(second[output][0]), [6.0, 9.0])
+        self.assertEqual(stage.stats[output]["samples"], 10)
+        self.assertEqual(stage.stats[output]["outputs"], 4)
+        self.assertGreater(stage.cost_per_sample()[output], 0.0)
+        self.assertEqual(stage.process(times, {"other": times}), {})
+
+
+class TestDaemonFilters(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def test_detector_reads_filtered_channel(self):
+        """Test that a detector on a filter output sees the filtered stream"""
+        config = parse_config(
+            {
+                "devices": [
+                    {
+                        "name": "diverter",
+                        "port": "/dev/null",
+                        "packets": [
+                            {
+                                "header": "0xA0",
+                                "size": 5,
+                                "fields": [
+                                    {"name": "arc", "offset": 1, "dtype": "<u4"}
+                                ],
+                                "filters": [
+                                    {
+                                        "field": "arc",
+                                        "output": "arc_mean",
+                                        "stages": [{"type": "fir", "taps": [0.25] * 4}],
+                                    }
+                                ],
+                            }
+                        ],
+                        "detectors": [
+                            {
+                                "name": "raw",
+                                "header": "0xA0",
+                                "field": "arc",
+                                "threshold": 5,
+                            },
+                            {
+                                "name": "smoothed",
+                                "header": "0xA0",
+                                "field": "arc_mean",
+                                "threshold": 5,
+                            },
+                        ],
+                    }
+                ]
+            }
+        )
+        daemon = AcquisitionDaemon(config)
+        events = []
+        for detector in daemon.detectors[("diverter", 0xA0)]:
+            detector.callback = events.append
+
+        queue = daemon.pending[("diverter", 0xA0)]
+        for i, level in enumerate([0, 0, 12, 0, 0, 0, 0, 8, 8, 8, 8, 0, 0, 0, 0, 0]):
+            queue.append((100.0 + i * 0.01, struct.pack("<BI", 0xA0, level)))
+        daemon.process_pending()
+
+        by_detector = {}
+        for event in events:
+            by_detector.setdefault(event.detector, []).append(event.peak)
+        self.assertEqual(by_detector["raw"], [12.0, 8.0])
+        self.assertEqual(by_detector["smoothed"], [8.0])
+        stats = daemon.filter_stages[("diverter", 0xA0)].stats["arc_mean"]
+        self.assertEqual(stats["samples"], 16)
+        self.assertIn("mr_filter_samples_total", daemon.metrics.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for caching, eviction and content of the detection views
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import unittest
+import numpy as np
+from PySide6.QtCore import QEvent
+from PySide6.QtWidgets import QApplication
+from controllers.main_window_controller import MainWindowController
+from utils.events.signature_index import SignatureIndex
+
+
+class TestViewEviction(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.controller = MainWindowController(view_eviction_timeout=60.0)
+        self.controller.eviction_timer.stop()  # Sweeps are driven by hand
+
+    def tearDown(self):
+        self.controller.clear_current_widget()
+        self.controller.view.deleteLater()
+        self.controller.deleteLater()  # Stops its render and eviction timers
+        # Delete the views now rather than in a later test's event loop
+        QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+    def test_switching_keeps_views(self):
+        """Test that switching back within the timeout reuses the view"""
+        first = self.controller.show_view("short_circuit")
+        self.controller.show_view("multi_channel")
+        self.assertEqual(self.controller.evict_stale_views(), [])
+        self.assertIs(self.controller.show_view("short_circuit"), first)
+
+    def test_hidden_view_rebuilt_after_timeout(self):
+        """Test that a view hidden past the timeout is evicted and rebuilt"""
+        first = self.controller.show_view("short_circuit")
+        self.controller.show_view("multi_channel")
+        self.controller.view_eviction_timeout = 0.0
+
+        self.assertEqual(self.controller.evict_stale_views(), ["short_circuit"])
+        self.assertNotIn("short_circuit", self.controller.channel_statistics)
+        self.assertNotIn(first, self.controller.render_scheduler._views)
+        self.assertEqual(self.controller.view_stack.count(), 1)
+
+        rebuilt = self.controller.show_view("short_circuit")
+        self.assertIsNot(rebuilt, first)
+        self.assertIs(self.controller.view_stack.currentWidget(), rebuilt)
+        self.assertIn("short_circuit", self.controller.channel_statistics)
+
+    def test_current_view_never_evicted(self):
+        """Test that the displayed view survives any number of sweeps"""
+        current = self.controller.show_view("multi_channel")
+        self.controller.view_eviction_timeout = 0.0
+
+        self.assertEqual(self.controller.evict_stale_views(), [])
+        self.assertIs(self.controller.current_widget, current)
+        self.assertIs(self.controller.view_stack.currentWidget(), current)
+
+
+class TestSimilarOperations(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def tearDown(self):
+        self.controller.clear_current_widget()
+        self.controller.view.deleteLater()
+        self.controller.deleteLater()  # Stops its render and eviction timers
+        QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+    def test_no_history_hides_panel(self):
+        """Test that the arc view shows no similar operations without history"""
+        with tempfile.TemporaryDirectory() as directory:
+            self.controller = MainWindowController(signature_directory=directory)
+            widget = self.controller.show_view("arc")
+        self.assertIsNone(widget.similar_operations)
+
+    def test_history_from_directory(self):
+        """Test that the arc view queries the saved signature index"""
+        with tempfile.TemporaryDirectory() as directory:
+            index = SignatureIndex(directory)
+            for operation_id in range(1, 21):
+                index.add(operation_id, np.random.default_rng(operation_id).random(20))
+            index.save()
+            self.controller = MainWindowController(signature_directory=directory)
+            widget = self.controller.show_view("arc")
+
+        panel = widget.similar_operations
+        self.assertIsNotNone(panel)
+        self.assertEqual(panel.event_selector.count(), 3)
+        self.assertEqual(panel.table.rowCount(), 10)
+
+
+class TestArcSpectrogram(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.controller = MainWindowController()
+
+    def tearDown(self):
+        self.controller.clear_current_widget()
+        self.controller.view.deleteLater()
+        self.controller.deleteLater()  # Stops its render and eviction timers
+        QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+    def test_fed_by_live_samples(self):
+        """Test that the spectrogram starts empty and follows pushed samples"""
+        self.controller.show_arc_samples(np.zeros(1024))  # No arc view yet
+        spectrogram = self.controller.show_view("arc").spectrogram
+        self.assertEqual(spectrogram.stft.frames_out, 0)
+
+        self.controller.show_arc_samples(np.random.default_rng(0).normal(size=2560))
+        self.assertEqual(spectrogram.stft.frames_out, 19)
+        self.assertTrue(spectrogram.needs_render)
+        self.controller.render_scheduler._on_tick()
+        self.assertFalse(spectrogram.needs_render)
+
+
+if __name__ == "__main__":
+    unittest.main()
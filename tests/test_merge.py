@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for the time-aligned merge of streams from several devices
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import unittest
+import numpy as np
+from PySide6.QtWidgets import QApplication
+from utils.daemon.acquisition_daemon import AcquisitionDaemon
+from utils.daemon.config import parse_config
+from utils.stream.merge import ClockEstimator, StreamMerger
+
+
+class TestClockEstimator(unittest.TestCase):
+
+    def test_offset_and_drift(self):
+        """Test recovering a drifting device clock from jittered arrivals"""
+        rng = np.random.default_rng(0)
+        host = 1000.0 + np.arange(0.0, 60.0, 0.001)
+        device = (host - 1000.0) * (1 - 80e-6) + 5.0  # Runs 80 ppm slow
+        arrivals = host + rng.exponential(0.002, len(host))
+        clock = ClockEstimator(block=1.0)
+        for start in range(0, len(host), 250):
+            clock.observe(device[start : start + 250], arrivals[start : start + 250])
+
+        self.assertAlmostEqual(clock.drift * 1e6, 80.0, delta=2.0)
+        np.testing.assert_allclose(
+            clock.to_host(device[-5000:]), host[-5000:], atol=1e-4
+        )
+
+
+class TestStreamMerger(unittest.TestCase):
+
+    def test_interleaves_sources_in_time_order(self):
+        """Test a k-way merge of sources with different batch timing"""
+        merger = StreamMerger(max_delay=0.05)
+        for name in ("a", "b", "c"):
+            merger.add_source(name, correct_clock=False)
+        out = []
+        times = {
+            name: 100.0 + np.arange(300) * 0.003 + i * 0.001
+            for i, name in enumerate("abc")
+        }
+        for step, batch in enumerate([7, 40, 1]):
+            for start in range(0, 300, batch):
+                name = "abc"[step]
+                merger.push(
+                    name,
+                    times[name][start : start + batch],
+                    range(start, start + batch),
+                )
+                out += merger.pop_ready(now=0.0)
+        out += merger.flush()
+
+        self.assertEqual(len(out), 900)
+        self.assertEqual(merger.stats["late"], 0)
+        merged_times = [t for t, _, _ in out]
+        self.assertEqual(merged_times, sorted(merged_times))
+        self.assertEqual([source for _, source, _ in out[:4]], ["a", "b", "c", "a"])
+
+    def test_stalled_source_and_late_packets(self):
+        """Test that a silent source delays output by at most max_delay"""
+        merged = []
+        merger = StreamMerger(max_delay=0.1, callback=merged.extend)
+        merger.add_source("fast", correct_clock=False)
+        merger.add_source("slow", correct_clock=False)
+        merger.push("fast", [10.0, 10.05, 10.2], ["f0", "f1", "f2"])
+
+        self.assertEqual(merger.pop_ready(now=10.09), [])  # Waits for "slow"
+        ready = merger.pop_ready(now=10.16)
+        self.assertEqual([item for _, _, item in ready], ["f0", "f1"])
+
+        merger.push("slow", [10.02, 10.1], ["s0", "s1"])  # s0 missed the delay
+        self.assertEqual(merger.stats["late"], 1)
+        self.assertEqual(merger.clock_report()["slow"]["late"], 1)
+        ready = merger.pop_ready(now=10.17)
+        self.assertEqual([item for _, _, item in ready], ["s1"])
+        self.assertEqual([item for _, _, item in merger.flush()], ["f2"])
+        self.assertEqual(len(merged), 4)
+
+    def test_default_delay_survives_stall(self):
+        """Test that a batch pushed after an event-loop stall is not dropped"""
+        raw = {
+            "devices": [{"name": "board", "port": "/dev/null"}],
+            "merge": {
+                "streams": [
+                    {"device": "board", "header": "0xA0"},
+                    {"device": "board", "header": "0xB0"},
+                ]
+            },
+        }
+        config = parse_config(raw)
+        self.assertAlmostEqual(config.merge.max_delay, 0.2)  # 10 batches of 20 ms
+        raw["merge"]["max_delay"] = 0.03
+        with self.assertRaises(ValueError):
+            parse_config(raw)
+
+        merger = StreamMerger(max_delay=config.merge.max_delay)
+        merger.add_source("a", correct_clock=False)
+        merger.add_source("b", correct_clock=False)
+        times = 100.0 + np.arange(150) * 0.001
+        # The loop stalled for 150 ms (7 batch intervals): both sources
+        # come in at once, one drained before the other is pushed
+        merger.push("a", times, range(150))
+        out = merger.pop_ready(now=times[-1] + 0.001)
+        merger.push("b", times + 0.0005, range(150))
+        out += merger.pop_ready(now=times[-1] + 0.002)
+        out += merger.flush()
+
+        self.assertEqual(merger.stats["late"], 0)
+        self.assertEqual(len(out), 300)
+        merged_times = [t for t, _, _ in out]
+        self.assertEqual(merged_times, sorted(merged_times))
+
+
+class TestDaemonMerge(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_merges_devices(self):
+        """Test merging a device-timed stream with an arrival-timed one"""
+        config = parse_config(
+            {
+                "devices": [
+                    {
+                        "name": "arc_board",
+                        "port": "/dev/null",
+                        "packets": [
+                            {
+                                "header": "0xA0",
+                                "size": 4,
+                                "sample_counter": {
+                                    "offset": 1,
+                                    "dtype": "<u2",
+                                    "sample_rate": 100,
+                                },
+                            }
+                        ],
+                    },
+                    {
+                        "name": "current_board",
+                        "port": "/dev/null",
+                        "packets": [{"header": "0xB0", "size": 2}],
+                    },
+                ],
+                "merge": {
+                    "max_delay": 0.5,
+                    "streams": [
+                        {"device": "arc_board", "header": "0xA0"},
+                        {"device": "current_board", "header": "0xB0"},
+                    ],
+                },
+            }
+        )
+        daemon = AcquisitionDaemon(config)
+        merged = []
+        daemon.merged_callbacks.append(merged.extend)
+        arcs = daemon.pending[("arc_board", 0xA0)]
+        currents = daemon.pending[("current_board", 0xB0)]
+        for i in range(50):
+            arcs.append((100.0 + i * 0.01 + 0.004, struct.pack("<BHB", 0xA0, i, 0)))
+            currents.append((100.005 + i * 0.01, bytes([0xB0, i])))
+        daemon.process_pending()
+        daemon.merger.flush()
+
+        self.assertEqual(len(merged), 100)
+        self.assertEqual(
+            [stream for _, stream, _ in merged[:4]],
+            ["arc_board/0xA0", "current_board/0xB0"] * 2,
+        )
+        self.assertIn("mr_merge_packets_total 100.0", daemon.metrics.render())
+
+        config.merge.streams.append(("missing", 0xC0))
+        with self.assertRaises(ValueError):
+            AcquisitionDaemon(config)
+
+
+if __name__ == "__main__":
+    unittest.main()
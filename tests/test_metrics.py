@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics exporter
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import unittest
+import urllib.request
+from queue import Queue
+from utils.metrics.histogram import Histogram, LatencyReservoir
+from utils.metrics.prometheus import AcquisitionMetricsCollector, MetricsServer
+from utils.serial.serial_reader import SerialReader
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_cumulative_buckets(self):
+        """Test that bucket counts are cumulative and +Inf counts everything"""
+        histogram = Histogram(buckets=(0.001, 0.01))
+        for value in (0.0005, 0.005, 0.005, 1.0):
+            histogram.observe(value)
+
+        cumulative = histogram.cumulative()
+
+        self.assertEqual(cumulative[0.001], 1)
+        self.assertEqual(cumulative[0.01], 3)
+        self.assertEqual(cumulative[float("inf")], 4)
+
+    def test_reservoir_quantiles(self):
+        """Test quantiles over recent observations"""
+        reservoir = LatencyReservoir(size=100)
+        for value in range(101):
+            reservoir.observe(float(value))
+
+        quantiles = reservoir.quantiles((0.5, 0.99))
+
+        self.assertAlmostEqual(quantiles[0.5], 51.0, delta=1.0)
+        self.assertAlmostEqual(quantiles[0.99], 100.0, delta=1.0)
+
+
+class TestMetricsExport(unittest.TestCase):
+
+    def setUp(self):
+        """Create a reader with one handled packet"""
+        self.reader = SerialReader("/dev/ttyUSB0", log_packets=False)
+        self.reader.add_packet_config(header=0xA0, size=3, queue=Queue(maxsize=1))
+        config = self.reader.packet_configs[0xA0]
+        framed_at = time.perf_counter()
+        self.reader._handle_packet(bytes([0xA0, 1, 2]), config, framed_at)
+        self.reader._handle_packet(bytes([0xA0, 3, 4]), config, framed_at)
+
+        self.collector = AcquisitionMetricsCollector()
+        self.collector.add_reader("dev", self.reader)
+
+    def test_render_text_format(self):
+        """Test that packet, drop, queue and latency metrics are rendered"""
+        text = self.collector.render()
+
+        self.assertIn(
+            'mr_packets_total{device="dev",header="0xA0",name="Packet_A0"} 2.0', text
+        )
+        self.assertIn(
+            'mr_packets_dropped_total{device="dev",header="0xA0",name="Packet_A0"} 1.0',
+            text,
+        )
+        self.assertIn(
+            'mr_queue_depth{device="dev",header="0xA0",name="Packet_A0"} 1.0', text
+        )
+        self.assertIn('mr_dispatch_latency_seconds_count{device="dev"} 2.0', text)
+        self.assertIn(
+            'mr_read_loop_iteration_seconds_bucket{device="dev",le="+Inf"} 0.0', text
+        )
+        self.assertIn("# TYPE mr_reconnects_total counter", text)
+
+    def test_http_endpoint(self):
+        """Test scraping the collector over HTTP"""
+        server = MetricsServer(self.collector, host="127.0.0.1", port=0)
+        server.start()
+        try:
+            url = f"http://127.0.0.1:{server.port}/metrics"
+            with urllib.request.urlopen(url, timeout=2.0) as response:
+                body = response.read().decode("utf-8")
+                content_type = response.headers["Content-Type"]
+        finally:
+            server.stop()
+
+        self.assertTrue(content_type.startswith("text/plain"))
+        self.assertIn("mr_packets_total", body)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for protection rules evaluated on the I/O thread
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import threading
+import time
+import unittest
+from PySide6.QtCore import Qt
+from utils.serial.protection import (
+    ProtectionEngine,
+    ProtectionRule,
+    protection_rule_from_dict,
+)
+from utils.serial.serial_reader import SerialReader
+from utils.serial.serial_worker import SerialWorker
+from utils.serial.transports import MemoryTransport
+from utils.serial.types import PacketConfig
+
+TRIP = b"\x55\xaa\x01"
+
+
+def short_circuit(current: int) -> bytes:
+    return struct.pack("<BBI", 0xB0, 1, current)
+
+
+class TestProtectionRule(unittest.TestCase):
+
+    def test_threshold_and_hold_off(self):
+        """Test comparison on the raw field, scaling and hold-off"""
+        rule = ProtectionRule(
+            "trip", 0xB0, 2, 400.0, TRIP, dtype="<u4", scale=0.01, hold_off=0.5
+        )
+        self.assertIsNone(rule.check(short_circuit(39999), 10.0))
+        self.assertEqual(rule.check(short_circuit(40000), 10.0), 400.0)
+        self.assertIsNone(rule.check(short_circuit(90000), 10.4))
+        self.assertEqual(rule.check(short_circuit(90000), 10.5), 900.0)
+
+        below = ProtectionRule("low", 0xB0, 1, 2, TRIP, dtype="u1", comparison="<")
+        self.assertEqual(below.check(short_circuit(0), 0.0), 1)
+        with self.assertRaises(ValueError):
+            ProtectionRule("bad", 0xB0, 1, 2, TRIP, comparison="==")
+
+    def test_from_dict(self):
+        """Test parsing of the JSON description"""
+        rule = protection_rule_from_dict(
+            {
+                "name": "trip",
+                "header": "0xB0",
+                "offset": 2,
+                "dtype": ">i2",
+                "threshold": 5,
+                "command": "0x55 AA 01",
+            }
+        )
+        self.assertEqual(rule.command, TRIP)
+        self.assertEqual(rule.header, 0xB0)
+        self.assertEqual(rule.check(b"\xb0\x00\x00\x07", 0.0), 7)
+
+    def test_send_failure_is_counted(self):
+        """Test that a failing write is reported, not raised"""
+
+        def send(_):
+            raise OSError("port gone")
+
+        engine = ProtectionEngine(send)
+        engine.add_rule(ProtectionRule("trip", 0xB0, 1, 0, TRIP, dtype="u1"))
+        engine.evaluate(short_circuit(1), 0xB0, time.perf_counter())
+        engine.shutdown()
+        self.assertEqual(engine.stats["errors"], 1)
+        self.assertEqual(engine.stats["actions"], 1)
+
+    def test_rule_past_packet_end(self):
+        """Test that a rule reading past the packet is rejected or counted"""
+        engine = ProtectionEngine(lambda _: None)
+        engine.add_rule(ProtectionRule("long", 0xA0, 2, 1, TRIP, dtype="<u2"))
+        engine.add_rule(ProtectionRule("short", 0xA0, 1, 1, TRIP, dtype="u1"))
+        engine.evaluate(b"\xa0\x05\x00", 0xA0, time.perf_counter())
+        engine.shutdown()
+        self.assertEqual(engine.stats["errors"], 1)
+        self.assertEqual(engine.actions_by_rule, {"long": 0, "short": 1})
+
+        reader = SerialReader("COM_TEST", transport=MemoryTransport())
+        reader.add_packet_config(0xA0, 3, None)
+        with self.assertRaises(ValueError):
+            reader.add_protection_rule(
+                ProtectionRule("long", 0xA0, 2, 1, TRIP, dtype="<u2")
+            )
+
+
+class TestWorkerProtection(unittest.TestCase):
+
+    def test_command_written_from_io_thread(self):
+        """Test the trip command is written before the packet is emitted"""
+        transport = MemoryTransport(timeout=0.01)
+        worker = SerialWorker("COM_TEST", transport=transport)
+        worker.update_packet_configs({0xB0: PacketConfig(0xB0, 6, None)}, {})
+        engine = ProtectionEngine(worker.write_now, max_latency=0.05)
+        actions = []
+        engine.callbacks.append(actions.append)
+        engine.add_rule(
+            ProtectionRule(
+                "trip", 0xB0, 2, 400.0, TRIP, dtype="<u4", scale=0.01, hold_off=0.0
+            )
+        )
+        worker.protection = engine
+
+        written_at_emit = []
+        worker.packet_ready.connect(
+            lambda packet, config, framed_at: written_at_emit.append(
+                bytes(transport.written)
+            ),
+            Qt.ConnectionType.DirectConnection,
+        )
+        thread = threading.Thread(target=worker.start_reading)
+        thread.start()
+        transport.feed(short_circuit(100) + short_circuit(50000))
+        deadline = time.time() + 5.0
+        while len(written_at_emit) < 2 and time.time() < deadline:
+            time.sleep(0.001)
+        worker.stop_reading()
+        thread.join(timeout=5.0)
+        engine.shutdown()
+
+        self.assertEqual(bytes(transport.written), TRIP)
+        # Protection ran for the whole chunk before the first packet went out
+        self.assertEqual(written_at_emit[0], TRIP)
+        self.assertEqual(len(actions), 1)
+        self.assertEqual(actions[0].value, 500.0)
+        self.assertGreater(actions[0].latency, 0.0)
+        self.assertEqual(engine.stats["overruns"], 0)
+        self.assertEqual(engine.histogram.count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the packet fan-out publisher
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import socket
+import time
+import unittest
+from utils.stream.publisher import (
+    KIND_DECODED,
+    KIND_PACKETS,
+    PacketPublisher,
+    iter_messages,
+)
+
+
+class TestPacketPublisher(unittest.TestCase):
+
+    def setUp(self):
+        """Start a publisher on an ephemeral local port"""
+        self.publisher = PacketPublisher(port=0, batch_interval=0.005)
+        self.publisher.start()
+
+    def tearDown(self):
+        """Stop the publisher"""
+        self.publisher.stop()
+
+    def _connect(self):
+        """Connect a subscriber and wait until the server accepted it"""
+        sock = socket.create_connection(self.publisher.address, timeout=2.0)
+        deadline = time.time() + 2.0
+        while self.publisher.stats["subscribers"] == 0 and time.time() < deadline:
+            time.sleep(0.005)
+        return sock
+
+    def test_fan_out_to_multiple_subscribers(self):
+        """Test that every subscriber receives all published packets in order"""
+        subscribers = [self._connect(), self._connect()]
+        while self.publisher.stats["subscribers"] < 2:
+            time.sleep(0.005)
+
+        packets = [bytes([0xA0, i, 0, 0, 0]) for i in range(50)]
+        for i, packet in enumerate(packets):
+            self.publisher.publish(0xA0, packet, timestamp=float(i))
+
+        for sock in subscribers:
+            received = []
+            for kind, records in iter_messages(sock):
+                self.assertEqual(kind, KIND_PACKETS)
+                received.extend(records)
+                if len(received) >= len(packets):
+                    break
+            self.assertEqual([p for _, _, p in received], packets)
+            self.assertEqual(received[3][:2], (3.0, 0xA0))
+            sock.close()
+
+    def test_decoded_message(self):
+        """Test that decoded batches arrive as JSON documents"""
+        sock = self._connect()
+        self.publisher.publish_decoded("dev/0xA0", [1.0, 2.0], {"arc": [0.5, 0.7]})
+
+        kind, document = next(iter_messages(sock))
+
+        self.assertEqual(kind, KIND_DECODED)
+        self.assertEqual(document["stream"], "dev/0xA0")
+        self.assertEqual(document["fields"]["arc"], [0.5, 0.7])
+        sock.close()
+
+    def test_slow_subscriber_is_disconnected(self):
+        """Test that a subscriber that never reads is disconnected"""
+        self.publisher.stop()
+        self.publisher = PacketPublisher(
+            port=0, batch_interval=0.001, max_buffer_bytes=4096, disconnect_slow=True
+        )
+        self.publisher.start()
+        sock = self._connect()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+
+        payload = bytes(200)
+        deadline = time.time() + 5.0
+        while self.publisher.stats["disconnects"] == 0 and time.time() < deadline:
+            for _ in range(100):
+                self.publisher.publish(0xA0, payload)
+            time.sleep(0.002)
+
+        self.assertEqual(self.publisher.stats["disconnects"], 1)
+        self.assertEqual(self.publisher.stats["subscribers"], 0)
+        sock.close()
+
+    def test_batch_over_buffer_limit_reaches_idle_subscriber(self):
+        """Test that a message larger than the buffer is not dropped"""
+        self.publisher.stop()
+        self.publisher = PacketPublisher(
+            port=0, batch_interval=0.001, max_buffer_bytes=1024, disconnect_slow=True
+        )
+        self.publisher.start()
+        sock = self._connect()
+
+        packets = [bytes([0xA0]) + bytes(999) for _ in range(4)]
+        for packet in packets:
+            self.publisher.publish(0xA0, packet)
+        received = []
+        for _, records in iter_messages(sock):
+            received.extend(records)
+            if len(received) >= len(packets):
+                break
+
+        self.assertEqual([p for _, _, p in received], packets)
+        self.assertEqual(self.publisher.stats["disconnects"], 0)
+        self.assertEqual(self.publisher.stats["dropped_messages"], 0)
+        sock.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
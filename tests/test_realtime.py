@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the I/O thread realtime settings and the read-loop jitter probe
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+import unittest
+from utils.diagnostics.jitter_probe import JitterProbe, measure_sleep_jitter
+from utils.diagnostics.realtime import (
+    RealtimeSettings,
+    apply_realtime,
+    realtime_from_dict,
+)
+from utils.serial.serial_worker import SerialWorker
+from utils.serial.transports import MemoryTransport
+from utils.serial.types import PacketConfig
+
+
+class TestJitterProbe(unittest.TestCase):
+
+    def test_read_observations(self):
+        """Test wake-up latency, chunk gaps, backlog and incidents"""
+        probe = JitterProbe(baudrate=10000, incident_threshold=0.01)
+
+        probe.observe_read(0.0, 0.1002, 0, timeout=0.1)  # Woke 0.2 ms late
+        probe.observe_read(0.2, 0.201, 5)  # First chunk, no gap yet
+        probe.observe_read(0.201, 0.25, 200)  # 49 ms gap, 200 ms of bytes
+
+        self.assertEqual(probe.wakeup.count, 1)
+        self.assertAlmostEqual(probe.wakeup.sum, 0.0002)
+        self.assertEqual(probe.chunk_gap.count, 1)
+        self.assertAlmostEqual(probe.maxima["chunk_gap"], 0.049)
+        self.assertAlmostEqual(probe.maxima["backlog"], 0.2)
+        self.assertEqual(
+            [kind for _, kind, _ in probe.incidents], ["chunk_gap", "backlog"]
+        )
+
+        probe.reset()
+        self.assertEqual(probe.summary()["incidents"], 0)
+        self.assertEqual(probe.backlog.count, 0)
+
+    def test_sleep_jitter(self):
+        """Test the standalone sleep probe"""
+        probe = measure_sleep_jitter(interval=0.001, duration=0.05)
+        self.assertGreater(probe.wakeup.count, 5)
+        self.assertGreaterEqual(probe.maxima["wakeup"], 0.0)
+
+
+class TestRealtimeSettings(unittest.TestCase):
+
+    def test_nothing_requested(self):
+        """Test that default settings leave the thread alone"""
+        self.assertEqual(apply_realtime(RealtimeSettings()), {})
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "Linux scheduling")
+    def test_affinity_and_refusals_reported(self):
+        """Test per-setting results on a helper thread"""
+        results = {}
+
+        def apply():
+            results.update(
+                apply_realtime(
+                    RealtimeSettings(priority=1, cpus=sorted(os.sched_getaffinity(0)))
+                )
+            )
+
+        thread = threading.Thread(target=apply)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(results["affinity"], "ok")
+        # Granted with CAP_SYS_NICE, otherwise refused with a reason
+        self.assertIn("sched_fifo", results)
+        self.assertTrue(results["sched_fifo"])
+        # Only the helper thread was changed
+        self.assertEqual(os.sched_getscheduler(0), os.SCHED_OTHER)
+
+    def test_from_dict(self):
+        """Test parsing of the JSON description"""
+        settings = realtime_from_dict({"priority": "40", "cpus": [2, 3]})
+        self.assertEqual(settings.priority, 40)
+        self.assertEqual(settings.cpus, [2, 3])
+        self.assertIsNone(settings.nice)
+        self.assertIsNone(realtime_from_dict(None))
+
+
+class TestWorkerJitter(unittest.TestCase):
+
+    def test_read_loop_feeds_probe(self):
+        """Test that the worker applies settings and measures its reads"""
+        transport = MemoryTransport(timeout=0.01)
+        worker = SerialWorker(
+            "COM_TEST",
+            transport=transport,
+            realtime=RealtimeSettings(nice=0),
+        )
+        worker.update_packet_configs({0xA0: PacketConfig(0xA0, 2, None)}, {})
+        thread = threading.Thread(target=worker.start_reading)
+        thread.start()
+        for _ in range(5):
+            transport.feed(bytes([0xA0, 0x01]))
+            time.sleep(0.02)
+        worker.stop_reading()
+        thread.join(timeout=5.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertGreaterEqual(worker.jitter.chunk_gap.count, 4)
+        self.assertGreater(worker.jitter.wakeup.count, 0)
+        if sys.platform.startswith("linux"):
+            self.assertEqual(worker.realtime_status, {"nice": "ok"})
+
+
+if __name__ == "__main__":
+    unittest.main()
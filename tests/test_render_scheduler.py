@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the frame-budget render scheduler
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import unittest
+import numpy as np
+from PySide6.QtWidgets import QApplication
+from views.plotter_widget_view import PlotterWidgetView
+from views.render_scheduler import RenderScheduler
+
+
+class SlowView:
+    """Stand-in view whose redraw takes a fixed time"""
+
+    def __init__(self, render_seconds=0.0):
+        self.render_seconds = render_seconds
+        self.renders = 0
+        self.scheduler = None
+        self.options = None
+
+    def render_pending(self):
+        time.sleep(self.render_seconds)
+        self.renders += 1
+
+    def set_render_scheduler(self, scheduler):
+        self.scheduler = scheduler
+
+    def apply_render_quality(self, antialias=True, downsample=1):
+        self.options = {"antialias": antialias, "downsample": downsample}
+
+
+class TestRenderScheduler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.scheduler = RenderScheduler(frame_budget_ms=5.0)
+        self.scheduler.timer.stop()  # Frames are driven by hand
+
+    def test_coalesces_updates(self):
+        """Test that several updates before a frame give one redraw"""
+        view = PlotterWidgetView()
+        self.scheduler.register_view(view)
+        for i in range(5):
+            view.update_data(np.arange(10.0), np.full(10, float(i)), "Voltage")
+
+        self.assertEqual(self.scheduler.get_stats()["pending_views"], 1)
+        curve = view.plot_curves["Voltage"]
+        self.assertIsNone(curve.yData)
+        self.scheduler._on_tick()
+        np.testing.assert_array_equal(curve.yData, np.full(10, 4.0))
+        self.assertEqual(self.scheduler.get_stats()["pending_views"], 0)
+
+        view.update_data(np.arange(3.0), np.ones(3), "Voltage")
+        self.scheduler.unregister_view(view)  # Detaching draws what is pending
+        np.testing.assert_array_equal(curve.yData, np.ones(3))
+        self.assertIsNone(view.render_scheduler)
+
+    def test_budget_defers_views_and_degrades(self):
+        """Test that slow frames spill views over and lower the quality"""
+        views = [SlowView(0.03), SlowView(0.03)]
+        for view in views:
+            self.scheduler.register_view(view)
+        levels = []
+        self.scheduler.quality_changed.connect(levels.append)
+
+        for _ in range(3):
+            for view in views:
+                self.scheduler.request_render(view)
+            self.scheduler._on_tick()
+            # The first view used up the budget, the second waits
+            self.assertEqual(self.scheduler.get_stats()["pending_views"], 1)
+
+        self.assertEqual(levels, [1])
+        self.assertEqual(views[1].options, {"antialias": False, "downsample": 1})
+        self.assertEqual(self.scheduler.timer.interval(), 33)
+
+    def test_restores_quality_when_idle(self):
+        """Test that idle frames restore quality one level at a time"""
+        view = SlowView()
+        self.scheduler.register_view(view)
+        self.scheduler.set_quality_level(3)
+        self.assertEqual(view.options["downsample"], 4)
+        self.assertEqual(self.scheduler.timer.interval(), 100)
+
+        self.scheduler.restore_after = 0.0
+        for _ in range(4):
+            self.scheduler._on_tick()
+
+        self.assertEqual(self.scheduler.quality_level, 1)
+        self.assertEqual(view.options, {"antialias": False, "downsample": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared time-base ring buffer and min/max decimation
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import numpy as np
+from utils.dsp.ring_buffer import TimeBaseRingBuffer
+from views.multi_channel_view import peak_decimate
+
+
+class TestTimeBaseRingBuffer(unittest.TestCase):
+
+    def test_wraps_and_returns_contiguous_views(self):
+        """Test that the latest samples come back in order after wrapping"""
+        buffer = TimeBaseRingBuffer(capacity=10, channels=2)
+        stream = np.arange(37, dtype=np.float64)
+        position = 0
+        for size in (3, 7, 1, 9, 4, 13):
+            chunk = stream[position : position + size]
+            buffer.append(chunk, np.vstack([chunk, -chunk]))
+            position += size
+
+            times, data = buffer.latest()
+            expected = stream[max(0, position - 10) : position]
+            np.testing.assert_array_equal(times, expected)
+            np.testing.assert_array_equal(data[0], expected)
+            np.testing.assert_array_equal(data[1], -expected)
+            self.assertIs(times.base, buffer._times)
+
+        self.assertEqual(buffer.total, 37)
+        self.assertEqual(buffer.count, 10)
+
+    def test_rejects_mismatched_channels(self):
+        """Test that values must match the number of channels"""
+        buffer = TimeBaseRingBuffer(capacity=4, channels=3)
+        with self.assertRaises(ValueError):
+            buffer.append([0.0, 1.0], np.zeros((2, 2)))
+
+
+class TestPeakDecimate(unittest.TestCase):
+
+    def test_keeps_spikes(self):
+        """Test that a single-sample spike survives decimation"""
+        x = np.arange(10000, dtype=np.float64)
+        y = np.zeros(10000)
+        y[4321] = 5.0
+        y[8765] = -3.0
+
+        dx, dy = peak_decimate(x, y, 100)
+
+        self.assertEqual(len(dy), 200)
+        self.assertEqual(dy.max(), 5.0)
+        self.assertEqual(dy.min(), -3.0)
+        self.assertEqual(len(dx), len(dy))
+
+    def test_short_traces_unchanged(self):
+        """Test that traces shorter than two blocks are left alone"""
+        x = np.arange(10.0)
+        dx, dy = peak_decimate(x, x, 8)
+        self.assertIs(dy, x)
+
+
+if __name__ == "__main__":
+    unittest.main()
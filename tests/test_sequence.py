@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for sequence counter accounting and the device timebase
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import struct
+import threading
+import time
+import unittest
+import numpy as np
+from utils.serial.sequence import DeviceTimebase, SequenceTracker, counter_from_dict
+from utils.serial.serial_worker import SerialWorker
+from utils.serial.transports import MemoryTransport
+from utils.serial.types import CounterField, PacketConfig
+
+
+class TestSequenceTracker(unittest.TestCase):
+
+    def test_gaps_reorder_and_duplicates_across_wrap(self):
+        """Test accounting of an 8-bit counter wrapping at 256"""
+        tracker = SequenceTracker(CounterField(0, "u1"))
+        for value in [250, 251, 252, 255, 0, 254, 253, 253, 5, 1, 2, 3]:
+            tracker.observe_value(value)
+
+        self.assertEqual(tracker.stats["received"], 12)
+        self.assertEqual(tracker.stats["gaps"], 2)
+        self.assertEqual(tracker.stats["largest_gap"], 4)
+        self.assertEqual(tracker.stats["reordered"], 5)
+        self.assertEqual(tracker.stats["duplicates"], 1)
+        self.assertEqual(tracker.stats["lost"], 1)  # 4 never arrived
+        self.assertEqual(tracker.position, 261)
+
+    def test_step_and_big_endian(self):
+        """Test a sample counter advancing by samples per packet"""
+        tracker = SequenceTracker(CounterField(1, ">u2", step=8))
+        for count in [65520, 65528, 8, 16]:  # 0 is missing
+            tracker.observe(b"\xa0" + struct.pack(">H", count))
+        self.assertEqual(tracker.stats["lost"], 1)
+        tracker.reset()
+        self.assertEqual(tracker.stats["received"], 0)
+
+
+class TestDeviceTimebase(unittest.TestCase):
+
+    def test_continuous_times_across_batches_and_wrap(self):
+        """Test that jittered arrivals become an evenly spaced timebase"""
+        field = counter_from_dict({"offset": 1, "dtype": "<u2", "sample_rate": 1000})
+        timebase = DeviceTimebase(field)
+        counts = (np.arange(70000) + 60000) % 65536
+        packets = [b"\xa0" + struct.pack("<H", int(c)) + b"\x00" for c in counts]
+        arrivals = 100.0 + np.arange(70000) / 1000.0
+        arrivals += np.random.default_rng(0).uniform(0, 0.02, 70000)
+
+        times = np.concatenate(
+            [
+                timebase.times(
+                    timebase.counters(packets[i : i + 5000], 4), arrivals[i : i + 5000]
+                )
+                for i in range(0, 70000, 5000)
+            ]
+        )
+
+        np.testing.assert_allclose(np.diff(times), 0.001, atol=1e-9)
+        self.assertAlmostEqual(times[0], arrivals[0])
+        self.assertGreaterEqual(timebase.offset, -0.02)
+        with self.assertRaises(ValueError):
+            DeviceTimebase(CounterField(1, "<u2"))
+
+    def test_reanchors_after_outage_longer_than_counter_range(self):
+        """Test that a 70 s outage of a 16-bit 1 kHz counter is re-anchored"""
+        timebase = DeviceTimebase(CounterField(1, "<u2", sample_rate=1000))
+        before = np.arange(1000)
+        timebase.times(before, 100.0 + before / 1000.0)
+
+        resumed = np.arange(71000, 72000)  # Counter kept running during the gap
+        arrivals = 100.0 + resumed / 1000.0 + 0.002
+        times = timebase.times(resumed % 65536, arrivals)
+
+        self.assertEqual(timebase.reanchors, 1)
+        np.testing.assert_allclose(times, arrivals, atol=1e-6)
+        np.testing.assert_allclose(np.diff(times), 0.001, atol=1e-9)
+        self.assertLess(abs(timebase.offset), 0.01)
+
+
+class TestWorkerSequence(unittest.TestCase):
+
+    def test_worker_counts_lost_packets(self):
+        """Test per-header accounting in the read loop"""
+        transport = MemoryTransport(timeout=0.01)
+        worker = SerialWorker("COM_TEST", transport=transport)
+        config = PacketConfig(0xA0, 3, None, sequence=CounterField(1, "u1"))
+        worker.update_packet_configs(
+            {0xA0: config, 0xB0: PacketConfig(0xB0, 2, None)}, {}
+        )
+        thread = threading.Thread(target=worker.start_reading)
+        thread.start()
+        sequence = [s for s in range(300) if s % 50 != 7]  # 6 lost
+        transport.feed(b"".join(bytes([0xA0, s % 256, 0]) for s in sequence))
+        transport.feed(b"\xb0\x00")
+        deadline = time.time() + 5.0
+        tracker = None
+        while time.time() < deadline:
+            tracker = worker.sequence_trackers.get((0xA0, "sequence"))
+            if tracker is not None and tracker.stats["received"] == len(sequence):
+                break
+            time.sleep(0.005)
+        worker.stop_reading()
+        thread.join(timeout=5.0)
+
+        self.assertEqual(tracker.stats["lost"], 6)
+        self.assertEqual(tracker.stats["gaps"], 6)
+        self.assertNotIn((0xB0, "sequence"), worker.sequence_trackers)
+
+
+if __name__ == "__main__":
+    unittest.main()
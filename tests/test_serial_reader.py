@@ -8,32 +8,22 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import unittest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock
 from queue import Queue
-from utils.serial_reader import SerialReader, PacketConfig
+from utils.serial.serial_reader import SerialReader
+from utils.serial.transports import MemoryTransport
+from utils.serial.types import PacketConfig
 
 class TestSerialReader(unittest.TestCase):
     
     def setUp(self):
         """Set up test fixtures"""
-        # Mock serial to avoid actual hardware dependency
-        self.mock_serial_patcher = patch('utils.serial_reader.serial.Serial')
-        self.mock_serial = self.mock_serial_patcher.start()
-        
-        # Configure mock serial instance
-        self.mock_serial_instance = Mock()
-        self.mock_serial_instance.is_open = True
-        self.mock_serial_instance.in_waiting = 0
-        self.mock_serial_instance.read.return_value = b''
-        self.mock_serial.return_value = self.mock_serial_instance
-    
-    def tearDown(self):
-        """Clean up after tests"""
-        self.mock_serial_patcher.stop()
+        # In-memory transport to avoid actual hardware dependency
+        self.transport = MemoryTransport()
     
     def test_initialization(self):
         """Test that SerialReader initializes with empty configuration"""
-        reader = SerialReader("/dev/ttyUSB0")
+        reader = SerialReader("/dev/ttyUSB0", transport=self.transport)
         
         # Check that no configurations are present initially
         self.assertEqual(len(reader.packet_configs), 0)
@@ -41,7 +31,7 @@ class TestSerialReader(unittest.TestCase):
     
     def test_add_packet_config(self):
         """Test adding packet configurations"""
-        reader = SerialReader("/dev/ttyUSB0")
+        reader = SerialReader("/dev/ttyUSB0", transport=self.transport)
         test_queue = Queue()
         test_callback = Mock()
         
@@ -68,7 +58,7 @@ class TestSerialReader(unittest.TestCase):
     
     def test_remove_packet_config(self):
         """Test removing packet configurations"""
-        reader = SerialReader("/dev/ttyUSB0")
+        reader = SerialReader("/dev/ttyUSB0", transport=self.transport)
         test_queue = Queue()
         
         # Add a configuration
@@ -82,7 +72,7 @@ class TestSerialReader(unittest.TestCase):
     
     def test_clear_packet_configs(self):
         """Test clearing all packet configurations"""
-        reader = SerialReader("/dev/ttyUSB0")
+        reader = SerialReader("/dev/ttyUSB0", transport=self.transport)
         
         # Add some configurations first
         reader.add_packet_config(header=0xA0, size=10, queue=Queue())
@@ -96,7 +86,7 @@ class TestSerialReader(unittest.TestCase):
     
     def test_get_queue_for_header(self):
         """Test getting queue for specific header"""
-        reader = SerialReader("/dev/ttyUSB0")
+        reader = SerialReader("/dev/ttyUSB0", transport=self.transport)
         test_queue = Queue()
         
         reader.add_packet_config(header=0xCC, size=8, queue=test_queue)
@@ -111,7 +101,7 @@ class TestSerialReader(unittest.TestCase):
     
     def test_buffer_processing_valid_packet(self):
         """Test buffer processing with valid packets"""
-        reader = SerialReader("/dev/ttyUSB0")
+        reader = SerialReader("/dev/ttyUSB0", transport=self.transport)
         test_queue = Queue()
         test_callback = Mock()
         
@@ -124,13 +114,13 @@ class TestSerialReader(unittest.TestCase):
         
         # Simulate packet data
         packet_data = bytes([0xDD, 0x01, 0x02, 0x03, 0x04])
-        reader.buffer.extend(packet_data)
+        reader.worker.buffer.extend(packet_data)
         
         # Process buffer
-        reader._process_buffer()
+        reader.worker._process_buffer()
         
         # Verify packet was processed
-        self.assertEqual(len(reader.buffer), 0)  # Buffer should be empty
+        self.assertEqual(len(reader.worker.buffer), 0)  # Buffer should be empty
         self.assertEqual(test_queue.qsize(), 1)  # Packet should be in queue
         test_callback.assert_called_once_with(packet_data)
         
@@ -139,41 +129,42 @@ class TestSerialReader(unittest.TestCase):
     
     def test_buffer_processing_invalid_header(self):
         """Test buffer processing with invalid header"""
-        reader = SerialReader("/dev/ttyUSB0")
+        reader = SerialReader("/dev/ttyUSB0", transport=self.transport)
         test_queue = Queue()
         
         reader.add_packet_config(header=0xEE, size=5, queue=test_queue)
         
         # Simulate data with invalid header
-        reader.buffer.extend(bytes([0xFF, 0x01, 0x02, 0x03, 0x04]))
+        reader.worker.buffer.extend(bytes([0xFF, 0x01, 0x02, 0x03, 0x04]))
         
         # Process buffer
-        reader._process_buffer()
+        reader.worker._process_buffer()
         
-        # Verify invalid byte was dropped
-        self.assertEqual(len(reader.buffer), 4)  # One byte should be dropped
+        # Verify bytes were dropped until a known header could be found
+        self.assertEqual(len(reader.worker.buffer), 0)  # No valid header left
+        self.assertEqual(reader.worker.stats['desync_bytes'], 5)
         self.assertEqual(test_queue.qsize(), 0)  # No packets should be queued
     
     def test_buffer_processing_insufficient_data(self):
         """Test buffer processing with insufficient data"""
-        reader = SerialReader("/dev/ttyUSB0")
+        reader = SerialReader("/dev/ttyUSB0", transport=self.transport)
         test_queue = Queue()
         
         reader.add_packet_config(header=0xEE, size=10, queue=test_queue)
         
         # Simulate insufficient data
-        reader.buffer.extend(bytes([0xEE, 0x01, 0x02]))  # Only 3 bytes, need 10
+        reader.worker.buffer.extend(bytes([0xEE, 0x01, 0x02]))  # Only 3 bytes, need 10
         
         # Process buffer
-        reader._process_buffer()
+        reader.worker._process_buffer()
         
         # Verify data remains in buffer
-        self.assertEqual(len(reader.buffer), 3)
+        self.assertEqual(len(reader.worker.buffer), 3)
         self.assertEqual(test_queue.qsize(), 0)
     
     def test_handle_packet_with_callback_error(self):
         """Test packet handling when callback raises an exception"""
-        reader = SerialReader("/dev/ttyUSB0")
+        reader = SerialReader("/dev/ttyUSB0", transport=self.transport)
         test_queue = Queue()
         error_callback = Mock(side_effect=Exception("Test error"))
         
@@ -196,7 +187,7 @@ class TestSerialReader(unittest.TestCase):
     
     def test_get_packet_stats(self):
         """Test getting packet statistics"""
-        reader = SerialReader("/dev/ttyUSB0")
+        reader = SerialReader("/dev/ttyUSB0", transport=self.transport)
         test_queue = Queue()
         
         reader.add_packet_config(header=0xF0, size=5, queue=test_queue)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for SerialWorker reconnect supervision
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import time
+import unittest
+import serial
+from utils.serial.serial_worker import SerialWorker
+from utils.serial.transports import Transport
+from utils.serial.types import PacketConfig
+
+
+class ScriptedTransport(Transport):
+    """Transport whose successive opens replay scripted sessions
+
+    Each session is a list of chunks returned by reads, after which the read
+    fails like an unplugged device, or an exception raised by open.
+    """
+
+    def __init__(self, sessions):
+        self.sessions = list(sessions)
+        self.chunks = []
+        self._open = False
+
+    @property
+    def is_open(self):
+        return self._open
+
+    def open(self):
+        session = self.sessions.pop(0) if self.sessions else []
+        if isinstance(session, Exception):
+            raise session
+        self.chunks = list(session)
+        self._open = True
+
+    def read(self, size):
+        if self.chunks:
+            return self.chunks.pop(0)
+        raise serial.SerialException("device disconnected")
+
+    def write(self, data):
+        pass
+
+    def close(self):
+        self._open = False
+
+
+class TestSerialWorkerReconnect(unittest.TestCase):
+
+    def test_reconnect_preserves_partial_frame(self):
+        """Test backoff, gap accounting and framer state across an outage"""
+        transport = ScriptedTransport(
+            [
+                [bytes([0xA0, 0x01])],  # Partial frame, then unplug
+                serial.SerialException("no such device"),
+                serial.SerialException("no such device"),
+                [],
+            ]
+        )
+
+        worker = SerialWorker("COM_TEST", transport=transport)
+        worker.update_packet_configs({0xA0: PacketConfig(0xA0, 5, None)}, {})
+        worker.RECONNECT_INITIAL_DELAY = 0.001
+        worker.RECONNECT_MAX_DELAY = 0.005
+        thread = threading.Thread(target=worker.start_reading)
+        thread.start()
+        deadline = time.time() + 5.0
+        while worker.stats["reconnects"] < 2 and time.time() < deadline:
+            time.sleep(0.001)
+        worker.stop_reading()
+        thread.join(timeout=5.0)
+
+        self.assertFalse(thread.is_alive())
+        self.assertGreaterEqual(worker.stats["reconnects"], 2)
+        self.assertEqual(len(worker.gaps), worker.stats["reconnects"])
+        self.assertGreater(worker.stats["gap_seconds"], 0.0)
+        # The partial frame read before the outage is kept for reassembly
+        self.assertEqual(bytes(worker.buffer[:2]), bytes([0xA0, 0x01]))
+
+    def test_no_reconnect_when_disabled(self):
+        """Test that the legacy behaviour stops on the first failure"""
+        worker = SerialWorker(
+            "COM_TEST",
+            auto_reconnect=False,
+            transport=ScriptedTransport([[b"\x00"]] * 5),
+        )
+        worker.start_reading()
+
+        self.assertFalse(worker.running)
+        self.assertEqual(worker.stats["reconnects"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
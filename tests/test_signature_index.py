@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the signature similarity index
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import unittest
+import numpy as np
+from utils.events.signature_index import SignatureIndex, signature_vector
+
+
+class TestSignatureVector(unittest.TestCase):
+
+    def test_independent_of_length_and_level(self):
+        """Test that scaled and resampled copies give the same signature"""
+        t = np.linspace(0, 1, 500)
+        waveform = np.exp(-5 * t) * np.sin(20 * t)
+        a = signature_vector(waveform, 64)
+        b = signature_vector(3.0 * waveform[::4] + 1.0, 64)
+
+        self.assertEqual(a.shape, (64,))
+        self.assertAlmostEqual(float(np.linalg.norm(a)), 1.0, places=5)
+        self.assertGreater(float(a @ b), 0.99)
+
+
+class TestSignatureIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.t = np.linspace(0, 1, 50)
+        self.decays = rng.uniform(1.0, 20.0, 3000)
+        self.taps = rng.integers(1, 20, 3000)
+        self.index = SignatureIndex(length=32)
+        for operation_id, (decay, tap) in enumerate(zip(self.decays, self.taps)):
+            self.index.add(
+                operation_id, np.exp(-decay * self.t), int(tap), float(operation_id)
+            )
+
+    def test_matches_brute_force(self):
+        """Test that the k nearest neighbours match a brute-force ranking"""
+        query = np.exp(-7.3 * self.t)
+        matches = self.index.query(query, k=5)
+
+        q = signature_vector(query, 32)
+        scores = [
+            float(signature_vector(np.exp(-d * self.t), 32) @ q) for d in self.decays
+        ]
+        expected = list(np.argsort(scores)[::-1][:5])
+        self.assertEqual([m.operation_id for m in matches], expected)
+        similarities = [m.similarity for m in matches]
+        self.assertEqual(similarities, sorted(similarities, reverse=True))
+
+    def test_tap_prefilter(self):
+        """Test that only operations on the requested tap are returned"""
+        matches = self.index.query(np.exp(-7.3 * self.t), k=10, tap_position=7)
+        self.assertEqual(len(matches), 10)
+        self.assertTrue(all(m.tap_position == 7 for m in matches))
+        self.assertTrue(all(self.taps[m.operation_id] == 7 for m in matches))
+        self.assertEqual(self.index.query(self.t, tap_position=99), [])
+
+    def test_save_and_load(self):
+        """Test that a saved index answers queries identically after loading"""
+        with tempfile.TemporaryDirectory() as tmp:
+            self.index.directory = tmp
+            self.index.save()
+            loaded = SignatureIndex(tmp, length=32)
+
+            self.assertEqual(loaded.count, 3000)
+            query = np.exp(-2.0 * self.t)
+            self.assertEqual(loaded.query(query), self.index.query(query))
+            loaded.add(3000, query, 5)
+            self.assertEqual(loaded.query(query, k=1)[0].operation_id, 3000)
+
+
+if __name__ == "__main__":
+    unittest.main()
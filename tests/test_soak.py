@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for the soak test harness
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+import unittest
+from queue import Queue
+from PySide6.QtCore import QCoreApplication
+from utils.diagnostics.soak import (
+    SoakMonitor,
+    SoakSample,
+    SoakThresholds,
+    SyntheticSource,
+    rss_bytes,
+)
+from utils.serial.serial_reader import SerialReader
+from utils.serial.transports import MemoryTransport
+
+
+def sample(elapsed, rss_mb=100.0, dicts=1000, depth=0, p99=0.001):
+    return SoakSample(
+        elapsed=elapsed,
+        rss_bytes=int(rss_mb * 1e6),
+        objects={"dict": dicts},
+        queue_depths={"0xA0": depth},
+        latency={"p50": p99 / 2, "p90": p99, "p99": p99},
+        packets=0,
+        dropped=0,
+        desync_bytes=0,
+    )
+
+
+class TestSoakMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.monitor = SoakMonitor(
+            None,
+            SoakThresholds(
+                warmup=10,
+                max_rss_growth_mb=20,
+                max_object_growth=500,
+                max_queue_depth=100,
+                max_p99_latency=0.05,
+            ),
+        )
+
+    def test_steady_run_passes(self):
+        """Test that noise after a warm-up jump is no growth"""
+        self.monitor.samples = [sample(0, rss_mb=50, dicts=10)] + [
+            sample(t, rss_mb=100 + (t % 3) * 5) for t in range(10, 100, 10)
+        ]
+        self.assertEqual(self.monitor.failures(), [])
+        self.assertTrue(self.monitor.report()["passed"])
+
+    def test_type_entering_top_list_is_no_growth(self):
+        """Test that samples without a type do not count it as zero"""
+        self.monitor.samples = [sample(t) for t in range(10, 100, 10)]
+        for steady in self.monitor.samples[-3:]:
+            steady.objects["tuple"] = 50000
+        self.assertEqual(self.monitor.failures(), [])
+
+    def test_growth_and_latency_fail(self):
+        """Test RSS, object, queue and latency thresholds"""
+        self.monitor.samples = [
+            sample(t, rss_mb=100 + t / 2, dicts=1000 + t * 10, depth=t, p99=t / 3000)
+            for t in range(10, 210, 10)
+        ]
+        failures = self.monitor.failures()
+        self.assertEqual(len(failures), 5)
+        self.assertIn("queue 0xA0 reached 200", failures[0])
+        self.assertIn("RSS grew 95.0 MB", failures[1])
+        self.assertIn("dict objects grew by 1900", failures[2])
+        self.assertIn("p99 dispatch latency 66.7 ms", failures[3])
+        self.assertIn("rose from 3.33 ms to 66.67 ms", failures[4])
+
+
+class TestSoakSource(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def test_source_drives_reader(self):
+        """Test a short soak of a real reader fed by the synthetic source"""
+        transport = MemoryTransport(timeout=0.01)
+        reader = SerialReader("soak", log_packets=False, transport=transport)
+        queue = Queue()
+        reader.add_packet_config(0xA0, 5, queue, name="Arc")
+        reader.add_packet_config(0xB0, 6, None, name="ShortCircuit")
+        source = SyntheticSource(transport, rate=2000)
+        monitor = SoakMonitor(reader, SoakThresholds(warmup=0))
+
+        reader.start()
+        source.start()
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.005)
+        source.stop()
+        reader.stop()
+        self.app.processEvents()
+        result = monitor.sample()
+
+        self.assertGreater(result.packets, 1000)
+        self.assertEqual(result.desync_bytes, 0)
+        self.assertEqual(result.queue_depths["0xA0"], queue.qsize())
+        self.assertGreater(result.rss_bytes, 0)
+        self.assertIn("dict", result.objects)
+        # Types on top after the warm-up stay counted in later samples
+        self.assertLessEqual(set(result.objects), set(monitor.sample().objects))
+        self.assertGreater(rss_bytes(), 1e6)
+
+
+if __name__ == "__main__":
+    unittest.main()
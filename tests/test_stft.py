@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming STFT
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+import numpy as np
+from utils.dsp.stft import StreamingSTFT
+
+
+def reference_stft(signal, fft_size, hop):
+    """Straightforward per-frame STFT in dB for comparison"""
+    window = np.hanning(fft_size)
+    rows = []
+    for start in range(0, len(signal) - fft_size + 1, hop):
+        spectrum = np.fft.rfft(signal[start : start + fft_size] * window)
+        power = (np.abs(spectrum) * 2.0 / window.sum()) ** 2
+        rows.append(10 * np.log10(np.maximum(power, 1e-20)))
+    return np.array(rows)
+
+
+class TestStreamingSTFT(unittest.TestCase):
+
+    def test_batches_match_reference(self):
+        """Test that arbitrary batch splits give the reference spectrogram"""
+        rng = np.random.default_rng(1)
+        signal = rng.normal(size=5000)
+        stft = StreamingSTFT(fft_size=128, hop=48)
+
+        rows = []
+        position = 0
+        for size in rng.integers(1, 400, size=100):
+            rows.append(stft.process(signal[position : position + size]).copy())
+            position += size
+            if position >= len(signal):
+                break
+        result = np.concatenate(rows)
+        expected = reference_stft(signal[:position], 128, 48)
+
+        self.assertEqual(result.shape, expected.shape)
+        np.testing.assert_allclose(result, expected, atol=1e-9)
+        self.assertEqual(stft.frames_out, len(expected))
+
+    def test_sine_peak_and_level(self):
+        """Test that a full-scale sine peaks in its bin at about 0 dB"""
+        sample_rate = 8000.0
+        stft = StreamingSTFT(fft_size=256, sample_rate=sample_rate)
+        t = np.arange(4096) / sample_rate
+        frequency = stft.frequencies[40]
+        rows = stft.process(np.sin(2 * np.pi * frequency * t))
+
+        self.assertTrue(np.all(np.argmax(rows, axis=1) == 40))
+        self.assertAlmostEqual(float(rows[:, 40].mean()), 0.0, delta=0.1)
+
+    def test_buffers_reused_in_steady_state(self):
+        """Test that equal-sized batches do not reallocate buffers"""
+        stft = StreamingSTFT(fft_size=256, hop=128)
+        batch = np.zeros(1024)
+        stft.process(batch)
+        stft.process(batch)
+        buffers = (stft._input, stft._frames, stft._spectrum, stft._power)
+        for _ in range(50):
+            stft.process(batch)
+        for before, after in zip(
+            buffers, (stft._input, stft._frames, stft._spectrum, stft._power)
+        ):
+            self.assertIs(before, after)
+
+
+if __name__ == "__main__":
+    unittest.main()
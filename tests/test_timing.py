@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-stage timing instrumentation
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unittest
+from utils.diagnostics.timing import RollingHistogram, StageTimings
+
+
+class TestRollingHistogram(unittest.TestCase):
+
+    def test_quantiles_and_rate(self):
+        """Test that quantiles land in the right log bucket"""
+        histogram = RollingHistogram(slots=10, slot_seconds=1.0)
+        for _ in range(99):
+            histogram.observe(0.0001, now=100.0)
+        histogram.observe(0.05, now=100.0)
+
+        stats = histogram.snapshot(now=100.5)
+
+        self.assertEqual(stats["count"], 100)
+        self.assertAlmostEqual(stats["rate"], 10.0)
+        self.assertAlmostEqual(stats["p50"], 0.0001)
+        self.assertGreaterEqual(stats["p99"], 0.0001)
+        self.assertLess(stats["p99"], 0.0002)
+        self.assertAlmostEqual(stats["max"], 0.05)
+
+    def test_old_slots_expire(self):
+        """Test that observations older than the window are forgotten"""
+        histogram = RollingHistogram(slots=5, slot_seconds=1.0)
+        histogram.observe(0.01, now=10.0)
+        histogram.observe(0.02, now=14.0)
+
+        self.assertEqual(histogram.snapshot(now=14.5)["count"], 2)
+        self.assertEqual(histogram.snapshot(now=15.5)["count"], 1)
+        self.assertEqual(histogram.snapshot(now=30.0)["count"], 0)
+
+
+class TestStageTimings(unittest.TestCase):
+
+    def test_disabled_timed_block_records_nothing(self):
+        """Test that the context manager is inert while disabled"""
+        timings = StageTimings(enabled=False)
+        with timings.timed("stage"):
+            pass
+        self.assertEqual(timings.snapshot(), {})
+
+        timings.enabled = True
+        with timings.timed("stage"):
+            pass
+        self.assertEqual(timings.snapshot()["stage"]["count"], 1)
+
+    def test_utilization(self):
+        """Test that busy time is reported as a fraction of the window"""
+        timings = StageTimings(enabled=True)
+        timings.record_busy("worker", 2.5)
+        self.assertAlmostEqual(timings.utilization()["worker"], 0.25)
+
+        timings.reset()
+        self.assertEqual(timings.utilization(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
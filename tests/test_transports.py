@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tests for the SerialWorker transports
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pty
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from utils.capture.recorder import MAGIC, encode_records
+from utils.serial.serial_worker import SerialWorker
+from utils.serial.transports import (
+    FdTransport,
+    FileReplayTransport,
+    MemoryTransport,
+    PySerialTransport,
+    SocketTransport,
+    TransportError,
+    create_transport,
+)
+from utils.serial.types import PacketConfig
+
+
+class CollectingWorker:
+    """SerialWorker reading one packet type into a list on its own thread"""
+
+    def __init__(self, transport, size=4):
+        self.packets = []
+        self.worker = SerialWorker("test", transport=transport)
+        self.worker.update_packet_configs(
+            {0xA0: PacketConfig(0xA0, size, None, executor="inline")}, {}
+        )
+        self.worker.dispatcher = self
+
+    def dispatch(self, packet, config, framed_at):
+        self.packets.append(packet)
+        return True
+
+    def run_until(self, count, timeout=10.0):
+        thread = threading.Thread(target=self.worker.start_reading)
+        thread.start()
+        deadline = time.monotonic() + timeout
+        while len(self.packets) < count and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.worker.stop_reading()
+        thread.join(timeout=5.0)
+        return self.packets
+
+
+def make_stream(count):
+    return b"".join(
+        bytes([0xA0, i & 0xFF, (i >> 8) & 0xFF, 0x55]) for i in range(count)
+    )
+
+
+class TestMemoryTransport(unittest.TestCase):
+
+    def test_high_rate_through_framer(self):
+        """Test that megabytes pushed in memory are framed without loss"""
+        count = 250000  # 1 MB of 4-byte packets
+        stream = make_stream(count)
+        transport = MemoryTransport()
+        collector = CollectingWorker(transport)
+        feeder = threading.Thread(
+            target=lambda: [
+                transport.feed(stream[i : i + 65536])
+                for i in range(0, len(stream), 65536)
+            ]
+        )
+        feeder.start()
+        packets = collector.run_until(count)
+        feeder.join()
+
+        self.assertEqual(len(packets), count)
+        self.assertEqual(b"".join(packets), stream)
+        self.assertEqual(collector.worker.stats["desync_bytes"], 0)
+
+    def test_unplug_and_replug(self):
+        """Test that an unplugged memory transport is reconnected"""
+        transport = MemoryTransport()
+        collector = CollectingWorker(transport)
+        collector.worker.RECONNECT_INITIAL_DELAY = 0.001
+        transport.feed(make_stream(1) + b"\xa0\x01")
+
+        def outage():
+            time.sleep(0.05)
+            transport.unplug()
+            time.sleep(0.05)
+            transport.replug()
+            transport.feed(b"\x02\x55")
+
+        threading.Thread(target=outage).start()
+        packets = collector.run_until(2)
+
+        self.assertEqual(packets, [make_stream(1), b"\xa0\x01\x02\x55"])
+        self.assertEqual(collector.worker.stats["reconnects"], 1)
+
+
+class TestFileReplayTransport(unittest.TestCase):
+
+    def test_capture_replay_keeps_order(self):
+        """Test that a capture file is replayed packet by packet"""
+        records = [
+            (1000.0 + i * 0.0001, 0xA0, make_stream(i + 1)[-4:]) for i in range(2000)
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "replay.mrcap")
+            with open(path, "wb") as f:
+                f.write(MAGIC + encode_records(records))
+
+            transport = create_transport(f"file://{path}?speed=0")
+            self.assertIsInstance(transport, FileReplayTransport)
+            packets = CollectingWorker(transport).run_until(len(records))
+
+        self.assertEqual(packets, [r[2] for r in records])
+        self.assertTrue(transport.finished.is_set())
+
+    def test_raw_replay_is_paced(self):
+        """Test that a raw byte file is paced by the configured rate"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "stream.bin")
+            with open(path, "wb") as f:
+                f.write(make_stream(100))
+            transport = FileReplayTransport(path, rate=2000.0, chunk_size=100)
+            started = time.monotonic()
+            packets = CollectingWorker(transport).run_until(100)
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(len(packets), 100)
+        self.assertGreater(elapsed, 0.15)  # 400 bytes at 2000 B/s
+
+
+class TestSocketTransport(unittest.TestCase):
+
+    def test_tcp_gateway(self):
+        """Test reading from a TCP gateway and detecting its disconnect"""
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("127.0.0.1", 0))
+        server.listen(1)
+        port = server.getsockname()[1]
+
+        def serve():
+            conn, _ = server.accept()
+            conn.sendall(make_stream(500))
+            conn.close()
+
+        threading.Thread(target=serve).start()
+        transport = create_transport(f"tcp://127.0.0.1:{port}")
+        self.assertIsInstance(transport, SocketTransport)
+        transport.open()
+        data = b""
+        with self.assertRaises(TransportError):
+            while True:
+                data += transport.read(4096)
+        transport.close()
+        server.close()
+        self.assertEqual(data, make_stream(500))
+
+
+class TestFdTransport(unittest.TestCase):
+
+    def test_pty(self):
+        """Test reading framed packets from a pseudo terminal"""
+        master, slave = pty.openpty()
+        path = os.ttyname(slave)
+        transport = create_transport(f"fd://{path}")
+        self.assertIsInstance(transport, FdTransport)
+
+        threading.Timer(0.1, lambda: os.write(master, make_stream(50))).start()
+        packets = CollectingWorker(transport).run_until(50)
+        os.close(master)
+        os.close(slave)
+        self.assertEqual(b"".join(packets), make_stream(50))
+
+    def test_default_is_pyserial(self):
+        """Test that plain port names use pyserial"""
+        self.assertIsInstance(create_transport("/dev/ttyUSB0"), PySerialTransport)
+        self.assertIsInstance(create_transport("COM3"), PySerialTransport)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Tests for triggered pre/post-trigger capture
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import struct
+import tempfile
+import unittest
+import numpy as np
+from PySide6.QtWidgets import QApplication
+from utils.capture.recorder import read_capture
+from utils.daemon.acquisition_daemon import AcquisitionDaemon
+from utils.daemon.config import parse_config
+from utils.capture.trigger import (
+    ARMED,
+    IDLE,
+    LevelTrigger,
+    SlopeTrigger,
+    SnapshotWriter,
+    TriggeredCapture,
+)
+
+
+def make_batch(values, start_index=0, dt=0.001):
+    """Build timestamps, packets and fields for a list of sample values"""
+    values = np.asarray(values, dtype=float)
+    indices = np.arange(start_index, start_index + len(values))
+    timestamps = indices * dt
+    packets = [bytes([0xA0, i % 256]) for i in indices]
+    return timestamps, packets, {"arc": values}
+
+
+class TestTriggers(unittest.TestCase):
+
+    def test_level_trigger_across_batches(self):
+        """Test that a crossing at a batch boundary is detected"""
+        trigger = LevelTrigger("arc", 1.0)
+        first = trigger.evaluate(np.arange(3.0), {"arc": np.array([0.0, 0.5, 0.9])})
+        second = trigger.evaluate(np.arange(3.0, 5.0), {"arc": np.array([1.5, 2.0])})
+
+        self.assertFalse(first.any())
+        np.testing.assert_array_equal(second, [True, False])
+
+    def test_slope_trigger(self):
+        """Test that only steep changes fire the slope trigger"""
+        trigger = SlopeTrigger("arc", slope=100.0)
+        timestamps = np.array([0.0, 0.001, 0.002, 0.003])
+        hits = trigger.evaluate(timestamps, {"arc": np.array([0.0, 0.01, 0.5, 0.51])})
+
+        np.testing.assert_array_equal(hits, [False, False, True, False])
+
+    def test_slope_trigger_with_bunched_arrivals(self):
+        """Test that packets read in one chunk do not fake a steep slope"""
+        timestamps = np.array([0.0, 0.010, 0.010001, 0.010002, 0.020])
+        fields = {"arc": np.array([0.0, 0.05, 0.1, 0.15, 0.2])}
+
+        hits = SlopeTrigger("arc", 100.0, min_interval=1e-3).evaluate(
+            timestamps, fields
+        )
+        self.assertFalse(hits.any())
+        nominal = SlopeTrigger("arc", slope=6.0, sample_period=0.01)
+        np.testing.assert_array_equal(
+            nominal.evaluate(timestamps, fields), [False, False, False, False, False]
+        )
+
+    def test_slope_trigger_at_timebase_spacing(self):
+        """Test that 10 kHz device timestamps are not floored to 1 ms"""
+        timestamps = np.arange(10) * 1e-4
+        fields = {"arc": np.arange(10) * 0.05}  # 500/s
+        hits = SlopeTrigger("arc", slope=200.0).evaluate(timestamps, fields)
+        np.testing.assert_array_equal(hits, [False] + [True] * 9)
+
+
+class TestTriggeredCapture(unittest.TestCase):
+
+    def setUp(self):
+        """Create a capture writing into a temporary directory"""
+        self.directory = tempfile.mkdtemp()
+        self.writer = SnapshotWriter(self.directory)
+        self.writer.start()
+
+    def tearDown(self):
+        """Stop the writer thread"""
+        self.writer.stop()
+
+    def test_snapshot_contains_pre_and_post_window(self):
+        """Test the snapshot layout around a level trigger"""
+        capture = TriggeredCapture(
+            "arc",
+            0xA0,
+            self.writer,
+            triggers=[LevelTrigger("arc", 1.0)],
+            pre_packets=5,
+            post_packets=3,
+            hold_off=0.0,
+        )
+        values = [0.0] * 20 + [2.0] + [0.0] * 9
+
+        # Feed in uneven batches so the post window spans batch boundaries
+        capture.feed(*make_batch(values[:21]))
+        capture.feed(*make_batch(values[21:22], 21))
+        capture.feed(*make_batch(values[22:], 22))
+        self.writer.stop()
+
+        self.assertEqual(capture.stats["snapshots"], 1)
+        records = list(read_capture(self.writer.last_path))
+        self.assertEqual([packet[1] for _, _, packet in records], list(range(15, 23)))
+        with open(self.writer.last_path.replace(".mrcap", ".json")) as f:
+            metadata = json.load(f)
+        self.assertEqual(metadata["pre_trigger_records"], 5)
+        self.assertAlmostEqual(metadata["trigger_time"], 0.020)
+
+    def test_hold_off_and_rearm(self):
+        """Test that triggers during hold-off are suppressed"""
+        capture = TriggeredCapture(
+            "arc",
+            0xA0,
+            self.writer,
+            triggers=[LevelTrigger("arc", 1.0)],
+            pre_packets=2,
+            post_packets=2,
+            hold_off=0.010,
+        )
+        values = np.zeros(40)
+        values[[5, 10, 30]] = 2.0  # Second spike is inside the hold-off
+
+        capture.feed(*make_batch(values))
+
+        self.assertEqual(capture.stats["triggers"], 2)
+        self.assertEqual(capture.stats["suppressed"], 1)
+
+    def test_external_fire_single_shot(self):
+        """Test detector-style firing without automatic re-arm"""
+        capture = TriggeredCapture(
+            "arc",
+            0xA0,
+            self.writer,
+            pre_packets=4,
+            post_packets=2,
+            auto_rearm=False,
+            hold_off=0.0,
+        )
+        capture.feed(*make_batch(np.zeros(10)))
+        capture.fire(0.009, "detector arc")
+        capture.feed(*make_batch(np.zeros(10), 10))
+
+        self.assertEqual(capture.stats["snapshots"], 1)
+        self.assertEqual(capture.state, IDLE)
+        capture.rearm()
+        self.assertEqual(capture.state, ARMED)
+
+    def test_external_fire_after_hold_off(self):
+        """Test that a fire is only suppressed when it falls in the hold-off"""
+        capture = TriggeredCapture(
+            "arc",
+            0xA0,
+            self.writer,
+            triggers=[LevelTrigger("arc", 1.0)],
+            pre_packets=2,
+            post_packets=2,
+            hold_off=0.010,
+        )
+        values = np.zeros(10)
+        values[2] = 2.0
+        capture.feed(*make_batch(values))  # Hold-off lasts until 0.014
+
+        capture.fire(0.012, "inside hold-off")
+        capture.feed(*make_batch(np.zeros(10), 10))
+        self.assertEqual(capture.stats["suppressed"], 1)
+
+        capture.fire(0.030, "after hold-off")
+        capture.feed(*make_batch(np.zeros(10), 20))
+        self.assertEqual(capture.stats["triggers"], 2)
+        self.assertEqual(capture.stats["suppressed"], 1)
+
+
+class TestDaemonSlopeTrigger(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def config(self, directory, sample_counter):
+        packet = {
+            "header": "0xA0",
+            "size": 5,
+            "fields": [{"name": "arc", "offset": 3, "dtype": "<u2"}],
+        }
+        if sample_counter:
+            packet["sample_counter"] = {
+                "offset": 1,
+                "dtype": "<u2",
+                "sample_rate": 10000,
+            }
+        return parse_config(
+            {
+                "devices": [
+                    {
+                        "name": "diverter",
+                        "port": "/dev/null",
+                        "packets": [packet],
+                        "captures": [
+                            {
+                                "name": "ramp",
+                                "header": "0xA0",
+                                "pre_packets": 10,
+                                "post_packets": 10,
+                                "triggers": [
+                                    {"type": "slope", "field": "arc", "slope": 5000}
+                                ],
+                            }
+                        ],
+                    }
+                ],
+                "snapshot_directory": directory,
+            }
+        )
+
+    def test_timebase_stream_fires_at_10_khz(self):
+        """Test a slope trigger on a 10 kHz device timebase"""
+        with tempfile.TemporaryDirectory() as directory:
+            daemon = AcquisitionDaemon(self.config(directory, sample_counter=True))
+            (capture,) = daemon.captures[("diverter", 0xA0)]
+            self.assertEqual(capture.triggers[0].min_interval, 0.0)
+
+            # One count per sample is 10000/s; all packets arrive in one chunk
+            queue = daemon.pending[("diverter", 0xA0)]
+            for i in range(100):
+                queue.append((100.0, struct.pack("<BHH", 0xA0, i, i)))
+            daemon.process_pending()
+            self.assertEqual(capture.stats["triggers"], 1)
+
+            arrival = AcquisitionDaemon(self.config(directory, sample_counter=False))
+            (capture,) = arrival.captures[("diverter", 0xA0)]
+            self.assertEqual(capture.triggers[0].min_interval, 1e-3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,329 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from utils.capture.block_store import BLOCK_MAGIC, BlockCaptureReader
+from utils.capture.recorder import MAGIC, read_capture
+from utils.daemon.config import DeviceConfig
+from utils.detection.detectors import ThresholdDetector
+from utils.dsp.filters import FilterStage, filter_from_dict
+from utils.serial.decoding import PacketDecoder
+from utils.serial.framing import frame_buffer
+
+# How a file is read
+KIND_BLOCKS = "blocks"  # Indexed block capture, split by time
+KIND_CAPTURE = "capture"  # Plain record capture, read whole
+KIND_RAW = "raw"  # Raw serial byte dump, framed here, split by byte offset
+
+# Packets decoded and fed to the detectors at once
+DECODE_BATCH = 65536
+# Bytes of a raw dump read per framing pass
+RAW_READ_SIZE = 1 << 20
+
+
+@dataclass
+class WorkUnit:
+    """A piece of one file analysed by one worker
+
+    The unit owns ``[start, end)`` (seconds for captures, byte offsets for
+    raw dumps; None is unbounded) and reads ``[read_start, read_end)``,
+    which extends into its neighbours so detectors are warmed up before the
+    owned range and events starting near its end can finish.
+    """
+
+    path: str
+    kind: str
+    start: Optional[float] = None
+    end: Optional[float] = None
+    read_start: Optional[float] = None
+    read_end: Optional[float] = None
+
+
+@dataclass
+class UnitResult:
+    """Packets, desync bytes and events of one work unit"""
+
+    path: str
+    start: Optional[float]
+    packets: Dict[int, int] = field(default_factory=dict)
+    desync_bytes: int = 0
+    events: List[Dict] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+@dataclass
+class BatchReport:
+    """Merged result of a batch analysis"""
+
+    files: Dict[str, Dict] = field(default_factory=dict)
+    packets: Dict[int, int] = field(default_factory=dict)
+    desync_bytes: int = 0
+    events: List[Dict] = field(default_factory=list)
+    events_by_detector: Dict[str, int] = field(default_factory=dict)
+    units: int = 0
+    workers: int = 1
+    elapsed: float = 0.0
+    cpu_seconds: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "files": self.files,
+            "packets": {f"0x{h:02X}": n for h, n in sorted(self.packets.items())},
+            "desync_bytes": self.desync_bytes,
+            "events": len(self.events),
+            "events_by_detector": self.events_by_detector,
+            "units": self.units,
+            "workers": self.workers,
+            "elapsed_seconds": self.elapsed,
+            "cpu_seconds": self.cpu_seconds,
+        }
+
+
+def file_kind(path: str) -> str:
+    """Tell block captures, record captures and raw byte dumps apart"""
+    with open(path, "rb") as f:
+        magic = f.read(len(BLOCK_MAGIC))
+    if magic == BLOCK_MAGIC:
+        return KIND_BLOCKS
+    if magic[: len(MAGIC)] == MAGIC:
+        return KIND_CAPTURE
+    return KIND_RAW
+
+
+def plan_units(
+    paths: Iterable[str],
+    chunk_seconds: float = 600.0,
+    overlap: float = 5.0,
+    raw_rate: float = 10472.0,
+) -> List[WorkUnit]:
+    """Split files into work units of about ``chunk_seconds`` each
+
+    Block captures are split by time using their index and raw dumps by
+    byte offset, assuming ``raw_rate`` bytes per second. Record captures
+    have no index and are analysed whole. ``overlap`` seconds are read on
+    both sides of each chunk and must exceed the longest event plus
+    detector hold-off for results to match a single pass.
+    """
+    units = []
+    for path in paths:
+        kind = file_kind(path)
+        if kind == KIND_BLOCKS:
+            with BlockCaptureReader(path) as reader:
+                first, last = reader.time_range()
+            if first is None:
+                continue
+            bounds = [float(b) for b in np.arange(first, last, chunk_seconds)[1:]]
+            edges = [None] + bounds + [None]
+        elif kind == KIND_RAW:
+            size = os.path.getsize(path)
+            step = max(1, int(chunk_seconds * raw_rate))
+            edges = [None] + list(range(step, size, step)) + [None]
+            overlap_units = overlap * raw_rate
+        else:
+            units.append(WorkUnit(path, kind))
+            continue
+
+        margin = overlap if kind == KIND_BLOCKS else overlap_units
+        for start, end in zip(edges[:-1], edges[1:]):
+            units.append(
+                WorkUnit(
+                    path,
+                    kind,
+                    start=start,
+                    end=end,
+                    read_start=None if start is None else max(0, start - margin),
+                    read_end=None if end is None else end + margin,
+                )
+            )
+    return units
+
+
+def _raw_records(
+    unit: WorkUnit, configs: Dict, raw_rate: float, result: UnitResult
+) -> Iterator[Tuple[float, int, bytes]]:
+    """Frame a byte range of a raw dump with the live framer"""
+    offset = int(unit.read_start or 0)
+    stop = None if unit.read_end is None else int(unit.read_end)
+    buffer = bytearray()
+    with open(unit.path, "rb") as f:
+        f.seek(offset)
+        while stop is None or offset < stop:
+            size = RAW_READ_SIZE if stop is None else min(RAW_READ_SIZE, stop - offset)
+            data = f.read(size)
+            if not data:
+                break
+            base = offset - len(buffer)
+            buffer.extend(data)
+            offset += len(data)
+            packets, desync = frame_buffer(buffer, configs)
+            result.desync_bytes += sum(
+                1 for position, _ in desync if _owned(unit, base + position)
+            )
+            for position, packet, _ in packets:
+                yield (base + position) / raw_rate, packet[0], packet
+
+
+def _owned(unit: WorkUnit, position: float) -> bool:
+    """Whether a time or byte offset lies in the range owned by a unit"""
+    if unit.start is not None and position < unit.start:
+        return False
+    return unit.end is None or position < unit.end
+
+
+def analyze_unit(
+    unit: WorkUnit, device: DeviceConfig, raw_rate: float = 10472.0
+) -> UnitResult:
+    """Frame, decode and run the device's detectors over one work unit"""
+    started = time.process_time()
+    result = UnitResult(unit.path, unit.start)
+    packets_by_header = {spec.header: spec for spec in device.packets}
+    decoders = {
+        spec.header: PacketDecoder(spec.size, spec.fields)
+        for spec in device.packets
+        if spec.fields
+    }
+    stages: Dict[int, FilterStage] = {}
+    for spec in device.packets:
+        if spec.filters:
+            stage = stages[spec.header] = FilterStage(f"0x{spec.header:02X}")
+            for channel in spec.filters:
+                stage.add_channel(
+                    channel.field,
+                    [filter_from_dict(s) for s in channel.stages],
+                    channel.output,
+                )
+    detectors: Dict[int, List[ThresholdDetector]] = {}
+    kinds = {}
+    for spec in device.detectors:
+        detectors.setdefault(spec.header, []).append(
+            ThresholdDetector(
+                spec.name, spec.header, spec.field, spec.threshold, spec.hold_off
+            )
+        )
+        kinds[spec.name] = spec.kind or spec.name
+
+    reader = None
+    if unit.kind == KIND_RAW:
+        records = _raw_records(unit, packets_by_header, raw_rate, result)
+        owned_start = None if unit.start is None else unit.start / raw_rate
+        owned_end = None if unit.end is None else unit.end / raw_rate
+    else:
+        if unit.kind == KIND_BLOCKS:
+            reader = BlockCaptureReader(unit.path)
+            records = reader.read(unit.read_start, unit.read_end)
+        else:
+            records = read_capture(unit.path)
+        owned_start, owned_end = unit.start, unit.end
+    owned = WorkUnit(unit.path, unit.kind, owned_start, owned_end)
+
+    pending: Dict[int, Tuple[List[float], List[bytes]]] = {}
+
+    def flush(header: int):
+        timestamps, packets = pending.pop(header)
+        times = np.asarray(timestamps, dtype=np.float64)
+        # Block captures need not be in time order; detectors and the
+        # owned-range count below both want sorted times
+        if np.any(np.diff(times) < 0):
+            order = np.argsort(times, kind="stable")
+            times = times[order]
+            packets = [packets[i] for i in order]
+        low = 0 if owned.start is None else np.searchsorted(times, owned.start)
+        high = len(times) if owned.end is None else np.searchsorted(times, owned.end)
+        result.packets[header] = result.packets.get(header, 0) + int(high - low)
+        if header not in decoders or header not in detectors:
+            return
+        fields = decoders[header].decode(packets)
+        stage = stages.get(header)
+        filtered = stage.process(times, fields) if stage else {}
+        for detector in detectors[header]:
+            channel = filtered.get(detector.field_name)
+            if channel is None:
+                found = detector.process(times, fields)
+            else:
+                found = detector.process(channel[0], {detector.field_name: channel[1]})
+            for event in found:
+                if _owned(owned, event.timestamp):
+                    result.events.append(
+                        {
+                            "file": unit.path,
+                            "detector": event.detector,
+                            "kind": kinds[event.detector],
+                            "timestamp": event.timestamp,
+                            "value": event.value,
+                            "peak": event.peak,
+                            "energy": event.energy,
+                            "duration": event.duration,
+                        }
+                    )
+
+    try:
+        for timestamp, header, packet in records:
+            if header not in packets_by_header:
+                continue
+            batch = pending.setdefault(header, ([], []))
+            batch[0].append(timestamp)
+            batch[1].append(packet)
+            if len(batch[1]) >= DECODE_BATCH:
+                flush(header)
+        for header in list(pending):
+            flush(header)
+    finally:
+        if reader is not None:
+            reader.close()
+
+    result.events.sort(key=lambda e: e["timestamp"])
+    result.seconds = time.process_time() - started
+    return result
+
+
+def run_batch(
+    paths: Iterable[str],
+    device: DeviceConfig,
+    workers: Optional[int] = None,
+    chunk_seconds: float = 600.0,
+    overlap: float = 5.0,
+    raw_rate: float = 10472.0,
+    progress: Optional[Callable[[int, int, UnitResult], None]] = None,
+) -> BatchReport:
+    """Analyse capture files on a process pool and merge the results"""
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    units = plan_units(paths, chunk_seconds, overlap, raw_rate)
+    report = BatchReport(units=len(units), workers=workers)
+
+    results = []
+    if workers == 1:
+        for unit in units:
+            results.append(analyze_unit(unit, device, raw_rate))
+            if progress:
+                progress(len(results), len(units), results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(analyze_unit, unit, device, raw_rate) for unit in units
+            ]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if progress:
+                    progress(len(results), len(units), results[-1])
+
+    for result in results:
+        summary = report.files.setdefault(
+            result.path, {"packets": 0, "desync_bytes": 0, "events": 0}
+        )
+        for header, count in result.packets.items():
+            report.packets[header] = report.packets.get(header, 0) + count
+            summary["packets"] += count
+        report.desync_bytes += result.desync_bytes
+        summary["desync_bytes"] += result.desync_bytes
+        summary["events"] += len(result.events)
+        report.events.extend(result.events)
+        report.cpu_seconds += result.seconds
+    report.events.sort(key=lambda e: (e["file"], e["timestamp"]))
+    for event in report.events:
+        name = event["detector"]
+        report.events_by_detector[name] = report.events_by_detector.get(name, 0) + 1
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -0,0 +1,350 @@
+import lzma
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+# File layout:
+#   BLOCK_MAGIC
+#   block*:  BLOCK_HEADER + compressed block payload
+#   index:   INDEX_ENTRY * block count
+#   footer:  FOOTER (index offset, block count, INDEX_MAGIC)
+# A file without footer (e.g. after a crash) is recovered by scanning the
+# block headers sequentially.
+BLOCK_MAGIC = b"MRBLK1\n"
+INDEX_MAGIC = b"MRIDX1\n\0"
+# codec, record count, raw payload length, compressed length, earliest/latest
+# time (records may be slightly out of order: several threads record)
+BLOCK_HEADER = struct.Struct("<BIIIdd")
+# block offset, record count, raw length, compressed length, earliest/latest time
+INDEX_ENTRY = struct.Struct("<QIIIdd")
+FOOTER = struct.Struct("<QI8s")
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+CODECS = {"none": CODEC_NONE, "zlib": CODEC_ZLIB, "lzma": CODEC_LZMA}
+
+# Raw size of a record in the uncompressed capture layout (RECORD_HEADER)
+_RAW_RECORD_OVERHEAD = 11
+
+
+@dataclass
+class BlockInfo:
+    """Index entry of one compressed block"""
+
+    offset: int
+    count: int
+    raw_length: int
+    compressed_length: int
+    first_time: float  # Earliest timestamp in the block
+    last_time: float  # Latest timestamp in the block
+
+
+def _compress(codec: int, level: int, data: bytes) -> bytes:
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, level)
+    if codec == CODEC_LZMA:
+        return lzma.compress(data, preset=level)
+    return data
+
+
+def _decompress(codec: int, data: bytes) -> bytes:
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    if codec == CODEC_LZMA:
+        return lzma.decompress(data)
+    return data
+
+
+def encode_block(records: Sequence[Tuple[float, int, bytes]]) -> bytes:
+    """Encode records column-wise with delta coding before compression
+
+    Timestamps become delta-coded integer microseconds. Packets are grouped
+    by header; fixed-size groups are stored as a byte matrix whose rows are
+    delta coded against the previous packet (mod 256) and written column by
+    column, so slowly changing sample bytes turn into long runs of zeros.
+    """
+    count = len(records)
+    stamps = np.fromiter((r[0] for r in records), dtype=np.float64, count=count)
+    micros = np.round(stamps * 1e6).astype(np.int64)
+    deltas = np.diff(micros, prepend=np.int64(0))
+    headers = np.fromiter((r[1] for r in records), dtype=np.uint8, count=count)
+    lengths = np.fromiter((len(r[2]) for r in records), dtype=np.uint16, count=count)
+
+    parts = [
+        struct.pack("<I", count),
+        deltas.tobytes(),
+        headers.tobytes(),
+        lengths.tobytes(),
+    ]
+    for header in np.unique(headers):
+        selected = np.flatnonzero(headers == header)
+        group_lengths = lengths[selected]
+        size = int(group_lengths[0])
+        packets = b"".join(records[i][2] for i in selected)
+        if np.all(group_lengths == size) and size > 0:
+            matrix = np.frombuffer(packets, dtype=np.uint8).reshape(-1, size)
+            delta = np.diff(matrix, axis=0, prepend=np.zeros((1, size), np.uint8))
+            parts.append(struct.pack("<BB", int(header), 1))
+            parts.append(np.ascontiguousarray(delta.T).tobytes())
+        else:
+            parts.append(struct.pack("<BB", int(header), 0))
+            parts.append(packets)
+    return b"".join(parts)
+
+
+def decode_block(data: bytes) -> List[Tuple[float, int, bytes]]:
+    """Decode a block produced by encode_block"""
+    (count,) = struct.unpack_from("<I", data, 0)
+    offset = 4
+    deltas = np.frombuffer(data, dtype=np.int64, count=count, offset=offset)
+    offset += 8 * count
+    headers = np.frombuffer(data, dtype=np.uint8, count=count, offset=offset)
+    offset += count
+    lengths = np.frombuffer(data, dtype=np.uint16, count=count, offset=offset)
+    offset += 2 * count
+    stamps = np.cumsum(deltas) / 1e6
+
+    group_packets = {}
+    while offset < len(data):
+        header, delta_coded = struct.unpack_from("<BB", data, offset)
+        offset += 2
+        selected = np.flatnonzero(headers == header)
+        total = int(lengths[selected].sum())
+        raw = data[offset : offset + total]
+        offset += total
+        if delta_coded:
+            size = int(lengths[selected[0]])
+            delta = np.frombuffer(raw, dtype=np.uint8).reshape(size, -1).T
+            matrix = np.cumsum(delta, axis=0, dtype=np.uint8)
+            packets = [row.tobytes() for row in matrix]
+        else:
+            packets = []
+            position = 0
+            for length in lengths[selected]:
+                packets.append(raw[position : position + int(length)])
+                position += int(length)
+        group_packets[header] = iter(packets)
+
+    return [
+        (float(stamps[i]), int(headers[i]), next(group_packets[headers[i]]))
+        for i in range(count)
+    ]
+
+
+class BlockCaptureWriter:
+    """Write packets into independently compressed, indexed blocks"""
+
+    def __init__(
+        self,
+        path: str,
+        codec: str = "zlib",
+        level: int = 6,
+        block_records: int = 8192,
+        block_seconds: float = 5.0,
+    ):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}', expected one of {list(CODECS)}")
+        self.path = path
+        self.codec = CODECS[codec]
+        self.level = level
+        self.block_records = block_records
+        self.block_seconds = block_seconds
+        self.index: List[BlockInfo] = []
+        self.stats = {
+            "records": 0,
+            "raw_bytes": 0,
+            "compressed_bytes": 0,
+            "compress_seconds": 0.0,
+        }
+
+        self._records: List[Tuple[float, int, bytes]] = []
+        self._file = open(path, "wb")
+        self._file.write(BLOCK_MAGIC)
+
+    def write(self, timestamp: float, header: int, packet: bytes):
+        """Add one record, flushing a block when it is full"""
+        self._records.append((timestamp, header, packet))
+        if (
+            len(self._records) >= self.block_records
+            or timestamp - self._records[0][0] >= self.block_seconds
+        ):
+            self.flush_block()
+
+    def write_many(self, records: Iterable[Tuple[float, int, bytes]]):
+        """Add several records"""
+        for timestamp, header, packet in records:
+            self.write(timestamp, header, packet)
+
+    def flush_block(self):
+        """Compress and write the pending records as one block"""
+        if not self._records:
+            return
+        records, self._records = self._records, []
+        started = time.perf_counter()
+        raw = encode_block(records)
+        compressed = _compress(self.codec, self.level, raw)
+        self.stats["compress_seconds"] += time.perf_counter() - started
+
+        info = BlockInfo(
+            offset=self._file.tell(),
+            count=len(records),
+            raw_length=len(raw),
+            compressed_length=len(compressed),
+            first_time=min(r[0] for r in records),
+            last_time=max(r[0] for r in records),
+        )
+        self._file.write(
+            BLOCK_HEADER.pack(
+                self.codec,
+                info.count,
+                info.raw_length,
+                info.compressed_length,
+                info.first_time,
+                info.last_time,
+            )
+        )
+        self._file.write(compressed)
+        self.index.append(info)
+
+        self.stats["records"] += len(records)
+        self.stats["raw_bytes"] += sum(
+            _RAW_RECORD_OVERHEAD + len(p) for _, _, p in records
+        )
+        self.stats["compressed_bytes"] += BLOCK_HEADER.size + len(compressed)
+
+    def close(self):
+        """Flush the last block and write the index and footer"""
+        if self._file is None:
+            return
+        self.flush_block()
+        index_offset = self._file.tell()
+        for info in self.index:
+            self._file.write(
+                INDEX_ENTRY.pack(
+                    info.offset,
+                    info.count,
+                    info.raw_length,
+                    info.compressed_length,
+                    info.first_time,
+                    info.last_time,
+                )
+            )
+        self._file.write(FOOTER.pack(index_offset, len(self.index), INDEX_MAGIC))
+        self._file.close()
+        self._file = None
+
+    @property
+    def compression_ratio(self) -> float:
+        """Raw capture size divided by compressed size"""
+        if not self.stats["compressed_bytes"]:
+            return 0.0
+        return self.stats["raw_bytes"] / self.stats["compressed_bytes"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BlockCaptureReader:
+    """Random-access reader decompressing only the blocks a query touches"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.stats = {"blocks_read": 0, "decompress_seconds": 0.0}
+        self._file = open(path, "rb")
+        if self._file.read(len(BLOCK_MAGIC)) != BLOCK_MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a block capture file")
+        self.index = self._load_index()
+
+    def _load_index(self) -> List[BlockInfo]:
+        """Read the index from the footer, or rebuild it by scanning blocks"""
+        size = os.fstat(self._file.fileno()).st_size
+        if size >= len(BLOCK_MAGIC) + FOOTER.size:
+            self._file.seek(size - FOOTER.size)
+            index_offset, count, magic = FOOTER.unpack(self._file.read(FOOTER.size))
+            if magic == INDEX_MAGIC:
+                self._file.seek(index_offset)
+                raw = self._file.read(count * INDEX_ENTRY.size)
+                return [
+                    BlockInfo(*INDEX_ENTRY.unpack_from(raw, i * INDEX_ENTRY.size))
+                    for i in range(count)
+                ]
+        return self._scan_blocks(size)
+
+    def _scan_blocks(self, size: int) -> List[BlockInfo]:
+        """Rebuild the index of an unterminated file"""
+        index = []
+        offset = len(BLOCK_MAGIC)
+        while offset + BLOCK_HEADER.size <= size:
+            self._file.seek(offset)
+            _, count, raw_length, length, first, last = BLOCK_HEADER.unpack(
+                self._file.read(BLOCK_HEADER.size)
+            )
+            if offset + BLOCK_HEADER.size + length > size:
+                break  # Truncated last block
+            index.append(BlockInfo(offset, count, raw_length, length, first, last))
+            offset += BLOCK_HEADER.size + length
+        return index
+
+    def time_range(self) -> Tuple[Optional[float], Optional[float]]:
+        """Earliest and latest timestamp in the file"""
+        if not self.index:
+            return None, None
+        return (
+            min(info.first_time for info in self.index),
+            max(info.last_time for info in self.index),
+        )
+
+    def read_block(self, info: BlockInfo) -> List[Tuple[float, int, bytes]]:
+        """Decompress and decode one block"""
+        started = time.perf_counter()
+        self._file.seek(info.offset)
+        codec = BLOCK_HEADER.unpack(self._file.read(BLOCK_HEADER.size))[0]
+        raw = _decompress(codec, self._file.read(info.compressed_length))
+        records = decode_block(raw)
+        self.stats["blocks_read"] += 1
+        self.stats["decompress_seconds"] += time.perf_counter() - started
+        return records
+
+    def read(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        headers: Optional[Iterable[int]] = None,
+    ) -> Iterator[Tuple[float, int, bytes]]:
+        """Iterate over records in [start, end], optionally for some headers
+
+        Records come in file order; timestamps need not be increasing, so
+        every block whose time span overlaps the range is read.
+        """
+        wanted = set(headers) if headers is not None else None
+        for info in self.index:
+            if start is not None and info.last_time < start:
+                continue
+            if end is not None and info.first_time > end:
+                continue
+            for record in self.read_block(info):
+                timestamp, header, _ = record
+                if start is not None and timestamp < start:
+                    continue
+                if end is not None and timestamp > end:
+                    continue
+                if wanted is None or header in wanted:
+                    yield record
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,195 @@
+import os
+import struct
+import threading
+import time
+from queue import Queue, Full, Empty
+from typing import Iterator, Optional, Tuple
+from utils.capture.block_store import (
+    BLOCK_MAGIC,
+    BlockCaptureReader,
+    BlockCaptureWriter,
+)
+
+# File layout: MAGIC followed by records of RECORD_HEADER + payload
+MAGIC = b"MRCAP1\n"
+# timestamp (float64 seconds), packet header byte, payload length
+RECORD_HEADER = struct.Struct("<dBH")
+
+
+class CaptureRecorder:
+    """Record framed packets to disk from a background writer thread
+
+    Producers call ``write`` from any thread; records are handed to the
+    writer thread through a bounded queue so disk I/O never blocks the
+    acquisition path. Records that do not fit in the queue are counted as
+    dropped. A new file is started every ``rotate_seconds``.
+
+    With ``file_format="block"`` records are written as independently
+    compressed, indexed blocks (see ``block_store``) using ``codec`` at
+    ``level``; ``"raw"`` writes the plain record layout.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "capture",
+        rotate_seconds: float = 3600.0,
+        max_queue: int = 100000,
+        file_format: str = "raw",
+        codec: str = "zlib",
+        level: int = 6,
+    ):
+        if file_format not in ("raw", "block"):
+            raise ValueError(f"Unknown capture format '{file_format}'")
+        self.directory = directory
+        self.prefix = prefix
+        self.rotate_seconds = rotate_seconds
+        self.file_format = file_format
+        self.codec = codec
+        self.level = level
+        self.queue: Queue = Queue(maxsize=max_queue)
+        self.stats = {"records": 0, "bytes": 0, "dropped": 0, "files": 0}
+        self.current_path: Optional[str] = None
+
+        self._file = None
+        self._block_writer = None
+        self._file_opened = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self):
+        """Start the writer thread"""
+        if self._running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._writer_loop, name=f"recorder-{self.prefix}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Flush pending records and stop the writer thread"""
+        if not self._running:
+            return
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        self._close_file()
+
+    def write(self, header: int, packet: bytes, timestamp: Optional[float] = None):
+        """Queue a packet for recording (thread-safe, never blocks)"""
+        if timestamp is None:
+            timestamp = time.time()
+        try:
+            self.queue.put_nowait((timestamp, header, packet))
+        except Full:
+            self.stats["dropped"] += 1
+
+    def _writer_loop(self):
+        """Drain the queue to disk until stopped and the queue is empty"""
+        while self._running or not self.queue.empty():
+            try:
+                record = self.queue.get(timeout=0.2)
+            except Empty:
+                continue
+            batch = [record]
+            # Drain whatever else is pending to write in one go
+            while len(batch) < 4096:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except OSError as e:
+                print(f"[ERROR] Recorder write failed for {self.prefix}: {e}")
+                self.stats["dropped"] += len(batch)
+
+    def _write_batch(self, batch):
+        """Encode and write a batch of records"""
+        self._ensure_file(batch[0][0])
+        if self._block_writer is not None:
+            before = self._block_writer.stats["compressed_bytes"]
+            self._block_writer.write_many(batch)
+            self.stats["records"] += len(batch)
+            self.stats["bytes"] += self._block_writer.stats["compressed_bytes"] - before
+            return
+        data = encode_records(batch)
+        self._file.write(data)
+        self.stats["records"] += len(batch)
+        self.stats["bytes"] += len(data)
+
+    def _ensure_file(self, timestamp: float):
+        """Open the first file or rotate to a new one"""
+        now = time.monotonic()
+        is_open = self._file is not None or self._block_writer is not None
+        if is_open and now - self._file_opened < self.rotate_seconds:
+            return
+        self._close_file()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(timestamp))
+        base = os.path.join(self.directory, f"{self.prefix}-{stamp}")
+        if self.file_format == "block":
+            # Block files are never appended to; pick an unused name
+            suffix = 0
+            self.current_path = f"{base}.mrblk"
+            while os.path.exists(self.current_path):
+                suffix += 1
+                self.current_path = f"{base}-{suffix}.mrblk"
+            self._block_writer = BlockCaptureWriter(
+                self.current_path, codec=self.codec, level=self.level
+            )
+        else:
+            self.current_path = f"{base}.mrcap"
+            self._file = open(self.current_path, "ab")
+            if self._file.tell() == 0:
+                self._file.write(MAGIC)
+        self._file_opened = now
+        self.stats["files"] += 1
+        print(f"[RECORD] Writing {self.current_path}")
+
+    def _close_file(self):
+        """Flush and close the current file"""
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._block_writer is not None:
+            self._block_writer.close()
+            ratio = self._block_writer.compression_ratio
+            print(f"[RECORD] Closed {self.current_path} (ratio {ratio:.1f}:1)")
+            self._block_writer = None
+
+
+def encode_records(records) -> bytes:
+    """Encode (timestamp, header, packet) records in capture file layout"""
+    chunks = []
+    for timestamp, header, packet in records:
+        chunks.append(RECORD_HEADER.pack(timestamp, header, len(packet)))
+        chunks.append(packet)
+    return b"".join(chunks)
+
+
+def read_capture(path: str) -> Iterator[Tuple[float, int, bytes]]:
+    """Iterate over (timestamp, header, packet) records of a capture file
+
+    Both the raw record layout and block-compressed files are accepted.
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic == BLOCK_MAGIC[: len(MAGIC)]:
+            f.close()
+            with BlockCaptureReader(path) as reader:
+                yield from reader.read()
+            return
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a capture file")
+        while True:
+            raw = f.read(RECORD_HEADER.size)
+            if len(raw) < RECORD_HEADER.size:
+                return
+            timestamp, header, length = RECORD_HEADER.unpack(raw)
+            packet = f.read(length)
+            if len(packet) < length:
+                return
+            yield timestamp, header, packet
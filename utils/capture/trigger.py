@@ -0,0 +1,385 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from queue import Queue, Full, Empty
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.capture.recorder import MAGIC, encode_records
+
+# Capture states
+ARMED = "armed"
+COLLECTING = "collecting"
+HOLD_OFF = "hold_off"
+IDLE = "idle"
+
+# Default floor of sample spacing for slope triggers on host arrival times
+ARRIVAL_MIN_INTERVAL = 1e-3
+
+
+@dataclass
+class Snapshot:
+    """Packets around one trigger, ready to be written to disk"""
+
+    name: str
+    reason: str
+    trigger_time: float
+    records: List[Tuple[float, int, bytes]]
+    pre_count: int
+    metadata: Dict = field(default_factory=dict)
+
+
+class LevelTrigger:
+    """Trigger when a decoded field crosses a level"""
+
+    def __init__(self, field_name: str, level: float, direction: str = "rising"):
+        if direction not in ("rising", "falling", "either"):
+            raise ValueError(f"Unknown trigger direction '{direction}'")
+        self.field_name = field_name
+        self.level = level
+        self.direction = direction
+        self._last = None
+
+    @property
+    def reason(self) -> str:
+        return f"level {self.field_name} {self.direction} {self.level}"
+
+    def evaluate(self, timestamps: np.ndarray, fields: Dict[str, np.ndarray]):
+        """Boolean array marking samples where the trigger fires"""
+        values = fields[self.field_name]
+        previous = np.empty_like(values)
+        previous[0] = values[0] if self._last is None else self._last
+        previous[1:] = values[:-1]
+        self._last = values[-1]
+
+        rising = (previous < self.level) & (values >= self.level)
+        falling = (previous > self.level) & (values <= self.level)
+        if self.direction == "rising":
+            return rising
+        if self.direction == "falling":
+            return falling
+        return rising | falling
+
+
+class SlopeTrigger:
+    """Trigger when a decoded field changes faster than ``slope`` per second
+
+    Device timebase times are exact and used as they are. Host arrival
+    times bunch up: packets read in one chunk arrive only microseconds
+    apart, which would turn any step into a huge rate. For those, set
+    ``sample_period`` (every sample counts as that far from the previous
+    one) or ``min_interval`` (the time between samples is taken as at
+    least that long).
+    """
+
+    def __init__(
+        self,
+        field_name: str,
+        slope: float,
+        absolute: bool = True,
+        sample_period: Optional[float] = None,
+        min_interval: float = 0.0,
+    ):
+        self.field_name = field_name
+        self.slope = slope
+        self.absolute = absolute
+        self.sample_period = sample_period
+        self.min_interval = min_interval
+        self._last: Optional[Tuple[float, float]] = None
+
+    @property
+    def reason(self) -> str:
+        return f"slope {self.field_name} > {self.slope}/s"
+
+    def evaluate(self, timestamps: np.ndarray, fields: Dict[str, np.ndarray]):
+        """Boolean array marking samples where the trigger fires"""
+        values = fields[self.field_name]
+        if self._last is None:
+            prev_t, prev_v = timestamps[0], values[0]
+        else:
+            prev_t, prev_v = self._last
+        self._last = (timestamps[-1], values[-1])
+
+        dv = np.diff(values, prepend=prev_v)
+        if self.sample_period:
+            rate = dv / self.sample_period
+        else:
+            dt = np.diff(timestamps, prepend=prev_t)
+            if self.min_interval > 0:
+                dt = np.maximum(dt, self.min_interval)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rate = np.where(dt > 0, dv / dt, 0.0)
+        if self.absolute:
+            rate = np.abs(rate)
+        return rate > self.slope
+
+
+class SnapshotWriter:
+    """Write snapshots to disk from a background thread"""
+
+    def __init__(self, directory: str, max_pending: int = 16):
+        self.directory = directory
+        self.queue: Queue = Queue(maxsize=max_pending)
+        self.stats = {"written": 0, "dropped": 0, "bytes": 0}
+        self.last_path: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self):
+        """Start the writer thread"""
+        if self._running:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="snapshot-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Write pending snapshots and stop the writer thread"""
+        if not self._running:
+            return
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=10.0)
+            self._thread = None
+
+    def submit(self, snapshot: Snapshot) -> bool:
+        """Queue a snapshot for writing without blocking the caller"""
+        try:
+            self.queue.put_nowait(snapshot)
+            return True
+        except Full:
+            self.stats["dropped"] += 1
+            print(f"[TRIGGER] Snapshot queue full, dropping snapshot {snapshot.name}")
+            return False
+
+    def _writer_loop(self):
+        while self._running or not self.queue.empty():
+            try:
+                snapshot = self.queue.get(timeout=0.2)
+            except Empty:
+                continue
+            try:
+                self._write(snapshot)
+            except OSError as e:
+                self.stats["dropped"] += 1
+                print(f"[ERROR] Snapshot write failed for {snapshot.name}: {e}")
+
+    def _write(self, snapshot: Snapshot):
+        """Write the snapshot records and a JSON sidecar with its metadata"""
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(snapshot.trigger_time))
+        millis = int((snapshot.trigger_time % 1) * 1000)
+        base = os.path.join(self.directory, f"{snapshot.name}-{stamp}.{millis:03d}")
+        data = MAGIC + encode_records(snapshot.records)
+        with open(base + ".mrcap", "wb") as f:
+            f.write(data)
+        metadata = {
+            "name": snapshot.name,
+            "reason": snapshot.reason,
+            "trigger_time": snapshot.trigger_time,
+            "records": len(snapshot.records),
+            "pre_trigger_records": snapshot.pre_count,
+            "first_time": snapshot.records[0][0] if snapshot.records else None,
+            "last_time": snapshot.records[-1][0] if snapshot.records else None,
+        }
+        metadata.update(snapshot.metadata)
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+        self.stats["written"] += 1
+        self.stats["bytes"] += len(data)
+        self.last_path = base + ".mrcap"
+        print(
+            f"[TRIGGER] Saved snapshot {self.last_path} ({len(snapshot.records)} records)"
+        )
+
+
+class TriggeredCapture:
+    """Oscilloscope-style capture around trigger events for one packet stream
+
+    Packets are kept in a rolling pre-trigger buffer of ``pre_packets``
+    entries. When a trigger fires (a level or slope condition evaluated on
+    decoded batches, or an external ``fire`` call for detector events), the
+    pre-trigger buffer plus the next ``post_packets`` packets form a
+    snapshot that is handed to the writer thread. Afterwards further
+    triggers are ignored for ``hold_off`` seconds; the capture then re-arms
+    automatically, or waits for ``rearm`` when ``auto_rearm`` is off.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        header: int,
+        writer: SnapshotWriter,
+        triggers: Sequence = (),
+        pre_packets: int = 1000,
+        post_packets: int = 1000,
+        hold_off: float = 1.0,
+        auto_rearm: bool = True,
+    ):
+        self.name = name
+        self.header = header
+        self.writer = writer
+        self.triggers = list(triggers)
+        self.post_packets = post_packets
+        self.hold_off = hold_off
+        self.auto_rearm = auto_rearm
+
+        self.state = ARMED
+        self.stats = {"triggers": 0, "suppressed": 0, "snapshots": 0}
+
+        self._pre = deque(maxlen=pre_packets)
+        self._post: List[Tuple[float, int, bytes]] = []
+        self._snapshot_pre: List[Tuple[float, int, bytes]] = []
+        self._trigger_time = 0.0
+        self._reason = ""
+        self._hold_off_until = 0.0
+        self._pending_fire: Optional[Tuple[float, str]] = None
+        self._lock = threading.Lock()
+
+    def fire(self, timestamp: Optional[float] = None, reason: str = "external"):
+        """Trigger from outside, e.g. from a detector event (thread-safe)"""
+        with self._lock:
+            if self._pending_fire is None:
+                self._pending_fire = (
+                    time.time() if timestamp is None else timestamp,
+                    reason,
+                )
+
+    def rearm(self):
+        """Re-arm a capture waiting in single-shot mode"""
+        if self.state == IDLE:
+            self.state = ARMED
+
+    def flush(self):
+        """Save a snapshot still collecting its post window, e.g. on shutdown"""
+        if self.state == COLLECTING:
+            self._complete(truncated=True)
+
+    def feed(
+        self,
+        timestamps: np.ndarray,
+        packets: Sequence[bytes],
+        fields: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        """Process a batch of packets with their timestamps and decoded fields"""
+        count = len(packets)
+        if count == 0:
+            return
+
+        # Evaluate every trigger over the whole batch at once
+        fired = np.zeros(count, dtype=bool)
+        reasons = []
+        if fields is not None:
+            for trigger in self.triggers:
+                hits = trigger.evaluate(timestamps, fields)
+                reasons.append((trigger.reason, hits))
+                fired |= hits
+
+        with self._lock:
+            external, self._pending_fire = self._pending_fire, None
+        if external is not None and not (
+            self.state == ARMED
+            or (self.state == HOLD_OFF and external[0] >= self._hold_off_until)
+        ):
+            self.stats["suppressed"] += 1
+            external = None
+
+        index = 0
+        while index < count:
+            if self.state == HOLD_OFF:
+                if timestamps[index] < self._hold_off_until:
+                    # Count suppressed triggers, keep the pre-trigger buffer warm
+                    end = int(
+                        np.searchsorted(timestamps, self._hold_off_until, side="left")
+                    )
+                    end = max(end, index + 1)
+                    self.stats["suppressed"] += int(fired[index:end].sum())
+                    self._buffer(timestamps, packets, index, end)
+                    index = end
+                    continue
+                self.state = ARMED if self.auto_rearm else IDLE
+
+            if self.state == COLLECTING:
+                needed = self.post_packets - len(self._post)
+                end = min(count, index + needed)
+                self._post.extend(
+                    (float(timestamps[i]), self.header, packets[i])
+                    for i in range(index, end)
+                )
+                index = end
+                if len(self._post) >= self.post_packets:
+                    self._complete()
+                continue
+
+            if self.state == IDLE:
+                if external is not None:
+                    # Hold-off ended without re-arming
+                    self.stats["suppressed"] += 1
+                self._buffer(timestamps, packets, index, count)
+                return
+
+            # Armed: an external fire triggers right away
+            if external is not None:
+                trigger_at = index
+                trigger_time, reason = external
+                external = None
+            else:
+                hits = np.flatnonzero(fired[index:])
+                if len(hits) == 0:
+                    self._buffer(timestamps, packets, index, count)
+                    return
+                trigger_at = index + int(hits[0])
+                trigger_time = float(timestamps[trigger_at])
+                reason = next(r for r, h in reasons if h[trigger_at])
+
+            self._buffer(timestamps, packets, index, trigger_at)
+            self._start(trigger_time, reason)
+            index = trigger_at
+
+        if external is not None:
+            # The hold-off outlasts this batch; keep the fire for the next one
+            with self._lock:
+                if self._pending_fire is None:
+                    self._pending_fire = external
+
+    def _buffer(self, timestamps, packets, start: int, end: int):
+        """Append packets to the rolling pre-trigger buffer"""
+        self._pre.extend(
+            (float(timestamps[i]), self.header, packets[i]) for i in range(start, end)
+        )
+
+    def _start(self, trigger_time: float, reason: str):
+        """Freeze the pre-trigger buffer and start collecting the post window"""
+        self.stats["triggers"] += 1
+        self.state = COLLECTING
+        self._trigger_time = trigger_time
+        self._reason = reason
+        self._snapshot_pre = list(self._pre)
+        self._pre.clear()
+        self._post = []
+        if self.post_packets == 0:
+            self._complete()
+
+    def _complete(self, truncated: bool = False):
+        """Hand the snapshot to the writer and enter hold-off"""
+        snapshot = Snapshot(
+            name=self.name,
+            reason=self._reason,
+            trigger_time=self._trigger_time,
+            records=self._snapshot_pre + self._post,
+            pre_count=len(self._snapshot_pre),
+            metadata={"header": self.header, "truncated": truncated},
+        )
+        if self.writer.submit(snapshot):
+            self.stats["snapshots"] += 1
+        # The post window becomes history for the next snapshot
+        self._pre.extend(self._post)
+        self._snapshot_pre = []
+        self._post = []
+        self.state = HOLD_OFF
+        last_time = snapshot.records[-1][0] if snapshot.records else self._trigger_time
+        self._hold_off_until = last_time + self.hold_off
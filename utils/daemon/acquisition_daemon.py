@@ -0,0 +1,693 @@
+from PySide6.QtCore import QObject, QTimer
+from collections import deque
+from functools import partial
+from typing import Dict, List, Tuple
+import json
+import os
+import time
+import numpy as np
+from utils.capture.recorder import CaptureRecorder
+from utils.capture.trigger import (
+    ARRIVAL_MIN_INTERVAL,
+    LevelTrigger,
+    SlopeTrigger,
+    SnapshotWriter,
+    TriggeredCapture,
+)
+from utils.daemon.config import DaemonConfig, DeviceConfig
+from utils.detection.detectors import DetectionEvent, ThresholdDetector
+from utils.dsp.channel_stats import ChannelStatistics, statistics_from_dict
+from utils.dsp.filters import FilterStage, filter_from_dict
+from utils.events.event_store import EventRecord, EventStore, OperationRecord
+from utils.events.signature_index import SignatureIndex
+from utils.metrics.prometheus import AcquisitionMetricsCollector, MetricsServer
+from utils.serial.decoding import PacketDecoder
+from utils.serial.sequence import DeviceTimebase
+from utils.serial.serial_reader import SerialReader
+from utils.stream.merge import StreamMerger
+from utils.stream.publisher import PacketPublisher
+
+
+class AcquisitionDaemon(QObject):
+    """Headless acquisition: serial readers, detectors and recording, no widgets
+
+    Packets are collected per device and header as they arrive and processed
+    in batches on a timer, so decoding and detection run vectorized over many
+    packets at once.
+
+    Filtered channels are computed once per batch by the packet stream's
+    filter stage; detectors and subscribers of a filtered output all read
+    that one stream. Streams with statistics configured keep running
+    per-channel statistics of their decoded and filtered channels.
+
+    With a merge configured, the raw packets of the listed streams are also
+    merged across devices into one stream ordered by host-clock time (device
+    timebases corrected for clock offset and drift) and handed to
+    ``merged_callbacks``.
+
+    With an event store configured, tap changes (from the device's tap
+    position field) are stored as operations and every detection event is
+    stored with the current tap position, the operation it belongs to and a
+    pointer into the capture recording. With signatures configured as
+    well, the waveform of every event linked to an operation is added to
+    the operation signature index, saved to its directory periodically.
+    """
+
+    def __init__(self, config: DaemonConfig):
+        super().__init__()
+        self.config = config
+        self.readers: Dict[str, SerialReader] = {}
+        self.recorders: Dict[str, CaptureRecorder] = {}
+        self.publishers: Dict[str, PacketPublisher] = {}
+        self.decoders: Dict[Tuple[str, int], PacketDecoder] = {}
+        self.detectors: Dict[Tuple[str, int], List[ThresholdDetector]] = {}
+        self.filter_stages: Dict[Tuple[str, int], FilterStage] = {}
+        self.statistics: Dict[Tuple[str, int], ChannelStatistics] = {}
+        # Packet streams timed by their device sample counter
+        self.timebases: Dict[Tuple[str, int], Tuple[DeviceTimebase, int]] = {}
+        self.captures: Dict[Tuple[str, int], List[TriggeredCapture]] = {}
+        # (device, detector name) -> captures fired by that detector
+        self.detector_captures: Dict[Tuple[str, str], List[TriggeredCapture]] = {}
+        self.snapshot_writer = SnapshotWriter(config.snapshot_directory)
+        # Filled by packet callbacks (possibly off the GUI thread), drained
+        # by the batch timer; deque append/popleft are thread-safe
+        self.pending: Dict[Tuple[str, int], deque] = {}
+        self.event_count = 0
+        self.metrics = AcquisitionMetricsCollector()
+        self.metrics_server = None
+
+        self.event_store = None
+        if config.event_store:
+            self.event_store = EventStore(
+                config.event_store.path,
+                batch_size=config.event_store.batch_size,
+                flush_interval=config.event_store.flush_interval,
+            )
+        self.signature_index = None
+        if config.signatures:
+            self.signature_index = SignatureIndex(
+                config.signatures.directory, config.signatures.length
+            )
+        self._signatures_saved = (
+            self.signature_index.count if self.signature_index else 0
+        )
+        # Event kind per (device, detector name)
+        self.event_kinds: Dict[Tuple[str, str], str] = {}
+        # Packet streams carrying tap positions, processed first each batch
+        self.tap_keys: Dict[Tuple[str, int], str] = {}
+        self.tap_positions: Dict[str, int] = {}
+        self.last_operations: Dict[str, OperationRecord] = {}
+        # Packet stream -> (field, compensation) fed with its temperature
+        self.temperature_sinks: Dict[Tuple[str, int], List] = {}
+
+        for device in config.devices:
+            self._setup_device(device)
+
+        # Time-aligned merge of streams across devices
+        self.merger = None
+        self.merged_callbacks: List = []
+        if config.merge:
+            self.merger = self._build_merger(config.merge)
+
+        if config.metrics:
+            self.metrics_server = MetricsServer(
+                self.metrics, config.metrics.host, config.metrics.port
+            )
+
+        self.batch_timer = QTimer(self)
+        self.batch_timer.timeout.connect(self.process_pending)
+
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.log_stats)
+
+        self.signature_timer = QTimer(self)
+        self.signature_timer.timeout.connect(self.save_signatures)
+
+    def _setup_device(self, device: DeviceConfig):
+        """Create the reader, recorder, decoders and detectors for a device"""
+        reader = SerialReader(
+            device.port, device.baudrate, log_packets=False, realtime=device.realtime
+        )
+        reader.error_occurred.connect(
+            lambda message, name=device.name: print(f"[ERROR] {name}: {message}")
+        )
+        reader.connection_status_changed.connect(
+            lambda connected, name=device.name: print(
+                f"[STATUS] {name}: {'connected' if connected else 'disconnected'}"
+            )
+        )
+        reader.gap_detected.connect(partial(self._on_gap, device.name))
+        self.readers[device.name] = reader
+        self.metrics.add_reader(device.name, reader)
+
+        if self.config.recording:
+            self.recorders[device.name] = CaptureRecorder(
+                self.config.recording.directory,
+                prefix=device.name,
+                rotate_seconds=self.config.recording.rotate_seconds,
+                file_format=self.config.recording.format,
+                codec=self.config.recording.codec,
+                level=self.config.recording.level,
+            )
+            self.metrics.add_recorder(device.name, self.recorders[device.name])
+
+        if device.publisher:
+            self.publishers[device.name] = PacketPublisher(
+                host=device.publisher.host,
+                port=device.publisher.port,
+                unix_path=device.publisher.unix_path,
+                max_buffer_bytes=device.publisher.max_buffer_bytes,
+                disconnect_slow=device.publisher.disconnect_slow,
+            )
+            self.metrics.add_publisher(device.name, self.publishers[device.name])
+
+        for packet in device.packets:
+            key = (device.name, packet.header)
+            self.pending[key] = deque()
+            if packet.fields:
+                self.decoders[key] = PacketDecoder(packet.size, packet.fields)
+            if packet.filters:
+                self.filter_stages[key] = self._build_filter_stage(key, packet)
+            if packet.statistics:
+                self.statistics[key] = self._build_statistics(key, packet)
+            reader.add_packet_config(
+                header=packet.header,
+                size=packet.size,
+                queue=None,
+                callback=partial(self._on_packet, device.name, packet.header),
+                name=packet.name,
+                executor=packet.executor,
+                sequence=packet.sequence,
+                sample_counter=packet.sample_counter,
+            )
+            if packet.sample_counter and packet.sample_counter.sample_rate:
+                self.timebases[key] = (
+                    DeviceTimebase(packet.sample_counter),
+                    packet.size,
+                )
+
+        sizes = {packet.header: packet.size for packet in device.packets}
+        for rule in device.protection:
+            if rule.header not in sizes:
+                raise ValueError(
+                    f"Protection '{rule.name}' on {device.name} uses unknown "
+                    f"header 0x{rule.header:02X}"
+                )
+            if rule.end > sizes[rule.header]:
+                raise ValueError(
+                    f"Protection '{rule.name}' on {device.name} reads past the "
+                    f"end of {sizes[rule.header]}-byte 0x{rule.header:02X} packets"
+                )
+            reader.add_protection_rule(rule)
+        if device.protection:
+            reader.protection.callbacks.append(
+                partial(self._on_protection, device.name)
+            )
+
+        for packet in device.packets:
+            for field in packet.fields:
+                self._connect_temperature(device.name, field.calibration)
+
+        for spec in device.detectors:
+            key = (device.name, spec.header)
+            if key not in self.decoders:
+                raise ValueError(
+                    f"Detector '{spec.name}' on {device.name} needs decoded "
+                    f"fields for header 0x{spec.header:02X}"
+                )
+            self.detectors.setdefault(key, []).append(
+                ThresholdDetector(
+                    name=spec.name,
+                    header=spec.header,
+                    field_name=spec.field,
+                    threshold=spec.threshold,
+                    hold_off=spec.hold_off,
+                    callback=partial(self._on_event, device.name),
+                    keep_waveform=self.signature_index is not None,
+                )
+            )
+            self.event_kinds[(device.name, spec.name)] = spec.kind or spec.name
+
+        if device.tap_position:
+            key = (device.name, device.tap_position.header)
+            if key not in self.decoders:
+                raise ValueError(
+                    f"Tap position of {device.name} needs decoded fields for "
+                    f"header 0x{device.tap_position.header:02X}"
+                )
+            self.tap_keys[key] = device.tap_position.field
+
+        for spec in device.captures:
+            self._setup_capture(device, spec)
+
+    def _build_filter_stage(self, key: Tuple[str, int], packet) -> FilterStage:
+        """Create the shared filter stage of a packet stream"""
+        device, header = key
+        if key not in self.decoders:
+            raise ValueError(
+                f"Filters on {device} need decoded fields for header 0x{header:02X}"
+            )
+        names = {f.name for f in packet.fields}
+        stage = FilterStage(f"{device}/0x{header:02X}")
+        for spec in packet.filters:
+            if spec.field not in names:
+                raise ValueError(
+                    f"Filter '{spec.output}' on {device} uses unknown field "
+                    f"'{spec.field}'"
+                )
+            stage.add_channel(
+                spec.field, [filter_from_dict(s) for s in spec.stages], spec.output
+            )
+        self.metrics.add_filter_stage(device, stage)
+        return stage
+
+    def _build_statistics(self, key: Tuple[str, int], packet) -> ChannelStatistics:
+        """Create the running statistics of a packet stream's channels"""
+        device, header = key
+        if key not in self.decoders:
+            raise ValueError(
+                f"Statistics on {device} need decoded fields for header 0x{header:02X}"
+            )
+        known = {f.name for f in packet.fields} | {f.output for f in packet.filters}
+        for channel in packet.statistics.get("channels") or []:
+            if channel not in known:
+                raise ValueError(
+                    f"Statistics on {device} use unknown channel '{channel}'"
+                )
+        statistics = statistics_from_dict(packet.statistics, f"{device}/0x{header:02X}")
+        self.metrics.add_statistics(device, statistics)
+        return statistics
+
+    def _build_merger(self, spec) -> StreamMerger:
+        """Create the cross-device merge of the configured packet streams"""
+        merger = StreamMerger(spec.max_delay, spec.clock_block, self._on_merged)
+        for key in spec.streams:
+            if key not in self.pending:
+                raise ValueError(f"Merge uses unknown stream {key[0]}/0x{key[1]:02X}")
+            # Only device timebases have a clock of their own to correct
+            merger.add_source(self._stream_name(key), key in self.timebases)
+        self.metrics.add_merger(merger)
+        return merger
+
+    @staticmethod
+    def _stream_name(key: Tuple[str, int]) -> str:
+        return f"{key[0]}/0x{key[1]:02X}"
+
+    def _connect_temperature(self, device: str, calibration):
+        """Feed a calibration's temperature from the packet stream carrying it"""
+        compensation = calibration.compensation if calibration else None
+        if compensation is None or compensation.header is None:
+            return
+        key = (device, compensation.header)
+        if key not in self.decoders:
+            raise ValueError(
+                f"Temperature compensation on {device} needs decoded fields "
+                f"for header 0x{compensation.header:02X}"
+            )
+        self.temperature_sinks.setdefault(key, []).append(
+            (compensation.field, compensation)
+        )
+
+    def set_calibration(self, device: str, header: int, field: str, calibration):
+        """Replace the calibration of a decoded field while acquiring"""
+        key = (device, header)
+        if key not in self.decoders:
+            raise KeyError(f"No decoded fields for {device}/0x{header:02X}")
+        previous = self.decoders[key].get_calibration(field)
+        if previous is not None and previous.compensation is not None:
+            for sinks in self.temperature_sinks.values():
+                sinks[:] = [s for s in sinks if s[1] is not previous.compensation]
+        self._connect_temperature(device, calibration)
+        self.decoders[key].set_calibration(field, calibration)
+        print(f"[DAEMON] New calibration for {device}/0x{header:02X}/{field}")
+
+    def _setup_capture(self, device: DeviceConfig, spec):
+        """Create a triggered capture and hook up its triggers"""
+        key = (device.name, spec.header)
+        if key not in self.pending:
+            raise ValueError(
+                f"Capture '{spec.name}' on {device.name} uses unknown "
+                f"header 0x{spec.header:02X}"
+            )
+        triggers = []
+        for trig in spec.triggers:
+            if trig.type == "detector":
+                continue
+            if key not in self.decoders:
+                raise ValueError(
+                    f"Capture '{spec.name}' on {device.name} needs decoded "
+                    f"fields for a {trig.type} trigger"
+                )
+            if trig.type == "level":
+                triggers.append(LevelTrigger(trig.field, trig.level, trig.direction))
+            else:
+                min_interval = trig.min_interval
+                if not min_interval and key not in self.timebases:
+                    # Host arrival times bunch up within a read chunk
+                    min_interval = ARRIVAL_MIN_INTERVAL
+                triggers.append(
+                    SlopeTrigger(
+                        trig.field,
+                        trig.slope,
+                        sample_period=trig.sample_period or None,
+                        min_interval=min_interval,
+                    )
+                )
+
+        capture = TriggeredCapture(
+            name=f"{device.name}-{spec.name}",
+            header=spec.header,
+            writer=self.snapshot_writer,
+            triggers=triggers,
+            pre_packets=spec.pre_packets,
+            post_packets=spec.post_packets,
+            hold_off=spec.hold_off,
+            auto_rearm=spec.auto_rearm,
+        )
+        self.captures.setdefault(key, []).append(capture)
+        for trig in spec.triggers:
+            if trig.type == "detector":
+                self.detector_captures.setdefault(
+                    (device.name, trig.detector), []
+                ).append(capture)
+
+    def start(self):
+        """Start recorders, publishers, readers and the processing timers"""
+        if self.event_store:
+            self.event_store.start()
+        for recorder in self.recorders.values():
+            recorder.start()
+        if self.captures:
+            self.snapshot_writer.start()
+        for publisher in self.publishers.values():
+            publisher.start()
+        if self.metrics_server:
+            self.metrics_server.start()
+        for name, reader in self.readers.items():
+            print(f"[DAEMON] Starting {name} on {reader.port} @ {reader.baudrate}")
+            reader.start()
+        self.batch_timer.start(self.config.batch_interval_ms)
+        if self.config.stats_interval > 0:
+            self.stats_timer.start(int(self.config.stats_interval * 1000))
+        if self.signature_index is not None:
+            self.signature_timer.start(int(self.config.signatures.save_interval * 1000))
+
+    def stop(self):
+        """Stop readers, process what is left, flush recorders and publishers"""
+        self.batch_timer.stop()
+        self.stats_timer.stop()
+        self.signature_timer.stop()
+        for reader in self.readers.values():
+            reader.stop()
+        self.process_pending()
+        if self.merger is not None:
+            self.merger.flush()
+        if self.event_store:
+            self.event_store.stop()
+        self.save_signatures()
+        for recorder in self.recorders.values():
+            recorder.stop()
+        for captures in self.captures.values():
+            for capture in captures:
+                capture.flush()
+        self.snapshot_writer.stop()
+        for publisher in self.publishers.values():
+            publisher.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        print("[DAEMON] Stopped")
+
+    def _on_packet(self, device: str, header: int, packet: bytes):
+        """Collect a packet for batch processing, record and publish it"""
+        timestamp = time.time()
+        self.pending[(device, header)].append((timestamp, packet))
+        recorder = self.recorders.get(device)
+        if recorder:
+            recorder.write(header, packet, timestamp)
+        publisher = self.publishers.get(device)
+        if publisher:
+            publisher.publish(header, packet, timestamp)
+
+    def process_pending(self):
+        """Decode collected packets, feed captures and run the detectors"""
+        # Tap positions first, so events of this batch see the current tap
+        items = self.pending.items()
+        if self.tap_keys:
+            items = sorted(items, key=lambda item: item[0] not in self.tap_keys)
+        for key, queue in items:
+            if not queue:
+                continue
+            batch = [queue.popleft() for _ in range(len(queue))]
+            decoder = self.decoders.get(key)
+            captures = self.captures.get(key)
+            merged = self.merger is not None and (
+                self._stream_name(key) in self.merger.sources
+            )
+            if decoder is None and not captures and not merged:
+                continue
+            arrivals = np.fromiter((t for t, _ in batch), dtype=np.float64)
+            timestamps = arrivals
+            packets = [p for _, p in batch]
+            if key in self.timebases:
+                timebase, size = self.timebases[key]
+                timestamps = timebase.times(
+                    timebase.counters(packets, size), timestamps
+                )
+            if merged:
+                self.merger.push(self._stream_name(key), timestamps, packets, arrivals)
+            fields = decoder.decode(packets) if decoder else None
+            # Captures see the batch before detectors fire on it, so the
+            # detected event is already in the pre-trigger buffer
+            for capture in captures or []:
+                capture.feed(timestamps, packets, fields)
+            if fields is None:
+                continue
+            for field, compensation in self.temperature_sinks.get(key, []):
+                compensation.temperature = float(fields[field][-1])
+            if key in self.tap_keys:
+                self._track_tap(key[0], timestamps, fields[self.tap_keys[key]])
+            stage = self.filter_stages.get(key)
+            filtered = stage.process(timestamps, fields) if stage else {}
+            for detector in self.detectors.get(key, []):
+                channel = filtered.get(detector.field_name)
+                if channel is None:
+                    detector.process(timestamps, fields)
+                else:
+                    detector.process(channel[0], {detector.field_name: channel[1]})
+            statistics = self.statistics.get(key)
+            if statistics is not None:
+                statistics.update(
+                    {**fields, **{name: v for name, (_, v) in filtered.items()}}
+                )
+            self._publish_decoded(key, timestamps, fields, filtered)
+        if self.merger is not None:
+            self.merger.pop_ready()
+
+    def _publish_decoded(self, key, timestamps, fields, filtered=None):
+        """Publish a decoded batch when the device publisher asks for it
+
+        Filtered outputs have their own timestamps (decimation), so each is
+        published as its own stream ``<device>/0x<header>/<output>``.
+        """
+        device, header = key
+        publisher = self.publishers.get(device)
+        if publisher is None:
+            return
+        spec = next(d for d in self.config.devices if d.name == device)
+        if spec.publisher.decoded:
+            stream = f"{device}/0x{header:02X}"
+            publisher.publish_decoded(stream, timestamps, fields)
+            for output, (times, values) in (filtered or {}).items():
+                publisher.publish_decoded(f"{stream}/{output}", times, {output: values})
+
+    def _on_merged(self, items):
+        """Hand a time-ordered run of merged (time, stream, packet) items on"""
+        for callback in self.merged_callbacks:
+            callback(items)
+
+    def _on_gap(self, device: str, start: float, duration: float):
+        """Log a serial outage as a gap marker next to the recordings"""
+        if not self.config.recording:
+            return
+        path = os.path.join(self.config.recording.directory, f"{device}-gaps.jsonl")
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"start": start, "duration": duration}) + "\n")
+        except OSError as e:
+            print(f"[ERROR] Could not record gap for {device}: {e}")
+
+    def _track_tap(self, device: str, timestamps: np.ndarray, values: np.ndarray):
+        """Record an operation for every tap position change in a batch"""
+        taps = np.rint(values).astype(np.int64)
+        previous = self.tap_positions.get(device, int(taps[0]))
+        state = np.concatenate(([previous], taps))
+        recorder = self.recorders.get(device)
+        for index in np.flatnonzero(state[1:] != state[:-1]):
+            operation = OperationRecord(
+                device=device,
+                start_time=float(timestamps[index]),
+                tap_from=int(state[index]),
+                tap_to=int(taps[index]),
+                capture_path=recorder.current_path if recorder else None,
+                capture_time=float(timestamps[index]),
+            )
+            if self.event_store:
+                self.event_store.add_operation(operation)
+            self.last_operations[device] = operation
+            print(
+                f"[TAP] {device}: {operation.tap_from} -> {operation.tap_to} "
+                f"at {operation.start_time:.3f}"
+            )
+        self.tap_positions[device] = int(taps[-1])
+
+    def _store_event(self, device: str, event: DetectionEvent):
+        """Write a detection event, linked to its operation, to the event store"""
+        operation = self.last_operations.get(device)
+        window = self.config.event_store.operation_window
+        if operation and abs(event.timestamp - operation.start_time) > window:
+            operation = None
+        if operation:
+            # The operation lasts until its last event has ended
+            end = event.timestamp + event.duration
+            if operation.end_time is None or end > operation.end_time:
+                operation.end_time = end
+                self.event_store.add_operation(operation)
+            if self.signature_index is not None and event.waveform is not None:
+                self.signature_index.add(
+                    operation.id,
+                    event.waveform,
+                    tap_position=operation.tap_to,
+                    time=event.timestamp,
+                )
+        recorder = self.recorders.get(device)
+        self.event_store.add_event(
+            EventRecord(
+                device=device,
+                kind=self.event_kinds.get((device, event.detector), event.detector),
+                time=event.timestamp,
+                detector=event.detector,
+                tap_position=self.tap_positions.get(device),
+                peak=event.peak,
+                energy=event.energy,
+                duration=event.duration,
+                operation_id=operation.id if operation else None,
+                capture_path=recorder.current_path if recorder else None,
+                capture_time=event.timestamp,
+                metadata=event.metadata,
+            )
+        )
+
+    def save_signatures(self):
+        """Write the signature index to disk when signatures were added"""
+        index = self.signature_index
+        if index is None or index.count == self._signatures_saved:
+            return
+        try:
+            index.save()
+            self._signatures_saved = index.count
+        except OSError as e:
+            print(f"[ERROR] Could not save signatures to {index.directory}: {e}")
+
+    def _on_event(self, device: str, event: DetectionEvent):
+        """Report a detection event"""
+        self.event_count += 1
+        for capture in self.detector_captures.get((device, event.detector), []):
+            capture.fire(event.timestamp, f"detector {event.detector}")
+        if self.event_store:
+            self._store_event(device, event)
+        print(
+            f"[DETECT] {device}/{event.detector}: peak {event.peak:.3f} "
+            f"for {event.duration * 1000:.1f} ms at {event.timestamp:.3f}"
+        )
+
+    def _on_protection(self, device: str, action):
+        """Store a protection action; runs on the protection logger thread"""
+        if not self.event_store:
+            return
+        self.event_store.add_event(
+            EventRecord(
+                device=device,
+                kind="protection",
+                time=action.timestamp,
+                detector=action.rule,
+                tap_position=self.tap_positions.get(device),
+                peak=action.value,
+                metadata={"latency": action.latency, "error": action.error},
+            )
+        )
+
+    def log_stats(self):
+        """Print packet statistics of every device"""
+        for name, reader in self.readers.items():
+            parts = [
+                f"0x{header:02X}={stats['count']}"
+                for header, stats in reader.get_packet_stats().items()
+            ]
+            recorder = self.recorders.get(name)
+            if recorder:
+                parts.append(
+                    f"recorded={recorder.stats['records']} "
+                    f"dropped={recorder.stats['dropped']}"
+                )
+            print(f"[STATS] {name}: {' '.join(parts)} events={self.event_count}")
+            for header, kinds in reader.get_sequence_stats().items():
+                for kind, stats in kinds.items():
+                    print(
+                        f"[STATS] {name} 0x{header:02X} {kind}: "
+                        f"lost={stats['lost']} gaps={stats['gaps']} "
+                        f"duplicates={stats['duplicates']} "
+                        f"reordered={stats['reordered']}"
+                    )
+            protection = reader.protection
+            if protection.rules:
+                print(
+                    f"[STATS] {name} protection: actions="
+                    f"{protection.stats['actions']} overruns="
+                    f"{protection.stats['overruns']} max latency "
+                    f"{protection.stats['max_latency'] * 1e6:.0f} us"
+                )
+            jitter = reader.worker.jitter.summary()
+            print(
+                f"[STATS] {name} jitter: wakeup max "
+                f"{jitter['max_wakeup'] * 1000:.2f} ms, chunk gap max "
+                f"{jitter['max_chunk_gap'] * 1000:.2f} ms, backlog max "
+                f"{jitter['max_backlog'] * 1000:.2f} ms, "
+                f"incidents={jitter['incidents']}"
+            )
+        for key, stage in self.filter_stages.items():
+            parts = [
+                f"{output}={stats['samples']} in {stats['seconds'] * 1000:.1f} ms"
+                for output, stats in stage.stats.items()
+            ]
+            print(f"[STATS] filters {stage.name}: {' '.join(parts)}")
+        for statistics in self.statistics.values():
+            for channel, stats in statistics.snapshot().items():
+                quantiles = " ".join(
+                    f"{name}={value:.4g}"
+                    for name, value in stats.items()
+                    if name.startswith("p")
+                )
+                print(
+                    f"[STATS] {statistics.name} {channel}: n={stats['count']} "
+                    f"min={stats['min']:.4g} max={stats['max']:.4g} "
+                    f"mean={stats['mean']:.4g} std={stats['std']:.4g} {quantiles}"
+                )
+        if self.merger is not None:
+            stats = self.merger.stats
+            print(
+                f"[STATS] merge: emitted={stats['emitted']} late={stats['late']} "
+                f"buffered={self.merger.buffered} max buffered={stats['max_buffered']}"
+            )
+            for stream, clock in self.merger.clock_report().items():
+                print(
+                    f"[STATS] merge {stream}: offset={clock['offset'] * 1000:.3f} ms "
+                    f"drift={clock['drift_ppm']:.1f} ppm late={clock['late']}"
+                )
+        if self.event_store:
+            stats = self.event_store.stats
+            print(
+                f"[STATS] event store: operations={stats['operations']} "
+                f"events={stats['events']} dropped={stats['dropped']}"
+            )
+        if self.signature_index is not None:
+            print(f"[STATS] signatures: {self.signature_index.count}")
@@ -0,0 +1,389 @@
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from utils.diagnostics.realtime import RealtimeSettings, realtime_from_dict
+from utils.dsp.calibration import calibration_from_dict
+from utils.dsp.channel_stats import statistics_from_dict
+from utils.dsp.filters import filter_from_dict
+from utils.serial.protection import ProtectionRule, protection_rule_from_dict
+from utils.serial.sequence import counter_from_dict
+from utils.serial.types import CounterField
+from utils.serial.decoding import FieldSpec
+
+
+@dataclass
+class FilterSpec:
+    """Filter chain turning a decoded field into a filtered output channel"""
+
+    field: str
+    output: str
+    stages: List[Dict] = field(default_factory=list)  # Built per consumer
+
+
+@dataclass
+class PacketSpec:
+    """Packet type of a device as described in the daemon config"""
+
+    header: int
+    size: int
+    name: str = ""
+    fields: List[FieldSpec] = field(default_factory=list)
+    executor: str = "gui"
+    filters: List[FilterSpec] = field(default_factory=list)
+    sequence: Optional[CounterField] = None
+    sample_counter: Optional[CounterField] = None  # Device timebase if rated
+    statistics: Optional[Dict] = None  # Running channel statistics, built per stream
+
+
+@dataclass
+class DetectorSpec:
+    """Threshold detector attached to a decoded packet field"""
+
+    name: str
+    header: int
+    field: str
+    threshold: float
+    hold_off: float = 0.0
+    kind: str = ""  # Event kind in the event store, defaults to the name
+
+
+@dataclass
+class TapPositionSpec:
+    """Decoded packet field carrying the tap position of a device"""
+
+    header: int
+    field: str
+
+
+@dataclass
+class TriggerSpec:
+    """One trigger condition of a triggered capture"""
+
+    type: str  # "level", "slope" or "detector"
+    field: str = ""
+    level: float = 0.0
+    direction: str = "rising"
+    slope: float = 0.0
+    sample_period: float = 0.0  # Nominal sample spacing for slope triggers
+    min_interval: float = 0.0  # Floor of sample spacing for slope triggers
+    detector: str = ""
+
+
+@dataclass
+class CaptureSpec:
+    """Triggered pre/post-trigger capture on one packet stream"""
+
+    name: str
+    header: int
+    triggers: List[TriggerSpec] = field(default_factory=list)
+    pre_packets: int = 1000
+    post_packets: int = 1000
+    hold_off: float = 1.0
+    auto_rearm: bool = True
+
+
+@dataclass
+class PublisherConfig:
+    """Local fan-out server for the packets of one device"""
+
+    host: str = "127.0.0.1"
+    port: int = 0
+    unix_path: Optional[str] = None
+    max_buffer_bytes: int = 4 * 1024 * 1024
+    disconnect_slow: bool = False
+    decoded: bool = False
+
+
+@dataclass
+class DeviceConfig:
+    """One serial device and everything acquired from it"""
+
+    name: str
+    port: str
+    baudrate: int = 115200
+    packets: List[PacketSpec] = field(default_factory=list)
+    detectors: List[DetectorSpec] = field(default_factory=list)
+    publisher: Optional[PublisherConfig] = None
+    captures: List[CaptureSpec] = field(default_factory=list)
+    tap_position: Optional[TapPositionSpec] = None
+    realtime: Optional[RealtimeSettings] = None  # I/O thread scheduling
+    protection: List[ProtectionRule] = field(default_factory=list)
+
+
+@dataclass
+class RecordingConfig:
+    """Where and how captured packets are written"""
+
+    directory: str
+    rotate_seconds: float = 3600.0
+    format: str = "raw"  # "raw" or "block"
+    codec: str = "zlib"  # Block codec: "zlib", "lzma" or "none"
+    level: int = 6
+
+
+@dataclass
+class MetricsConfig:
+    """Prometheus metrics endpoint"""
+
+    host: str = "0.0.0.0"
+    port: int = 9108
+
+
+@dataclass
+class EventStoreConfig:
+    """SQLite index of tap-change operations and detection events"""
+
+    path: str
+    batch_size: int = 500
+    flush_interval: float = 0.5
+    operation_window: float = 2.0  # Seconds after a tap change linked to it
+
+
+@dataclass
+class SignatureConfig:
+    """On-disk signature index of the operations linked to detection events"""
+
+    directory: str
+    length: int = 128
+    save_interval: float = 60.0
+
+
+# Default and least merge delay, in batch intervals: packets pushed after a
+# longer event-loop stall than the delay are dropped as late
+MERGE_DELAY_BATCHES = 10
+MIN_MERGE_DELAY_BATCHES = 3
+
+
+@dataclass
+class MergeConfig:
+    """Time-aligned merge of packet streams from several devices"""
+
+    streams: List[Tuple[str, int]]  # (device name, header)
+    max_delay: float = 0.2  # Longest wait for a slow stream, in seconds
+    clock_block: float = 1.0  # Seconds per clock offset estimate
+
+
+@dataclass
+class DaemonConfig:
+    """Top-level configuration of the headless acquisition daemon"""
+
+    devices: List[DeviceConfig]
+    recording: Optional[RecordingConfig] = None
+    snapshot_directory: str = "snapshots"
+    metrics: Optional[MetricsConfig] = None
+    stats_interval: float = 10.0
+    batch_interval_ms: int = 20
+    event_store: Optional[EventStoreConfig] = None
+    merge: Optional[MergeConfig] = None
+    signatures: Optional[SignatureConfig] = None
+
+
+def _parse_int(value: Any) -> int:
+    """Accept headers as integers or strings such as "0xA0" """
+    if isinstance(value, str):
+        return int(value, 0)
+    return int(value)
+
+
+def _parse_packet(raw: Dict) -> PacketSpec:
+    return PacketSpec(
+        header=_parse_int(raw["header"]),
+        size=int(raw["size"]),
+        name=raw.get("name", ""),
+        executor=raw.get("executor", "gui"),
+        fields=[
+            FieldSpec(
+                name=f["name"],
+                offset=int(f["offset"]),
+                dtype=f.get("dtype", "<u2"),
+                scale=float(f.get("scale", 1.0)),
+                calibration=calibration_from_dict(f.get("calibration")),
+            )
+            for f in raw.get("fields", [])
+        ],
+        filters=[_parse_filter(f) for f in raw.get("filters", [])],
+        sequence=counter_from_dict(raw.get("sequence")),
+        sample_counter=counter_from_dict(raw.get("sample_counter")),
+        statistics=_parse_statistics(raw.get("statistics")),
+    )
+
+
+def _parse_statistics(raw: Optional[Dict]) -> Optional[Dict]:
+    if not raw:
+        return None
+    raw = {"channels": raw} if isinstance(raw, list) else dict(raw)
+    statistics_from_dict(raw)  # Reject bad quantiles and accuracies early
+    return raw
+
+
+def _parse_filter(raw: Dict) -> FilterSpec:
+    stages = list(raw.get("stages", []))
+    for stage in stages:
+        filter_from_dict(stage)  # Reject unknown types and bad designs early
+    return FilterSpec(
+        field=raw["field"],
+        output=raw.get("output") or f"{raw['field']}_filtered",
+        stages=stages,
+    )
+
+
+def _parse_detector(raw: Dict) -> DetectorSpec:
+    return DetectorSpec(
+        name=raw["name"],
+        header=_parse_int(raw["header"]),
+        field=raw["field"],
+        threshold=float(raw["threshold"]),
+        hold_off=float(raw.get("hold_off", 0.0)),
+        kind=raw.get("kind", ""),
+    )
+
+
+def _parse_tap_position(raw: Optional[Dict]) -> Optional[TapPositionSpec]:
+    if not raw:
+        return None
+    return TapPositionSpec(header=_parse_int(raw["header"]), field=raw["field"])
+
+
+def _parse_capture(raw: Dict) -> CaptureSpec:
+    triggers = []
+    for trig in raw.get("triggers", []):
+        if trig["type"] not in ("level", "slope", "detector"):
+            raise ValueError(f"Unknown trigger type '{trig['type']}'")
+        triggers.append(
+            TriggerSpec(
+                type=trig["type"],
+                field=trig.get("field", ""),
+                level=float(trig.get("level", 0.0)),
+                direction=trig.get("direction", "rising"),
+                slope=float(trig.get("slope", 0.0)),
+                sample_period=float(trig.get("sample_period", 0.0)),
+                min_interval=float(trig.get("min_interval", 0.0)),
+                detector=trig.get("detector", ""),
+            )
+        )
+    return CaptureSpec(
+        name=raw["name"],
+        header=_parse_int(raw["header"]),
+        triggers=triggers,
+        pre_packets=int(raw.get("pre_packets", 1000)),
+        post_packets=int(raw.get("post_packets", 1000)),
+        hold_off=float(raw.get("hold_off", 1.0)),
+        auto_rearm=bool(raw.get("auto_rearm", True)),
+    )
+
+
+def _parse_publisher(raw: Optional[Dict]) -> Optional[PublisherConfig]:
+    if not raw:
+        return None
+    return PublisherConfig(
+        host=raw.get("host", "127.0.0.1"),
+        port=int(raw.get("port", 0)),
+        unix_path=raw.get("unix_path"),
+        max_buffer_bytes=int(raw.get("max_buffer_bytes", 4 * 1024 * 1024)),
+        disconnect_slow=bool(raw.get("disconnect_slow", False)),
+        decoded=bool(raw.get("decoded", False)),
+    )
+
+
+def parse_config(raw: Dict) -> DaemonConfig:
+    """Build a DaemonConfig from a decoded JSON document"""
+    devices = []
+    for index, dev in enumerate(raw.get("devices", [])):
+        devices.append(
+            DeviceConfig(
+                name=dev.get("name", f"device{index}"),
+                port=dev["port"],
+                baudrate=int(dev.get("baudrate", 115200)),
+                packets=[_parse_packet(p) for p in dev.get("packets", [])],
+                detectors=[_parse_detector(d) for d in dev.get("detectors", [])],
+                publisher=_parse_publisher(dev.get("publisher")),
+                captures=[_parse_capture(c) for c in dev.get("captures", [])],
+                tap_position=_parse_tap_position(dev.get("tap_position")),
+                realtime=realtime_from_dict(dev.get("realtime")),
+                protection=[
+                    protection_rule_from_dict(p) for p in dev.get("protection", [])
+                ],
+            )
+        )
+    if not devices:
+        raise ValueError("Configuration defines no devices")
+
+    recording = None
+    if raw.get("recording"):
+        rec = raw["recording"]
+        recording = RecordingConfig(
+            directory=rec["directory"],
+            rotate_seconds=float(rec.get("rotate_seconds", 3600.0)),
+            format=rec.get("format", "raw"),
+            codec=rec.get("codec", "zlib"),
+            level=int(rec.get("level", 6)),
+        )
+
+    metrics = None
+    if raw.get("metrics"):
+        metrics = MetricsConfig(
+            host=raw["metrics"].get("host", "0.0.0.0"),
+            port=int(raw["metrics"].get("port", 9108)),
+        )
+
+    event_store = None
+    if raw.get("event_store"):
+        store = raw["event_store"]
+        event_store = EventStoreConfig(
+            path=store["path"],
+            batch_size=int(store.get("batch_size", 500)),
+            flush_interval=float(store.get("flush_interval", 0.5)),
+            operation_window=float(store.get("operation_window", 2.0)),
+        )
+
+    signatures = None
+    if raw.get("signatures"):
+        spec = raw["signatures"]
+        signatures = SignatureConfig(
+            directory=spec["directory"],
+            length=int(spec.get("length", 128)),
+            save_interval=float(spec.get("save_interval", 60.0)),
+        )
+        if event_store is None:
+            raise ValueError("Signatures index operations and need an event_store")
+
+    batch_interval_ms = int(raw.get("batch_interval_ms", 20))
+    merge = None
+    if raw.get("merge"):
+        spec = raw["merge"]
+        batch_interval = batch_interval_ms / 1000.0
+        merge = MergeConfig(
+            streams=[
+                (stream["device"], _parse_int(stream["header"]))
+                for stream in spec.get("streams", [])
+            ],
+            max_delay=float(
+                spec.get("max_delay", MERGE_DELAY_BATCHES * batch_interval)
+            ),
+            clock_block=float(spec.get("clock_block", 1.0)),
+        )
+        if len(merge.streams) < 2:
+            raise ValueError("A merge needs at least two streams")
+        if merge.max_delay < MIN_MERGE_DELAY_BATCHES * batch_interval:
+            raise ValueError(
+                f"Merge max_delay {merge.max_delay} s is shorter than "
+                f"{MIN_MERGE_DELAY_BATCHES} batch intervals of {batch_interval_ms} ms"
+            )
+
+    return DaemonConfig(
+        devices=devices,
+        recording=recording,
+        snapshot_directory=raw.get("snapshot_directory", "snapshots"),
+        metrics=metrics,
+        stats_interval=float(raw.get("stats_interval", 10.0)),
+        batch_interval_ms=batch_interval_ms,
+        event_store=event_store,
+        merge=merge,
+        signatures=signatures,
+    )
+
+
+def load_config(path: str) -> DaemonConfig:
+    """Load the daemon configuration from a JSON file"""
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_config(json.load(f))
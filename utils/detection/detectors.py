@@ -0,0 +1,162 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+
+@dataclass
+class DetectionEvent:
+    """A detected arc, short circuit or other threshold crossing"""
+
+    detector: str
+    timestamp: float
+    value: float
+    peak: float
+    duration: float = 0.0
+    metadata: Dict = field(default_factory=dict)
+    energy: float = 0.0
+    waveform: Optional[np.ndarray] = None  # Field samples during the event
+
+
+class ThresholdDetector:
+    """Detect excursions of a decoded field above a threshold
+
+    An event starts when the field rises above ``threshold`` and ends when it
+    falls back below it. After an event, new events are suppressed for
+    ``hold_off`` seconds so one disturbance is reported once. The energy of
+    an event is the time integral of the field over the event. With
+    ``keep_waveform`` the field samples of an event (at most
+    ``MAX_WAVEFORM``) are attached to it, e.g. for its signature.
+    """
+
+    MAX_WAVEFORM = 65536
+
+    def __init__(
+        self,
+        name: str,
+        header: int,
+        field_name: str,
+        threshold: float,
+        hold_off: float = 0.0,
+        callback: Optional[Callable[[DetectionEvent], None]] = None,
+        keep_waveform: bool = False,
+    ):
+        self.name = name
+        self.header = header
+        self.field_name = field_name
+        self.threshold = threshold
+        self.hold_off = hold_off
+        self.callback = callback
+        self.keep_waveform = keep_waveform
+
+        # State carried across batches
+        self._active = False
+        self._start = 0.0
+        self._start_value = 0.0
+        self._peak = 0.0
+        self._energy = 0.0
+        self._waveform: List[np.ndarray] = []
+        self._waveform_size = 0
+        self._last_time = None
+        self._last_end = None
+        self.event_count = 0
+
+    def process(
+        self, timestamps: np.ndarray, fields: Dict[str, np.ndarray]
+    ) -> List[DetectionEvent]:
+        """Process a batch of decoded samples and return completed events"""
+        values = fields.get(self.field_name)
+        if values is None or len(values) == 0:
+            return []
+
+        above = values > self.threshold
+        # Fast path: nothing above threshold and no event in progress
+        if not self._active and not above.any():
+            self._last_time = float(timestamps[-1])
+            return []
+
+        # Sample weights for the energy integral: the time since the previous
+        # sample, carried across batches
+        previous = timestamps[0] if self._last_time is None else self._last_time
+        weighted = values * np.diff(timestamps, prepend=previous)
+        self._last_time = float(timestamps[-1])
+
+        events = []
+        # Indices where the above/below state changes, relative to the state
+        # carried over from the previous batch
+        state = np.concatenate(([self._active], above))
+        edges = np.flatnonzero(state[1:] != state[:-1])
+        for index in edges:
+            if above[index]:
+                if (
+                    self._last_end is not None
+                    and timestamps[index] - self._last_end < self.hold_off
+                ):
+                    # Still in hold-off: ignore this rising edge by treating
+                    # the run as below threshold
+                    continue
+                self._active = True
+                self._start = float(timestamps[index])
+                self._start_value = float(values[index])
+                self._peak = float(values[index])
+                self._energy = 0.0
+                self._waveform, self._waveform_size = [], 0
+            elif self._active:
+                start = self._segment_start(timestamps)
+                segment = values[start:index]
+                if len(segment):
+                    self._peak = max(self._peak, float(segment.max()))
+                    self._energy += float(weighted[start:index].sum())
+                    self._keep(segment)
+                events.append(self._finish(float(timestamps[index])))
+
+        if self._active:
+            start = self._segment_start(timestamps)
+            segment = values[start:]
+            if len(segment):
+                self._peak = max(self._peak, float(segment.max()))
+                self._energy += float(weighted[start:].sum())
+                self._keep(segment)
+
+        for event in events:
+            if self.callback:
+                try:
+                    self.callback(event)
+                except Exception as e:
+                    print(f"[ERROR] Detector callback error for {self.name}: {e}")
+        return events
+
+    def reset(self):
+        """Forget any event in progress"""
+        self._active = False
+        self._last_time = None
+        self._last_end = None
+
+    def _keep(self, segment: np.ndarray):
+        """Collect samples of the event in progress for its waveform"""
+        if not self.keep_waveform or self._waveform_size >= self.MAX_WAVEFORM:
+            return
+        segment = segment[: self.MAX_WAVEFORM - self._waveform_size]
+        self._waveform.append(np.array(segment, dtype=np.float64))
+        self._waveform_size += len(segment)
+
+    def _segment_start(self, timestamps: np.ndarray) -> int:
+        """Index of the first sample of the current event within this batch"""
+        return int(np.searchsorted(timestamps, self._start, side="left"))
+
+    def _finish(self, end: float) -> DetectionEvent:
+        """Close the event in progress"""
+        self._active = False
+        self._last_end = end
+        self.event_count += 1
+        waveform = np.concatenate(self._waveform) if self._waveform else None
+        self._waveform, self._waveform_size = [], 0
+        return DetectionEvent(
+            detector=self.name,
+            timestamp=self._start,
+            value=self._start_value,
+            peak=self._peak,
+            duration=end - self._start,
+            energy=self._energy,
+            metadata={"header": self.header, "field": self.field_name},
+            waveform=waveform,
+        )
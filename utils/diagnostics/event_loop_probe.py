@@ -0,0 +1,31 @@
+from PySide6.QtCore import QObject, QTimer
+import time
+from utils.diagnostics.timing import TIMINGS, StageTimings
+
+
+class EventLoopLagProbe(QObject):
+    """Measure how late a periodic timer fires on the thread's event loop
+
+    The lag (actual interval minus requested interval) is recorded as the
+    "event_loop_lag" stage while timing is enabled.
+    """
+
+    STAGE = "event_loop_lag"
+
+    def __init__(
+        self, interval_ms: int = 50, timings: StageTimings = TIMINGS, parent=None
+    ):
+        super().__init__(parent)
+        self.interval = interval_ms / 1000.0
+        self.timings = timings
+        self._last = None
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._on_timeout)
+        self.timer.start(interval_ms)
+
+    def _on_timeout(self):
+        now = time.perf_counter()
+        if self._last is not None and self.timings.enabled:
+            self.timings.record(self.STAGE, max(0.0, now - self._last - self.interval))
+        self._last = now
@@ -0,0 +1,112 @@
+import time
+from collections import deque
+from typing import Dict, Optional
+from utils.metrics.histogram import Histogram
+
+# Buckets in seconds, from 50 us to 1 s
+JITTER_BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    1.0,
+)
+
+
+class JitterProbe:
+    """Scheduling jitter of a read loop, measured from the loop itself
+
+    - wake-up latency: how much later than its timeout an empty read
+      returned, i.e. how late the thread was woken
+    - chunk gap: time between reads that returned data
+    - backlog: bytes of a chunk times the byte time, an estimate of how
+      long the oldest byte of the chunk waited in the adapter's FIFO
+
+    Observations above ``incident_threshold`` are kept with their wall time
+    as incidents, to be lined up against packet loss and desync.
+    """
+
+    def __init__(
+        self,
+        baudrate: int = 115200,
+        bits_per_byte: int = 10,
+        incident_threshold: float = 0.01,
+        max_incidents: int = 1000,
+    ):
+        self.byte_time = bits_per_byte / float(baudrate)
+        self.incident_threshold = incident_threshold
+        self.wakeup = Histogram(JITTER_BUCKETS)
+        self.chunk_gap = Histogram(JITTER_BUCKETS)
+        self.backlog = Histogram(JITTER_BUCKETS)
+        self.maxima = {"wakeup": 0.0, "chunk_gap": 0.0, "backlog": 0.0}
+        self.incidents = deque(maxlen=max_incidents)  # (wall time, kind, seconds)
+        self._last_chunk: Optional[float] = None
+
+    def _observe(self, kind: str, histogram: Histogram, value: float):
+        histogram.observe(value)
+        if value > self.maxima[kind]:
+            self.maxima[kind] = value
+        if value > self.incident_threshold:
+            self.incidents.append((time.time(), kind, value))
+
+    def observe_read(self, started: float, finished: float, size: int, timeout=None):
+        """Record one read of ``size`` bytes between two perf_counter times"""
+        if size == 0:
+            if timeout:
+                self._observe(
+                    "wakeup", self.wakeup, max(0.0, finished - started - timeout)
+                )
+            return
+        if self._last_chunk is not None:
+            self._observe("chunk_gap", self.chunk_gap, finished - self._last_chunk)
+        self._last_chunk = finished
+        self._observe("backlog", self.backlog, size * self.byte_time)
+
+    def restart(self):
+        """Forget the last chunk time, e.g. after a reconnect"""
+        self._last_chunk = None
+
+    def reset(self):
+        """Forget all observations"""
+        for histogram in (self.wakeup, self.chunk_gap, self.backlog):
+            histogram.reset()
+        self.maxima = dict.fromkeys(self.maxima, 0.0)
+        self.incidents.clear()
+        self._last_chunk = None
+
+    def summary(self) -> Dict[str, float]:
+        """Counts and maxima of every measurement"""
+        return {
+            "wakeups": self.wakeup.count,
+            "chunks": self.chunk_gap.count,
+            "max_wakeup": self.maxima["wakeup"],
+            "max_chunk_gap": self.maxima["chunk_gap"],
+            "max_backlog": self.maxima["backlog"],
+            "incidents": len(self.incidents),
+        }
+
+
+def measure_sleep_jitter(
+    interval: float = 0.001, duration: float = 1.0, probe: Optional[JitterProbe] = None
+) -> JitterProbe:
+    """Wake-up latency of periodic sleeps on the calling thread
+
+    A cyclictest-style check of what a thread with the current scheduling
+    settings can expect, independent of any serial traffic.
+    """
+    probe = probe or JitterProbe()
+    deadline = time.perf_counter() + duration
+    while True:
+        started = time.perf_counter()
+        if started >= deadline:
+            return probe
+        time.sleep(interval)
+        probe.observe_read(started, time.perf_counter(), 0, timeout=interval)
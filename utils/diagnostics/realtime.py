@@ -0,0 +1,98 @@
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# mlockall flags from <sys/mman.h>
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+
+@dataclass
+class RealtimeSettings:
+    """Opt-in scheduling settings for an I/O thread (Linux only)
+
+    ``priority`` selects SCHED_FIFO at that priority (1-99), ``nice`` sets
+    the thread's nice value instead or in addition, ``cpus`` pins the thread
+    to those CPUs and ``lock_memory`` locks the process's pages in RAM.
+    """
+
+    priority: Optional[int] = None
+    nice: Optional[int] = None
+    cpus: List[int] = field(default_factory=list)
+    lock_memory: bool = False
+
+    @property
+    def requested(self) -> bool:
+        return (
+            self.priority is not None
+            or self.nice is not None
+            or bool(self.cpus)
+            or self.lock_memory
+        )
+
+
+def _lock_memory() -> str:
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return "libc not found"
+    libc = ctypes.CDLL(libc_name, use_errno=True)
+    if libc.mlockall(MCL_CURRENT | MCL_FUTURE) != 0:
+        return os.strerror(ctypes.get_errno())
+    return "ok"
+
+
+def apply_realtime(settings: RealtimeSettings) -> Dict[str, str]:
+    """Apply ``settings`` to the calling thread
+
+    Every setting is tried independently; the result maps each requested
+    setting to "ok" or the reason it was refused (usually missing
+    CAP_SYS_NICE / CAP_IPC_LOCK or RLIMIT_RTPRIO / RLIMIT_MEMLOCK), so an
+    unprivileged run keeps going with default scheduling.
+    """
+    results = {}
+    if not settings.requested:
+        return results
+    if not sys.platform.startswith("linux"):
+        return {"platform": f"unsupported on {sys.platform}"}
+
+    # Linux scheduling attributes are per thread; address this one by TID
+    tid = threading.get_native_id()
+    if settings.cpus:
+        try:
+            os.sched_setaffinity(tid, settings.cpus)
+            results["affinity"] = "ok"
+        except (OSError, ValueError) as e:
+            results["affinity"] = str(e)
+    if settings.nice is not None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, tid, settings.nice)
+            results["nice"] = "ok"
+        except OSError as e:
+            results["nice"] = str(e)
+    if settings.priority is not None:
+        try:
+            os.sched_setscheduler(tid, os.SCHED_FIFO, os.sched_param(settings.priority))
+            results["sched_fifo"] = "ok"
+        except (OSError, ValueError) as e:
+            results["sched_fifo"] = str(e)
+    if settings.lock_memory:
+        results["mlock"] = _lock_memory()
+    return results
+
+
+def realtime_from_dict(raw: Optional[Dict]) -> Optional[RealtimeSettings]:
+    """Build realtime settings from their JSON description"""
+    if not raw:
+        return None
+    priority = raw.get("priority")
+    nice = raw.get("nice")
+    return RealtimeSettings(
+        priority=None if priority is None else int(priority),
+        nice=None if nice is None else int(nice),
+        cpus=[int(cpu) for cpu in raw.get("cpus", [])],
+        lock_memory=bool(raw.get("lock_memory", False)),
+    )
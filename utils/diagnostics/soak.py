@@ -0,0 +1,252 @@
+import gc
+import os
+import struct
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+import numpy as np
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is missing)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def object_counts() -> Dict[str, int]:
+    """Live gc-tracked objects per type name"""
+    return dict(Counter(type(o).__name__ for o in gc.get_objects()))
+
+
+def synthetic_stream(seconds: float, rate: float, seed: int = 0) -> bytes:
+    """Interleaved arc (0xA0, <u4) and short-circuit (0xB0, u1 + <u4) packets
+
+    ``rate`` is packets per second of each type; the arc level has short
+    bursts now and then so detectors and plots see realistic activity.
+    """
+    rng = np.random.default_rng(seed)
+    count = max(1, int(seconds * rate))
+    arc = rng.integers(100, 300, count)
+    for start in rng.integers(0, max(1, count - 40), max(1, count // 2000)):
+        arc[start : start + 40] += 800
+    current = 1000 + (200 * np.sin(np.arange(count) * 0.1)).astype(np.int64)
+    stream = bytearray()
+    for level, amps in zip(arc.tolist(), current.tolist()):
+        stream += struct.pack("<BI", 0xA0, level)
+        stream += struct.pack("<BBI", 0xB0, 1, amps)
+    return bytes(stream)
+
+
+class SyntheticSource:
+    """Feed a transport with a repeating synthetic stream at a fixed rate
+
+    The stream (one second of packets) is generated once and fed in slices
+    every ``tick`` seconds, catching up after late ticks, so the source
+    itself neither allocates nor drifts over a long run.
+    """
+
+    def __init__(self, transport, rate: float = 1000.0, tick: float = 0.005):
+        self.transport = transport
+        self.tick = tick
+        self.stream = synthetic_stream(1.0, rate)
+        self.bytes_per_second = len(self.stream)
+        self.stats = {"bytes": 0}
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="soak-source", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+    def _run(self):
+        started = time.monotonic()
+        position = 0
+        stream = self.stream
+        while self._running:
+            due = int((time.monotonic() - started) * self.bytes_per_second)
+            while self.stats["bytes"] < due:
+                size = min(due - self.stats["bytes"], len(stream) - position)
+                self.transport.feed(stream[position : position + size])
+                position = (position + size) % len(stream)
+                self.stats["bytes"] += size
+            time.sleep(self.tick)
+
+
+@dataclass
+class SoakThresholds:
+    """Limits that fail a soak run
+
+    Growth is the least-squares trend of the samples after the warm-up,
+    extrapolated over the observed span, so noise does not trip it.
+    """
+
+    warmup: float = 60.0
+    max_rss_growth_mb: float = 50.0
+    max_object_growth: int = 10000  # Per type
+    max_queue_depth: int = 1000
+    max_p99_latency: float = 0.1
+    max_latency_regression: float = 2.0  # Final p99 over the baseline p99
+    regression_floor: float = 0.002  # p99 below this never counts as regressed
+
+
+@dataclass
+class SoakSample:
+    """One measurement of the process under soak"""
+
+    elapsed: float
+    rss_bytes: int
+    objects: Dict[str, int]
+    queue_depths: Dict[str, int]
+    latency: Dict[str, float]
+    packets: int
+    dropped: int
+    desync_bytes: int
+
+
+def _trend(times: Sequence[float], values: Sequence[float]) -> float:
+    """Least-squares growth over the span of ``times``"""
+    if len(times) < 2 or times[-1] == times[0]:
+        return 0.0
+    slope = np.polyfit(np.asarray(times), np.asarray(values, dtype=np.float64), 1)[0]
+    return float(slope * (times[-1] - times[0]))
+
+
+class SoakMonitor:
+    """Sample a SerialReader under load and judge the run against thresholds
+
+    ``queues`` adds depth callbacks for queues outside the reader, e.g. a
+    consumer's backlog. Object counts are taken for the ``top_types`` most
+    numerous types of each sample, plus the types that were on top at the
+    first sample after the warm-up, so those are counted throughout.
+    """
+
+    def __init__(
+        self,
+        reader,
+        thresholds: Optional[SoakThresholds] = None,
+        queues: Optional[Dict[str, Callable[[], int]]] = None,
+        top_types: int = 25,
+    ):
+        self.reader = reader
+        self.thresholds = thresholds or SoakThresholds()
+        self.queues = dict(queues or {})
+        self.top_types = top_types
+        self.samples: List[SoakSample] = []
+        self._tracked: Optional[List[str]] = None  # Types chosen after warm-up
+        self._started = time.monotonic()
+
+    def sample(self) -> SoakSample:
+        """Take one sample now"""
+        health = self.reader.get_health_metrics()
+        depths = {
+            f"0x{header:02X}": queue["depth"]
+            for header, queue in health["queues"].items()
+        }
+        for target, stats in health.get("executors", {}).items():
+            depths[f"executor:{target}"] = stats["backlog"]
+        for name, depth in self.queues.items():
+            depths[name] = int(depth())
+        stats = health["packet_stats"].values()
+        counts = object_counts()
+        top = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+        objects = dict(top[: self.top_types])
+        elapsed = time.monotonic() - self._started
+        if self._tracked is None and elapsed >= self.thresholds.warmup:
+            self._tracked = list(objects)
+        for name in self._tracked or []:
+            objects[name] = counts.get(name, 0)
+        sample = SoakSample(
+            elapsed=elapsed,
+            rss_bytes=rss_bytes(),
+            objects=objects,
+            queue_depths=depths,
+            latency={
+                f"p{int(q * 100)}": value
+                for q, value in health["dispatch_latency"].quantiles().items()
+            },
+            packets=sum(s["count"] for s in stats),
+            dropped=sum(s.get("dropped", 0) for s in stats),
+            desync_bytes=health["worker"]["desync_bytes"],
+        )
+        self.samples.append(sample)
+        return sample
+
+    def _steady(self) -> List[SoakSample]:
+        steady = [s for s in self.samples if s.elapsed >= self.thresholds.warmup]
+        return steady if len(steady) >= 2 else []
+
+    def failures(self) -> List[str]:
+        """Threshold violations so far (empty when the run is healthy)"""
+        limits = self.thresholds
+        problems = []
+        deepest: Dict[str, int] = {}
+        for sample in self.samples:
+            for name, depth in sample.queue_depths.items():
+                deepest[name] = max(depth, deepest.get(name, 0))
+        for name, depth in deepest.items():
+            if depth > limits.max_queue_depth:
+                problems.append(
+                    f"queue {name} reached {depth} (limit {limits.max_queue_depth})"
+                )
+        steady = self._steady()
+        if not steady:
+            return problems
+
+        times = [s.elapsed for s in steady]
+        growth = _trend(times, [s.rss_bytes for s in steady]) / 1e6
+        if growth > limits.max_rss_growth_mb:
+            problems.append(
+                f"RSS grew {growth:.1f} MB (limit {limits.max_rss_growth_mb} MB)"
+            )
+        for name in steady[-1].objects:
+            # A type missing from a sample was not counted, not absent
+            counted = [s for s in steady if name in s.objects]
+            growth = _trend(
+                [s.elapsed for s in counted], [s.objects[name] for s in counted]
+            )
+            if growth > limits.max_object_growth:
+                problems.append(
+                    f"{name} objects grew by {growth:.0f} "
+                    f"(limit {limits.max_object_growth})"
+                )
+        baseline, final = steady[0].latency["p99"], steady[-1].latency["p99"]
+        if final > limits.max_p99_latency:
+            problems.append(
+                f"p99 dispatch latency {final * 1000:.1f} ms "
+                f"(limit {limits.max_p99_latency * 1000:.1f} ms)"
+            )
+        if (
+            final > limits.regression_floor
+            and final > baseline * limits.max_latency_regression
+        ):
+            problems.append(
+                f"p99 dispatch latency rose from {baseline * 1000:.2f} ms to "
+                f"{final * 1000:.2f} ms (limit x{limits.max_latency_regression})"
+            )
+        return problems
+
+    def report(self) -> Dict:
+        """Thresholds, samples and verdict as a JSON-serialisable dict"""
+        problems = self.failures()
+        return {
+            "passed": not problems,
+            "failures": problems,
+            "thresholds": asdict(self.thresholds),
+            "samples": [asdict(s) for s in self.samples],
+        }
@@ -0,0 +1,171 @@
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Log-spaced bucket upper bounds from 1 us to ~10 s, four per decade
+_BUCKETS_PER_DECADE = 4
+_MIN_EXPONENT = -6
+_BUCKET_COUNT = 7 * _BUCKETS_PER_DECADE + 1
+BUCKET_BOUNDS = [
+    10 ** (_MIN_EXPONENT + i / _BUCKETS_PER_DECADE) for i in range(_BUCKET_COUNT)
+]
+
+
+def _bucket_index(seconds: float) -> int:
+    """Index of the first bucket whose bound is >= seconds"""
+    if seconds <= BUCKET_BOUNDS[0]:
+        return 0
+    index = math.ceil((math.log10(seconds) - _MIN_EXPONENT) * _BUCKETS_PER_DECADE)
+    return min(index, _BUCKET_COUNT - 1)
+
+
+class RollingHistogram:
+    """Log-bucket timing histogram over a sliding window of time slots
+
+    The window is split into ``slots`` of ``slot_seconds``; old slots are
+    recycled, so memory is constant and statistics reflect recent behaviour.
+    """
+
+    def __init__(self, slots: int = 10, slot_seconds: float = 1.0):
+        self.slot_seconds = slot_seconds
+        self._counts = [[0] * _BUCKET_COUNT for _ in range(slots)]
+        self._sums = [0.0] * slots
+        self._maxima = [0.0] * slots
+        self._slot_ids = [-1] * slots
+
+    def _slot(self, now: float) -> int:
+        slot_id = int(now / self.slot_seconds)
+        index = slot_id % len(self._slot_ids)
+        if self._slot_ids[index] != slot_id:
+            self._slot_ids[index] = slot_id
+            self._counts[index] = [0] * _BUCKET_COUNT
+            self._sums[index] = 0.0
+            self._maxima[index] = 0.0
+        return index
+
+    def observe(self, seconds: float, now: Optional[float] = None):
+        """Record one duration"""
+        index = self._slot(time.monotonic() if now is None else now)
+        self._counts[index][_bucket_index(seconds)] += 1
+        self._sums[index] += seconds
+        if seconds > self._maxima[index]:
+            self._maxima[index] = seconds
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, float]:
+        """Count, rate, mean, p50/p90/p99 and max over the window"""
+        now = time.monotonic() if now is None else now
+        current = int(now / self.slot_seconds)
+        oldest = current - len(self._slot_ids) + 1
+        counts = [0] * _BUCKET_COUNT
+        total = 0.0
+        maximum = 0.0
+        for index, slot_id in enumerate(self._slot_ids):
+            if slot_id < oldest:
+                continue
+            for bucket, count in enumerate(self._counts[index]):
+                counts[bucket] += count
+            total += self._sums[index]
+            maximum = max(maximum, self._maxima[index])
+
+        count = sum(counts)
+        window = len(self._slot_ids) * self.slot_seconds
+        result = {
+            "count": count,
+            "rate": count / window,
+            "total": total,
+            "mean": total / count if count else 0.0,
+            "max": maximum,
+        }
+        for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            # Bucket bounds can overshoot the largest observed value
+            result[name] = min(self._quantile(counts, count, q), maximum)
+        return result
+
+    @staticmethod
+    def _quantile(counts: List[int], total: int, q: float) -> float:
+        """Upper bound of the bucket containing the quantile"""
+        if not total:
+            return 0.0
+        target = q * total
+        running = 0
+        for bucket, count in enumerate(counts):
+            running += count
+            if running >= target:
+                return BUCKET_BOUNDS[bucket]
+        return BUCKET_BOUNDS[-1]
+
+
+class StageTimings:
+    """Registry of per-stage timing histograms
+
+    Instrumented code checks ``enabled`` before reading the clock, so a
+    disabled registry costs one attribute lookup per instrumentation point:
+
+        started = time.perf_counter() if TIMINGS.enabled else 0.0
+        ...
+        if started:
+            TIMINGS.record("stage", time.perf_counter() - started)
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._stages: Dict[str, RollingHistogram] = {}
+        self._busy: Dict[str, RollingHistogram] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, table: Dict[str, RollingHistogram], name: str):
+        histogram = table.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(name, RollingHistogram())
+        return histogram
+
+    def record(self, stage: str, seconds: float):
+        """Record the duration of one pass through a stage"""
+        self._histogram(self._stages, stage).observe(seconds)
+
+    def record_busy(self, thread: str, seconds: float):
+        """Record time a thread spent working rather than waiting"""
+        self._histogram(self._busy, thread).observe(seconds)
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Context manager timing a block (for code off the hot path)"""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Statistics of every stage"""
+        with self._lock:
+            stages = list(self._stages.items())
+        return {name: histogram.snapshot() for name, histogram in stages}
+
+    def utilization(self) -> Dict[str, float]:
+        """Busy fraction of every instrumented thread over the window"""
+        with self._lock:
+            threads = list(self._busy.items())
+        result = {}
+        for name, histogram in threads:
+            stats = histogram.snapshot()
+            window = len(histogram._slot_ids) * histogram.slot_seconds
+            result[name] = min(1.0, stats["total"] / window)
+        return result
+
+    def reset(self):
+        """Forget all recorded timings"""
+        with self._lock:
+            self._stages.clear()
+            self._busy.clear()
+
+
+# Process-wide registry; set MR_TIMING=1 to enable at startup
+TIMINGS = StageTimings(enabled=os.environ.get("MR_TIMING", "") not in ("", "0"))
@@ -0,0 +1,169 @@
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+
+# Integer fields up to this many bits get a full-range lookup table
+MAX_TABLE_BITS = 16
+
+
+class TemperatureCompensation:
+    """Linear temperature correction of calibrated values
+
+    ``value * (1 + gain_coefficient * dT) + offset_coefficient * dT`` with
+    ``dT = T - reference``. The temperature comes per sample from ``field``
+    of the same packet, or, when ``header`` names another packet type, from
+    ``temperature``, which the owner updates from that packet's ``field``.
+    """
+
+    def __init__(
+        self,
+        reference: float = 25.0,
+        gain_coefficient: float = 0.0,
+        offset_coefficient: float = 0.0,
+        field: Optional[str] = None,
+        header: Optional[int] = None,
+    ):
+        self.reference = reference
+        self.gain_coefficient = gain_coefficient
+        self.offset_coefficient = offset_coefficient
+        self.field = field
+        self.header = header
+        self.temperature: Optional[float] = None
+
+    def apply(self, values: np.ndarray, temperature=None) -> np.ndarray:
+        """Correct ``values`` in place for ``temperature`` (array or scalar)"""
+        if temperature is None:
+            temperature = self.temperature
+        if temperature is None:
+            return values
+        delta = np.asarray(temperature, dtype=np.float64) - self.reference
+        if self.gain_coefficient:
+            values *= 1.0 + self.gain_coefficient * delta
+        if self.offset_coefficient:
+            values += self.offset_coefficient * delta
+        return values
+
+
+class Calibration:
+    """Conversion of raw counts of one field to physical units
+
+    Subclasses implement ``convert``; curves that are expensive per sample
+    are turned into a lookup table over every possible raw value by
+    ``prepare`` when the field is a small integer type.
+    """
+
+    def __init__(
+        self, units: str = "", compensation: Optional[TemperatureCompensation] = None
+    ):
+        self.units = units
+        self.compensation = compensation
+        self._table: Optional[np.ndarray] = None
+        self._table_start = 0
+
+    def convert(self, raw: np.ndarray) -> np.ndarray:
+        """Physical values of raw counts as a new float64 array"""
+        raise NotImplementedError
+
+    def prepare(self, dtype):
+        """Precompute a lookup table for all values of an integer ``dtype``"""
+        dtype = np.dtype(dtype)
+        if dtype.kind not in "iu" or dtype.itemsize * 8 > MAX_TABLE_BITS:
+            self._table = None
+            return
+        info = np.iinfo(dtype)
+        self._table_start = int(info.min)
+        self._table = self.convert(np.arange(info.min, info.max + 1, dtype=np.int64))
+
+    def apply(self, raw: np.ndarray, temperature=None) -> np.ndarray:
+        """Calibrated, temperature-compensated values of a batch of raw counts"""
+        if self._table is not None and raw.dtype.kind in "iu":
+            index = (
+                raw
+                if self._table_start == 0
+                else raw.astype(np.int64) - self._table_start
+            )
+            values = self._table[index]
+        else:
+            values = self.convert(raw)
+        if self.compensation is not None:
+            values = self.compensation.apply(values, temperature)
+        return values
+
+
+class LinearCalibration(Calibration):
+    """``gain * raw + offset``"""
+
+    def __init__(self, gain: float = 1.0, offset: float = 0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.gain = gain
+        self.offset = offset
+
+    def convert(self, raw: np.ndarray) -> np.ndarray:
+        values = raw.astype(np.float64)
+        if self.gain != 1.0:
+            values *= self.gain
+        if self.offset:
+            values += self.offset
+        return values
+
+    def prepare(self, dtype):
+        # Multiply-add is as fast as a table lookup
+        self._table = None
+
+
+class PiecewiseLinearCalibration(Calibration):
+    """Linear interpolation between (raw, physical) points, clamped at the ends"""
+
+    def __init__(self, points: Sequence[Tuple[float, float]], **kwargs):
+        super().__init__(**kwargs)
+        points = sorted(points)
+        if len(points) < 2:
+            raise ValueError("A piecewise-linear calibration needs two points")
+        self.raw_points = np.array([p[0] for p in points], dtype=np.float64)
+        self.values = np.array([p[1] for p in points], dtype=np.float64)
+
+    def convert(self, raw: np.ndarray) -> np.ndarray:
+        return np.interp(raw, self.raw_points, self.values)
+
+
+class LookupTableCalibration(Calibration):
+    """Physical value per raw count from a table, starting at ``raw_min``"""
+
+    def __init__(self, table: Sequence[float], raw_min: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.table = np.asarray(table, dtype=np.float64)
+        if len(self.table) == 0:
+            raise ValueError("Lookup table is empty")
+        self.raw_min = raw_min
+
+    def convert(self, raw: np.ndarray) -> np.ndarray:
+        index = np.clip(raw.astype(np.int64) - self.raw_min, 0, len(self.table) - 1)
+        return self.table[index]
+
+
+def calibration_from_dict(raw: Optional[Dict]) -> Optional[Calibration]:
+    """Build a calibration from its JSON description"""
+    if not raw:
+        return None
+    compensation = None
+    if raw.get("temperature"):
+        temp = raw["temperature"]
+        header = temp.get("header")
+        compensation = TemperatureCompensation(
+            reference=float(temp.get("reference", 25.0)),
+            gain_coefficient=float(temp.get("gain_coefficient", 0.0)),
+            offset_coefficient=float(temp.get("offset_coefficient", 0.0)),
+            field=temp.get("field"),
+            header=int(header, 0) if isinstance(header, str) else header,
+        )
+    common = {"units": raw.get("units", ""), "compensation": compensation}
+    kind = raw.get("type", "linear")
+    if kind == "linear":
+        return LinearCalibration(
+            float(raw.get("gain", 1.0)), float(raw.get("offset", 0.0)), **common
+        )
+    if kind == "piecewise":
+        return PiecewiseLinearCalibration(raw["points"], **common)
+    if kind == "table":
+        table = raw["table"] if "table" in raw else np.load(raw["path"])
+        return LookupTableCalibration(table, int(raw.get("raw_min", 0)), **common)
+    raise ValueError(f"Unknown calibration type '{kind}'")
@@ -0,0 +1,350 @@
+import math
+import time
+from typing import Dict, Iterable, Optional, Sequence
+import numpy as np
+from utils.diagnostics.timing import TIMINGS
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# Least ratio of largest to smallest magnitude a bucket store must span
+MIN_DYNAMIC_RANGE = 100.0
+
+
+def _check_accuracy(relative_accuracy: float, max_buckets: int):
+    """Reject sketch settings that are invalid or cover too little range"""
+    if not 0 < relative_accuracy < 1:
+        raise ValueError("relative_accuracy must lie between 0 and 1")
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    needed = math.ceil(math.log(MIN_DYNAMIC_RANGE) / math.log(gamma))
+    if max_buckets < needed:
+        raise ValueError(
+            f"max_buckets {max_buckets} spans only a factor of "
+            f"{gamma ** max_buckets:.3g}; at relative_accuracy "
+            f"{relative_accuracy} at least {needed} are needed"
+        )
+
+
+class _BucketStore:
+    """Dense counts of consecutive bucket keys, at most ``max_buckets`` wide
+
+    When new keys would widen the range beyond the limit, the lowest keys
+    are folded into the lowest bucket kept.
+    """
+
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.offset = 0  # Key of counts[0]
+
+    def add(self, keys: np.ndarray):
+        """Count one value per key"""
+        if len(keys) == 0:
+            return
+        self._cover(int(keys.min()), int(keys.max()))
+        keys = np.maximum(keys, self.offset) - self.offset
+        self.counts += np.bincount(keys, minlength=len(self.counts))
+
+    def merge(self, other: "_BucketStore"):
+        """Add the counts of another store"""
+        if len(other.counts) == 0:
+            return
+        self._cover(other.offset, other.offset + len(other.counts) - 1)
+        keys = np.arange(other.offset, other.offset + len(other.counts))
+        np.add.at(
+            self.counts, np.maximum(keys, self.offset) - self.offset, other.counts
+        )
+
+    def keys(self) -> np.ndarray:
+        return np.arange(self.offset, self.offset + len(self.counts))
+
+    def _cover(self, low: int, high: int):
+        """Grow the key range to include [low, high], folding the lowest keys"""
+        size = len(self.counts)
+        if size:
+            if low >= self.offset and high < self.offset + size:
+                return
+            low, high = min(low, self.offset), max(high, self.offset + size - 1)
+        low = max(low, high - self.max_buckets + 1)
+        counts = np.zeros(high - low + 1, dtype=np.int64)
+        if size:
+            cut = low - self.offset
+            if cut > 0:
+                counts[0] = self.counts[:cut].sum()
+                kept = self.counts[cut:]
+                counts[: len(kept)] += kept
+            else:
+                counts[-cut : -cut + size] = self.counts
+        self.counts, self.offset = counts, low
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative error and bounded memory
+
+    Values are counted in logarithmic buckets growing by ``gamma = (1 + a) /
+    (1 - a)``, so every quantile is answered within relative error ``a`` of
+    a value of the stream. Positive and negative magnitudes have a store of
+    at most ``max_buckets`` buckets each, which spans magnitudes within a
+    factor ``dynamic_range = gamma ** max_buckets`` of the largest one seen
+    (about 6e17 with the defaults, only 170 with 256 buckets at 1%).
+    Smaller magnitudes are folded into the lowest bucket and read back as
+    that bucket's value, so quantiles falling there are overestimated.
+    Settings spanning less than ``MIN_DYNAMIC_RANGE`` are rejected. Values
+    smaller than ``min_value`` count as zero. Sketches of equal accuracy
+    merge by adding their bucket counts.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        max_buckets: int = 2048,
+        min_value: float = 1e-9,
+    ):
+        _check_accuracy(relative_accuracy, max_buckets)
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.reset()
+
+    def reset(self):
+        """Forget all values"""
+        self.positive = _BucketStore(self.max_buckets)
+        self.negative = _BucketStore(self.max_buckets)
+        self.zeros = 0
+        self.count = 0
+
+    def _keys(self, magnitudes: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def _values(self, keys: np.ndarray) -> np.ndarray:
+        return 2.0 * np.power(self.gamma, keys.astype(np.float64)) / (self.gamma + 1)
+
+    def update(self, values: np.ndarray):
+        """Add a batch of finite values"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        positive = values[values >= self.min_value]
+        negative = -values[values <= -self.min_value]
+        self.positive.add(self._keys(positive))
+        self.negative.add(self._keys(negative))
+        self.zeros += len(values) - len(positive) - len(negative)
+        self.count += len(values)
+
+    def merge(self, other: "QuantileSketch"):
+        """Add the values counted by another sketch of the same accuracy"""
+        if other.gamma != self.gamma:
+            raise ValueError("Only sketches of equal accuracy can be merged")
+        self.positive.merge(other.positive)
+        self.negative.merge(other.negative)
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def quantiles(self, qs: Iterable[float] = DEFAULT_QUANTILES) -> Dict[float, float]:
+        """Estimated quantiles (nan when empty)"""
+        qs = tuple(qs)
+        if self.count == 0:
+            return {q: math.nan for q in qs}
+        # All buckets in ascending value order: negatives by falling magnitude
+        values = np.concatenate(
+            (
+                -self._values(self.negative.keys())[::-1],
+                [0.0],
+                self._values(self.positive.keys()),
+            )
+        )
+        counts = np.concatenate(
+            (self.negative.counts[::-1], [self.zeros], self.positive.counts)
+        )
+        ranks = np.clip(np.asarray(qs, dtype=np.float64), 0.0, 1.0) * (self.count - 1)
+        index = np.searchsorted(np.cumsum(counts), ranks, side="right")
+        return {q: float(v) for q, v in zip(qs, values[index])}
+
+    def quantile(self, q: float) -> float:
+        """Estimated quantile ``q`` (0..1)"""
+        return self.quantiles((q,))[q]
+
+    @property
+    def dynamic_range(self) -> float:
+        """Ratio of largest to smallest magnitude one store keeps apart"""
+        return self.gamma**self.max_buckets
+
+    @property
+    def buckets(self) -> int:
+        """Buckets held, bounded by twice ``max_buckets``"""
+        return len(self.positive.counts) + len(self.negative.counts)
+
+
+class RunningStats:
+    """Count, extremes, mean, variance and quantiles of one channel
+
+    Mean and variance are updated a batch at a time with Welford's
+    combination of partial results (Chan et al.), numerically stable over
+    long windows; quantiles come from a QuantileSketch, so the memory of a
+    channel does not grow with the number of samples.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.sketch = QuantileSketch(relative_accuracy, max_buckets)
+        self.reset()
+
+    def reset(self):
+        """Forget all samples"""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch.reset()
+
+    def update(self, values: np.ndarray):
+        """Add a batch of samples; non-finite values are ignored"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        mean = float(values.mean())
+        m2 = float(np.square(values - mean).sum())
+        self._combine(len(values), mean, m2)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sketch.update(values)
+
+    def merge(self, other: "RunningStats"):
+        """Add the samples summarised by another RunningStats"""
+        if other.count == 0:
+            return
+        self._combine(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    def _combine(self, count: int, mean: float, m2: float):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    @property
+    def variance(self) -> float:
+        """Population variance (0.0 when empty)"""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def snapshot(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, float]:
+        """Current statistics, quantiles keyed as ``p50``, ``p99`` etc."""
+        empty = self.count == 0
+        result = {
+            "count": self.count,
+            "min": math.nan if empty else self.min,
+            "max": math.nan if empty else self.max,
+            "mean": math.nan if empty else self.mean,
+            "std": math.nan if empty else self.std,
+        }
+        for q, value in self.sketch.quantiles(qs).items():
+            # Bucket values may overshoot the extremes by the relative error
+            result[_quantile_name(q)] = (
+                value if empty else min(max(value, self.min), self.max)
+            )
+        return result
+
+
+def _quantile_name(q: float) -> str:
+    return f"p{q * 100:g}".replace(".", "_")
+
+
+class ChannelStatistics:
+    """Running statistics of the decoded channels of one packet stream
+
+    Every channel keeps a RunningStats for the current window. A window
+    ends on ``reset()`` (e.g. at a shift change) or, with ``window`` set,
+    automatically once it is that many seconds old; the snapshot of the
+    window just closed is kept in ``previous``. ``channels`` limits the
+    statistics to the named fields, otherwise every field seen is tracked.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        channels: Optional[Sequence[str]] = None,
+        window: Optional[float] = None,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES,
+        relative_accuracy: float = 0.01,
+        max_buckets: int = 2048,
+    ):
+        if any(not 0 <= q <= 1 for q in quantiles):
+            raise ValueError("Quantiles must lie between 0 and 1")
+        _check_accuracy(relative_accuracy, max_buckets)
+        self.name = name
+        self.window = window
+        self.quantiles = tuple(quantiles)
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.channels: Dict[str, RunningStats] = {}
+        self._fixed = channels is not None
+        for channel in channels or []:
+            self._channel(channel)
+        self.started = time.time()
+        self.previous: Optional[Dict] = None
+
+    def _channel(self, name: str) -> RunningStats:
+        stats = self.channels.get(name)
+        if stats is None:
+            stats = RunningStats(self.relative_accuracy, self.max_buckets)
+            self.channels[name] = stats
+        return stats
+
+    def update(self, fields: Dict[str, np.ndarray], now: Optional[float] = None):
+        """Add a decoded batch, starting a new window first when one is due"""
+        now = time.time() if now is None else now
+        if self.window and now - self.started >= self.window:
+            self.reset(now)
+        started = time.perf_counter()
+        for field, values in fields.items():
+            if self._fixed and field not in self.channels:
+                continue
+            self._channel(field).update(values)
+        if TIMINGS.enabled:
+            TIMINGS.record(f"stats:{self.name}", time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Statistics of every channel in the current window"""
+        return {
+            name: stats.snapshot(self.quantiles)
+            for name, stats in self.channels.items()
+        }
+
+    def reset(self, now: Optional[float] = None) -> Dict:
+        """Close the current window; returns (and keeps) its snapshot"""
+        now = time.time() if now is None else now
+        self.previous = {
+            "start": self.started,
+            "end": now,
+            "channels": self.snapshot(),
+        }
+        for stats in self.channels.values():
+            stats.reset()
+        self.started = now
+        return self.previous
+
+
+def statistics_from_dict(
+    raw: Optional[Dict], name: str = ""
+) -> Optional[ChannelStatistics]:
+    """Build channel statistics from their JSON description"""
+    if not raw:
+        return None
+    window = raw.get("window")
+    return ChannelStatistics(
+        name=name,
+        channels=raw.get("channels"),
+        window=None if window is None else float(window),
+        quantiles=[float(q) for q in raw.get("quantiles", DEFAULT_QUANTILES)],
+        relative_accuracy=float(raw.get("relative_accuracy", 0.01)),
+        max_buckets=int(raw.get("max_buckets", 2048)),
+    )
@@ -0,0 +1,335 @@
+import math
+import time
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.diagnostics.timing import TIMINGS
+
+
+def fir_lowpass(
+    num_taps: int, cutoff: float, sample_rate: float = 1.0, window: str = "hamming"
+) -> np.ndarray:
+    """Windowed-sinc low-pass FIR taps with unit gain at DC"""
+    if num_taps < 1:
+        raise ValueError("num_taps must be positive")
+    if not 0 < cutoff < sample_rate / 2:
+        raise ValueError("cutoff must lie between 0 and the Nyquist frequency")
+    fc = cutoff / sample_rate
+    n = np.arange(num_taps) - (num_taps - 1) / 2.0
+    taps = 2 * fc * np.sinc(2 * fc * n)
+    windows = {"hamming": np.hamming, "hann": np.hanning, "blackman": np.blackman}
+    if window not in windows:
+        raise ValueError(f"Unknown window '{window}'")
+    taps *= windows[window](num_taps)
+    return taps / taps.sum()
+
+
+def butterworth_sos(
+    order: int, cutoff: float, sample_rate: float = 1.0, btype: str = "lowpass"
+) -> np.ndarray:
+    """Digital Butterworth filter as second-order sections (bilinear transform)
+
+    Rows are ``[b0, b1, b2, 1, a1, a2]``; an odd order ends with a
+    first-order section.
+    """
+    if order < 1:
+        raise ValueError("order must be positive")
+    if not 0 < cutoff < sample_rate / 2:
+        raise ValueError("cutoff must lie between 0 and the Nyquist frequency")
+    if btype not in ("lowpass", "highpass"):
+        raise ValueError(f"Unknown filter type '{btype}'")
+    k = 2.0 * sample_rate
+    wc = k * math.tan(math.pi * cutoff / sample_rate)  # Pre-warped cutoff
+    sections = []
+    for i in range(order // 2):
+        # Conjugate analog pole pair on the unit circle
+        real = -math.sin(math.pi * (2 * i + 1) / (2 * order)) * wc
+        a0 = k * k - 2 * real * k + wc * wc
+        a1 = 2 * wc * wc - 2 * k * k
+        a2 = k * k + 2 * real * k + wc * wc
+        if btype == "lowpass":
+            b = [wc * wc, 2 * wc * wc, wc * wc]
+        else:
+            b = [k * k, -2 * k * k, k * k]
+        sections.append([b[0] / a0, b[1] / a0, b[2] / a0, 1.0, a1 / a0, a2 / a0])
+    if order % 2:
+        a0 = k + wc
+        b = [wc, wc] if btype == "lowpass" else [k, -k]
+        sections.append([b[0] / a0, b[1] / a0, 0.0, 1.0, (wc - k) / a0, 0.0])
+    return np.array(sections)
+
+
+class StreamFilter:
+    """Filter processing a sample stream block by block
+
+    State is carried between calls, so splitting a stream into blocks does
+    not change the output. Decimating filters return fewer samples and set
+    ``last_indices`` to the input indices the outputs belong to.
+    """
+
+    factor = 1
+
+    def __init__(self):
+        self.last_indices: Optional[np.ndarray] = None
+
+    def process(self, samples) -> np.ndarray:
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+
+class FIRFilter(StreamFilter):
+    """Causal FIR filter"""
+
+    def __init__(self, taps: Sequence[float]):
+        super().__init__()
+        self.taps = np.asarray(taps, dtype=np.float64)
+        if self.taps.ndim != 1 or len(self.taps) == 0:
+            raise ValueError("FIR taps must be a non-empty 1-D sequence")
+        self.reset()
+
+    def process(self, samples) -> np.ndarray:
+        samples = np.asarray(samples, dtype=np.float64)
+        if len(self.taps) == 1:
+            return samples * self.taps[0]
+        extended = np.concatenate((self._history, samples))
+        self._history = extended[len(samples) :].copy()
+        return np.convolve(extended, self.taps, mode="valid")
+
+    def reset(self):
+        self._history = np.zeros(len(self.taps) - 1)
+
+
+class BiquadFilter(StreamFilter):
+    """One second-order IIR section, evaluated block-wise
+
+    Uses the state-space form of transposed direct form II. Within a
+    sub-block of ``BLOCK`` samples the output is the forced response (a
+    lower-triangular Toeplitz matrix product) plus the response to the
+    state at the start of the sub-block, so whole batches are matrix
+    products and only the 2-element state is carried from one sub-block
+    to the next in Python.
+    """
+
+    BLOCK = 64
+
+    def __init__(self, section: Sequence[float]):
+        super().__init__()
+        b0, b1, b2, a0, a1, a2 = (float(c) for c in section)
+        if a0 == 0:
+            raise ValueError("a0 must not be zero")
+        b0, b1, b2, a1, a2 = b0 / a0, b1 / a0, b2 / a0, a1 / a0, a2 / a0
+        self.section = (b0, b1, b2, 1.0, a1, a2)
+
+        a = np.array([[-a1, 1.0], [-a2, 0.0]])
+        b = np.array([b1 - a1 * b0, b2 - a2 * b0])
+        length = self.BLOCK
+        powers = np.empty((length + 1, 2, 2))
+        powers[0] = np.eye(2)
+        for i in range(1, length + 1):
+            powers[i] = powers[i - 1] @ a
+        # Response of the output to the start state, and of the state to input
+        self._free = powers[:length, 0, :]  # C A^n, C = [1, 0]
+        self._drive = powers[:length] @ b  # A^n B
+        self._powers = powers
+        impulse = np.concatenate(([b0], self._drive[: length - 1, 0]))
+        rows = np.arange(length)
+        lags = rows[:, None] - rows[None, :]
+        self._forced = np.where(lags >= 0, impulse[np.clip(lags, 0, None)], 0.0)
+        self.reset()
+
+    def _run(self, blocks: np.ndarray, length: int) -> np.ndarray:
+        """Filter full sub-blocks of ``length`` samples, shape (m, length)"""
+        forced = blocks @ self._forced[:length, :length].T
+        drive = blocks @ self._drive[length - 1 :: -1] if length else None
+        step = self._powers[length]
+        s0, s1 = self._state
+        p00, p01, p10, p11 = step[0, 0], step[0, 1], step[1, 0], step[1, 1]
+        starts = np.empty((len(blocks), 2))
+        for i, (d0, d1) in enumerate(drive.tolist()):
+            starts[i, 0] = s0
+            starts[i, 1] = s1
+            s0, s1 = p00 * s0 + p01 * s1 + d0, p10 * s0 + p11 * s1 + d1
+        self._state = (s0, s1)
+        return forced + starts @ self._free[:length].T
+
+    def process(self, samples) -> np.ndarray:
+        samples = np.asarray(samples, dtype=np.float64)
+        full = len(samples) // self.BLOCK * self.BLOCK
+        parts = []
+        if full:
+            blocks = samples[:full].reshape(-1, self.BLOCK)
+            parts.append(self._run(blocks, self.BLOCK).ravel())
+        if full < len(samples):
+            tail = samples[full:]
+            parts.append(self._run(tail[None, :], len(tail)).ravel())
+        return np.concatenate(parts) if parts else samples.copy()
+
+    def reset(self):
+        self._state = (0.0, 0.0)
+
+
+class IIRFilter(StreamFilter):
+    """IIR filter as a cascade of second-order sections"""
+
+    def __init__(self, sos):
+        super().__init__()
+        sos = np.atleast_2d(np.asarray(sos, dtype=np.float64))
+        if sos.shape[1] != 6:
+            raise ValueError("Second-order sections need 6 coefficients per row")
+        self.sections = [BiquadFilter(row) for row in sos]
+
+    def process(self, samples) -> np.ndarray:
+        for section in self.sections:
+            samples = section.process(samples)
+        return np.asarray(samples, dtype=np.float64)
+
+    def reset(self):
+        for section in self.sections:
+            section.reset()
+
+
+class Decimator(StreamFilter):
+    """Anti-aliasing FIR low-pass and downsampling by ``factor``
+
+    Only every ``factor``-th output is computed (the polyphase saving), as
+    one matrix-vector product over strided windows of the input.
+    """
+
+    def __init__(self, factor: int, taps: Optional[Sequence[float]] = None):
+        super().__init__()
+        if factor < 1:
+            raise ValueError("factor must be positive")
+        self.factor = factor
+        if taps is None:
+            taps = fir_lowpass(10 * factor + 1, 0.4 / factor) if factor > 1 else [1.0]
+        self.taps = np.asarray(taps, dtype=np.float64)
+        self._reversed = self.taps[::-1].copy()
+        self.reset()
+
+    def process(self, samples) -> np.ndarray:
+        samples = np.asarray(samples, dtype=np.float64)
+        extended = np.concatenate((self._history, samples))
+        indices = np.arange(self._phase, len(samples), self.factor)
+        self._phase = self._phase + len(indices) * self.factor - len(samples)
+        keep = len(self.taps) - 1
+        self._history = (
+            extended[len(extended) - keep :].copy() if keep else extended[:0]
+        )
+        self.last_indices = indices
+        if len(indices) == 0:
+            return np.empty(0)
+        windows = sliding_window_view(extended, len(self.taps))[indices]
+        return windows @ self._reversed
+
+    def reset(self):
+        self._history = np.zeros(len(self.taps) - 1)
+        self._phase = 0
+
+
+def filter_from_dict(raw: Dict) -> StreamFilter:
+    """Build a filter from its JSON description"""
+    kind = raw.get("type")
+    if kind == "fir":
+        return FIRFilter(raw["taps"])
+    if kind == "fir_lowpass":
+        return FIRFilter(
+            fir_lowpass(
+                int(raw.get("taps", 31)),
+                float(raw["cutoff"]),
+                float(raw.get("sample_rate", 1.0)),
+                raw.get("window", "hamming"),
+            )
+        )
+    if kind == "iir":
+        return IIRFilter(raw["sos"])
+    if kind == "butterworth":
+        return IIRFilter(
+            butterworth_sos(
+                int(raw.get("order", 2)),
+                float(raw["cutoff"]),
+                float(raw.get("sample_rate", 1.0)),
+                raw.get("btype", "lowpass"),
+            )
+        )
+    if kind == "decimate":
+        return Decimator(int(raw["factor"]), raw.get("taps"))
+    raise ValueError(f"Unknown filter type '{kind}'")
+
+
+class FilterChain:
+    """Filters applied one after another to a channel and its timestamps"""
+
+    def __init__(self, filters: Sequence[StreamFilter]):
+        self.filters = list(filters)
+
+    def process(self, timestamps, samples) -> Tuple[np.ndarray, np.ndarray]:
+        for stream_filter in self.filters:
+            samples = stream_filter.process(samples)
+            if stream_filter.factor > 1:
+                timestamps = timestamps[stream_filter.last_indices]
+        return timestamps, samples
+
+    def reset(self):
+        for stream_filter in self.filters:
+            stream_filter.reset()
+
+
+class FilterStage:
+    """Shared filtering of decoded channels of one packet stream
+
+    Each channel filters an input field into an output stream once per
+    batch; every consumer (detectors, publishers, plots) reads the output
+    instead of filtering on its own. CPU time is accounted per channel and,
+    when timing is enabled, recorded as stage ``filter:<name>/<output>``.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.channels: Dict[str, Tuple[str, FilterChain]] = {}
+        self.stats: Dict[str, Dict] = {}
+
+    def add_channel(
+        self,
+        field: str,
+        filters: Sequence[StreamFilter],
+        output: Optional[str] = None,
+    ) -> str:
+        """Filter ``field`` into ``output`` (default ``<field>_filtered``)"""
+        output = output or f"{field}_filtered"
+        self.channels[output] = (field, FilterChain(filters))
+        self.stats[output] = {"samples": 0, "outputs": 0, "seconds": 0.0}
+        return output
+
+    def process(
+        self, timestamps: np.ndarray, fields: Dict[str, np.ndarray]
+    ) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """Filter a decoded batch; returns (timestamps, values) per output"""
+        outputs = {}
+        for output, (field, chain) in self.channels.items():
+            values = fields.get(field)
+            if values is None or len(values) == 0:
+                continue
+            started = time.perf_counter()
+            outputs[output] = chain.process(timestamps, values)
+            elapsed = time.perf_counter() - started
+            stats = self.stats[output]
+            stats["samples"] += len(values)
+            stats["outputs"] += len(outputs[output][1])
+            stats["seconds"] += elapsed
+            if TIMINGS.enabled:
+                TIMINGS.record(f"filter:{self.name}/{output}", elapsed)
+        return outputs
+
+    def cost_per_sample(self) -> Dict[str, float]:
+        """Mean CPU seconds per input sample of each channel"""
+        return {
+            output: stats["seconds"] / stats["samples"] if stats["samples"] else 0.0
+            for output, stats in self.stats.items()
+        }
+
+    def reset(self):
+        """Clear the filter state of every channel"""
+        for _, chain in self.channels.values():
+            chain.reset()
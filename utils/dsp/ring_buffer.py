@@ -0,0 +1,62 @@
+from typing import Tuple
+import numpy as np
+
+
+class TimeBaseRingBuffer:
+    """Fixed-size history of timestamps shared by several sample channels
+
+    Channels sampled together share one timestamp ring instead of storing
+    their own copy. Every sample is written twice, at ``i`` and
+    ``i + capacity``, so the most recent samples are always one contiguous
+    slice and reading returns views without copying.
+    """
+
+    def __init__(self, capacity: int, channels: int, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.channels = channels
+        self.count = 0
+        self.total = 0
+        self._write = 0
+        self._times = np.zeros(2 * capacity, dtype=np.float64)
+        self._data = np.zeros((channels, 2 * capacity), dtype=dtype)
+
+    def append(self, timestamps, values):
+        """Append samples; ``values`` has shape (channels, len(timestamps))"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values)
+        count = len(timestamps)
+        if values.shape != (self.channels, count):
+            raise ValueError(
+                f"Expected values of shape {(self.channels, count)}, got {values.shape}"
+            )
+        if count == 0:
+            return
+        self.total += count
+        if count > self.capacity:
+            timestamps = timestamps[-self.capacity :]
+            values = values[:, -self.capacity :]
+            count = self.capacity
+
+        first = min(count, self.capacity - self._write)
+        for offset, stop in ((0, first), (first, count)):
+            if stop == offset:
+                continue
+            start = (self._write + offset) % self.capacity
+            end = start + stop - offset
+            for base in (start, start + self.capacity):
+                self._times[base : base + end - start] = timestamps[offset:stop]
+                self._data[:, base : base + end - start] = values[:, offset:stop]
+        self._write = (self._write + count) % self.capacity
+        self.count = min(self.capacity, self.count + count)
+
+    def latest(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Views of the buffered timestamps and channel data, oldest first"""
+        end = self._write + self.capacity
+        start = end - self.count
+        return self._times[start:end], self._data[:, start:end]
+
+    def clear(self):
+        self.count = 0
+        self._write = 0
@@ -0,0 +1,134 @@
+import inspect
+from typing import Optional
+import numpy as np
+
+# NumPy >= 2.0 can write FFT results into a preallocated array
+_RFFT_HAS_OUT = "out" in inspect.signature(np.fft.rfft).parameters
+
+# Floor of the dB scale, avoids log10(0)
+_MIN_POWER = 1e-20
+
+
+class StreamingSTFT:
+    """Incremental short-time Fourier transform over a sample stream
+
+    Samples are appended in batches of any size; every complete window of
+    ``fft_size`` samples starting on a multiple of ``hop`` becomes one
+    spectrum row. All frames available in a batch are windowed and
+    transformed with a single ``rfft`` call. The input, windowed frame and
+    spectrum buffers are reused between calls and only grow when a batch
+    yields more frames than any batch before it, so steady-state processing
+    does not allocate.
+    """
+
+    def __init__(
+        self,
+        fft_size: int = 256,
+        hop: Optional[int] = None,
+        sample_rate: float = 1.0,
+        window: str = "hann",
+    ):
+        if fft_size < 2:
+            raise ValueError("fft_size must be at least 2")
+        self.fft_size = fft_size
+        self.hop = hop or fft_size // 2
+        if not 0 < self.hop <= fft_size:
+            raise ValueError("hop must be between 1 and fft_size")
+        self.sample_rate = sample_rate
+        self.bins = fft_size // 2 + 1
+        self.window = self._make_window(window, fft_size)
+        # Scale so a full-scale sine reads about 0 dB regardless of window
+        self._scale = 2.0 / self.window.sum()
+
+        self.frames_out = 0
+        self._input = np.zeros(fft_size * 4, dtype=np.float64)
+        self._fill = 0
+        self._frames = np.empty((0, fft_size), dtype=np.float64)
+        self._spectrum = np.empty((0, self.bins), dtype=np.complex128)
+        self._power = np.empty((0, self.bins), dtype=np.float64)
+
+    @staticmethod
+    def _make_window(name: str, size: int) -> np.ndarray:
+        if name == "hann":
+            return np.hanning(size)
+        if name == "hamming":
+            return np.hamming(size)
+        if name == "blackman":
+            return np.blackman(size)
+        if name in ("rect", "boxcar"):
+            return np.ones(size)
+        raise ValueError(f"Unknown window '{name}'")
+
+    @property
+    def frequencies(self) -> np.ndarray:
+        """Centre frequency of each bin in Hz"""
+        return np.fft.rfftfreq(self.fft_size, d=1.0 / self.sample_rate)
+
+    @property
+    def frame_period(self) -> float:
+        """Time between consecutive spectrum rows in seconds"""
+        return self.hop / self.sample_rate
+
+    def reset(self):
+        """Drop buffered samples"""
+        self._fill = 0
+        self.frames_out = 0
+
+    def _reserve(self, samples: int, frames: int):
+        """Grow the reusable buffers if this batch needs more room"""
+        needed = self._fill + samples
+        if needed > len(self._input):
+            grown = np.zeros(max(needed, 2 * len(self._input)), dtype=np.float64)
+            grown[: self._fill] = self._input[: self._fill]
+            self._input = grown
+        if frames > len(self._frames):
+            rows = max(frames, 2 * len(self._frames))
+            self._frames = np.empty((rows, self.fft_size), dtype=np.float64)
+            self._spectrum = np.empty((rows, self.bins), dtype=np.complex128)
+            self._power = np.empty((rows, self.bins), dtype=np.float64)
+
+    def process(self, samples) -> np.ndarray:
+        """Append samples and return the new spectrum rows in dB
+
+        The returned array has shape (frames, bins) and is a view into an
+        internal buffer that is overwritten by the next call; copy it to keep it.
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        available = self._fill + len(samples)
+        frames = 0
+        if available >= self.fft_size:
+            frames = (available - self.fft_size) // self.hop + 1
+        self._reserve(len(samples), frames)
+        self._input[self._fill : available] = samples
+        self._fill = available
+        if frames == 0:
+            return self._power[:0]
+
+        # Strided view of all complete windows, then window them in place
+        windows = np.lib.stride_tricks.sliding_window_view(
+            self._input[: self._fill], self.fft_size
+        )[:: self.hop][:frames]
+        framed = self._frames[:frames]
+        np.multiply(windows, self.window, out=framed)
+
+        spectrum = self._spectrum[:frames]
+        if _RFFT_HAS_OUT:
+            np.fft.rfft(framed, axis=1, out=spectrum)
+        else:
+            spectrum[...] = np.fft.rfft(framed, axis=1)
+
+        power = self._power[:frames]
+        np.abs(spectrum, out=power)
+        power *= self._scale
+        np.square(power, out=power)
+        np.maximum(power, _MIN_POWER, out=power)
+        np.log10(power, out=power)
+        power *= 10.0
+
+        # Keep the samples the next window still needs
+        consumed = frames * self.hop
+        remaining = self._fill - consumed
+        self._input[:remaining] = self._input[consumed : self._fill]
+        self._fill = remaining
+        self.frames_out += frames
+        return power
@@ -0,0 +1,346 @@
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from queue import Queue, Full, Empty
+from typing import Dict, List, Optional, Sequence
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    id INTEGER PRIMARY KEY,
+    device TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    tap_from INTEGER,
+    tap_to INTEGER,
+    capture_path TEXT,
+    capture_time REAL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    operation_id INTEGER REFERENCES operations(id),
+    device TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    detector TEXT,
+    time REAL NOT NULL,
+    tap_position INTEGER,
+    peak REAL,
+    energy REAL,
+    duration REAL,
+    capture_path TEXT,
+    capture_time REAL,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS events_kind_tap_time ON events(kind, tap_position, time);
+CREATE INDEX IF NOT EXISTS events_time ON events(time);
+CREATE INDEX IF NOT EXISTS events_device_time ON events(device, time);
+CREATE INDEX IF NOT EXISTS events_operation ON events(operation_id);
+CREATE INDEX IF NOT EXISTS operations_device_time ON operations(device, start_time);
+CREATE INDEX IF NOT EXISTS operations_tap_time ON operations(tap_to, start_time);
+"""
+
+
+@dataclass
+class OperationRecord:
+    """One tap-change operation"""
+
+    device: str
+    start_time: float
+    end_time: Optional[float] = None
+    tap_from: Optional[int] = None
+    tap_to: Optional[int] = None
+    capture_path: Optional[str] = None
+    capture_time: Optional[float] = None
+    id: Optional[int] = None
+
+
+@dataclass
+class EventRecord:
+    """A detected arc, short circuit or other event
+
+    ``capture_path`` and ``capture_time`` point at the raw packets of the
+    event in the capture storage.
+    """
+
+    device: str
+    kind: str
+    time: float
+    detector: str = ""
+    tap_position: Optional[int] = None
+    peak: float = 0.0
+    energy: float = 0.0
+    duration: float = 0.0
+    operation_id: Optional[int] = None
+    capture_path: Optional[str] = None
+    capture_time: Optional[float] = None
+    metadata: Dict = field(default_factory=dict)
+    id: Optional[int] = None
+
+
+_OPERATION_COLUMNS = (
+    "id",
+    "device",
+    "start_time",
+    "end_time",
+    "tap_from",
+    "tap_to",
+    "capture_path",
+    "capture_time",
+)
+_EVENT_COLUMNS = (
+    "id",
+    "operation_id",
+    "device",
+    "kind",
+    "detector",
+    "time",
+    "tap_position",
+    "peak",
+    "energy",
+    "duration",
+    "capture_path",
+    "capture_time",
+    "metadata",
+)
+
+
+class EventStore:
+    """Persistent index of operations and events in SQLite
+
+    Producers call ``add_operation`` / ``add_event`` from any thread; rows
+    are queued and inserted by a background writer in transactions of up to
+    ``batch_size`` rows, or every ``flush_interval`` seconds. Operation ids
+    are assigned up front so events can reference an operation before it is
+    written. Queries use their own connections and run concurrently with the
+    writer (WAL journal).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        max_queue: int = 100000,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: Queue = Queue(maxsize=max_queue)
+        self.stats = {"operations": 0, "events": 0, "dropped": 0, "batches": 0}
+
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._id_lock = threading.Lock()
+
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+            db.commit()
+            row = db.execute("SELECT MAX(id) FROM operations").fetchone()
+        self._next_operation_id = (row[0] or 0) + 1
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; callers close it with ``closing``"""
+        db = sqlite3.connect(self.path, timeout=10.0)
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def start(self):
+        """Start the writer thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="event-store", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Write queued rows and stop the writer thread"""
+        if not self._running:
+            return
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=10.0)
+            self._thread = None
+
+    def flush(self, timeout: float = 10.0):
+        """Wait until every queued row has been written"""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def add_operation(self, operation: OperationRecord) -> int:
+        """Queue an operation and return its id"""
+        if operation.id is None:
+            with self._id_lock:
+                operation.id = self._next_operation_id
+                self._next_operation_id += 1
+        self._put(("operation", operation))
+        return operation.id
+
+    def add_event(self, event: EventRecord):
+        """Queue an event"""
+        self._put(("event", event))
+
+    def _put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except Full:
+            self.stats["dropped"] += 1
+
+    def _writer_loop(self):
+        db = self._connect()
+        try:
+            while self._running or not self.queue.empty():
+                try:
+                    batch = [self.queue.get(timeout=self.flush_interval)]
+                except Empty:
+                    continue
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except Empty:
+                        break
+                try:
+                    self._write_batch(db, batch)
+                except sqlite3.Error as e:
+                    self.stats["dropped"] += len(batch)
+                    print(f"[ERROR] Event store write failed: {e}")
+                for _ in batch:
+                    self.queue.task_done()
+        finally:
+            db.close()
+
+    def _write_batch(self, db: sqlite3.Connection, batch):
+        operations = [item for kind, item in batch if kind == "operation"]
+        events = [item for kind, item in batch if kind == "event"]
+        with db:
+            if operations:
+                db.executemany(
+                    "INSERT OR REPLACE INTO operations "
+                    f"({', '.join(_OPERATION_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_OPERATION_COLUMNS))})",
+                    [
+                        (
+                            o.id,
+                            o.device,
+                            o.start_time,
+                            o.end_time,
+                            o.tap_from,
+                            o.tap_to,
+                            o.capture_path,
+                            o.capture_time,
+                        )
+                        for o in operations
+                    ],
+                )
+            if events:
+                db.executemany(
+                    f"INSERT INTO events ({', '.join(_EVENT_COLUMNS[1:])}) "
+                    f"VALUES ({', '.join('?' * (len(_EVENT_COLUMNS) - 1))})",
+                    [
+                        (
+                            e.operation_id,
+                            e.device,
+                            e.kind,
+                            e.detector,
+                            e.time,
+                            e.tap_position,
+                            e.peak,
+                            e.energy,
+                            e.duration,
+                            e.capture_path,
+                            e.capture_time,
+                            json.dumps(e.metadata) if e.metadata else None,
+                        )
+                        for e in events
+                    ],
+                )
+        self.stats["operations"] += len(operations)
+        self.stats["events"] += len(events)
+        self.stats["batches"] += 1
+
+    @staticmethod
+    def _where(filters: Sequence) -> tuple:
+        """Build a WHERE clause from (sql, value) pairs whose value is set"""
+        clauses = [sql for sql, value in filters if value is not None]
+        params = [value for _, value in filters if value is not None]
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query_events(
+        self,
+        kind: Optional[str] = None,
+        tap_position: Optional[int] = None,
+        device: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        operation_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[EventRecord]:
+        """Events matching all given filters, in time order"""
+        where, params = self._where(
+            (
+                ("kind = ?", kind),
+                ("tap_position = ?", tap_position),
+                ("device = ?", device),
+                ("time >= ?", start),
+                ("time < ?", end),
+                ("operation_id = ?", operation_id),
+            )
+        )
+        sql = f"SELECT {', '.join(_EVENT_COLUMNS)} FROM events{where} ORDER BY time"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with closing(self._connect()) as db:
+            rows = db.execute(sql, params).fetchall()
+        events = []
+        for row in rows:
+            values = dict(zip(_EVENT_COLUMNS, row))
+            values["metadata"] = json.loads(values["metadata"] or "{}")
+            events.append(EventRecord(**values))
+        return events
+
+    def query_operations(
+        self,
+        device: Optional[str] = None,
+        tap_to: Optional[int] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[OperationRecord]:
+        """Operations matching all given filters, in time order"""
+        where, params = self._where(
+            (
+                ("device = ?", device),
+                ("tap_to = ?", tap_to),
+                ("start_time >= ?", start),
+                ("start_time < ?", end),
+            )
+        )
+        sql = (
+            f"SELECT {', '.join(_OPERATION_COLUMNS)} FROM operations{where} "
+            "ORDER BY start_time"
+        )
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with closing(self._connect()) as db:
+            rows = db.execute(sql, params).fetchall()
+        return [OperationRecord(**dict(zip(_OPERATION_COLUMNS, row))) for row in rows]
+
+    def count_events_by_tap(
+        self,
+        kind: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Dict[Optional[int], int]:
+        """Number of events of one kind per tap position"""
+        where, params = self._where(
+            (("kind = ?", kind), ("time >= ?", start), ("time < ?", end))
+        )
+        sql = f"SELECT tap_position, COUNT(*) FROM events{where} GROUP BY tap_position"
+        with closing(self._connect()) as db:
+            return dict(db.execute(sql, params).fetchall())
@@ -0,0 +1,173 @@
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+
+META_DTYPE = np.dtype(
+    [("operation_id", np.int64), ("tap_position", np.int32), ("time", np.float64)]
+)
+NO_TAP = np.iinfo(np.int32).min
+
+
+@dataclass
+class SignatureMatch:
+    """A stored operation similar to a query signature"""
+
+    operation_id: int
+    tap_position: Optional[int]
+    time: float
+    similarity: float
+
+
+def signature_vector(waveform, length: int = 128) -> np.ndarray:
+    """Fixed-length, normalized feature vector of a waveform
+
+    The waveform is resampled to ``length`` points over its own duration,
+    its mean removed and scaled to unit norm, so the dot product of two
+    signatures is their correlation regardless of duration and level.
+    """
+    waveform = np.asarray(waveform, dtype=np.float64)
+    if len(waveform) == 0:
+        raise ValueError("Cannot build a signature from an empty waveform")
+    if len(waveform) == length:
+        vector = waveform.copy()
+    else:
+        positions = np.linspace(0.0, len(waveform) - 1, length)
+        vector = np.interp(positions, np.arange(len(waveform)), waveform)
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector.astype(np.float32)
+
+
+class SignatureIndex:
+    """Signatures of past operations for nearest-neighbour search
+
+    Signatures are the rows of one float32 matrix, kept with a parallel
+    array of operation id, tap position and time. A query is a single
+    matrix-vector product over the candidate rows, optionally restricted to
+    one tap position first, followed by a partial sort for the best ``k``.
+    With a ``directory`` the index is loaded from and saved to
+    ``signatures.npy`` and ``signatures-meta.npy`` there.
+    """
+
+    def __init__(self, directory: Optional[str] = None, length: int = 128):
+        self.directory = directory
+        self.length = length
+        self.count = 0
+        self._vectors = np.zeros((1024, length), dtype=np.float32)
+        self._meta = np.zeros(1024, dtype=META_DTYPE)
+        if directory and os.path.exists(self._path("signatures.npy")):
+            self.load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Stored signatures, one per row"""
+        return self._vectors[: self.count]
+
+    @property
+    def meta(self) -> np.ndarray:
+        """Operation id, tap position and time of each stored signature"""
+        return self._meta[: self.count]
+
+    def add(
+        self,
+        operation_id: int,
+        waveform,
+        tap_position: Optional[int] = None,
+        time: float = 0.0,
+    ) -> int:
+        """Add the signature of an operation's waveform and return its row"""
+        if self.count == len(self._vectors):
+            self._grow(2 * len(self._vectors))
+        row = self.count
+        self._vectors[row] = signature_vector(waveform, self.length)
+        self._meta[row] = (
+            operation_id,
+            NO_TAP if tap_position is None else tap_position,
+            time,
+        )
+        self.count += 1
+        return row
+
+    def _grow(self, capacity: int):
+        vectors = np.zeros((capacity, self.length), dtype=np.float32)
+        vectors[: self.count] = self.vectors
+        meta = np.zeros(capacity, dtype=META_DTYPE)
+        meta[: self.count] = self.meta
+        self._vectors, self._meta = vectors, meta
+
+    def query(
+        self,
+        waveform,
+        k: int = 10,
+        tap_position: Optional[int] = None,
+        exclude_operation: Optional[int] = None,
+    ) -> List[SignatureMatch]:
+        """The ``k`` stored operations most similar to a waveform, best first"""
+        if self.count == 0 or k <= 0:
+            return []
+        query = signature_vector(waveform, self.length)
+        meta = self.meta
+        rows = None
+        if tap_position is not None or exclude_operation is not None:
+            mask = np.ones(self.count, dtype=bool)
+            if tap_position is not None:
+                mask &= meta["tap_position"] == tap_position
+            if exclude_operation is not None:
+                mask &= meta["operation_id"] != exclude_operation
+            rows = np.flatnonzero(mask)
+            if len(rows) == 0:
+                return []
+            scores = self._vectors[rows] @ query
+        else:
+            scores = self.vectors @ query
+
+        k = min(k, len(scores))
+        best = np.argpartition(scores, len(scores) - k)[-k:]
+        best = best[np.argsort(scores[best])[::-1]]
+        selected = meta[best if rows is None else rows[best]]
+        return [
+            SignatureMatch(
+                operation_id=int(entry["operation_id"]),
+                tap_position=(
+                    None
+                    if entry["tap_position"] == NO_TAP
+                    else int(entry["tap_position"])
+                ),
+                time=float(entry["time"]),
+                similarity=float(score),
+            )
+            for entry, score in zip(selected, scores[best])
+        ]
+
+    def save(self):
+        """Write the index to its directory"""
+        if not self.directory:
+            raise ValueError("Signature index has no directory")
+        os.makedirs(self.directory, exist_ok=True)
+        for name, array in (
+            ("signatures.npy", self.vectors),
+            ("signatures-meta.npy", self.meta),
+        ):
+            # Write to a temporary file first so readers never see half a file
+            temporary = self._path(f"{name}.tmp")
+            with open(temporary, "wb") as f:
+                np.save(f, array)
+            os.replace(temporary, self._path(name))
+
+    def load(self):
+        """Read the index from its directory"""
+        vectors = np.load(self._path("signatures.npy"))
+        meta = np.load(self._path("signatures-meta.npy"))
+        if vectors.shape[1] != self.length or len(meta) != len(vectors):
+            raise ValueError(f"Signature index in {self.directory} does not match")
+        self.count = 0
+        self._grow(max(1024, len(vectors)))
+        self._vectors[: len(vectors)] = vectors
+        self._meta[: len(meta)] = meta
+        self.count = len(vectors)
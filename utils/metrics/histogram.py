@@ -0,0 +1,76 @@
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, Sequence
+import threading
+
+# Default buckets in seconds, from 10 us to 1 s
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+)
+
+
+class Histogram:
+    """Cumulative fixed-bucket histogram, cheap enough for the read loop"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record one observation"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Dict[float, int]:
+        """Cumulative counts per upper bound, float('inf') included"""
+        result = {}
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            result[bound] = running
+        return result
+
+    def reset(self):
+        """Forget all observations"""
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class LatencyReservoir:
+    """Keep the most recent observations to answer quantile queries"""
+
+    def __init__(self, size: int = 2048):
+        self._values = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Record one observation"""
+        with self._lock:
+            self._values.append(value)
+            self.count += 1
+            self.sum += value
+
+    def quantiles(self, qs: Iterable[float] = (0.5, 0.9, 0.99)) -> Dict[float, float]:
+        """Quantiles of the recent observations (0.0 when empty)"""
+        with self._lock:
+            values = sorted(self._values)
+        if not values:
+            return {q: 0.0 for q in qs}
+        last = len(values) - 1
+        return {q: values[min(last, int(round(q * last)))] for q in qs}
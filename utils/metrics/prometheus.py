@@ -0,0 +1,450 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    """Render a label set"""
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + inner + "}"
+
+
+def _bound(value: float) -> str:
+    """Render a histogram bucket bound"""
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class _Family:
+    """Samples of one metric family, rendered with a single HELP/TYPE header"""
+
+    def __init__(self, name: str, kind: str, help_text: str):
+        self.name = name
+        self.kind = kind
+        self.help_text = help_text
+        self.samples: List[str] = []
+
+    def add(self, value, suffix: str = "", **labels):
+        self.samples.append(f"{self.name}{suffix}{_labels(**labels)} {float(value)!r}")
+
+    def render(self) -> List[str]:
+        if not self.samples:
+            return []
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.kind}",
+        ] + self.samples
+
+
+class AcquisitionMetricsCollector:
+    """Render acquisition health of SerialReaders in Prometheus text format"""
+
+    def __init__(self):
+        self.readers: Dict[str, object] = {}
+        self.recorders: Dict[str, object] = {}
+        self.publishers: Dict[str, object] = {}
+        self.filter_stages: List[Tuple[str, object]] = []
+        self.statistics: List[Tuple[str, object]] = []
+        self.mergers: List[object] = []
+        self._lock = threading.Lock()
+        # (device, header) -> (time, count) at the previous scrape
+        self._last_counts: Dict[Tuple[str, int], Tuple[float, int]] = {}
+
+    def add_reader(self, device: str, reader):
+        """Export the health metrics of a SerialReader"""
+        self.readers[device] = reader
+
+    def add_recorder(self, device: str, recorder):
+        """Export the counters of a CaptureRecorder"""
+        self.recorders[device] = recorder
+
+    def add_publisher(self, device: str, publisher):
+        """Export the counters of a PacketPublisher"""
+        self.publishers[device] = publisher
+
+    def add_filter_stage(self, device: str, stage):
+        """Export the per-channel cost of a FilterStage"""
+        self.filter_stages.append((device, stage))
+
+    def add_statistics(self, device: str, statistics):
+        """Export the current window of a ChannelStatistics"""
+        self.statistics.append((device, statistics))
+
+    def add_merger(self, merger):
+        """Export the counters and clock estimates of a StreamMerger"""
+        self.mergers.append(merger)
+
+    def render(self) -> str:
+        """Render all metrics as a Prometheus text exposition"""
+        with self._lock:
+            families = self._collect()
+        lines = []
+        for family in families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+    def _collect(self) -> List[_Family]:
+        now = time.monotonic()
+        packets = _Family("mr_packets_total", "counter", "Packets received per header")
+        rates = _Family(
+            "mr_packet_rate", "gauge", "Packets per second since the previous scrape"
+        )
+        errors = _Family(
+            "mr_packet_errors_total", "counter", "Packet handling errors per header"
+        )
+        dropped = _Family(
+            "mr_packets_dropped_total",
+            "counter",
+            "Packets dropped because a queue was full",
+        )
+        depth = _Family(
+            "mr_queue_depth", "gauge", "Packets waiting in a consumer queue"
+        )
+        capacity = _Family(
+            "mr_queue_capacity", "gauge", "Maximum consumer queue size (0 = unbounded)"
+        )
+        desync = _Family(
+            "mr_desync_bytes_total",
+            "counter",
+            "Bytes dropped while searching for a header",
+        )
+        bytes_read = _Family(
+            "mr_bytes_read_total", "counter", "Bytes read from the serial port"
+        )
+        reconnects = _Family("mr_reconnects_total", "counter", "Serial reconnects")
+        gap_seconds = _Family(
+            "mr_gap_seconds_total", "counter", "Time without serial data due to outages"
+        )
+        last_gap = _Family(
+            "mr_last_gap_seconds", "gauge", "Duration of the most recent outage"
+        )
+        loop = _Family(
+            "mr_read_loop_iteration_seconds",
+            "histogram",
+            "Duration of read loop iterations that received data",
+        )
+        counter_lost = _Family(
+            "mr_counter_lost_packets_total",
+            "counter",
+            "Packets missing from a sequence or sample counter",
+        )
+        counter_duplicates = _Family(
+            "mr_counter_duplicate_packets_total",
+            "counter",
+            "Packets repeating a counter value already received",
+        )
+        counter_reordered = _Family(
+            "mr_counter_reordered_packets_total",
+            "counter",
+            "Packets arriving after a later counter value",
+        )
+        jitter = _Family(
+            "mr_read_jitter_seconds",
+            "histogram",
+            "Read loop wake-up latency, chunk gaps and FIFO backlog",
+        )
+        realtime = _Family(
+            "mr_realtime_setting_applied",
+            "gauge",
+            "Whether a requested I/O thread realtime setting took effect",
+        )
+        protection_actions = _Family(
+            "mr_protection_actions_total",
+            "counter",
+            "Commands sent by protection rules on the I/O thread",
+        )
+        protection_overruns = _Family(
+            "mr_protection_overruns_total",
+            "counter",
+            "Protection actions slower than their latency budget",
+        )
+        protection_latency = _Family(
+            "mr_protection_latency_seconds",
+            "histogram",
+            "Chunk read to protection command written",
+        )
+        latency = _Family(
+            "mr_dispatch_latency_seconds",
+            "summary",
+            "Delay from framing to packet handling",
+        )
+        backlog = _Family(
+            "mr_executor_backlog",
+            "gauge",
+            "Packets waiting for an off-GUI execution target",
+        )
+        recorded = _Family(
+            "mr_recorder_records_total", "counter", "Records written to capture files"
+        )
+        recorder_dropped = _Family(
+            "mr_recorder_dropped_total", "counter", "Records dropped by the recorder"
+        )
+        subscribers = _Family(
+            "mr_publisher_subscribers", "gauge", "Connected stream subscribers"
+        )
+        publisher_dropped = _Family(
+            "mr_publisher_dropped_messages_total",
+            "counter",
+            "Messages dropped for slow subscribers",
+        )
+        filter_samples = _Family(
+            "mr_filter_samples_total", "counter", "Samples filtered per channel"
+        )
+        filter_seconds = _Family(
+            "mr_filter_seconds_total", "counter", "CPU seconds spent filtering"
+        )
+        channel_stats = _Family(
+            "mr_channel_statistic",
+            "gauge",
+            "Running statistic of a decoded channel in the current window",
+        )
+
+        merge_emitted = _Family(
+            "mr_merge_packets_total", "counter", "Packets emitted by the stream merge"
+        )
+        merge_late = _Family(
+            "mr_merge_late_packets_total",
+            "counter",
+            "Packets dropped by the merge for arriving after the reorder delay",
+        )
+        merge_buffered = _Family(
+            "mr_merge_buffered_packets", "gauge", "Packets waiting in the merge"
+        )
+        merge_offset = _Family(
+            "mr_merge_clock_offset_seconds",
+            "gauge",
+            "Estimated host minus device clock offset of a merged stream",
+        )
+        merge_drift = _Family(
+            "mr_merge_clock_drift_ppm",
+            "gauge",
+            "Estimated drift of a merged stream's clock against the host",
+        )
+
+        for device, reader in self.readers.items():
+            health = reader.get_health_metrics()
+            names = health["packet_names"]
+            for header, stats in health["packet_stats"].items():
+                labels = {
+                    "device": device,
+                    "header": f"0x{header:02X}",
+                    "name": names.get(header, ""),
+                }
+                count = stats["count"]
+                packets.add(count, **labels)
+                errors.add(stats["errors"], **labels)
+                dropped.add(stats.get("dropped", 0), **labels)
+
+                previous = self._last_counts.get((device, header))
+                rate = 0.0
+                if previous and now > previous[0]:
+                    rate = max(0, count - previous[1]) / (now - previous[0])
+                self._last_counts[(device, header)] = (now, count)
+                rates.add(rate, **labels)
+
+            for header, queue in health["queues"].items():
+                labels = {
+                    "device": device,
+                    "header": f"0x{header:02X}",
+                    "name": queue["name"],
+                }
+                depth.add(queue["depth"], **labels)
+                capacity.add(queue["maxsize"], **labels)
+
+            worker = health["worker"]
+            desync.add(worker["desync_bytes"], device=device)
+            bytes_read.add(worker["bytes_read"], device=device)
+            reconnects.add(worker["reconnects"], device=device)
+            gap_seconds.add(worker["gap_seconds"], device=device)
+            last_gap.add(worker["last_gap_seconds"], device=device)
+
+            histogram = health["read_loop"]
+            for bound, count in histogram.cumulative().items():
+                loop.add(count, "_bucket", device=device, le=_bound(bound))
+            loop.add(histogram.sum, "_sum", device=device)
+            loop.add(histogram.count, "_count", device=device)
+
+            for header, kinds in health.get("sequence", {}).items():
+                for kind, stats in kinds.items():
+                    labels = {
+                        "device": device,
+                        "header": f"0x{header:02X}",
+                        "name": names.get(header, ""),
+                        "counter": kind,
+                    }
+                    counter_lost.add(stats["lost"], **labels)
+                    counter_duplicates.add(stats["duplicates"], **labels)
+                    counter_reordered.add(stats["reordered"], **labels)
+
+            probe = health.get("jitter")
+            if probe is not None:
+                for kind in ("wakeup", "chunk_gap", "backlog"):
+                    histogram = getattr(probe, kind)
+                    for bound, count in histogram.cumulative().items():
+                        jitter.add(
+                            count, "_bucket", device=device, kind=kind, le=_bound(bound)
+                        )
+                    jitter.add(histogram.sum, "_sum", device=device, kind=kind)
+                    jitter.add(histogram.count, "_count", device=device, kind=kind)
+            engine = health.get("protection")
+            if engine is not None and engine.rules:
+                for rule, count in engine.actions_by_rule.items():
+                    protection_actions.add(count, device=device, rule=rule)
+                protection_overruns.add(engine.stats["overruns"], device=device)
+                histogram = engine.histogram
+                for bound, count in histogram.cumulative().items():
+                    protection_latency.add(
+                        count, "_bucket", device=device, le=_bound(bound)
+                    )
+                protection_latency.add(histogram.sum, "_sum", device=device)
+                protection_latency.add(histogram.count, "_count", device=device)
+            for setting, status in health.get("realtime", {}).items():
+                realtime.add(int(status == "ok"), device=device, setting=setting)
+
+            reservoir = health["dispatch_latency"]
+            for q, value in reservoir.quantiles().items():
+                latency.add(value, device=device, quantile=repr(q))
+            latency.add(reservoir.sum, "_sum", device=device)
+            latency.add(reservoir.count, "_count", device=device)
+
+            for target, stats in health.get("executors", {}).items():
+                backlog.add(stats["backlog"], device=device, target=target)
+
+        for device, recorder in self.recorders.items():
+            recorded.add(recorder.stats["records"], device=device)
+            recorder_dropped.add(recorder.stats["dropped"], device=device)
+
+        for device, publisher in self.publishers.items():
+            subscribers.add(publisher.stats["subscribers"], device=device)
+            publisher_dropped.add(publisher.stats["dropped_messages"], device=device)
+
+        for device, stage in self.filter_stages:
+            for output, stats in stage.stats.items():
+                filter_samples.add(stats["samples"], device=device, channel=output)
+                filter_seconds.add(stats["seconds"], device=device, channel=output)
+
+        for device, statistics in self.statistics:
+            for channel, stats in statistics.snapshot().items():
+                if not stats["count"]:
+                    continue
+                for stat, value in stats.items():
+                    channel_stats.add(
+                        value,
+                        device=device,
+                        stream=statistics.name,
+                        channel=channel,
+                        stat=stat,
+                    )
+
+        for merger in self.mergers:
+            merge_emitted.add(merger.stats["emitted"])
+            merge_buffered.add(merger.buffered)
+            for stream, clock in merger.clock_report().items():
+                merge_late.add(clock["late"], stream=stream)
+                merge_offset.add(clock["offset"], stream=stream)
+                merge_drift.add(clock["drift_ppm"], stream=stream)
+
+        return [
+            packets,
+            rates,
+            errors,
+            dropped,
+            depth,
+            capacity,
+            desync,
+            bytes_read,
+            reconnects,
+            gap_seconds,
+            last_gap,
+            loop,
+            counter_lost,
+            counter_duplicates,
+            counter_reordered,
+            jitter,
+            realtime,
+            protection_actions,
+            protection_overruns,
+            protection_latency,
+            latency,
+            backlog,
+            recorded,
+            recorder_dropped,
+            subscribers,
+            publisher_dropped,
+            filter_samples,
+            filter_seconds,
+            channel_stats,
+            merge_emitted,
+            merge_late,
+            merge_buffered,
+            merge_offset,
+            merge_drift,
+        ]
+
+
+class MetricsServer:
+    """Serve a collector on /metrics from a background HTTP thread"""
+
+    def __init__(self, collector, host: str = "0.0.0.0", port: int = 9108):
+        self.collector = collector
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Bind the HTTP server and start serving"""
+        if self._server:
+            return
+        collector = self.collector
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                try:
+                    body = collector.render().encode("utf-8")
+                except Exception as e:
+                    self.send_error(500, f"Metrics collection failed: {e}")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes are too frequent to log
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-http", daemon=True
+        )
+        self._thread.start()
+        print(
+            f"[METRICS] Serving Prometheus metrics on http://{self.host}:{self.port}/metrics"
+        )
+
+    def stop(self):
+        """Stop serving"""
+        if not self._server:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self._thread:
+            self._thread.join(timeout=5.0)
+            self._thread = None
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+
+@dataclass
+class FieldSpec:
+    """Location and encoding of one numeric field inside a packet"""
+
+    name: str
+    offset: int
+    dtype: str = "<u2"  # NumPy dtype string, e.g. "<u4", "<i2", "<f4"
+    scale: float = 1.0
+    # Calibration from raw counts (utils.dsp.calibration); replaces scale
+    calibration: Optional[Any] = None
+
+
+class PacketDecoder:
+    """Vectorized decoder turning a batch of fixed-size packets into field arrays
+
+    Fields with a calibration are converted from raw counts by it, after
+    the fields of the same packet its temperature compensation reads.
+    Calibrations can be swapped with ``set_calibration`` while batches are
+    being decoded on another thread; each batch uses one consistent set.
+    """
+
+    def __init__(self, size: int, fields: Sequence[FieldSpec]):
+        self.size = size
+        self.fields = list(fields)
+        for field in self.fields:
+            end = field.offset + np.dtype(field.dtype).itemsize
+            if field.offset < 0 or end > size:
+                raise ValueError(
+                    f"Field '{field.name}' ({field.offset}..{end}) "
+                    f"does not fit in a {size}-byte packet"
+                )
+
+        # One structured dtype describing the whole packet, so a batch is
+        # decoded by a single frombuffer call
+        self.dtype = np.dtype(
+            {
+                "names": [f.name for f in self.fields],
+                "formats": [f.dtype for f in self.fields],
+                "offsets": [f.offset for f in self.fields],
+                "itemsize": size,
+            }
+        )
+
+        self._calibrations: Dict[str, Any] = {}
+        for field in self.fields:
+            if field.calibration is not None:
+                self.set_calibration(field.name, field.calibration)
+
+    def set_calibration(self, field_name: str, calibration: Optional[Any]):
+        """Replace the calibration of a field, or remove it with None"""
+        field = next((f for f in self.fields if f.name == field_name), None)
+        if field is None:
+            raise KeyError(f"Unknown field '{field_name}'")
+        calibrations = dict(self._calibrations)
+        if calibration is None:
+            calibrations.pop(field_name, None)
+        else:
+            calibration.prepare(field.dtype)
+            calibrations[field_name] = calibration
+        # Compensated fields last, so the temperature fields they read are
+        # already calibrated; swap the whole mapping so a concurrent decode
+        # sees either the old or the new set
+        self._calibrations = dict(
+            sorted(
+                calibrations.items(),
+                key=lambda item: item[1].compensation is not None,
+            )
+        )
+
+    def get_calibration(self, field_name: str) -> Optional[Any]:
+        """Current calibration of a field"""
+        return self._calibrations.get(field_name)
+
+    @property
+    def units(self) -> Dict[str, str]:
+        """Physical units of the calibrated fields"""
+        return {
+            name: calibration.units for name, calibration in self._calibrations.items()
+        }
+
+    def decode(self, packets: List[bytes]) -> Dict[str, np.ndarray]:
+        """Decode packets into one scaled float64 array per field"""
+        return self.decode_bytes(b"".join(packets))
+
+    def decode_bytes(self, data: bytes) -> Dict[str, np.ndarray]:
+        """Decode a contiguous run of packets into one array per field"""
+        count = len(data) // self.size
+        records = np.frombuffer(data, dtype=self.dtype, count=count)
+        calibrations = self._calibrations
+        decoded = {}
+        for field in self.fields:
+            if field.name in calibrations:
+                continue
+            values = records[field.name].astype(np.float64)
+            if field.scale != 1.0:
+                values *= field.scale
+            decoded[field.name] = values
+        for name, calibration in calibrations.items():
+            compensation = calibration.compensation
+            temperature = None
+            if compensation is not None and compensation.header is None:
+                temperature = decoded.get(compensation.field)
+            decoded[name] = calibration.apply(records[name], temperature)
+        return decoded
@@ -0,0 +1,254 @@
+import threading
+import time
+from collections import deque
+from queue import Queue, Full, Empty
+from typing import Callable, Dict, Optional
+from utils.diagnostics.timing import TIMINGS
+
+# Where the handling of a packet type runs
+EXEC_GUI = "gui"  # queued into the GUI thread (legacy behaviour)
+EXEC_INLINE = "inline"  # directly on the I/O thread after framing
+EXEC_WORKER = "worker"  # on a dedicated thread per packet type
+EXEC_POOL = "pool"  # on a shared thread pool, serialized per header
+EXECUTION_TARGETS = (EXEC_GUI, EXEC_INLINE, EXEC_WORKER, EXEC_POOL)
+
+
+class SerialExecutor:
+    """Single thread running submitted tasks in order from a bounded queue"""
+
+    def __init__(self, name: str, max_backlog: int = 10000):
+        self.name = name
+        self.queue: Queue = Queue(maxsize=max_backlog)
+        self.stats = {"processed": 0, "dropped": 0, "max_backlog": 0}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._running = True
+        self._thread.start()
+
+    @property
+    def backlog(self) -> int:
+        return self.queue.qsize()
+
+    def submit(self, fn: Callable, *args) -> bool:
+        """Queue a task without blocking; False when the backlog is full"""
+        try:
+            self.queue.put_nowait((fn, args))
+        except Full:
+            self.stats["dropped"] += 1
+            return False
+        backlog = self.queue.qsize()
+        if backlog > self.stats["max_backlog"]:
+            self.stats["max_backlog"] = backlog
+        return True
+
+    def shutdown(self, timeout: float = 5.0):
+        """Run the remaining tasks and stop the thread"""
+        self._running = False
+        self._thread.join(timeout=timeout)
+
+    def _run(self):
+        while self._running or not self.queue.empty():
+            try:
+                fn, args = self.queue.get(timeout=0.1)
+            except Empty:
+                continue
+            started = time.perf_counter() if TIMINGS.enabled else 0.0
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"[ERROR] Task failed on {self.name}: {e}")
+            if started:
+                TIMINGS.record_busy(self.name, time.perf_counter() - started)
+            self.stats["processed"] += 1
+
+
+class KeyedThreadPool:
+    """Thread pool that runs tasks of the same key one at a time, in order
+
+    Each key has its own task deque. A key is scheduled on the pool when its
+    first task arrives and stays owned by one thread until its deque is
+    drained (or ``batch`` tasks ran, to stay fair to other keys), so tasks of
+    one key never run concurrently or out of order.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_backlog: int = 10000,
+        batch: int = 64,
+        name: str = "packet-pool",
+    ):
+        self.max_backlog = max_backlog
+        self.batch = batch
+        self.stats = {"processed": 0, "dropped": 0, "max_backlog": 0}
+        self._tasks: Dict[object, deque] = {}
+        self._scheduled = set()
+        self._ready: Queue = Queue()
+        self._lock = threading.Lock()
+        self._backlog = 0
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def backlog(self) -> int:
+        return self._backlog
+
+    def key_backlog(self, key) -> int:
+        """Tasks waiting for one key"""
+        tasks = self._tasks.get(key)
+        return len(tasks) if tasks else 0
+
+    def submit(self, key, fn: Callable, *args) -> bool:
+        """Queue a task for a key without blocking; False when full"""
+        with self._lock:
+            if self._backlog >= self.max_backlog:
+                self.stats["dropped"] += 1
+                return False
+            self._tasks.setdefault(key, deque()).append((fn, args))
+            self._backlog += 1
+            if self._backlog > self.stats["max_backlog"]:
+                self.stats["max_backlog"] = self._backlog
+            if key in self._scheduled:
+                return True
+            self._scheduled.add(key)
+        self._ready.put(key)
+        return True
+
+    def shutdown(self, timeout: float = 5.0):
+        """Run the remaining tasks and stop the threads"""
+        self._running = False
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def _run(self):
+        thread = threading.current_thread().name
+        while self._running or self._backlog:
+            try:
+                key = self._ready.get(timeout=0.1)
+            except Empty:
+                continue
+            started = time.perf_counter() if TIMINGS.enabled else 0.0
+            tasks = self._tasks[key]
+            for _ in range(self.batch):
+                with self._lock:
+                    if not tasks:
+                        break
+                    fn, args = tasks.popleft()
+                    self._backlog -= 1
+                try:
+                    fn(*args)
+                except Exception as e:
+                    print(f"[ERROR] Pool task failed for {key}: {e}")
+                self.stats["processed"] += 1
+            if started:
+                TIMINGS.record_busy(thread, time.perf_counter() - started)
+            with self._lock:
+                if not tasks:
+                    self._scheduled.discard(key)
+                    continue
+            # Let other keys run before continuing with this one
+            self._ready.put(key)
+
+
+class PacketDispatcher:
+    """Route framed packets to the execution target of their PacketConfig
+
+    ``dispatch`` is called on the I/O thread. It runs the handler inline,
+    hands it to the packet type's dedicated worker or to the shared pool,
+    or returns False for GUI-thread configs so the caller queues them into
+    the GUI thread as before. Qt signals emitted by a handler off the GUI
+    thread are still delivered on the GUI thread by queued connections.
+    """
+
+    def __init__(
+        self,
+        handler: Callable,
+        on_drop: Optional[Callable] = None,
+        pool_workers: int = 4,
+        max_backlog: int = 10000,
+        name: str = "serial",
+    ):
+        self.handler = handler
+        self.on_drop = on_drop
+        self.pool_workers = pool_workers
+        self.max_backlog = max_backlog
+        self.name = name
+        self.inline_stats = {"processed": 0}
+        self._workers: Dict[int, SerialExecutor] = {}
+        self._pool: Optional[KeyedThreadPool] = None
+        self._lock = threading.Lock()
+
+    def dispatch(self, packet: bytes, config, framed_at: float) -> bool:
+        """Run or queue the handling of a packet; False if it belongs to the GUI"""
+        target = getattr(config, "executor", EXEC_GUI)
+        if target == EXEC_GUI:
+            return False
+        if target == EXEC_INLINE:
+            self.handler(packet, config, framed_at)
+            self.inline_stats["processed"] += 1
+            return True
+        if target == EXEC_WORKER:
+            accepted = self._worker(config).submit(
+                self.handler, packet, config, framed_at
+            )
+        else:
+            accepted = self._shared_pool().submit(
+                config.header, self.handler, packet, config, framed_at
+            )
+        if not accepted and self.on_drop is not None:
+            self.on_drop(config)
+        return True
+
+    def backlog(self) -> Dict[str, Dict]:
+        """Backlog and throughput of every execution target in use"""
+        result = {EXEC_INLINE: {"backlog": 0, **self.inline_stats}}
+        for header, worker in list(self._workers.items()):
+            result[f"{EXEC_WORKER}:0x{header:02X}"] = {
+                "backlog": worker.backlog,
+                **worker.stats,
+            }
+        if self._pool is not None:
+            result[EXEC_POOL] = {"backlog": self._pool.backlog, **self._pool.stats}
+        return result
+
+    def release(self, header: int):
+        """Stop the dedicated worker of a removed packet type"""
+        with self._lock:
+            worker = self._workers.pop(header, None)
+        if worker is not None:
+            worker.shutdown()
+
+    def shutdown(self):
+        """Drain and stop all workers"""
+        with self._lock:
+            workers, self._workers = list(self._workers.values()), {}
+            pool, self._pool = self._pool, None
+        for worker in workers:
+            worker.shutdown()
+        if pool is not None:
+            pool.shutdown()
+
+    def _worker(self, config) -> SerialExecutor:
+        worker = self._workers.get(config.header)
+        if worker is None:
+            with self._lock:
+                worker = self._workers.get(config.header)
+                if worker is None:
+                    worker = SerialExecutor(
+                        f"{self.name}-0x{config.header:02X}", self.max_backlog
+                    )
+                    self._workers[config.header] = worker
+        return worker
+
+    def _shared_pool(self) -> KeyedThreadPool:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = KeyedThreadPool(
+                        self.pool_workers, self.max_backlog, name=f"{self.name}-pool"
+                    )
+        return self._pool
@@ -0,0 +1,35 @@
+from typing import Any, Dict, List, Tuple
+
+
+def frame_buffer(
+    buffer: bytearray, configs: Dict[int, Any]
+) -> Tuple[List[Tuple[int, bytes, Any]], List[Tuple[int, int]]]:
+    """Extract complete packets from the front of ``buffer``
+
+    ``configs`` maps header bytes to packet configurations with a ``size``.
+    Bytes that do not start a known packet are skipped one at a time. The
+    consumed bytes are removed from ``buffer`` in one go; an incomplete
+    packet at the end stays for the next call.
+
+    Returns ``(offset, packet, config)`` for each packet and
+    ``(offset, byte)`` for each skipped byte, offsets relative to the
+    start of the buffer.
+    """
+    packets = []
+    desync = []
+    position = 0
+    length = len(buffer)
+    while position < length:
+        header = buffer[position]
+        config = configs.get(header)
+        if config is None:
+            desync.append((position, header))
+            position += 1
+            continue
+        end = position + config.size
+        if end > length:
+            break  # Not enough data yet, wait for more
+        packets.append((position, bytes(buffer[position:end]), config))
+        position = end
+    del buffer[:position]
+    return packets, desync
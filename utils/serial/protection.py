@@ -0,0 +1,246 @@
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from queue import SimpleQueue
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from utils.metrics.histogram import Histogram, LatencyReservoir
+
+# Buckets in seconds, from 10 us to 100 ms
+PROTECTION_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.1,
+)
+
+_COMPARISONS = {
+    ">": lambda value, threshold: value > threshold,
+    ">=": lambda value, threshold: value >= threshold,
+    "<": lambda value, threshold: value < threshold,
+    "<=": lambda value, threshold: value <= threshold,
+}
+
+
+# struct codes per (numpy kind, item size)
+_STRUCT_CODES = {
+    ("u", 1): "B",
+    ("i", 1): "b",
+    ("u", 2): "H",
+    ("i", 2): "h",
+    ("u", 4): "I",
+    ("i", 4): "i",
+    ("u", 8): "Q",
+    ("i", 8): "q",
+    ("f", 4): "f",
+    ("f", 8): "d",
+}
+
+
+def _struct_format(dtype) -> str:
+    """struct format of a scalar numpy dtype such as "<u4" """
+    dtype = np.dtype(dtype)
+    code = _STRUCT_CODES.get((dtype.kind, dtype.itemsize))
+    if code is None:
+        raise ValueError(f"Unsupported protection field type {dtype}")
+    big = dtype.byteorder == ">" or (dtype.byteorder == "=" and sys.byteorder == "big")
+    return (">" if big else "<") + code
+
+
+@dataclass
+class ProtectionRule:
+    """Send ``command`` when a packet field crosses ``threshold``
+
+    The field is read straight from the packet bytes (``offset``, numpy
+    style ``dtype``, ``scale``), so no decoder runs in the critical path.
+    After firing, the rule stays quiet for ``hold_off`` seconds.
+    """
+
+    name: str
+    header: int
+    offset: int
+    threshold: float
+    command: bytes
+    dtype: str = "<u2"
+    scale: float = 1.0
+    comparison: str = ">="
+    hold_off: float = 0.1
+
+    def __post_init__(self):
+        if self.comparison not in _COMPARISONS:
+            raise ValueError(f"Unknown comparison '{self.comparison}'")
+        layout = struct.Struct(_struct_format(self.dtype))
+        self._unpack = layout.unpack_from
+        self.end = self.offset + layout.size  # Packet bytes the field needs
+        self._compare = _COMPARISONS[self.comparison]
+        self._quiet_until = 0.0
+
+    def check(self, packet: bytes, now: float) -> Optional[float]:
+        """The scaled field value when the rule fires on ``packet``"""
+        if now < self._quiet_until:
+            return None
+        value = self._unpack(packet, self.offset)[0] * self.scale
+        if not self._compare(value, self.threshold):
+            return None
+        self._quiet_until = now + self.hold_off
+        return value
+
+
+@dataclass
+class ProtectionAction:
+    """A command sent by a protection rule, reported after the fact"""
+
+    rule: str
+    header: int
+    value: float
+    timestamp: float  # Wall time the command was written
+    latency: float  # Chunk read to command written, seconds
+    error: str = ""
+
+
+class ProtectionEngine:
+    """Protection rules evaluated on the I/O thread right after framing
+
+    ``evaluate`` only unpacks one field per rule, compares and writes the
+    command through ``send``; the latency from the read that delivered the
+    packet's bytes to the return of the write is recorded, and everything
+    else (printing, callbacks) happens afterwards on a logger thread.
+    Latencies above ``max_latency`` count as overruns.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], None],
+        max_latency: float = 0.001,
+        name: str = "protection",
+    ):
+        self.send = send
+        self.max_latency = max_latency
+        self.name = name
+        self.rules: Dict[int, List[ProtectionRule]] = {}
+        self.latency = LatencyReservoir()
+        self.histogram = Histogram(PROTECTION_BUCKETS)
+        self.stats = {"actions": 0, "overruns": 0, "errors": 0, "max_latency": 0.0}
+        self.actions_by_rule: Dict[str, int] = {}
+        self.callbacks: List[Callable[[ProtectionAction], None]] = []
+        self._log: SimpleQueue = SimpleQueue()
+        self._logger: Optional[threading.Thread] = None
+
+    def add_rule(self, rule: ProtectionRule):
+        """Add a rule; safe while the I/O thread evaluates"""
+        if rule.offset < 0:
+            raise ValueError(f"Protection '{rule.name}' has a negative offset")
+        rules = {header: list(items) for header, items in self.rules.items()}
+        rules.setdefault(rule.header, []).append(rule)
+        self.actions_by_rule.setdefault(rule.name, 0)
+        self.rules = rules  # Swapped whole, never mutated in place
+        self.start()
+
+    def remove_rules(self, header: int):
+        """Remove every rule of a packet header"""
+        rules = dict(self.rules)
+        rules.pop(header, None)
+        self.rules = rules
+
+    def evaluate(self, packet: bytes, header: int, received: float):
+        """Check a framed packet; ``received`` is the perf_counter of its read"""
+        rules = self.rules.get(header)
+        if not rules:
+            return
+        for rule in rules:
+            try:
+                value = rule.check(packet, received)
+            except Exception:
+                # A bad rule must never stop the read loop
+                self.stats["errors"] += 1
+                continue
+            if value is None:
+                continue
+            error = ""
+            try:
+                self.send(rule.command)
+            except Exception as e:
+                error = str(e)
+            latency = time.perf_counter() - received
+            self._record(rule, value, latency, error)
+
+    def _record(self, rule: ProtectionRule, value: float, latency: float, error: str):
+        self.latency.observe(latency)
+        self.histogram.observe(latency)
+        self.stats["actions"] += 1
+        self.actions_by_rule[rule.name] = self.actions_by_rule.get(rule.name, 0) + 1
+        if latency > self.stats["max_latency"]:
+            self.stats["max_latency"] = latency
+        if latency > self.max_latency:
+            self.stats["overruns"] += 1
+        if error:
+            self.stats["errors"] += 1
+        self._log.put(
+            ProtectionAction(rule.name, rule.header, value, time.time(), latency, error)
+        )
+
+    def start(self):
+        """Start the logger thread (adding a rule does this too)"""
+        if self._logger is None:
+            self._logger = threading.Thread(
+                target=self._run_logger, name=f"{self.name}-log", daemon=True
+            )
+            self._logger.start()
+
+    def _run_logger(self):
+        while True:
+            action = self._log.get()
+            if action is None:
+                return
+            if action.error:
+                print(f"[ERROR] Protection '{action.rule}' failed: {action.error}")
+            else:
+                print(
+                    f"[PROTECT] {self.name}/{action.rule}: value {action.value:.3f}, "
+                    f"command sent after {action.latency * 1e6:.0f} us"
+                )
+            for callback in list(self.callbacks):
+                try:
+                    callback(action)
+                except Exception as e:
+                    print(f"[ERROR] Protection callback error: {e}")
+
+    def shutdown(self, timeout: float = 5.0):
+        """Finish logging queued actions and stop the logger thread"""
+        if self._logger is not None:
+            self._log.put(None)
+            self._logger.join(timeout=timeout)
+            self._logger = None
+
+
+def protection_rule_from_dict(raw: Dict) -> ProtectionRule:
+    """Build a protection rule from its JSON description
+
+    ``command`` is a hex string such as "55AA01" or a list of byte values.
+    """
+    command = raw["command"]
+    if isinstance(command, str):
+        command = bytes.fromhex(command.replace("0x", "").replace(" ", ""))
+    else:
+        command = bytes(command)
+    header = raw["header"]
+    return ProtectionRule(
+        name=raw["name"],
+        header=int(header, 0) if isinstance(header, str) else int(header),
+        offset=int(raw["offset"]),
+        threshold=float(raw["threshold"]),
+        command=command,
+        dtype=raw.get("dtype", "<u2"),
+        scale=float(raw.get("scale", 1.0)),
+        comparison=raw.get("comparison", ">="),
+        hold_off=float(raw.get("hold_off", 0.1)),
+    )
@@ -0,0 +1,171 @@
+import sys
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+from utils.serial.types import CounterField
+
+
+def _counter_layout(field: CounterField):
+    dtype = np.dtype(field.dtype)
+    if dtype.kind not in "iu":
+        raise ValueError(f"Counter fields must be integers, got {dtype}")
+    big = dtype.byteorder == ">" or (dtype.byteorder == "=" and sys.byteorder == "big")
+    return dtype.itemsize, "big" if big else "little"
+
+
+class SequenceTracker:
+    """Gap, duplicate and reorder accounting of one wrapping packet counter
+
+    Each counter value is compared with the highest one seen so far, modulo
+    the counter range: a jump forward of more than ``step`` loses the
+    packets in between, a value behind it either fills a recorded gap (a
+    reordered packet, no longer counted as lost) or repeats one already
+    received (a duplicate). Up to ``window`` missing values are remembered
+    to tell the two apart.
+    """
+
+    def __init__(self, field: CounterField, window: int = 1024):
+        self.field = field
+        self.size, self.byteorder = _counter_layout(field)
+        self.modulus = 1 << (8 * self.size)
+        self._window = window
+        self.reset()
+
+    def reset(self):
+        """Forget the counter position and all statistics"""
+        self.position: Optional[int] = None  # Unwrapped highest value
+        self._missing = set()
+        self._missing_order = deque()
+        self.stats = {
+            "received": 0,
+            "lost": 0,
+            "gaps": 0,
+            "duplicates": 0,
+            "reordered": 0,
+            "largest_gap": 0,
+        }
+
+    def value(self, packet: bytes) -> int:
+        """Raw counter value of a packet"""
+        offset = self.field.offset
+        return int.from_bytes(packet[offset : offset + self.size], self.byteorder)
+
+    def observe(self, packet: bytes) -> int:
+        """Account for one packet; returns its unwrapped counter value"""
+        return self.observe_value(self.value(packet))
+
+    def observe_value(self, value: int) -> int:
+        stats = self.stats
+        stats["received"] += 1
+        if self.position is None:
+            self.position = value
+            return value
+        half = self.modulus // 2
+        delta = (value - self.position + half) % self.modulus - half
+        unwrapped = self.position + delta
+        step = self.field.step
+        if delta == step:
+            self.position = unwrapped
+        elif delta > 0:
+            missing = delta // step - 1
+            if missing > 0:
+                stats["lost"] += missing
+                stats["gaps"] += 1
+                stats["largest_gap"] = max(stats["largest_gap"], missing)
+                self._remember(unwrapped - delta + step, unwrapped)
+            self.position = unwrapped
+        elif unwrapped in self._missing:
+            self._missing.discard(unwrapped)
+            stats["lost"] -= 1
+            stats["reordered"] += 1
+        else:
+            stats["duplicates"] += 1
+        return unwrapped
+
+    def _remember(self, first: int, end: int):
+        """Record the skipped values [first, end) as possibly late"""
+        step = self.field.step
+        for value in range(max(first, end - self._window * step), end, step):
+            self._missing.add(value)
+            self._missing_order.append(value)
+        while len(self._missing_order) > self._window:
+            self._missing.discard(self._missing_order.popleft())
+
+
+class DeviceTimebase:
+    """Continuous sample times from a device sample counter
+
+    Counters of consecutive batches are unwrapped into one increasing count
+    and turned into times as ``anchor + count / sample_rate``, anchored at
+    the host arrival time of the first packet. Host scheduling jitter then
+    no longer shows up in the timestamps; ``offset`` (arrival minus device
+    time, smallest of the last batch) shows drift between the clocks.
+
+    A packet arriving more than ``tolerance`` seconds away from its device
+    time (e.g. after an outage longer than the counter range, which cannot
+    be unwrapped) re-anchors the timebase at that packet.
+    """
+
+    def __init__(self, field: CounterField, tolerance: float = 1.0):
+        if not field.sample_rate:
+            raise ValueError("A device timebase needs the counter's sample_rate")
+        self.field = field
+        self.tolerance = tolerance
+        self.size, byteorder = _counter_layout(field)
+        self.dtype = np.dtype(f"{'>' if byteorder == 'big' else '<'}u{self.size}")
+        self.modulus = 1 << (8 * self.size)
+        self._last: Optional[int] = None  # Unwrapped count of the last packet
+        self._anchor_time = 0.0
+        self._anchor_count = 0
+        self.offset = 0.0
+        self.reanchors = 0
+
+    def counters(self, packets: List[bytes], size: int) -> np.ndarray:
+        """Raw counter values of equally sized packets"""
+        raw = np.frombuffer(b"".join(packets), dtype=np.uint8).reshape(-1, size)
+        offset = self.field.offset
+        return raw[:, offset : offset + self.size].copy().view(self.dtype).ravel()
+
+    def times(self, counters: np.ndarray, arrivals: np.ndarray) -> np.ndarray:
+        """Device times of a batch of raw counters and their arrival times"""
+        counters = np.asarray(counters, dtype=np.int64)
+        if len(counters) == 0:
+            return np.empty(0)
+        arrivals = np.asarray(arrivals, dtype=np.float64)
+        half = self.modulus // 2
+        if self._last is None:
+            self._last = int(counters[0])
+            self._anchor_count = self._last
+            self._anchor_time = float(arrivals[0])
+        previous = np.concatenate(([self._last % self.modulus], counters[:-1]))
+        deltas = (counters - previous + half) % self.modulus - half
+        unwrapped = self._last + np.cumsum(deltas)
+        self._last = int(unwrapped[-1])
+        rate = float(self.field.sample_rate)
+        times = self._anchor_time + (unwrapped - self._anchor_count) / rate
+        while True:
+            lost = np.flatnonzero(np.abs(arrivals - times) > self.tolerance)
+            if len(lost) == 0:
+                break
+            first = lost[0]
+            self._anchor_count = int(unwrapped[first])
+            self._anchor_time = float(arrivals[first])
+            times[first:] = (
+                self._anchor_time + (unwrapped[first:] - self._anchor_count) / rate
+            )
+            self.reanchors += 1
+        self.offset = float(np.min(arrivals - times))
+        return times
+
+
+def counter_from_dict(raw: Optional[Dict]) -> Optional[CounterField]:
+    """Build a counter field from its JSON description"""
+    if not raw:
+        return None
+    rate = raw.get("sample_rate")
+    return CounterField(
+        offset=int(raw["offset"]),
+        dtype=raw.get("dtype", "u1"),
+        step=int(raw.get("step", 1)),
+        sample_rate=None if rate is None else float(rate),
+    )
@@ -2,8 +2,14 @@ from PySide6.QtCore import QObject, Signal, QThread
 from typing import Dict, Callable, Optional, Any
 from queue import Queue
 import time
+from utils.diagnostics.realtime import RealtimeSettings
+from utils.diagnostics.timing import TIMINGS
+from utils.metrics.histogram import LatencyReservoir
+from utils.serial.dispatch import EXEC_GUI, EXECUTION_TARGETS, PacketDispatcher
+from utils.serial.protection import ProtectionEngine, ProtectionRule
 from utils.serial.serial_worker import SerialWorker
-from utils.serial.types import PacketConfig
+from utils.serial.transports import Transport
+from utils.serial.types import CounterField, PacketConfig
 
 
 class SerialReader(QObject):
@@ -14,25 +20,56 @@ class SerialReader(QObject):
     error_occurred = Signal(str)
     connection_status_changed = Signal(bool)
     desync_detected = Signal(int)
+    gap_detected = Signal(float, float)  # outage start (epoch s), duration (s)
 
-    def __init__(self, port: str, baudrate: int = 115200):
+    def __init__(
+        self,
+        port: str,
+        baudrate: int = 115200,
+        log_packets: bool = True,
+        auto_reconnect: bool = True,
+        transport: Optional[Transport] = None,
+        realtime: Optional[RealtimeSettings] = None,
+    ):
         super().__init__()
 
         # Configuration
         self.port = port
         self.baudrate = baudrate
+        self.log_packets = log_packets
 
         # Packet configuration management
         self.packet_configs: Dict[int, PacketConfig] = {}
         self.packet_stats = {}  # Statistics for each packet type
 
+        # Time from framing in the worker to handling in this thread
+        self.dispatch_latency = LatencyReservoir()
+
         # Qt threading components
         self.worker_thread = QThread()
-        self.worker = SerialWorker(port, baudrate)
+        self.worker = SerialWorker(
+            port,
+            baudrate,
+            auto_reconnect=auto_reconnect,
+            transport=transport,
+            realtime=realtime,
+        )
 
         # Move worker to thread
         self.worker.moveToThread(self.worker_thread)
 
+        # Configs with an off-GUI executor are handled from the I/O thread
+        self.dispatcher = PacketDispatcher(
+            self._handle_packet,
+            on_drop=self._handle_backlog_drop,
+            name=f"serial-{port}",
+        )
+        self.worker.dispatcher = self.dispatcher
+
+        # Protection rules run on the I/O thread and write commands directly
+        self.protection = ProtectionEngine(self.worker.write_now, name=f"serial-{port}")
+        self.worker.protection = self.protection
+
         # Connect worker signals
         self._connect_worker_signals()
 
@@ -45,6 +82,7 @@ class SerialReader(QObject):
         self.worker.error_occurred.connect(self.error_occurred.emit)
         self.worker.connection_status.connect(self.connection_status_changed.emit)
         self.worker.desync_detected.connect(self._handle_desync)
+        self.worker.gap_detected.connect(self._handle_gap)
 
         # Connect thread lifecycle
         self.worker_thread.started.connect(self.worker.start_reading)
@@ -57,6 +95,8 @@ class SerialReader(QObject):
     def start(self):
         """Start the serial reading in worker thread"""
         if not self.worker_thread.isRunning():
+            if self.protection.rules:
+                self.protection.start()
             self.worker_thread.start()
 
     def stop(self):
@@ -67,6 +107,8 @@ class SerialReader(QObject):
             # Wait for thread to finish
             self.worker_thread.quit()
             self.worker_thread.wait(5000)  # Wait up to 5 seconds
+        self.dispatcher.shutdown()
+        self.protection.shutdown()
 
     def add_packet_config(
         self,
@@ -76,8 +118,20 @@ class SerialReader(QObject):
         callback: Optional[Callable[[bytes], None]] = None,
         signal: Optional[Signal] = None,
         name: str = "",
+        executor: str = EXEC_GUI,
+        sequence: Optional[CounterField] = None,
+        sample_counter: Optional[CounterField] = None,
     ):
-        """Add a new packet configuration for a specific header"""
+        """Add a new packet configuration for a specific header
+
+        ``executor`` chooses where the packet is handled: "gui", "inline",
+        "worker" or "pool" (see PacketConfig). ``sequence`` and
+        ``sample_counter`` enable lost-packet accounting on those counters.
+        """
+        if executor not in EXECUTION_TARGETS:
+            raise ValueError(
+                f"Unknown executor '{executor}', expected one of {EXECUTION_TARGETS}"
+            )
         if not name:
             name = f"Packet_{header:02X}"
 
@@ -88,12 +142,21 @@ class SerialReader(QObject):
             callback=callback,
             signal=signal,
             name=name,
+            executor=executor,
+            sequence=sequence,
+            sample_counter=sample_counter,
         )
 
         self.packet_configs[header] = config
-        self.packet_stats[header] = {"count": 0, "last_received": None, "errors": 0}
+        self.packet_stats[header] = {
+            "count": 0,
+            "last_received": None,
+            "errors": 0,
+            "dropped": 0,
+        }
         print(
-            f"[CONFIG] Added packet config for header 0x{header:02X}: {name} (size: {size})"
+            f"[CONFIG] Added packet config for header 0x{header:02X}: {name} "
+            f"(size: {size}, executor: {executor})"
         )
 
         # Sync with worker thread
@@ -109,6 +172,7 @@ class SerialReader(QObject):
 
             # Sync with worker thread
             self._sync_worker_config()
+            self.dispatcher.release(header)
 
     def get_packet_stats(self) -> Dict[int, Dict[str, Any]]:
         """Get statistics for all packet types"""
@@ -123,24 +187,84 @@ class SerialReader(QObject):
         # Sync with worker thread
         self._sync_worker_config()
 
+    def get_health_metrics(self) -> Dict[str, Any]:
+        """Get a snapshot of acquisition health for monitoring"""
+        queues = {}
+        for header, config in list(self.packet_configs.items()):
+            if config.queue is not None:
+                queues[header] = {
+                    "name": config.name,
+                    "depth": config.queue.qsize(),
+                    "maxsize": config.queue.maxsize,
+                }
+        return {
+            "packet_stats": {h: dict(s) for h, s in list(self.packet_stats.items())},
+            "packet_names": {h: c.name for h, c in list(self.packet_configs.items())},
+            "queues": queues,
+            "worker": dict(self.worker.stats),
+            "read_loop": self.worker.loop_histogram,
+            "jitter": self.worker.jitter,
+            "realtime": dict(self.worker.realtime_status),
+            "dispatch_latency": self.dispatch_latency,
+            "executors": self.dispatcher.backlog(),
+            "protection": self.protection,
+            "sequence": self.get_sequence_stats(),
+        }
+
+    def get_sequence_stats(self) -> Dict[int, Dict[str, Dict[str, int]]]:
+        """Lost, duplicated and reordered packets per header and counter"""
+        result = {}
+        for (header, kind), tracker in list(self.worker.sequence_trackers.items()):
+            result.setdefault(header, {})[kind] = dict(tracker.stats)
+        return result
+
     def get_queue_for_header(self, header: int) -> Optional[Queue]:
         """Get the queue associated with a specific header"""
         config = self.packet_configs.get(header)
         return config.queue if config else None
 
+    def add_protection_rule(self, rule: ProtectionRule):
+        """Send a command from the I/O thread whenever ``rule`` fires
+
+        The packet type must also be configured with add_packet_config so
+        it gets framed; its normal handling runs after the rule.
+        """
+        config = self.packet_configs.get(rule.header)
+        if config is not None and rule.end > config.size:
+            raise ValueError(
+                f"Protection '{rule.name}' reads bytes {rule.offset}..{rule.end - 1} "
+                f"of 0x{rule.header:02X} packets of {config.size} bytes"
+            )
+        self.protection.add_rule(rule)
+        print(
+            f"[CONFIG] Protection '{rule.name}' on 0x{rule.header:02X}: "
+            f"{rule.comparison} {rule.threshold} sends {rule.command.hex()}"
+        )
+
     def send_signal(self, signal_bytes: bytes):
         """Send signal through worker thread"""
         self.worker.send_data(signal_bytes)
 
-    def _handle_packet(self, packet: bytes, config: PacketConfig):
-        """Handle a received packet according to its configuration (runs in main thread)"""
+    def _handle_packet(
+        self, packet: bytes, config: PacketConfig, framed_at: Optional[float] = None
+    ):
+        """Handle a received packet according to its configuration
+
+        Runs in the main thread, or on the I/O thread, a dedicated worker or
+        the shared pool depending on ``config.executor``.
+        """
+        started = time.perf_counter()
+        if framed_at is not None:
+            self.dispatch_latency.observe(started - framed_at)
+        timed = TIMINGS.enabled
         try:
             # Update statistics
             self.packet_stats[config.header]["count"] += 1
             self.packet_stats[config.header]["last_received"] = time.time()
 
             # Log the packet
-            self._log_packet(packet, config)
+            if self.log_packets:
+                self._log_packet(packet, config)
 
             # Put packet in queue
             if config.queue:
@@ -149,11 +273,20 @@ class SerialReader(QObject):
                 except:
                     # Queue might be full, handle gracefully
                     print(f"[WARNING] Queue full for {config.name}, dropping packet")
+                    self.packet_stats[config.header]["dropped"] += 1
 
             # Call callback if provided
             if config.callback:
                 try:
-                    config.callback(packet)
+                    if timed:
+                        callback_started = time.perf_counter()
+                        config.callback(packet)
+                        TIMINGS.record(
+                            f"callback:{config.name}",
+                            time.perf_counter() - callback_started,
+                        )
+                    else:
+                        config.callback(packet)
                 except Exception as e:
                     print(f"[ERROR] Callback error for {config.name}: {e}")
                     self.packet_stats[config.header]["errors"] += 1
@@ -170,11 +303,33 @@ class SerialReader(QObject):
             print(f"[ERROR] Error handling packet for {config.name}: {e}")
             self.packet_stats[config.header]["errors"] += 1
 
+        if timed:
+            finished = time.perf_counter()
+            TIMINGS.record("handle_packet", finished - started)
+            if framed_at is not None:
+                TIMINGS.record("dispatch", started - framed_at)
+
+    def _handle_backlog_drop(self, config: PacketConfig):
+        """Count a packet dropped because its executor backlog was full"""
+        stats = self.packet_stats.get(config.header)
+        if stats is not None:
+            stats["dropped"] += 1
+        if self.log_packets:
+            print(f"[WARNING] Executor backlog full for {config.name}, dropping packet")
+
     def _handle_desync(self, byte: int):
         """Handle desync detection"""
-        print(f"[DESYNC] Dropped byte: {byte:02X}")
+        if self.log_packets:
+            print(f"[DESYNC] Dropped byte: {byte:02X}")
         self.desync_detected.emit(byte)
 
+    def _handle_gap(self, start: float, duration: float):
+        """Handle the end of a connection outage"""
+        print(
+            f"[GAP] {self.port}: no data for {duration * 1000:.0f} ms before reconnect"
+        )
+        self.gap_detected.emit(start, duration)
+
     def _log_packet(self, packet: bytes, config: PacketConfig):
         """Log received packet"""
         hex_str = " ".join(f"{b:02X}" for b in packet)
@@ -182,4 +337,8 @@ class SerialReader(QObject):
 
     def __del__(self):
         """Cleanup when object is destroyed"""
-        self.stop()
+        try:
+            self.stop()
+        except RuntimeError:
+            # Qt objects may already be gone at interpreter shutdown
+            pass
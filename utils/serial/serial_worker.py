@@ -1,48 +1,110 @@
-import serial
 from PySide6.QtCore import QObject, Signal, QThread, QMutex, QMutexLocker
 from typing import Dict, Set, Callable, Optional, Any
 from dataclasses import dataclass
 from queue import Queue
 from utils.serial.types import PacketConfig
+from utils.serial.sequence import SequenceTracker
+from utils.serial.framing import frame_buffer
+from utils.serial.transports import Transport, create_transport
+from utils.metrics.histogram import Histogram
+from utils.diagnostics.jitter_probe import JitterProbe
+from utils.diagnostics.realtime import RealtimeSettings, apply_realtime
+from utils.diagnostics.timing import TIMINGS
+from collections import deque
+import os
+import random
+import threading
 import time
 
 
 class SerialWorker(QObject):
-    """Worker class that handles serial communication in a separate thread"""
+    """Worker class that handles serial communication in a separate thread
+
+    With ``auto_reconnect`` the port is supervised: when it fails to open or
+    drops out, the worker retries with exponential backoff and jitter, and
+    retries immediately when the device node reappears. The framing buffer
+    survives reconnects, and every outage is reported as a gap marker.
+
+    Bytes come from a Transport: by default one built from ``port`` (a
+    serial port, or a ``tcp://``, ``fd://`` or ``file://`` specification),
+    or any transport passed in, e.g. a MemoryTransport in tests.
+
+    ``realtime`` settings (priority, CPU affinity, memory locking) are
+    applied to the I/O thread when reading starts; ``jitter`` measures how
+    late the read loop wakes up whatever the settings.
+    """
+
+    # Reconnect backoff: first delay, growth factor, upper bound (seconds)
+    RECONNECT_INITIAL_DELAY = 0.05
+    RECONNECT_BACKOFF = 2.0
+    RECONNECT_MAX_DELAY = 5.0
+    RECONNECT_JITTER = 0.2  # +/- fraction of the delay
+    # Poll interval while waiting for a device node to reappear
+    DEVICE_POLL_INTERVAL = 0.02
 
     # Signals for communication with main thread
-    packet_ready = Signal(bytes, object)  # packet data and config
+    packet_ready = Signal(bytes, object, float)  # packet data, config, framing time
     error_occurred = Signal(str)
     desync_detected = Signal(int)
     connection_status = Signal(bool)
+    gap_detected = Signal(float, float)  # outage start (epoch s), duration (s)
 
-    def __init__(self, port: str, baudrate: int = 115200):
+    def __init__(
+        self,
+        port: str,
+        baudrate: int = 115200,
+        auto_reconnect: bool = True,
+        transport: Optional[Transport] = None,
+        realtime: Optional[RealtimeSettings] = None,
+    ):
         super().__init__()
         self.port = port
         self.baudrate = baudrate
-        self.ser = None
+        self.auto_reconnect = auto_reconnect
+        self.transport = (
+            transport if transport is not None else create_transport(port, baudrate)
+        )
         self.buffer = bytearray()
         self.running = False
         self.packet_configs = {}
         self.packet_stats = {}
         self.config_mutex = QMutex()
+        # Routes packets of non-GUI configs to their execution target
+        self.dispatcher = None
+        # Protection rules checked on this thread before any dispatch
+        self.protection = None
+        # Commands come from the GUI thread and from protection rules
+        self._write_lock = threading.Lock()
 
-    def initialize_serial(self):
-        """Initialize serial connection"""
+        # Health counters, read by the main thread for metrics
+        self.stats = {
+            "bytes_read": 0,
+            "desync_bytes": 0,
+            "reconnects": 0,
+            "gap_seconds": 0.0,
+            "last_gap_seconds": 0.0,
+        }
+        self.loop_histogram = Histogram()
+        # (header, "sequence" | "sample_counter") -> counter accounting
+        self.sequence_trackers: Dict[tuple, SequenceTracker] = {}
+        self.jitter = JitterProbe(baudrate)
+        self.realtime = realtime
+        self.realtime_status: Dict[str, str] = {}
+        self.gaps = deque(maxlen=1000)  # (start, duration) of recent outages
+
+        # Set by stop_reading so backoff sleeps end immediately
+        self._stop_event = threading.Event()
+
+    def initialize_serial(self, report_errors: bool = True):
+        """Open the transport"""
         try:
-            self.ser = serial.Serial(
-                self.port,
-                baudrate=self.baudrate,
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_EVEN,
-                stopbits=serial.STOPBITS_ONE,
-                timeout=0.1,  # Non-blocking with short timeout
-            )
+            self.transport.open()
             self.connection_status.emit(True)
             return True
-        except serial.SerialException as e:
-            self.error_occurred.emit(f"Failed to initialize serial: {e}")
-            self.connection_status.emit(False)
+        except OSError as e:  # Includes serial.SerialException
+            if report_errors:
+                self.error_occurred.emit(f"Failed to initialize serial: {e}")
+                self.connection_status.emit(False)
             return False
 
     def update_packet_configs(self, configs: Dict[int, PacketConfig], stats: Dict):
@@ -53,75 +115,194 @@ class SerialWorker(QObject):
 
     def start_reading(self):
         """Start the reading loop"""
-        if not self.initialize_serial():
+        self._stop_event.clear()
+        if self.realtime is not None and not self.realtime_status:
+            self._apply_realtime()
+        if not self.auto_reconnect:
+            if not self.initialize_serial():
+                return
+            self.running = True
+            self._read_loop()
             return
 
         self.running = True
-        self._read_loop()
+        self._supervise()
+
+    def _apply_realtime(self):
+        """Apply the realtime settings to this (the I/O) thread"""
+        self.realtime_status = apply_realtime(self.realtime)
+        refused = {k: v for k, v in self.realtime_status.items() if v != "ok"}
+        if refused:
+            details = ", ".join(f"{k}: {v}" for k, v in refused.items())
+            self.error_occurred.emit(f"Realtime settings not applied ({details})")
 
     def stop_reading(self):
         """Stop the reading loop"""
         self.running = False
-        if self.ser and self.ser.is_open:
-            self.ser.close()
+        self._stop_event.set()
+        if self.transport.is_open:
+            self.transport.close()
         self.connection_status.emit(False)
 
     def send_data(self, data: bytes):
         """Send data through serial port"""
-        if self.ser and self.ser.is_open:
+        if self.transport.is_open:
             try:
-                self.ser.write(data)
-            except serial.SerialException as e:
+                self.write_now(data)
+            except OSError as e:
                 self.error_occurred.emit(f"Failed to send data: {e}")
 
+    def write_now(self, data: bytes):
+        """Write to the transport from the calling thread; raises OSError"""
+        with self._write_lock:
+            self.transport.write(data)
+
+    def _supervise(self):
+        """Keep the port open, reconnecting with backoff until stopped"""
+        delay = self.RECONNECT_INITIAL_DELAY
+        gap_start = None  # Wall time and monotonic time the outage began
+        report_errors = True
+
+        while self.running:
+            if not self.initialize_serial(report_errors=report_errors):
+                # Report the first failure of an outage, not every retry
+                report_errors = False
+                if gap_start is None:
+                    gap_start = (time.time(), time.monotonic())
+                self._wait_for_device(delay)
+                delay = min(delay * self.RECONNECT_BACKOFF, self.RECONNECT_MAX_DELAY)
+                continue
+
+            if gap_start is not None:
+                self._record_gap(*gap_start)
+                gap_start = None
+            delay = self.RECONNECT_INITIAL_DELAY
+            report_errors = True
+
+            self._read_loop()
+
+            if self.running:
+                # The port dropped out; the partial frame stays in the buffer
+                gap_start = (time.time(), time.monotonic())
+                self._close_port()
+                self.connection_status.emit(False)
+
+    def _wait_for_device(self, delay: float):
+        """Sleep for a jittered backoff delay, or less if the device reappears"""
+        jitter = 1.0 + random.uniform(-self.RECONNECT_JITTER, self.RECONNECT_JITTER)
+        deadline = time.monotonic() + delay * jitter
+        watch_path = self.transport.watch_path
+        was_present = watch_path is not None and os.path.exists(watch_path)
+
+        while self.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if self._stop_event.wait(min(remaining, self.DEVICE_POLL_INTERVAL)):
+                return
+            if watch_path is not None:
+                present = os.path.exists(watch_path)
+                if present and not was_present:
+                    return  # Device node is back, retry right away
+                was_present = present
+
+    def _record_gap(self, wall_start: float, monotonic_start: float):
+        """Record an outage that just ended"""
+        duration = time.monotonic() - monotonic_start
+        self.stats["reconnects"] += 1
+        self.stats["gap_seconds"] += duration
+        self.stats["last_gap_seconds"] = duration
+        self.gaps.append((wall_start, duration))
+        self.gap_detected.emit(wall_start, duration)
+
+    def _close_port(self):
+        """Close the port after a failure, ignoring errors"""
+        try:
+            self.transport.close()
+        except Exception:
+            pass
+
     def _read_loop(self):
         """Main reading loop running in worker thread"""
+        timeout = getattr(self.transport, "timeout", None)
+        self.jitter.restart()
         while self.running:
             try:
-                if not self.ser or not self.ser.is_open:
+                if not self.transport.is_open:
                     break
 
                 # Read available data
-                data = self.ser.read(self.ser.in_waiting or 1)
+                started = time.perf_counter()
+                data = self.transport.read(self.transport.in_waiting or 1)
+                received = time.perf_counter()
+                self.jitter.observe_read(started, received, len(data), timeout)
                 if not data:
                     continue
 
+                self.stats["bytes_read"] += len(data)
                 self.buffer.extend(data)
-                self._process_buffer()
+                framing = time.perf_counter() if TIMINGS.enabled else 0.0
+                self._process_buffer(received)
+                finished = time.perf_counter()
+                self.loop_histogram.observe(finished - started)
+                if framing:
+                    TIMINGS.record("process_buffer", finished - framing)
+                    TIMINGS.record_busy(f"serial:{self.port}", finished - framing)
 
-            except serial.SerialException as e:
+            except OSError as e:  # Includes serial.SerialException
+                if not self.running:
+                    break  # Closed by stop_reading
                 self.error_occurred.emit(f"Serial exception: {e}")
-                self.running = False
+                if not self.auto_reconnect:
+                    self.running = False
                 break
             except Exception as e:
                 self.error_occurred.emit(f"Unexpected exception: {e}")
                 self.running = False
                 break
 
-    def _process_buffer(self):
-        """Process the buffer to extract packets based on configured headers"""
+    def _process_buffer(self, received: Optional[float] = None):
+        """Process the buffer to extract packets based on configured headers
+
+        Protection rules see each packet first; ``received`` is when the read
+        that completed it returned, the start of the protection latency.
+        """
         with QMutexLocker(self.config_mutex):
             configs = self.packet_configs.copy()
 
-        while len(self.buffer) > 0:
-            # Check if we have a valid header
-            header = self.buffer[0]
-            config = configs.get(header)
-
-            if config is None:
-                # Unknown header, drop byte and continue
-                self.desync_detected.emit(header)
-                self.buffer.pop(0)
-                continue
+        packets, desync = frame_buffer(self.buffer, configs)
+        protection = self.protection
+        if protection is not None and protection.rules:
+            if received is None:
+                received = time.perf_counter()
+            for _, packet, config in packets:
+                protection.evaluate(packet, config.header, received)
 
-            # Check if we have enough bytes for this packet type
-            if len(self.buffer) < config.size:
-                # Not enough data yet, wait for more
-                break
+        for _, header in desync:
+            # Unknown header, the byte was dropped
+            self.stats["desync_bytes"] += 1
+            self.desync_detected.emit(header)
 
-            # Extract the packet
-            packet = bytes(self.buffer[: config.size])
-            self.buffer = self.buffer[config.size :]
+        for _, packet, config in packets:
+            if config.sequence is not None or config.sample_counter is not None:
+                self._track_counters(packet, config)
+            # Run off-GUI configs here, emit the rest for the main thread
+            framed_at = time.perf_counter()
+            if self.dispatcher is None or not self.dispatcher.dispatch(
+                packet, config, framed_at
+            ):
+                self.packet_ready.emit(packet, config, framed_at)
 
-            # Emit packet for processing in main thread
-            self.packet_ready.emit(packet, config)
+    def _track_counters(self, packet: bytes, config: PacketConfig):
+        """Account the packet's sequence and sample counters"""
+        for kind, field in (
+            ("sequence", config.sequence),
+            ("sample_counter", config.sample_counter),
+        ):
+            if field is None:
+                continue
+            key = (config.header, kind)
+            tracker = self.sequence_trackers.get(key)
+            if tracker is None or tracker.field is not field:
+                tracker = self.sequence_trackers[key] = SequenceTracker(field)
+            tracker.observe(packet)
@@ -0,0 +1,420 @@
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Iterator, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+import serial
+
+try:
+    import fcntl
+    import termios
+    import tty
+except ImportError:  # Not available on Windows; FdTransport is POSIX only
+    fcntl = termios = tty = None
+
+
+class TransportError(OSError):
+    """A transport failed or the device went away"""
+
+
+class Transport:
+    """Byte stream the SerialWorker reads frames from
+
+    ``read`` returns the bytes available (at most ``size``), waiting at most
+    the transport timeout; an empty result means no data yet. A failure or
+    disconnect raises OSError (TransportError or serial.SerialException),
+    which the worker treats as an outage. A closed transport can be opened
+    again, which is how the worker reconnects.
+    """
+
+    # Path whose reappearance should trigger an immediate reconnect
+    watch_path: Optional[str] = None
+
+    @property
+    def is_open(self) -> bool:
+        raise NotImplementedError
+
+    @property
+    def in_waiting(self) -> int:
+        """Bytes that can be read without waiting (0 if unknown)"""
+        return 0
+
+    def open(self):
+        raise NotImplementedError
+
+    def read(self, size: int) -> bytes:
+        raise NotImplementedError
+
+    def write(self, data: bytes):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class PySerialTransport(Transport):
+    """Serial port through pyserial"""
+
+    def __init__(
+        self,
+        port: str,
+        baudrate: int = 115200,
+        bytesize: int = serial.EIGHTBITS,
+        parity: str = serial.PARITY_EVEN,
+        stopbits: float = serial.STOPBITS_ONE,
+        timeout: float = 0.1,
+    ):
+        self.port = port
+        self.baudrate = baudrate
+        self.bytesize = bytesize
+        self.parity = parity
+        self.stopbits = stopbits
+        self.timeout = timeout
+        self.watch_path = port if os.path.isabs(port) else None
+        self._serial: Optional[serial.Serial] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._serial is not None and self._serial.is_open
+
+    @property
+    def in_waiting(self) -> int:
+        return self._serial.in_waiting
+
+    def open(self):
+        self._serial = serial.Serial(
+            self.port,
+            baudrate=self.baudrate,
+            bytesize=self.bytesize,
+            parity=self.parity,
+            stopbits=self.stopbits,
+            timeout=self.timeout,
+        )
+
+    def read(self, size: int) -> bytes:
+        return self._serial.read(size)
+
+    def write(self, data: bytes):
+        self._serial.write(data)
+
+    def close(self):
+        if self._serial is not None:
+            self._serial.close()
+            self._serial = None
+
+
+class FdTransport(Transport):
+    """Raw file descriptor, e.g. a pty or a tty already configured elsewhere
+
+    Opens ``path`` non-blocking (or wraps an existing descriptor) and waits
+    with select; terminals are switched to raw mode.
+    """
+
+    def __init__(self, path: Union[str, int], timeout: float = 0.1):
+        self.path = path
+        self.timeout = timeout
+        self.watch_path = path if isinstance(path, str) else None
+        self._fd: Optional[int] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._fd is not None
+
+    @property
+    def in_waiting(self) -> int:
+        try:
+            raw = fcntl.ioctl(self._fd, termios.FIONREAD, b"\0\0\0\0")
+        except OSError:
+            return 0
+        return struct.unpack("i", raw)[0]
+
+    def open(self):
+        if fcntl is None:
+            raise TransportError("raw descriptor transport needs a POSIX system")
+        if isinstance(self.path, int):
+            fd = os.dup(self.path)
+        else:
+            fd = os.open(self.path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        os.set_blocking(fd, False)
+        if os.isatty(fd):
+            tty.setraw(fd)
+        self._fd = fd
+
+    def read(self, size: int) -> bytes:
+        fd = self._fd
+        if fd is None:
+            raise TransportError(f"{self.path}: transport closed")
+        readable, _, _ = select.select([fd], [], [], self.timeout)
+        if not readable:
+            return b""
+        try:
+            data = os.read(fd, max(size, 1))
+        except BlockingIOError:
+            return b""
+        if not data:
+            raise TransportError(f"{self.path}: end of stream")
+        return data
+
+    def write(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(self._fd, view)
+            except BlockingIOError:
+                select.select([], [self._fd], [], self.timeout)
+                continue
+            view = view[written:]
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class FileReplayTransport(Transport):
+    """Replay a recorded byte stream as if it came from a device
+
+    Capture files (.mrcap / .mrblk) are replayed with their original packet
+    timing scaled by ``speed``; any other file is replayed as raw bytes at
+    ``rate`` bytes per second. ``speed``/``rate`` of 0 replays as fast as
+    possible. At the end of the data the transport idles like a silent
+    device (``finished`` is set), or starts over when ``loop`` is set.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: float = 1.0,
+        rate: float = 0.0,
+        chunk_size: int = 4096,
+        loop: bool = False,
+        timeout: float = 0.1,
+    ):
+        self.path = path
+        self.speed = speed
+        self.rate = rate
+        self.chunk_size = chunk_size
+        self.loop = loop
+        self.timeout = timeout
+        self.finished = threading.Event()
+        self._chunks: Optional[Iterator[Tuple[float, bytes]]] = None
+        self._pending = b""
+        self._due = 0.0
+        self._start = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self._chunks is not None
+
+    def open(self):
+        self._chunks = self._iter_chunks()
+        self._pending = b""
+        self._start = time.monotonic()
+        self.finished.clear()
+
+    def _iter_chunks(self) -> Iterator[Tuple[float, bytes]]:
+        """Yield (offset in seconds, bytes) pairs from the file"""
+        from utils.capture.block_store import BLOCK_MAGIC
+        from utils.capture.recorder import MAGIC, read_capture
+
+        with open(self.path, "rb") as f:
+            is_capture = f.read(len(MAGIC)) in (MAGIC, BLOCK_MAGIC[: len(MAGIC)])
+        if is_capture:
+            first = None
+            for timestamp, _, packet in read_capture(self.path):
+                if first is None:
+                    first = timestamp
+                offset = (timestamp - first) / self.speed if self.speed else 0.0
+                yield offset, packet
+            return
+
+        sent = 0
+        with open(self.path, "rb") as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    return
+                yield (sent / self.rate if self.rate else 0.0), data
+                sent += len(data)
+
+    def read(self, size: int) -> bytes:
+        limit = max(size, self.chunk_size)
+        out = bytearray()
+        now = time.monotonic()
+        # Hand out everything that is due, up to the read limit
+        while len(out) < limit:
+            if not self._pending:
+                try:
+                    self._due, self._pending = next(self._chunks)
+                except StopIteration:
+                    if out:
+                        break
+                    if self.loop:
+                        self.open()
+                        return b""
+                    self.finished.set()
+                    time.sleep(self.timeout)
+                    return b""
+            wait = self._start + self._due - now
+            if wait > 0:
+                if out:
+                    break
+                time.sleep(min(wait, self.timeout))
+                if wait > self.timeout:
+                    return b""
+                now = time.monotonic()
+            take = limit - len(out)
+            out += self._pending[:take]
+            self._pending = self._pending[take:]
+        return bytes(out)
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._pending)
+
+    def write(self, data: bytes):
+        pass  # Commands to a replayed device go nowhere
+
+    def close(self):
+        self._chunks = None
+        self._pending = b""
+
+
+class SocketTransport(Transport):
+    """TCP connection, e.g. to a serial-over-IP gateway"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        timeout: float = 0.1,
+        connect_timeout: float = 2.0,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._sock: Optional[socket.socket] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._sock is not None
+
+    def open(self):
+        sock = socket.create_connection(
+            (self.host, self.port), timeout=self.connect_timeout
+        )
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(self.timeout)
+        self._sock = sock
+
+    def read(self, size: int) -> bytes:
+        sock = self._sock
+        if sock is None:
+            raise TransportError(f"{self.host}:{self.port}: transport closed")
+        try:
+            data = sock.recv(max(size, 4096))
+        except socket.timeout:
+            return b""
+        if not data:
+            raise TransportError(f"{self.host}:{self.port}: connection closed")
+        return data
+
+    def write(self, data: bytes):
+        self._sock.sendall(data)
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+class MemoryTransport(Transport):
+    """In-memory byte feed for tests and benchmarks
+
+    Producers call ``feed`` from any thread. ``unplug`` makes the next read
+    fail and further opens fail until ``replug``, simulating a device that
+    disappears. Written bytes are collected in ``written``.
+    """
+
+    def __init__(self, timeout: float = 0.1):
+        self.timeout = timeout
+        self.written = bytearray()
+        self._buffer = bytearray()
+        self._condition = threading.Condition()
+        self._open = False
+        self._plugged = True
+
+    @property
+    def is_open(self) -> bool:
+        return self._open
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data: bytes):
+        """Make bytes available to the reader"""
+        with self._condition:
+            self._buffer.extend(data)
+            self._condition.notify_all()
+
+    def unplug(self):
+        """Simulate the device going away"""
+        with self._condition:
+            self._plugged = False
+            self._condition.notify_all()
+
+    def replug(self):
+        """Let the device be opened again"""
+        self._plugged = True
+
+    def open(self):
+        if not self._plugged:
+            raise TransportError("memory transport unplugged")
+        self._open = True
+
+    def read(self, size: int) -> bytes:
+        with self._condition:
+            if not self._buffer and self._plugged:
+                self._condition.wait(self.timeout)
+            if not self._plugged:
+                raise TransportError("memory transport unplugged")
+            size = max(size, 1)
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return data
+
+    def write(self, data: bytes):
+        self.written.extend(data)
+
+    def close(self):
+        self._open = False
+
+
+def create_transport(port: str, baudrate: int = 115200) -> Transport:
+    """Build a transport from a port specification
+
+    - ``tcp://host:port``: TCP socket
+    - ``fd:///dev/pts/3``: raw descriptor / pty
+    - ``file:///path/capture.mrcap?speed=2``: file replay (also ``rate``,
+      ``loop``)
+    - anything else: serial port through pyserial
+    """
+    parts = urlsplit(port)
+    if parts.scheme == "tcp":
+        return SocketTransport(parts.hostname, parts.port)
+    if parts.scheme == "fd":
+        return FdTransport(parts.path)
+    if parts.scheme == "file":
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        return FileReplayTransport(
+            parts.path,
+            speed=float(query.get("speed", 1.0)),
+            rate=float(query.get("rate", 0.0)),
+            loop=query.get("loop", "0") not in ("0", "false", ""),
+        )
+    return PySerialTransport(port, baudrate)
@@ -2,11 +2,36 @@ from dataclasses import dataclass
 from queue import Queue
 from typing import Optional, Callable
 from PySide6.QtCore import Signal
+from utils.serial.dispatch import EXEC_GUI
+
+
+@dataclass
+class CounterField:
+    """Wrapping counter carried in a packet, e.g. a sequence number
+
+    The counter wraps at the range of ``dtype`` and advances by ``step``
+    per packet (1 for sequence numbers, samples per packet for sample
+    counters). ``sample_rate`` (counts per second) lets a sample counter
+    replace host arrival times with a device timebase.
+    """
+
+    offset: int
+    dtype: str = "u1"
+    step: int = 1
+    sample_rate: Optional[float] = None
 
 
 @dataclass
 class PacketConfig:
-    """Configuration for a packet type"""
+    """Configuration for a packet type
+
+    ``executor`` selects where the queue put, callback and signal emission
+    run: "gui" (GUI thread), "inline" (I/O thread), "worker" (a dedicated
+    thread for this header) or "pool" (shared pool, in order per header).
+
+    ``sequence`` and ``sample_counter`` name counters the worker checks for
+    lost, duplicated and reordered packets.
+    """
 
     header: int
     size: int
@@ -14,3 +39,6 @@ class PacketConfig:
     callback: Optional[Callable[[bytes], None]] = None
     signal: Optional[Signal] = None
     name: str = ""
+    executor: str = EXEC_GUI
+    sequence: Optional[CounterField] = None
+    sample_counter: Optional[CounterField] = None
@@ -0,0 +1,216 @@
+import heapq
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# One merged packet: (corrected time, source name, item)
+MergedItem = Tuple[float, str, Any]
+
+
+class ClockEstimator:
+    """Offset and drift of a device clock against the host clock
+
+    Host arrival minus device time is the clock offset plus a transport
+    delay that is never negative, so its minimum over a block of ``block``
+    seconds (device time) tracks the offset closely. A line fitted through
+    the minima of the last ``history`` blocks gives offset and drift;
+    ``to_host`` maps device times onto the host clock with it. Streams
+    timed by host arrival have a zero offset and drift.
+    """
+
+    def __init__(self, block: float = 1.0, history: int = 64):
+        self.block = block
+        self._minima = deque(maxlen=history)  # (device time, arrival - device)
+        self._block = -1  # Index of the current block since the reference
+        self._block_min: Optional[Tuple[float, float]] = None
+        self.reference: Optional[float] = None  # Device time of the first item
+        self.offset = 0.0
+        self.drift = 0.0  # Seconds of offset change per device second
+
+    def observe(self, device_times: np.ndarray, arrivals: np.ndarray):
+        """Account for a batch of device times and their host arrival times"""
+        device_times = np.asarray(device_times, dtype=np.float64)
+        if len(device_times) == 0:
+            return
+        deltas = np.asarray(arrivals, dtype=np.float64) - device_times
+        if self.reference is None:
+            self.reference = float(device_times[0])
+        blocks = np.floor((device_times - self.reference) / self.block)
+        for block in np.unique(blocks):
+            members = np.flatnonzero(blocks == block)
+            index = members[np.argmin(deltas[members])]
+            candidate = (float(device_times[index]), float(deltas[index]))
+            if block > self._block:
+                if self._block_min is not None:
+                    self._minima.append(self._block_min)
+                self._block, self._block_min = int(block), candidate
+            elif candidate[1] < self._block_min[1]:
+                self._block_min = candidate
+        self._fit()
+
+    def _fit(self):
+        if len(self._minima) < 2:
+            # No drift before two complete blocks; the lowest delta so far
+            # is the best offset
+            points = list(self._minima) + [self._block_min]
+            self.offset = min(delta for _, delta in points)
+            return
+        times = np.array([t for t, _ in self._minima]) - self.reference
+        deltas = np.array([d for _, d in self._minima])
+        self.drift, self.offset = (float(v) for v in np.polyfit(times, deltas, 1))
+
+    def to_host(self, device_times: np.ndarray) -> np.ndarray:
+        """Host clock times of device times"""
+        device_times = np.asarray(device_times, dtype=np.float64)
+        if self.reference is None:
+            return device_times
+        return device_times + self.offset + self.drift * (device_times - self.reference)
+
+
+class _Source:
+    """Buffered, time-ordered packets of one input stream"""
+
+    def __init__(self, name: str, clock: Optional[ClockEstimator]):
+        self.name = name
+        self.clock = clock
+        self.times = np.empty(0)
+        self.items: List[Any] = []
+        self.latest = -np.inf  # Newest corrected time pushed
+
+
+class StreamMerger:
+    """Merge packet streams of several devices into one time-ordered stream
+
+    Every source (e.g. one packet type of one SerialReader) pushes batches
+    in its own time order with device or arrival times; with a clock
+    estimator those are mapped onto the host clock first. ``pop_ready``
+    k-way merges the buffered sources up to a watermark: the oldest newest
+    time over all sources (nothing earlier can still arrive), but never
+    more than ``max_delay`` seconds behind the host clock, so a stalled
+    source delays the output by at most ``max_delay``. A larger delay
+    waits longer for slow sources; packets arriving behind the watermark
+    are counted as late and dropped.
+    """
+
+    def __init__(
+        self,
+        max_delay: float = 0.2,
+        clock_block: float = 1.0,
+        callback: Optional[Callable[[List[MergedItem]], None]] = None,
+    ):
+        self.max_delay = max_delay
+        self.clock_block = clock_block
+        self.callback = callback
+        self.sources: Dict[str, _Source] = {}
+        self.watermark = -np.inf  # Everything up to here has been emitted
+        self.stats = {"pushed": 0, "emitted": 0, "late": 0, "max_buffered": 0}
+        self.late_by_source: Dict[str, int] = {}
+
+    def add_source(self, name: str, correct_clock: bool = True):
+        """Register an input stream; ``correct_clock`` estimates its clock"""
+        clock = ClockEstimator(self.clock_block) if correct_clock else None
+        self.sources[name] = _Source(name, clock)
+        self.late_by_source[name] = 0
+
+    def push(
+        self,
+        name: str,
+        timestamps: np.ndarray,
+        items: Sequence[Any],
+        arrivals: Optional[np.ndarray] = None,
+    ):
+        """Buffer a batch of one source
+
+        Args:
+            name: Source name given to ``add_source``
+            timestamps: Device (or arrival) time of every item
+            items: The items, e.g. raw packets
+            arrivals: Host arrival times, used to estimate the source clock
+        """
+        source = self.sources[name]
+        times = np.asarray(timestamps, dtype=np.float64)
+        if len(times) == 0:
+            return
+        if source.clock is not None:
+            source.clock.observe(times, times if arrivals is None else arrivals)
+            times = source.clock.to_host(times)
+        items = list(items)
+        self.stats["pushed"] += len(items)
+
+        late = times <= self.watermark
+        if late.any():
+            count = int(late.sum())
+            self.stats["late"] += count
+            self.late_by_source[name] += count
+            keep = np.flatnonzero(~late)
+            times = times[keep]
+            items = [items[i] for i in keep]
+            if len(times) == 0:
+                return
+
+        source.times = np.concatenate((source.times, times))
+        source.items.extend(items)
+        if np.any(np.diff(source.times) < 0):
+            order = np.argsort(source.times, kind="stable")
+            source.times = source.times[order]
+            source.items = [source.items[i] for i in order]
+        source.latest = max(source.latest, float(source.times[-1]))
+        self.stats["max_buffered"] = max(self.stats["max_buffered"], self.buffered)
+
+    @property
+    def buffered(self) -> int:
+        """Items waiting for the watermark"""
+        return sum(len(source.items) for source in self.sources.values())
+
+    def pop_ready(self, now: Optional[float] = None) -> List[MergedItem]:
+        """Merged items up to the current watermark, oldest first"""
+        now = time.time() if now is None else now
+        seen = [s.latest for s in self.sources.values() if s.latest > -np.inf]
+        complete = min(seen) if len(seen) == len(self.sources) else -np.inf
+        return self._emit(max(complete, now - self.max_delay))
+
+    def flush(self) -> List[MergedItem]:
+        """Merge everything still buffered"""
+        return self._emit(np.inf)
+
+    def _emit(self, watermark: float) -> List[MergedItem]:
+        runs = []
+        for source in self.sources.values():
+            count = int(np.searchsorted(source.times, watermark, side="right"))
+            if count == 0:
+                continue
+            runs.append(
+                zip(
+                    source.times[:count].tolist(),
+                    [source.name] * count,
+                    source.items[:count],
+                )
+            )
+            source.times = source.times[count:]
+            del source.items[:count]
+        if np.isfinite(watermark):
+            self.watermark = max(self.watermark, watermark)
+        if not runs:
+            return []
+        merged = list(heapq.merge(*runs, key=lambda entry: entry[0]))
+        self.watermark = max(self.watermark, merged[-1][0])
+        self.stats["emitted"] += len(merged)
+        if self.callback:
+            self.callback(merged)
+        return merged
+
+    def clock_report(self, reference: Optional[str] = None) -> Dict[str, Dict]:
+        """Offset and drift of every source, offsets relative to ``reference``"""
+        base = 0.0
+        if reference is not None and self.sources[reference].clock is not None:
+            base = self.sources[reference].clock.offset
+        report = {}
+        for name, source in self.sources.items():
+            clock = source.clock
+            report[name] = {
+                "offset": (clock.offset if clock else 0.0) - base,
+                "drift_ppm": clock.drift * 1e6 if clock else 0.0,
+                "late": self.late_by_source[name],
+            }
+        return report
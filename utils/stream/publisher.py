@@ -0,0 +1,344 @@
+import json
+import os
+import selectors
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+from utils.capture.recorder import RECORD_HEADER
+
+# Every message on the wire: body length (uint32, big endian) + message kind
+MESSAGE_HEADER = struct.Struct(">IB")
+# Body is a batch of RECORD_HEADER + packet records
+KIND_PACKETS = 1
+# Body is a JSON document of decoded field arrays
+KIND_DECODED = 2
+
+
+class _Subscriber:
+    """Connection state of one subscriber"""
+
+    def __init__(self, sock: socket.socket, address: str):
+        self.sock = sock
+        self.address = address
+        self.out = deque()
+        self.out_bytes = 0
+        self.sent_messages = 0
+        self.dropped_messages = 0
+
+
+class PacketPublisher:
+    """Fan out packet streams to local TCP or Unix-socket subscribers
+
+    Producers call ``publish`` / ``publish_decoded`` from any thread. Records
+    are batched for ``batch_interval`` seconds into one length-prefixed
+    message that is queued for every subscriber. Each subscriber has a
+    bounded output buffer; when a slow subscriber's buffer is full the
+    message is dropped for it, or the subscriber is disconnected when
+    ``disconnect_slow`` is set. A message larger than the buffer is still
+    queued for a subscriber with nothing else pending. Acquisition is never blocked by subscribers.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        unix_path: Optional[str] = None,
+        max_buffer_bytes: int = 4 * 1024 * 1024,
+        batch_interval: float = 0.01,
+        max_batch_records: int = 4096,
+        disconnect_slow: bool = False,
+    ):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.max_buffer_bytes = max_buffer_bytes
+        self.batch_interval = batch_interval
+        self.max_batch_records = max_batch_records
+        self.disconnect_slow = disconnect_slow
+
+        self.stats = {
+            "published": 0,
+            "messages": 0,
+            "dropped_messages": 0,
+            "disconnects": 0,
+            "subscribers": 0,
+        }
+
+        self._lock = threading.Lock()
+        self._pending: List[bytes] = []
+        self._pending_decoded: List[bytes] = []
+        self._subscribers: Dict[socket.socket, _Subscriber] = {}
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._server: Optional[socket.socket] = None
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    @property
+    def address(self):
+        """Address subscribers connect to"""
+        if self.unix_path:
+            return self.unix_path
+        return (self.host, self.port)
+
+    def start(self):
+        """Open the listening socket and start the server thread"""
+        if self._running:
+            return
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(self.unix_path)
+        else:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server.bind((self.host, self.port))
+            self.port = server.getsockname()[1]
+        server.listen(16)
+        server.setblocking(False)
+        self._server = server
+
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(server, selectors.EVENT_READ, "accept")
+        self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._serve, name="packet-publisher", daemon=True
+        )
+        self._thread.start()
+        print(f"[PUBLISH] Serving packet stream on {self.address}")
+
+    def stop(self):
+        """Close all connections and stop the server thread"""
+        if not self._running:
+            return
+        self._running = False
+        self._wake()
+        if self._thread:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+        for sub in list(self._subscribers.values()):
+            self._close_subscriber(sub, count=False)
+        for sock in (self._server, self._wake_r, self._wake_w):
+            if sock:
+                sock.close()
+        if self._selector:
+            self._selector.close()
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+
+    def publish(self, header: int, packet: bytes, timestamp: Optional[float] = None):
+        """Queue a framed packet for all subscribers (thread-safe)"""
+        if timestamp is None:
+            timestamp = time.time()
+        record = RECORD_HEADER.pack(timestamp, header, len(packet)) + packet
+        with self._lock:
+            self._pending.append(record)
+            flush_now = len(self._pending) >= self.max_batch_records
+        if flush_now:
+            self._wake()
+
+    def publish_decoded(self, stream: str, timestamps, fields: Dict):
+        """Queue a batch of decoded field arrays for all subscribers"""
+        document = {
+            "stream": stream,
+            "timestamps": [float(t) for t in timestamps],
+            "fields": {
+                name: [float(v) for v in values] for name, values in fields.items()
+            },
+        }
+        body = json.dumps(document, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._pending_decoded.append(body)
+        self._wake()
+
+    def subscriber_stats(self) -> List[Dict]:
+        """Per-subscriber buffer and drop statistics"""
+        return [
+            {
+                "address": sub.address,
+                "buffered_bytes": sub.out_bytes,
+                "sent_messages": sub.sent_messages,
+                "dropped_messages": sub.dropped_messages,
+            }
+            for sub in list(self._subscribers.values())
+        ]
+
+    def _wake(self):
+        """Interrupt the selector so pending data is flushed immediately"""
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError, AttributeError):
+            pass
+
+    def _serve(self):
+        """Server thread: accept, batch and write until stopped"""
+        next_flush = time.monotonic() + self.batch_interval
+        while self._running:
+            timeout = max(0.0, next_flush - time.monotonic())
+            for key, events in self._selector.select(timeout):
+                if key.data == "accept":
+                    self._accept()
+                elif key.data == "wake":
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                else:
+                    sub = key.data
+                    if events & selectors.EVENT_READ:
+                        self._read_subscriber(sub)
+                    if events & selectors.EVENT_WRITE and sub.sock in self._subscribers:
+                        self._write_subscriber(sub)
+
+            now = time.monotonic()
+            if now >= next_flush or len(self._pending) >= self.max_batch_records:
+                self._flush_pending()
+                next_flush = now + self.batch_interval
+
+    def _accept(self):
+        """Accept a new subscriber"""
+        try:
+            sock, address = self._server.accept()
+        except (BlockingIOError, OSError):
+            return
+        sock.setblocking(False)
+        if sock.family != socket.AF_UNIX:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sub = _Subscriber(sock, str(address) if address else self.unix_path)
+        self._subscribers[sock] = sub
+        self._selector.register(sock, selectors.EVENT_READ, sub)
+        self.stats["subscribers"] = len(self._subscribers)
+        print(f"[PUBLISH] Subscriber connected: {sub.address}")
+
+    def _read_subscriber(self, sub: _Subscriber):
+        """Subscribers do not send data; a read only detects disconnects"""
+        try:
+            data = sub.sock.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close_subscriber(sub, count=False)
+
+    def _flush_pending(self):
+        """Turn pending records into messages and queue them per subscriber"""
+        with self._lock:
+            records, self._pending = self._pending, []
+            decoded, self._pending_decoded = self._pending_decoded, []
+
+        messages = []
+        if records:
+            body = b"".join(records)
+            messages.append(MESSAGE_HEADER.pack(len(body), KIND_PACKETS) + body)
+            self.stats["published"] += len(records)
+        for body in decoded:
+            messages.append(MESSAGE_HEADER.pack(len(body), KIND_DECODED) + body)
+        if not messages:
+            return
+
+        for message in messages:
+            self.stats["messages"] += 1
+            for sub in list(self._subscribers.values()):
+                # An idle subscriber takes any message, even one over the limit
+                if sub.out and sub.out_bytes + len(message) > self.max_buffer_bytes:
+                    if self.disconnect_slow:
+                        print(f"[PUBLISH] Disconnecting slow subscriber {sub.address}")
+                        self._close_subscriber(sub, count=True)
+                    else:
+                        sub.dropped_messages += 1
+                        self.stats["dropped_messages"] += 1
+                    continue
+                sub.out.append(message)
+                sub.out_bytes += len(message)
+
+        for sub in list(self._subscribers.values()):
+            if sub.out:
+                self._write_subscriber(sub)
+
+    def _write_subscriber(self, sub: _Subscriber):
+        """Write as much buffered data as the socket accepts"""
+        while sub.out:
+            message = sub.out[0]
+            try:
+                sent = sub.sock.send(message)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                self._close_subscriber(sub, count=False)
+                return
+            sub.out_bytes -= sent
+            if sent < len(message):
+                sub.out[0] = message[sent:]
+                break
+            sub.out.popleft()
+            sub.sent_messages += 1
+
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if sub.out else 0)
+        self._selector.modify(sub.sock, events, sub)
+
+    def _close_subscriber(self, sub: _Subscriber, count: bool):
+        """Drop a subscriber connection"""
+        if sub.sock not in self._subscribers:
+            return
+        del self._subscribers[sub.sock]
+        try:
+            self._selector.unregister(sub.sock)
+        except (KeyError, ValueError):
+            pass
+        sub.sock.close()
+        if count:
+            self.stats["disconnects"] += 1
+        self.stats["subscribers"] = len(self._subscribers)
+        print(f"[PUBLISH] Subscriber disconnected: {sub.address}")
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Receive exactly size bytes, or None when the connection closes"""
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def iter_messages(sock: socket.socket) -> Iterator[Tuple[int, object]]:
+    """Iterate over messages from a publisher connection
+
+    Yields ``(KIND_PACKETS, [(timestamp, header, packet), ...])`` or
+    ``(KIND_DECODED, document)`` until the connection closes.
+    """
+    while True:
+        raw = _recv_exact(sock, MESSAGE_HEADER.size)
+        if raw is None:
+            return
+        length, kind = MESSAGE_HEADER.unpack(raw)
+        body = _recv_exact(sock, length)
+        if body is None:
+            return
+        if kind == KIND_DECODED:
+            yield kind, json.loads(body)
+            continue
+        records = []
+        offset = 0
+        while offset < len(body):
+            timestamp, header, size = RECORD_HEADER.unpack_from(body, offset)
+            offset += RECORD_HEADER.size
+            records.append((timestamp, header, body[offset : offset + size]))
+            offset += size
+        yield kind, records
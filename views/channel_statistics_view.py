@@ -0,0 +1,104 @@
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+)
+from PySide6.QtCore import Signal
+import math
+import time
+
+
+class ChannelStatisticsView(QWidget):
+    """
+    Table of running statistics per channel for the current window.
+
+    One row per channel with count, extremes, mean, standard deviation and
+    the configured percentiles; the reset button asks the owner to start a
+    new window (e.g. at a shift change).
+    """
+
+    reset_requested = Signal()
+
+    BASE_COLUMNS = ("Channel", "Count", "Min", "Max", "Mean", "Std")
+
+    def __init__(self, parent=None):
+        """
+        Initialize the channel statistics view.
+
+        Args:
+            parent: Parent widget (optional)
+        """
+        super().__init__(parent)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        self.window_label = QLabel("Statistics")
+        header.addWidget(self.window_label, 1)
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(self.reset_requested.emit)
+        header.addWidget(self.reset_button)
+        layout.addLayout(header)
+
+        self.table = QTableWidget(0, len(self.BASE_COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.BASE_COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        layout.addWidget(self.table)
+
+    def show_statistics(self, snapshot, started=None):
+        """
+        Show a statistics snapshot.
+
+        Args:
+            snapshot (dict): Statistics per channel, as returned by
+                ChannelStatistics.snapshot()
+            started (float): Start of the window as a Unix time (optional)
+        """
+        if started is not None:
+            self.window_label.setText(
+                "Statistics since "
+                + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started))
+            )
+        stats_names = []
+        for stats in snapshot.values():
+            stats_names = [name for name in stats if name != "count"]
+            break
+        columns = ("Channel", "Count") + tuple(
+            name if name.startswith("p") else name.capitalize() for name in stats_names
+        )
+        if columns != tuple(
+            self.table.horizontalHeaderItem(i).text()
+            for i in range(self.table.columnCount())
+        ):
+            self.table.setColumnCount(len(columns))
+            self.table.setHorizontalHeaderLabels(columns)
+
+        self.table.setRowCount(len(snapshot))
+        for row, (channel, stats) in enumerate(snapshot.items()):
+            values = [channel, str(stats["count"])]
+            values += [self._format(stats[name]) for name in stats_names]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+    @staticmethod
+    def _format(value):
+        """
+        Format a statistic for display.
+
+        Args:
+            value (float): Statistic value
+
+        Returns:
+            str: The value with four significant digits, "-" when undefined
+        """
+        return "-" if math.isnan(value) else f"{value:.4g}"
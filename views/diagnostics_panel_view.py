@@ -0,0 +1,134 @@
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QCheckBox,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+)
+from PySide6.QtCore import QTimer
+from utils.diagnostics.timing import TIMINGS
+
+
+class DiagnosticsPanelView(QWidget):
+    """
+    Live diagnostics panel showing per-stage timings of the acquisition and
+    rendering pipeline, event-loop lag and worker thread utilization.
+
+    Timing collection is off by default; the panel only reads the shared
+    timing registry, so it costs nothing while hidden.
+    """
+
+    COLUMNS = ("Stage", "Rate /s", "Mean ms", "p50 ms", "p99 ms", "Max ms")
+    REFRESH_INTERVAL_MS = 1000
+
+    def __init__(self, timings=TIMINGS, parent=None):
+        """
+        Initialize the diagnostics panel.
+
+        Args:
+            timings: StageTimings registry to display
+            parent: Parent widget (optional)
+        """
+        super().__init__(parent)
+        self.timings = timings
+
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.enable_checkbox = QCheckBox("Collect timings")
+        self.enable_checkbox.setChecked(timings.enabled)
+        self.enable_checkbox.toggled.connect(self._on_enable_toggled)
+        controls.addWidget(self.enable_checkbox)
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(self._on_reset_clicked)
+        controls.addWidget(self.reset_button)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        self.lag_label = QLabel("Event loop lag: -")
+        layout.addWidget(self.lag_label)
+        self.utilization_label = QLabel("Worker utilization: -")
+        self.utilization_label.setWordWrap(True)
+        layout.addWidget(self.utilization_label)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(
+            0, QHeaderView.ResizeMode.Stretch
+        )
+        layout.addWidget(self.table)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        """Start refreshing while the panel is visible."""
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start(self.REFRESH_INTERVAL_MS)
+
+    def hideEvent(self, event):
+        """Stop refreshing while the panel is hidden."""
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def refresh(self):
+        """
+        Update the panel from the timing registry.
+        """
+        snapshot = self.timings.snapshot()
+
+        lag = snapshot.pop("event_loop_lag", None)
+        if lag and lag["count"]:
+            self.lag_label.setText(
+                f"Event loop lag: mean {lag['mean'] * 1000:.2f} ms | "
+                f"p99 {lag['p99'] * 1000:.2f} ms | max {lag['max'] * 1000:.2f} ms"
+            )
+        else:
+            self.lag_label.setText("Event loop lag: -")
+
+        utilization = self.timings.utilization()
+        if utilization:
+            text = ", ".join(
+                f"{name} {fraction * 100:.1f}%"
+                for name, fraction in sorted(utilization.items())
+            )
+            self.utilization_label.setText(f"Worker utilization: {text}")
+        else:
+            self.utilization_label.setText("Worker utilization: -")
+
+        stages = sorted(snapshot.items())
+        self.table.setRowCount(len(stages))
+        for row, (name, stats) in enumerate(stages):
+            values = (
+                name,
+                f"{stats['rate']:.1f}",
+                f"{stats['mean'] * 1000:.3f}",
+                f"{stats['p50'] * 1000:.3f}",
+                f"{stats['p99'] * 1000:.3f}",
+                f"{stats['max'] * 1000:.3f}",
+            )
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+    def _on_enable_toggled(self, enabled):
+        """
+        Switch timing collection on or off.
+
+        Args:
+            enabled (bool): Whether stages record their timings
+        """
+        self.timings.enabled = enabled
+
+    def _on_reset_clicked(self):
+        """
+        Clear all recorded timings.
+        """
+        self.timings.reset()
+        self.refresh()
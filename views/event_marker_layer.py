@@ -0,0 +1,187 @@
+from PySide6.QtCore import QLineF, QPointF, QRectF
+import numpy as np
+import pyqtgraph as pg
+
+
+class EventMarkerItem(pg.GraphicsObject):
+    """
+    All vertical event markers of one colour drawn as a single graphics item.
+
+    Marker positions are kept sorted in a growing array, so painting only
+    looks at the markers inside the visible x range (found by binary search)
+    and draws at most one line per pixel column, in one call. Labels are
+    drawn only when few enough markers are visible to read them. The cost
+    of a frame depends on what is visible, not on how many markers exist.
+    """
+
+    MAX_LABELS = 30
+    LABEL_OFFSET = 3
+
+    def __init__(self, color="r", max_labels=None):
+        """
+        Initialize the marker item.
+
+        Args:
+            color: Pen colour of the markers and labels
+            max_labels (int): Most visible markers for which labels are drawn
+        """
+        super(EventMarkerItem, self).__init__()
+        self.pen = pg.mkPen(color)
+        self.pen.setCosmetic(True)
+        self.max_labels = self.MAX_LABELS if max_labels is None else max_labels
+        self.count = 0
+        self._positions = np.empty(256, dtype=np.float64)
+        self._labels = []
+
+    @property
+    def positions(self):
+        """Sorted marker positions"""
+        return self._positions[: self.count]
+
+    @property
+    def labels(self):
+        """Marker labels, in position order"""
+        return self._labels
+
+    def add_marker(self, x_pos, label=""):
+        """
+        Add one marker.
+
+        Args:
+            x_pos (float): X position of the marker
+            label (str): Label of the marker
+        """
+        self.add_markers([x_pos], [label])
+
+    def add_markers(self, x_positions, labels=None):
+        """
+        Add several markers at once.
+
+        Args:
+            x_positions: X positions of the markers
+            labels: Labels of the markers (optional)
+        """
+        x_positions = np.asarray(x_positions, dtype=np.float64).ravel()
+        if len(x_positions) == 0:
+            return
+        labels = [""] * len(x_positions) if labels is None else list(labels)
+        if len(labels) != len(x_positions):
+            raise ValueError("Need one label per marker")
+
+        needed = self.count + len(x_positions)
+        if needed > len(self._positions):
+            grown = np.empty(max(needed, 2 * len(self._positions)), dtype=np.float64)
+            grown[: self.count] = self.positions
+            self._positions = grown
+
+        in_order = np.all(np.diff(x_positions) >= 0) and (
+            self.count == 0 or x_positions[0] >= self._positions[self.count - 1]
+        )
+        if in_order:
+            # Live events arrive in time order: plain append
+            self._positions[self.count : needed] = x_positions
+            self._labels.extend(labels)
+        else:
+            positions = np.concatenate((self.positions, x_positions))
+            order = np.argsort(positions, kind="stable")
+            self._positions[:needed] = positions[order]
+            all_labels = self._labels + labels
+            self._labels = [all_labels[i] for i in order]
+        self.count = needed
+
+        self.prepareGeometryChange()
+        self.informViewBoundsChanged()
+        self.update()
+
+    def clear(self):
+        """
+        Remove all markers.
+        """
+        self.count = 0
+        self._labels = []
+        self.prepareGeometryChange()
+        self.informViewBoundsChanged()
+        self.update()
+
+    def visible_range(self, x_min, x_max):
+        """
+        Get the index range of the markers between two x positions.
+
+        Args:
+            x_min (float): Left edge
+            x_max (float): Right edge
+
+        Returns:
+            tuple: (start, stop) indices into the sorted markers
+        """
+        positions = self.positions
+        return (
+            int(np.searchsorted(positions, x_min, side="left")),
+            int(np.searchsorted(positions, x_max, side="right")),
+        )
+
+    def dataBounds(self, axis, frac=1.0, orthoRange=None):
+        """
+        Report the x extent of the markers for auto-ranging; markers span
+        any y range, so they do not constrain it.
+        """
+        if axis != 0 or self.count == 0:
+            return None
+        return (self._positions[0], self._positions[self.count - 1])
+
+    def boundingRect(self):
+        """
+        Markers are drawn across the visible area.
+        """
+        if self.count == 0:
+            return QRectF()
+        view = self.viewRect()
+        return QRectF() if view is None else view
+
+    def viewRangeChanged(self):
+        """
+        Follow the view, since the bounding rect is the visible area.
+        """
+        self.prepareGeometryChange()
+        self.update()
+
+    def paint(self, painter, option, widget=None):
+        """
+        Draw the visible markers, and their labels when zoomed in.
+
+        Args:
+            painter: QPainter of the scene
+            option: Style options
+            widget: Widget being painted on
+        """
+        view = self.viewRect()
+        if self.count == 0 or view is None:
+            return
+        start, stop = self.visible_range(view.left(), view.right())
+        if start == stop:
+            return
+
+        # Draw in device coordinates so lines and text are not scaled
+        transform = painter.transform()
+        top = transform.map(QPointF(view.left(), view.bottom()))
+        bottom = transform.map(QPointF(view.left(), view.top()))
+        y_top, y_bottom = sorted((top.y(), bottom.y()))
+        positions = self._positions[start:stop]
+        pixels = transform.m11() * positions + transform.m31()
+        columns = np.round(pixels)
+        keep = np.empty(len(columns), dtype=bool)
+        keep[0] = True
+        np.not_equal(columns[1:], columns[:-1], out=keep[1:])
+        columns = columns[keep]
+
+        painter.save()
+        painter.resetTransform()
+        painter.setPen(self.pen)
+        painter.drawLines([QLineF(x, y_top, x, y_bottom) for x in columns])
+        if stop - start <= self.max_labels:
+            metrics = painter.fontMetrics()
+            y_text = y_top + metrics.ascent() + self.LABEL_OFFSET
+            for x, label in zip(pixels, self._labels[start:stop]):
+                if label:
+                    painter.drawText(QPointF(x + self.LABEL_OFFSET, y_text), label)
+        painter.restore()
@@ -1,11 +1,12 @@
-from PySide6.QtWidgets import QMainWindow, QMessageBox
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QMainWindow, QMessageBox, QDockWidget, QPushButton
+from PySide6.QtCore import QObject, Signal, Qt
 import sys
 import os
 
 # Add the ressources directory to the path to import the UI
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "ressources"))
 from ui_main_window import Ui_MainWindow
+from views.diagnostics_panel_view import DiagnosticsPanelView
 
 
 class MainWindowView(QMainWindow):
@@ -17,6 +18,7 @@ class MainWindowView(QMainWindow):
     # Signals for communicating with controllers
     arc_detection_requested = Signal()
     short_circuit_detection_requested = Signal()
+    multi_channel_requested = Signal()
 
     def __init__(self, parent=None):
         """
@@ -31,6 +33,13 @@ class MainWindowView(QMainWindow):
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
 
+        # Footer button for the combined multi-channel view
+        self.multiChannelBtn = QPushButton("Overview", self.ui.footerWidget)
+        self.ui.horizontalLayout.addWidget(self.multiChannelBtn)
+
+        # Diagnostics panel, hidden until toggled from the footer
+        self._setup_diagnostics_panel()
+
         # Connect signals to slots
         self._connect_signals()
 
@@ -45,6 +54,24 @@ class MainWindowView(QMainWindow):
         self.ui.shorCircuitDetectionBtn.clicked.connect(
             self._on_short_circuit_detection_clicked
         )
+        self.multiChannelBtn.clicked.connect(self.multi_channel_requested.emit)
+
+    def _setup_diagnostics_panel(self):
+        """
+        Create the diagnostics dock and its toggle button in the footer.
+        """
+        self.diagnostics_panel = DiagnosticsPanelView()
+        self.diagnostics_dock = QDockWidget("Diagnostics", self)
+        self.diagnostics_dock.setObjectName("diagnosticsDock")
+        self.diagnostics_dock.setWidget(self.diagnostics_panel)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.diagnostics_dock)
+        self.diagnostics_dock.hide()
+
+        self.diagnosticsBtn = QPushButton("Diagnostics", self.ui.footerWidget)
+        self.diagnosticsBtn.setCheckable(True)
+        self.ui.horizontalLayout.insertWidget(1, self.diagnosticsBtn)
+        self.diagnosticsBtn.toggled.connect(self.diagnostics_dock.setVisible)
+        self.diagnostics_dock.visibilityChanged.connect(self.diagnosticsBtn.setChecked)
 
     def _on_arc_detection_clicked(self):
         """
@@ -115,6 +142,20 @@ class MainWindowView(QMainWindow):
         """
         self.ui.arcDetectionBtn.setEnabled(enabled)
         self.ui.shorCircuitDetectionBtn.setEnabled(enabled)
+        self.multiChannelBtn.setEnabled(enabled)
+
+    def show_render_stats(self, stats):
+        """
+        Show plot rendering statistics in the status bar.
+
+        Args:
+            stats (dict): Frame statistics from the render scheduler
+        """
+        self.statusBar().showMessage(
+            f"Plot: {stats['fps']} FPS | frame {stats['frame_time_mean_ms']:.1f} ms "
+            f"(p95 {stats['frame_time_p95_ms']:.1f} ms) | "
+            f"quality level {stats['quality_level']}"
+        )
 
     def update_detection_status(self, detection_type, status):
         """
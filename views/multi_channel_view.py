@@ -0,0 +1,247 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout
+from PySide6.QtCore import QTimer
+import math
+import time
+import numpy as np
+import pyqtgraph as pg
+from utils.dsp.ring_buffer import TimeBaseRingBuffer
+
+
+def peak_decimate(x, y, factor):
+    """
+    Reduce a trace by ``factor`` while keeping its extremes.
+
+    Each block of ``factor`` samples becomes its minimum and maximum, so
+    short spikes such as arcs stay visible however far the trace is reduced.
+
+    Args:
+        x: Sample times
+        y: Sample values
+        factor (int): Samples per block
+
+    Returns:
+        tuple: Decimated (x, y) arrays
+    """
+    if factor <= 1 or len(y) < 2 * factor:
+        return x, y
+    blocks = len(y) // factor
+    used = blocks * factor
+    shaped = y[:used].reshape(blocks, factor)
+    out_y = np.empty(2 * blocks, dtype=y.dtype)
+    out_y[0::2] = shaped.min(axis=1)
+    out_y[1::2] = shaped.max(axis=1)
+    out_x = np.repeat(x[:used:factor], 2)
+    return out_x, out_y
+
+
+class TimedGraphicsLayoutWidget(pg.GraphicsLayoutWidget):
+    """
+    GraphicsLayoutWidget that reports the duration of each paint event.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TimedGraphicsLayoutWidget, self).__init__(*args, **kwargs)
+        self.paint_time_callback = None
+
+    def paintEvent(self, event):
+        """
+        Paint the scene and report the elapsed time.
+
+        Args:
+            event: The paint event
+        """
+        if self.paint_time_callback is None:
+            return super(TimedGraphicsLayoutWidget, self).paintEvent(event)
+        start = time.perf_counter()
+        super(TimedGraphicsLayoutWidget, self).paintEvent(event)
+        self.paint_time_callback(time.perf_counter() - start)
+
+
+class _Channel:
+    """Plot, curve and decimation settings of one channel"""
+
+    def __init__(self, name, time_base, index, plot, curve, decimation):
+        self.name = name
+        self.time_base = time_base
+        self.index = index
+        self.plot = plot
+        self.curve = curve
+        self.decimation = decimation
+
+
+class MultiChannelView(QWidget):
+    """
+    Stacked plots of several channels on one shared, linked time axis.
+
+    All channels live in a single GraphicsLayoutWidget, so one scene is
+    painted per frame however many channels there are. Channels sampled
+    together share a time base: one ring buffer holding the timestamps once
+    and every channel's samples. Appending data only marks time bases dirty;
+    one refresh (the render scheduler's tick, or this view's own timer when
+    no scheduler is attached) updates the curves of dirty time bases. Each
+    channel is reduced with min/max decimation to about two points per
+    pixel, or more coarsely by its own ``decimation`` factor.
+    """
+
+    REFRESH_INTERVAL_MS = 33
+
+    def __init__(self, parent=None):
+        """
+        Initialize the multi-channel view.
+
+        Args:
+            parent: Parent widget (optional)
+        """
+        super(MultiChannelView, self).__init__(parent)
+
+        self.layout_widget = TimedGraphicsLayoutWidget()
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.layout_widget)
+
+        self.time_bases = {}
+        self.channels = {}
+        self._dirty = set()
+        self._master_plot = None
+        self._render_options = {"antialias": True, "downsample": 1}
+
+        # Own refresh timer, replaced by the render scheduler when attached
+        self.render_scheduler = None
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.render_pending)
+        self.refresh_timer.start(self.REFRESH_INTERVAL_MS)
+
+    def add_time_base(self, name, channels, capacity):
+        """
+        Add a ring-buffered time base shared by a group of channels.
+
+        Args:
+            name (str): Name of the time base
+            channels (list): Names of the channels sampled on this time base
+            capacity (int): Samples kept per channel
+
+        Returns:
+            TimeBaseRingBuffer: The buffer of the time base
+        """
+        buffer = TimeBaseRingBuffer(capacity, len(channels))
+        buffer.channel_names = list(channels)
+        self.time_bases[name] = buffer
+        return buffer
+
+    def add_channel(
+        self, name, time_base, label="", units=None, color="k", decimation=1
+    ):
+        """
+        Add a stacked plot for a channel of a time base.
+
+        Args:
+            name (str): Channel name, one of the time base's channels
+            time_base (str): Name of the time base the channel belongs to
+            label (str): Y-axis label (defaults to the channel name)
+            units (str): Y-axis units (optional)
+            color: Pen colour of the curve
+            decimation (int): Minimum min/max decimation factor
+
+        Returns:
+            PlotItem: The channel's plot
+        """
+        buffer = self.time_bases[time_base]
+        index = buffer.channel_names.index(name)
+
+        # Only the bottom plot shows the time axis
+        if self._master_plot is not None:
+            self.bottom_plot().hideAxis("bottom")
+        plot = self.layout_widget.addPlot(row=len(self.channels), col=0)
+        plot.setLabel("left", label or name, units=units)
+        plot.setLabel("bottom", "Time", units="s")
+        plot.showGrid(x=True, y=True)
+        plot.setClipToView(True)
+        plot.setMouseEnabled(x=True, y=False)
+        if self._master_plot is None:
+            self._master_plot = plot
+        else:
+            plot.setXLink(self._master_plot)
+
+        curve = plot.plot(pen=color, name=name)
+        curve.opts["antialias"] = self._render_options["antialias"]
+        channel = _Channel(name, time_base, index, plot, curve, max(1, int(decimation)))
+        self.channels[name] = channel
+        return plot
+
+    def bottom_plot(self):
+        """
+        Get the lowest plot of the stack.
+
+        Returns:
+            PlotItem: The plot added last, or None without channels
+        """
+        if not self.channels:
+            return self._master_plot
+        return list(self.channels.values())[-1].plot
+
+    def append(self, time_base, timestamps, values):
+        """
+        Append samples to a time base; the redraw happens on the next refresh.
+
+        Args:
+            time_base (str): Name of the time base
+            timestamps: Sample times
+            values: Array of shape (channels, samples), in the time base's
+                channel order
+        """
+        self.time_bases[time_base].append(timestamps, values)
+        self._dirty.add(time_base)
+        if self.render_scheduler is not None:
+            self.render_scheduler.request_render(self)
+
+    def render_pending(self):
+        """
+        Update the curves of every time base that received data.
+        """
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        width = max(1, self.layout_widget.width())
+        quality = self._render_options["downsample"]
+        for channel in self.channels.values():
+            if channel.time_base not in dirty:
+                continue
+            times, data = self.time_bases[channel.time_base].latest()
+            factor = max(channel.decimation, math.ceil(len(times) / (2 * width)))
+            x, y = peak_decimate(times, data[channel.index], factor * quality)
+            channel.curve.setData(x, y)
+
+    def set_render_scheduler(self, scheduler):
+        """
+        Attach or detach the render scheduler driving this view.
+
+        Args:
+            scheduler: RenderScheduler instance, or None to use the own timer
+        """
+        self.render_scheduler = scheduler
+        self.layout_widget.paint_time_callback = (
+            scheduler.report_paint_time if scheduler is not None else None
+        )
+        if scheduler is None:
+            self.refresh_timer.start(self.REFRESH_INTERVAL_MS)
+        else:
+            self.refresh_timer.stop()
+            if self._dirty:
+                scheduler.request_render(self)
+
+    def apply_render_quality(self, antialias=True, downsample=1):
+        """
+        Apply rendering quality settings to all channels.
+
+        Args:
+            antialias (bool): Whether curves are drawn antialiased
+            downsample (int): Extra decimation factor on top of each channel's
+        """
+        self._render_options = {"antialias": antialias, "downsample": downsample}
+        for channel in self.channels.values():
+            if channel.curve.opts["antialias"] != antialias:
+                channel.curve.opts["antialias"] = antialias
+                channel.curve.updateItems()
+        self._dirty.update(self.time_bases)
+        if self.render_scheduler is not None and self._dirty:
+            self.render_scheduler.request_render(self)
@@ -1,14 +1,46 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QComboBox, QSpinBox
 from PySide6.QtCore import QTimer, Signal
 import sys
+import time
 import os
 import numpy as np
 import pyqtgraph as pg
+from views.event_marker_layer import EventMarkerItem
 
 # Add the ressources directory to the path to import the UI
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "ressources"))
 from ui_plotter_widget import Ui_PlotterWidget
 
+# PyQtGraph options are global; configure them once per process rather than
+# on every widget construction
+pg.setConfigOptions(antialias=True)
+pg.setConfigOption('background', 'w')
+pg.setConfigOption('foreground', 'k')
+
+
+class TimedPlotWidget(pg.PlotWidget):
+    """
+    PlotWidget that reports the duration of each paint event, so a render
+    scheduler can measure the real cost of a frame.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(TimedPlotWidget, self).__init__(*args, **kwargs)
+        self.paint_time_callback = None
+
+    def paintEvent(self, event):
+        """
+        Paint the scene and report the elapsed time.
+
+        Args:
+            event: The paint event
+        """
+        if self.paint_time_callback is None:
+            return super(TimedPlotWidget, self).paintEvent(event)
+        start = time.perf_counter()
+        super(TimedPlotWidget, self).paintEvent(event)
+        self.paint_time_callback(time.perf_counter() - start)
+
 
 class PlotterWidgetView(QWidget):
     """
@@ -32,13 +64,8 @@ class PlotterWidgetView(QWidget):
         self.ui = Ui_PlotterWidget()
         self.ui.setupUi(self)
         
-        # Configure PyQtGraph
-        pg.setConfigOptions(antialias=True)
-        pg.setConfigOption('background', 'w')
-        pg.setConfigOption('foreground', 'k')
-        
         # Create the plot widget
-        self.plot_widget = pg.PlotWidget()
+        self.plot_widget = TimedPlotWidget()
         self.plot_widget.setLabel('left', 'Amplitude', units='V')
         self.plot_widget.setLabel('bottom', 'Time', units='s')
         self.plot_widget.setTitle('MR Detection Data')
@@ -51,6 +78,23 @@ class PlotterWidgetView(QWidget):
         # Initialize data storage
         self.plot_data = {}
         self.plot_curves = {}
+
+        # Deferred rendering state, driven by a RenderScheduler when attached
+        self.render_scheduler = None
+        self._pending_data = {}
+        self._render_options = {"antialias": True, "downsample": 1}
+        
+        # Optional spectrogram below the time-domain plot
+        self.spectrogram = None
+        
+        # Optional list of similar past operations per detected event
+        self.similar_operations = None
+        
+        # Optional table of running channel statistics
+        self.channel_statistics = None
+        
+        # Event markers, one batched graphics item per colour
+        self.marker_items = {}
         
         # Set up initial styling
         self.setStyleSheet("""
@@ -78,6 +122,8 @@ class PlotterWidgetView(QWidget):
         
         color = colors.get(data_type, 'k')
         curve = self.plot_widget.plot(pen=color, name=data_type)
+        curve.setClipToView(True)
+        self._apply_curve_quality(curve)
         self.plot_curves[data_type] = curve
         self.plot_data[data_type] = {'x': [], 'y': []}
         
@@ -95,6 +141,8 @@ class PlotterWidgetView(QWidget):
             self.plot_widget.clear()
             self.plot_data.clear()
             self.plot_curves.clear()
+            self._pending_data.clear()
+            self.marker_items.clear()
             
         if data_type not in self.plot_curves:
             self._add_plot_curve(data_type)
@@ -103,6 +151,169 @@ class PlotterWidgetView(QWidget):
         self.plot_data[data_type]['y'] = list(y_data)
         
         self.plot_curves[data_type].setData(x_data, y_data)
+
+    def update_data(self, x_data, y_data, data_type):
+        """
+        Replace the data of a curve, deferring the redraw to the render
+        scheduler when one is attached. Only the latest data per curve is
+        kept until the next frame.
+        
+        Args:
+            x_data: X-axis data (time or sample points)
+            y_data: Y-axis data (measurements)
+            data_type (str): Type of data being plotted
+        """
+        if data_type not in self.plot_curves:
+            self._add_plot_curve(data_type)
+
+        self.plot_data[data_type]['x'] = x_data
+        self.plot_data[data_type]['y'] = y_data
+
+        if self.render_scheduler is None:
+            self.plot_curves[data_type].setData(x_data, y_data)
+            return
+
+        self._pending_data[data_type] = (x_data, y_data)
+        self.render_scheduler.request_render(self)
+
+    def render_pending(self):
+        """
+        Push deferred curve data to the plot. Called by the render scheduler.
+        """
+        pending = self._pending_data
+        self._pending_data = {}
+        for data_type, (x_data, y_data) in pending.items():
+            curve = self.plot_curves.get(data_type)
+            if curve is not None:
+                curve.setData(x_data, y_data)
+        if self.spectrogram is not None and self.spectrogram.needs_render:
+            self.spectrogram.render_pending()
+
+    def set_render_scheduler(self, scheduler):
+        """
+        Attach or detach the render scheduler driving this view.
+        
+        Args:
+            scheduler: RenderScheduler instance, or None to draw synchronously
+        """
+        if scheduler is None and self._pending_data:
+            self.render_pending()
+        self.render_scheduler = scheduler
+        self.plot_widget.paint_time_callback = (
+            scheduler.report_paint_time if scheduler is not None else None
+        )
+        if self.spectrogram is not None:
+            # Redraws are requested through this view, not the spectrogram
+            self.spectrogram.plot_widget.paint_time_callback = (
+                self.plot_widget.paint_time_callback
+            )
+
+    def apply_render_quality(self, antialias=True, downsample=1):
+        """
+        Apply rendering quality settings to all curves.
+        
+        Args:
+            antialias (bool): Whether curves are drawn antialiased
+            downsample (int): Decimation factor for drawn points
+        """
+        self._render_options = {"antialias": antialias, "downsample": downsample}
+        for curve in self.plot_curves.values():
+            self._apply_curve_quality(curve)
+        if self.spectrogram is not None:
+            self.spectrogram.apply_render_quality(antialias, downsample)
+
+    def _apply_curve_quality(self, curve):
+        """
+        Apply the current rendering quality settings to one curve.
+        
+        Args:
+            curve: PlotDataItem to configure
+        """
+        curve.setDownsampling(
+            ds=self._render_options["downsample"], auto=False, method='peak'
+        )
+        if curve.opts['antialias'] != self._render_options["antialias"]:
+            curve.opts['antialias'] = self._render_options["antialias"]
+            curve.updateItems()
+        
+    def enable_spectrogram(self, sample_rate, fft_size=256, hop=None, history_seconds=10.0):
+        """
+        Show a scrolling spectrogram below the time-domain plot.
+        
+        Args:
+            sample_rate (float): Sample rate of the stream in Hz
+            fft_size (int): Samples per FFT window
+            hop (int): Samples between windows (default: half a window)
+            history_seconds (float): Time span kept and displayed
+            
+        Returns:
+            SpectrogramView: The spectrogram view
+        """
+        # Imported here: spectrogram_view imports TimedPlotWidget from this module
+        from views.spectrogram_view import SpectrogramView
+        
+        if self.spectrogram is None:
+            self.spectrogram = SpectrogramView(
+                sample_rate, fft_size, hop, history_seconds, parent=self
+            )
+            self.ui.verticalLayout.addWidget(self.spectrogram)
+            self.spectrogram.apply_render_quality(**self._render_options)
+            self.spectrogram.plot_widget.paint_time_callback = (
+                self.plot_widget.paint_time_callback
+            )
+        return self.spectrogram
+        
+    def update_spectrogram(self, samples):
+        """
+        Feed new samples to the spectrogram. The transform runs immediately;
+        the redraw is deferred to the render scheduler when one is attached.
+        
+        Args:
+            samples: 1-D array of new samples
+        """
+        if self.spectrogram is None:
+            return
+        self.spectrogram.append_samples(samples, render=self.render_scheduler is None)
+        if self.render_scheduler is not None:
+            self.render_scheduler.request_render(self)
+        
+    def show_similar_operations(self, label, matches):
+        """
+        Show the past operations most similar to a detected event below the
+        plot.
+        
+        Args:
+            label (str): Event description
+            matches (list): SignatureMatch results from a SignatureIndex, best first
+        """
+        if self.similar_operations is None:
+            from views.similar_operations_view import SimilarOperationsView
+            
+            self.similar_operations = SimilarOperationsView(parent=self)
+            self.similar_operations.setMaximumHeight(180)
+            self.ui.verticalLayout.addWidget(self.similar_operations)
+        self.similar_operations.add_event(label, matches)
+        
+    def show_channel_statistics(self, snapshot, started=None):
+        """
+        Show running statistics of the plotted channels below the plot.
+        
+        Args:
+            snapshot (dict): Statistics per channel from ChannelStatistics.snapshot()
+            started (float): Start of the statistics window as a Unix time (optional)
+            
+        Returns:
+            ChannelStatisticsView: The statistics table, whose reset_requested
+            signal asks for a new window
+        """
+        if self.channel_statistics is None:
+            from views.channel_statistics_view import ChannelStatisticsView
+            
+            self.channel_statistics = ChannelStatisticsView(parent=self)
+            self.channel_statistics.setMaximumHeight(120)
+            self.ui.verticalLayout.addWidget(self.channel_statistics)
+        self.channel_statistics.show_statistics(snapshot, started)
+        return self.channel_statistics
         
     def add_marker(self, x_pos, label="Marker", color='r'):
         """
@@ -113,8 +324,43 @@ class PlotterWidgetView(QWidget):
             label (str): Label for the marker
             color: Color of the marker line
         """
-        line = pg.InfiniteLine(pos=x_pos, angle=90, pen=color, label=label)
-        self.plot_widget.addItem(line)
+        self._marker_item(color).add_marker(x_pos, label)
+        
+    def add_markers(self, x_positions, labels=None, color='r'):
+        """
+        Add many vertical marker lines to the plot at once.
+        
+        Args:
+            x_positions: X positions of the markers
+            labels: Labels of the markers (optional)
+            color: Color of the marker lines
+        """
+        self._marker_item(color).add_markers(x_positions, labels)
+        
+    def clear_markers(self):
+        """
+        Remove all markers from the plot.
+        """
+        for item in self.marker_items.values():
+            self.plot_widget.removeItem(item)
+        self.marker_items.clear()
+        
+    def _marker_item(self, color):
+        """
+        Get the marker item drawing the markers of one colour.
+        
+        Args:
+            color: Color of the markers
+            
+        Returns:
+            EventMarkerItem: The batched marker item
+        """
+        item = self.marker_items.get(color)
+        if item is None:
+            item = EventMarkerItem(color)
+            self.plot_widget.addItem(item)
+            self.marker_items[color] = item
+        return item
         
     def set_plot_labels(self, x_label="Time", y_label="Amplitude", title="Data Plot"):
         """
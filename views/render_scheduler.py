@@ -0,0 +1,234 @@
+from PySide6.QtCore import QObject, QTimer, Signal
+from collections import deque
+import time
+import numpy as np
+from utils.diagnostics.timing import TIMINGS
+
+
+class RenderScheduler(QObject):
+    """
+    Render scheduler that keeps plot redraws within a frame-time budget on the
+    GUI thread.
+
+    Views register with the scheduler and mark themselves dirty when new data
+    arrives instead of redrawing synchronously. On every tick the scheduler
+    renders dirty views until the per-frame budget is spent, measures the
+    actual paint time reported by the views, and adapts the quality level:
+    under load it first disables antialiasing, then increases decimation and
+    lowers the refresh rate; once frames are cheap again (or the plots are
+    idle) quality is restored step by step.
+    """
+
+    # Emitted when the quality level changes (new level index)
+    quality_changed = Signal(int)
+    # Emitted about once per second with the current frame statistics
+    stats_updated = Signal(dict)
+
+    # Quality levels from best to cheapest: refresh interval (ms),
+    # antialiasing and downsampling factor
+    QUALITY_LEVELS = (
+        {"interval_ms": 33, "antialias": True, "downsample": 1},
+        {"interval_ms": 33, "antialias": False, "downsample": 1},
+        {"interval_ms": 50, "antialias": False, "downsample": 2},
+        {"interval_ms": 100, "antialias": False, "downsample": 4},
+        {"interval_ms": 200, "antialias": False, "downsample": 8},
+    )
+
+    def __init__(self, frame_budget_ms=8.0, parent=None):
+        """
+        Initialize the render scheduler.
+
+        Args:
+            frame_budget_ms (float): Target GUI-thread time per frame
+            parent: Parent object (optional)
+        """
+        super(RenderScheduler, self).__init__(parent)
+
+        self.frame_budget = frame_budget_ms / 1000.0
+        self.quality_level = 0
+
+        # Registered views and the subset waiting for a redraw
+        self._views = []
+        self._dirty = []
+
+        # Frames above budget before degrading, seconds of cheap frames
+        # before restoring one level
+        self.degrade_after = 3
+        self.restore_after = 1.0
+        self._over_budget_frames = 0
+        self._cheap_since = None
+
+        # Rolling frame statistics
+        self._frame_times = deque(maxlen=120)
+        self._frame_stamps = deque(maxlen=240)
+        self._frame_time_ema = 0.0
+        self._pending_paint_time = 0.0
+        self._last_stats_emit = time.monotonic()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._on_tick)
+        self.timer.start(self.QUALITY_LEVELS[0]["interval_ms"])
+
+    def register_view(self, view):
+        """
+        Register a view to be rendered by this scheduler.
+
+        Args:
+            view: View providing render_pending(), apply_render_quality()
+                and set_render_scheduler()
+        """
+        if view in self._views:
+            return
+        self._views.append(view)
+        view.set_render_scheduler(self)
+        view.apply_render_quality(**self._quality_options())
+
+    def unregister_view(self, view):
+        """
+        Stop rendering a view.
+
+        Args:
+            view: Previously registered view
+        """
+        if view in self._views:
+            self._views.remove(view)
+        if view in self._dirty:
+            self._dirty.remove(view)
+        view.set_render_scheduler(None)
+
+    def request_render(self, view):
+        """
+        Mark a view as needing a redraw on the next frame.
+
+        Args:
+            view: Registered view with new data
+        """
+        if view not in self._dirty:
+            self._dirty.append(view)
+
+    def report_paint_time(self, seconds):
+        """
+        Report time spent in a paint event of a registered view.
+
+        Args:
+            seconds (float): Duration of the paint event
+        """
+        self._pending_paint_time += seconds
+        if TIMINGS.enabled:
+            TIMINGS.record("paint", seconds)
+
+    def get_stats(self):
+        """
+        Get the current frame statistics.
+
+        Returns:
+            dict: fps, frame time mean/p95/max in milliseconds, quality level
+                and number of views waiting for a redraw
+        """
+        now = time.monotonic()
+        recent = [t for t in self._frame_stamps if now - t <= 1.0]
+        if self._frame_times:
+            frame_times = np.fromiter(self._frame_times, dtype=float) * 1000.0
+            mean_ms = float(frame_times.mean())
+            p95_ms = float(np.percentile(frame_times, 95))
+            max_ms = float(frame_times.max())
+        else:
+            mean_ms = p95_ms = max_ms = 0.0
+        return {
+            "fps": len(recent),
+            "frame_time_mean_ms": mean_ms,
+            "frame_time_p95_ms": p95_ms,
+            "frame_time_max_ms": max_ms,
+            "budget_ms": self.frame_budget * 1000.0,
+            "quality_level": self.quality_level,
+            "pending_views": len(self._dirty),
+        }
+
+    def set_quality_level(self, level):
+        """
+        Force a quality level and apply it to all registered views.
+
+        Args:
+            level (int): Index into QUALITY_LEVELS
+        """
+        level = max(0, min(level, len(self.QUALITY_LEVELS) - 1))
+        if level == self.quality_level:
+            return
+        self.quality_level = level
+        self._over_budget_frames = 0
+        self._cheap_since = None
+        options = self._quality_options()
+        for view in self._views:
+            view.apply_render_quality(**options)
+        self.timer.setInterval(self.QUALITY_LEVELS[level]["interval_ms"])
+        self.quality_changed.emit(level)
+
+    def _quality_options(self):
+        """Rendering options of the current quality level"""
+        level = self.QUALITY_LEVELS[self.quality_level]
+        return {"antialias": level["antialias"], "downsample": level["downsample"]}
+
+    def _on_tick(self):
+        """Render dirty views within the frame budget and adapt quality"""
+        # Paint events of the previous frame were delivered since the last tick
+        paint_time = self._pending_paint_time
+        self._pending_paint_time = 0.0
+
+        start = time.perf_counter()
+        rendered = 0
+        while self._dirty:
+            view = self._dirty.pop(0)
+            if TIMINGS.enabled:
+                view_start = time.perf_counter()
+                view.render_pending()
+                TIMINGS.record(
+                    f"render:{type(view).__name__}", time.perf_counter() - view_start
+                )
+            else:
+                view.render_pending()
+            rendered += 1
+            # Leave the remaining views for the next frame so input events
+            # are not starved
+            if time.perf_counter() - start >= self.frame_budget:
+                break
+        frame_time = time.perf_counter() - start + paint_time
+
+        if rendered or paint_time:
+            self._record_frame(frame_time)
+        else:
+            # Nothing to draw counts as an idle, cheap frame
+            self._adapt(0.0)
+        self._maybe_emit_stats()
+
+    def _record_frame(self, frame_time):
+        """Record a rendered frame and adapt quality to its cost"""
+        self._frame_times.append(frame_time)
+        self._frame_stamps.append(time.monotonic())
+        self._frame_time_ema = 0.8 * self._frame_time_ema + 0.2 * frame_time
+        self._adapt(self._frame_time_ema)
+
+    def _adapt(self, frame_time):
+        """Degrade or restore quality with hysteresis"""
+        if frame_time > self.frame_budget:
+            self._over_budget_frames += 1
+            self._cheap_since = None
+            if self._over_budget_frames >= self.degrade_after:
+                self.set_quality_level(self.quality_level + 1)
+        elif frame_time < 0.5 * self.frame_budget:
+            self._over_budget_frames = 0
+            now = time.monotonic()
+            if self._cheap_since is None:
+                self._cheap_since = now
+            elif now - self._cheap_since >= self.restore_after:
+                self._frame_time_ema = frame_time
+                self.set_quality_level(self.quality_level - 1)
+        else:
+            self._over_budget_frames = 0
+            self._cheap_since = None
+
+    def _maybe_emit_stats(self):
+        """Emit frame statistics about once per second"""
+        now = time.monotonic()
+        if now - self._last_stats_emit >= 1.0:
+            self._last_stats_emit = now
+            self.stats_updated.emit(self.get_stats())
@@ -0,0 +1,95 @@
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QComboBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+)
+import time
+
+
+class SimilarOperationsView(QWidget):
+    """
+    List of the past operations most similar to each detected event.
+
+    Every event added brings its nearest-neighbour matches from the signature
+    index; the latest event is shown, earlier ones can be picked from the
+    event selector.
+    """
+
+    COLUMNS = ("Operation", "Tap", "Time", "Similarity")
+    MAX_EVENTS = 200
+
+    def __init__(self, parent=None):
+        """
+        Initialize the similar operations view.
+
+        Args:
+            parent: Parent widget (optional)
+        """
+        super().__init__(parent)
+        self._matches = []
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        header.addWidget(QLabel("Most similar past operations for"))
+        self.event_selector = QComboBox()
+        self.event_selector.currentIndexChanged.connect(self._show_event)
+        header.addWidget(self.event_selector, 1)
+        layout.addLayout(header)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(
+            2, QHeaderView.ResizeMode.Stretch
+        )
+        layout.addWidget(self.table)
+
+    def add_event(self, label, matches):
+        """
+        Add an event with its similar operations and show it.
+
+        Args:
+            label (str): Event description shown in the selector
+            matches (list): SignatureMatch results, best first
+        """
+        if len(self._matches) >= self.MAX_EVENTS:
+            self._matches.pop(0)
+            self.event_selector.removeItem(0)
+        self._matches.append(matches)
+        self.event_selector.addItem(label)
+        self.event_selector.setCurrentIndex(self.event_selector.count() - 1)
+
+    def clear(self):
+        """
+        Remove all events.
+        """
+        self._matches.clear()
+        self.event_selector.clear()
+        self.table.setRowCount(0)
+
+    def _show_event(self, index):
+        """
+        Fill the table with the matches of one event.
+
+        Args:
+            index (int): Index of the event in the selector
+        """
+        matches = self._matches[index] if 0 <= index < len(self._matches) else []
+        self.table.setRowCount(len(matches))
+        for row, match in enumerate(matches):
+            values = (
+                str(match.operation_id),
+                "-" if match.tap_position is None else str(match.tap_position),
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(match.time)),
+                f"{match.similarity:.3f}",
+            )
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
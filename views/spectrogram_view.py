@@ -0,0 +1,154 @@
+from PySide6.QtWidgets import QWidget, QVBoxLayout
+from PySide6.QtCore import QRectF
+import numpy as np
+import pyqtgraph as pg
+from utils.dsp.stft import StreamingSTFT
+from views.plotter_widget_view import TimedPlotWidget
+
+
+class SpectrogramView(QWidget):
+    """
+    Scrolling spectrogram of a live sample stream.
+
+    Samples are transformed incrementally by a StreamingSTFT as they arrive.
+    Spectrum rows are written into a preallocated image of twice the history
+    length: each row is stored at ``i`` and ``i + history``, so the newest
+    ``history`` rows are always one contiguous slice and scrolling needs no
+    copying. Memory is fixed by the history length, not the session length.
+    """
+
+    def __init__(
+        self,
+        sample_rate,
+        fft_size=256,
+        hop=None,
+        history_seconds=10.0,
+        db_range=(-100.0, 0.0),
+        parent=None,
+    ):
+        """
+        Initialize the spectrogram view.
+
+        Args:
+            sample_rate (float): Sample rate of the stream in Hz
+            fft_size (int): Samples per FFT window
+            hop (int): Samples between windows (default: half a window)
+            history_seconds (float): Time span kept and displayed
+            db_range (tuple): Colour scale limits in dB
+            parent: Parent widget (optional)
+        """
+        super(SpectrogramView, self).__init__(parent)
+
+        self.stft = StreamingSTFT(fft_size, hop, sample_rate)
+        self.db_range = db_range
+        self.history = max(1, int(round(history_seconds / self.stft.frame_period)))
+
+        # Double-length ring: rows [write, write + history) are oldest..newest
+        self._image = np.full(
+            (2 * self.history, self.stft.bins), db_range[0], dtype=np.float32
+        )
+        self._write = 0
+        self._dirty = False
+
+        self.plot_widget = TimedPlotWidget()
+        self.plot_widget.setLabel("left", "Frequency", units="Hz")
+        self.plot_widget.setLabel("bottom", "Time", units="s")
+        self.plot_widget.setTitle("Spectrogram")
+
+        self.image_item = pg.ImageItem(axisOrder="col-major")
+        self.image_item.setColorMap(pg.colormap.get("viridis"))
+        self.plot_widget.addItem(self.image_item)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.plot_widget)
+
+        self.render_scheduler = None
+        self.render_pending()
+
+    @property
+    def needs_render(self):
+        """bool: Whether rows were appended since the last redraw"""
+        return self._dirty
+
+    def append_samples(self, samples, render=True):
+        """
+        Transform new samples and append the resulting spectrum rows.
+
+        Args:
+            samples: 1-D array of new samples
+            render (bool): Redraw now (False when a parent schedules redraws)
+        """
+        rows = self.stft.process(samples)
+        count = len(rows)
+        if count == 0:
+            return
+        if count > self.history:
+            rows = rows[-self.history :]
+            count = self.history
+
+        # Write with wrap-around, mirrored into the second half
+        first = min(count, self.history - self._write)
+        for offset, part in ((0, rows[:first]), (first, rows[first:])):
+            if len(part) == 0:
+                continue
+            start = (self._write + offset) % self.history
+            self._image[start : start + len(part)] = part
+            self._image[start + self.history : start + self.history + len(part)] = part
+        self._write = (self._write + count) % self.history
+        self._dirty = True
+
+        if not render:
+            return
+        if self.render_scheduler is None:
+            self.render_pending()
+        else:
+            self.render_scheduler.request_render(self)
+
+    def render_pending(self):
+        """
+        Push the current history window to the image item.
+        """
+        visible = self._image[self._write : self._write + self.history]
+        self.image_item.setImage(visible, autoLevels=False, levels=self.db_range)
+
+        period = self.stft.frame_period
+        end = self.stft.frames_out * period
+        nyquist = self.stft.sample_rate / 2.0
+        self.image_item.setRect(
+            QRectF(end - self.history * period, 0.0, self.history * period, nyquist)
+        )
+        self._dirty = False
+
+    def set_render_scheduler(self, scheduler):
+        """
+        Attach or detach the render scheduler driving this view.
+
+        Args:
+            scheduler: RenderScheduler instance, or None to draw synchronously
+        """
+        if scheduler is None and self._dirty:
+            self.render_pending()
+        self.render_scheduler = scheduler
+        self.plot_widget.paint_time_callback = (
+            scheduler.report_paint_time if scheduler is not None else None
+        )
+
+    def apply_render_quality(self, antialias=True, downsample=1):
+        """
+        Apply rendering quality settings.
+
+        Args:
+            antialias (bool): Unused; images are not antialiased
+            downsample (int): Let the image item downsample when above 1
+        """
+        self.image_item.setAutoDownsample(downsample > 1)
+
+    def clear(self):
+        """
+        Drop the history and any buffered samples.
+        """
+        self._image.fill(self.db_range[0])
+        self._write = 0
+        self.stft.reset()
+        self.render_pending()